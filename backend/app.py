@@ -6,58 +6,131 @@ FastAPI application exposing endpoints for querying financial data and chat inte
 
 This module initializes the FastAPI server, configures CORS, logging, and integrates with
 Chroma vector store and OpenAI LLM for conversational querying.
+
+Importing it is cheap: the OpenAI clients, Chroma, caches and indexes live in a
+lazily built `Services` container that the lifespan warms up in the background;
+`/health/live` answers immediately and `/health/ready` once warm-up is done.
 """
+import asyncio
+import gzip
+import hashlib
+import json
 import os
 import sys
 import logging
+from contextlib import AsyncExitStack, asynccontextmanager, contextmanager
+from dataclasses import dataclass
+from datetime import date
 from pathlib import Path
-from typing import List, Dict, Any
+from time import perf_counter
+from typing import AsyncIterator, Iterator, List, Dict, Any, Optional, Tuple
 
-from dotenv import load_dotenv
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel, Field
-from jinja2 import Environment, FileSystemLoader, select_autoescape
-from langchain_openai import ChatOpenAI, OpenAIEmbeddings
-from langchain_community.vectorstores import Chroma
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from pydantic import BaseModel, Field, model_validator
+from langchain.docstore.document import Document
 from langchain.schema import HumanMessage
 
+from backend.src.answer_cache import CachedAnswer, doc_id
+from backend.src.concurrency import SaturatedError
+from backend.src.context_builder import BuiltPrompt, render_history
+from backend.src.http_clients import upstream_stats
+from backend.src.keyword_index import is_conclusive, reciprocal_rank_fusion
+from backend.src.services import ConfigError, Services
+from backend.src.telemetry import Registry, RequestIdFilter, TelemetryMiddleware
+
 # ─── Paths & Logging ─────────────────────────────────────────────────────────
 PROJECT_ROOT = Path(__file__).resolve().parent
-load_dotenv(PROJECT_ROOT / ".env")
 
+_log_handler = logging.StreamHandler(sys.stdout)
+_log_handler.addFilter(RequestIdFilter())
 logging.basicConfig(
     level=logging.INFO,
-    format="%(asctime)s %(levelname)-8s %(message)s",
-    handlers=[logging.StreamHandler(sys.stdout)],
+    format="%(asctime)s %(levelname)-8s [%(request_id)s] %(message)s",
+    handlers=[_log_handler],
 )
 logger = logging.getLogger(__name__)
 logger.info("Starting Chat API")
 
+# ─── Services ────────────────────────────────────────────────────────────────
+# Settings (backend/.env + environment), the system prompt, OpenAI clients,
+# Chroma, caches, keyword index, catalog and financials; see backend/src/services.py.
+services = Services(PROJECT_ROOT)
+_warm_up_task: Optional["asyncio.Future[None]"] = None
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """Start warming the services in a thread; the server accepts requests meanwhile."""
+    global _warm_up_task
+    _warm_up_task = asyncio.ensure_future(asyncio.to_thread(services.warm_up))
+    yield
+
+
 # ─── FastAPI setup ───────────────────────────────────────────────────────────
 app = FastAPI(
     title="Financial P&L Chat API",
     description="Query quarterly P&L statements via vector search + LLM",
     version="1.0.0",
+    lifespan=lifespan,
 )
+# ─── Metrics ─────────────────────────────────────────────────────────────────
+# With several uvicorn workers set METRICS_MULTIPROC_DIR to a directory that
+# is emptied on start; each worker flushes its metrics there and /metrics on
+# any worker reports the sum. It is read from the process environment, not .env.
+METRICS_MULTIPROC_DIR = os.getenv("METRICS_MULTIPROC_DIR")
+metrics = Registry(Path(METRICS_MULTIPROC_DIR) if METRICS_MULTIPROC_DIR else None)
+HTTP_SECONDS = metrics.histogram(
+    "http_request_duration_seconds", "HTTP request latency by route template", ("method", "path", "status"),
+)
+CHAT_STAGE_SECONDS = metrics.histogram(
+    "chat_stage_duration_seconds", "Time spent in each stage of the chat pipeline", ("stage",),
+)
+CHAT_REQUESTS = metrics.counter(
+    "chat_requests_total", "Answered chats by endpoint and route (structured, cached, llm)", ("endpoint", "route"),
+)
+CHAT_ERRORS = metrics.counter("chat_errors_total", "Chat failures by pipeline stage", ("stage",))
+LLM_TOKENS = metrics.counter("llm_tokens_total", "LLM tokens reported by the API", ("kind",))
+LLM_CHARS = metrics.counter("llm_chars_total", "Characters sent to and received from the LLM", ("kind",))
+PROMPT_TOKENS = metrics.counter(
+    "prompt_tokens_total", "Prompt tokens sent, and saved by context budgeting and overlap removal", ("kind",),
+)
+CACHE_LOOKUPS = metrics.counter("cache_lookups_total", "Embedding and answer cache lookups", ("cache", "outcome"))
+RETRIEVAL_PATHS = metrics.counter("retrieval_path_total", "Retrievals by path (keyword_only, embedded)", ("path",))
+
+app.add_middleware(TelemetryMiddleware, registry=metrics, histogram=HTTP_SECONDS)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["http://localhost:3000"],
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Request-ID"],
 )
 
+
+@app.exception_handler(ConfigError)
+async def config_error_handler(request: Request, exc: ConfigError) -> JSONResponse:
+    """A request needed a service that cannot be built (e.g. no OpenAI key): 503."""
+    logger.error("%s %s unavailable: %s", request.method, request.url.path, exc)
+    return JSONResponse(status_code=503, content={"detail": "Chat service is not configured"})
+
 # ─── Request / Response Models ───────────────────────────────────────────────
+MAX_CHAT_COMPANIES = 8  # bounds the per-company retrieval fan-out of one question
+
+
 class ChatRequest(BaseModel):  # noqa: D101
     """
     Request payload for chat endpoint.
 
     Attributes:
-        company (str): Slug of the company.
+        company (str): Slug of the company (the first of `companies` if omitted).
+        companies (List[str]): Further slugs, to compare several companies.
         question (str): User's question text.
         history (List[Dict[str, Any]]): Conversation history for context.
     """
-    company: str = Field(..., alias="company_slug")
+    company: Optional[str] = Field(None, alias="company_slug")
+    companies: List[str] = Field(default_factory=list, alias="company_slugs")
     question: str
     history: List[Dict[str, Any]] = Field(default_factory=list)
 
@@ -65,6 +138,25 @@ class ChatRequest(BaseModel):  # noqa: D101
         allow_population_by_field_name = True
         populate_by_name = True
 
+    @model_validator(mode="after")
+    def _check_companies(self) -> "ChatRequest":
+        if not self.company and not self.companies:
+            raise ValueError("company_slug or company_slugs is required")
+        self.company = self.company or self.companies[0]
+        if len(self.slugs) > MAX_CHAT_COMPANIES:
+            raise ValueError(f"at most {MAX_CHAT_COMPANIES} companies per question")
+        return self
+
+    @property
+    def slugs(self) -> List[str]:
+        """Every company asked about, in order and without repeats."""
+        return list(dict.fromkeys([self.company, *self.companies]))
+
+    @property
+    def scope(self) -> str:
+        """Answer-cache and log scope: the slug, or the comma-joined slugs."""
+        return ",".join(self.slugs)
+
 
 class ChatResponse(BaseModel):  # noqa: D101
     """
@@ -73,52 +165,110 @@ class ChatResponse(BaseModel):  # noqa: D101
     Attributes:
         answer (str): Generated answer from LLM.
         sources (List[str]): List of source document identifiers.
+        cached (bool): True if the answer was served from the answer cache.
+        structured (bool): True if the answer came from the financials store
+            without retrieval or the LLM.
+        sources_by_company (Dict[str, List[str]]): `sources` grouped by company slug.
     """
     answer: str
     sources: List[str]
+    cached: bool = False
+    structured: bool = False
+    sources_by_company: Dict[str, List[str]] = Field(default_factory=dict)
 
-# ─── Load system prompt from Jinja2 template ─────────────────────────────────
-tmpl_env = Environment(
-    loader=FileSystemLoader(str(PROJECT_ROOT / "prompts")),
-    autoescape=select_autoescape([]),
-)
-SYSTEM_PROMPT = tmpl_env.get_template("system_prompt.j2").render()
-logger.info("Loaded system prompt from backend/prompts/system_prompt.j2")
 
+class BatchChatRequest(BaseModel):  # noqa: D101
+    """
+    Request payload for the batch chat endpoint: every question for every company.
 
-# ─── OpenAI Embeddings & Chroma DB ───────────────────────────────────────────
-EMBED_KEY = os.getenv("OPENAI_EMBEDDING_KEY") or os.getenv("openai_embedding_key")
-if not EMBED_KEY:
-    logger.error("Missing OPENAI_EMBEDDING_KEY in .env")
-    sys.exit(1)
+    Attributes:
+        companies (List[str]): Company slugs.
+        questions (List[str]): Questions asked of each company.
+        skip (List[str]): Ids of items already answered by an earlier run.
+    """
+    companies: List[str] = Field(..., alias="company_slugs", min_length=1)
+    questions: List[str] = Field(..., min_length=1)
+    skip: List[str] = Field(default_factory=list)
 
-embeddings = OpenAIEmbeddings(
-    model=os.getenv("OPENAI_EMBEDDING_MODEL"),
-    openai_api_key=EMBED_KEY,
-)
-logger.info("OpenAIEmbeddings initialized")
+    class Config:
+        populate_by_name = True
+
+
+def batch_item_id(company: str, index: int) -> str:
+    """Id of the answer to `questions[index]` for `company` in a batch."""
+    return f"{company}#{index}"
+
+# ─── Hybrid retrieval ────────────────────────────────────────────────────────
+# build_index.py writes a BM25 index of the same chunks next to Chroma. Chat
+# fuses keyword and vector results (RRF); when the keyword hits alone are
+# convincing the embedding call and vector search are skipped entirely.
+RETRIEVAL_K = 4
+GZIP_MIN_BYTES = 1024  # smaller /api/financials bodies are sent uncompressed
+
+# ─── Structured-query routing ────────────────────────────────────────────────
+# Lookups like "net income in Q2 2023" are answered from the financials store;
+# everything else, including comparisons across companies, goes through
+# retrieval + LLM.
+def route_structured(req: ChatRequest) -> Optional[ChatResponse]:
+    """Answer `req` from the financials store, or None if it needs the LLM."""
+    if not services.settings.structured_routing or len(req.slugs) > 1:
+        return None
+    services.refresh_financials()
+    with stage("route"):
+        result = services.query_router.route(req.question, req.company)
+    if result is None:
+        return None
+    logger.info("Structured answer for %s: %s", req.company, req.question)
+    return ChatResponse(
+        answer=result.answer, sources=result.sources, structured=True,
+        sources_by_company={req.company: result.sources},
+    )
+
+# ─── Pipeline instrumentation ────────────────────────────────────────────────
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """Time one chat pipeline stage; an exception counts as an error of that stage."""
+    t0 = perf_counter()
+    try:
+        yield
+    except Exception:
+        CHAT_ERRORS.inc(stage=name)
+        raise
+    finally:
+        CHAT_STAGE_SECONDS.observe(perf_counter() - t0, stage=name)
 
-INDEX_DIR = PROJECT_ROOT.parent / "data" / "index"
-vectordb = Chroma(
-    persist_directory=str(INDEX_DIR),
-    embedding_function=embeddings
-)
-logger.info("Chroma index loaded from %s", INDEX_DIR)
-
-# ─── LLM Setup ───────────────────────────────────────────────────────────────
-CHAT_KEY = os.getenv("OPENAI_API_KEY") or EMBED_KEY
-llm = ChatOpenAI(
-    model=os.getenv("OPENAI_EMBEDDING_MODEL"),
-    openai_api_key=CHAT_KEY,
-    temperature=0.8,
-)
-logger.info("ChatOpenAI initialized (model=gpt-3.5-turbo)")
+
+def record_llm_usage(prompt: str, completion: str, usage: Optional[Dict[str, Any]]) -> None:
+    """Count prompt/completion characters, and tokens when the API reported them."""
+    LLM_CHARS.inc(len(prompt), kind="prompt")
+    LLM_CHARS.inc(len(completion), kind="completion")
+    if usage:
+        LLM_TOKENS.inc(usage.get("input_tokens", 0), kind="prompt")
+        LLM_TOKENS.inc(usage.get("output_tokens", 0), kind="completion")
+
+
+def mirror_cache_counters() -> None:
+    """Copy the caches' and retrieval's own counters into the metrics registry (if built yet)."""
+    if services.built("embeddings"):
+        emb = services.embeddings.stats()
+        for outcome, key in (("memory_hit", "hits"), ("disk_hit", "disk_hits"), ("miss", "misses")):
+            CACHE_LOOKUPS.set_total(emb[key], cache="embedding", outcome=outcome)
+    if services.built("answer_cache"):
+        ans = services.answer_cache.stats()
+        for outcome, key in (("exact_hit", "exact_hits"), ("semantic_hit", "semantic_hits"), ("miss", "misses")):
+            CACHE_LOOKUPS.set_total(ans[key], cache="answer", outcome=outcome)
+    for path, count in services.retrieval_stats.items():
+        RETRIEVAL_PATHS.set_total(count, path=path)
+
+
+metrics.add_collector(mirror_cache_counters)
 
 # ─── Endpoints ────────────────────────────────────────────────────────────────
 @app.get("/health", tags=["health"])  # noqa: D102
+@app.get("/health/live", tags=["health"])  # noqa: D102
 def health_check():  # noqa: D103
     """
-    Health check endpoint.
+    Liveness probe: the process is up and serving (nothing is built or checked).
 
     Returns:
         dict: Status OK indicator.
@@ -126,53 +276,583 @@ def health_check():  # noqa: D103
     return {"status": "ok"}
 
 
+@app.get("/health/ready", tags=["health"])  # noqa: D102
+def readiness_check(response: Response):  # noqa: D103
+    """
+    Readiness probe: warm-up has built the clients and loaded the indexes.
+
+    Returns:
+        dict: ``{"status": "ready", "index_version", "warmup_ms"}``, or with a
+        503 status ``{"status": "starting" | "warming"}`` or
+        ``{"status": "failed", "error"}`` (e.g. a missing OpenAI key).
+    """
+    body = services.readiness()
+    if body["status"] != "ready":
+        response.status_code = 503
+    return body
+
+
 @app.post("/api/chat", response_model=ChatResponse, tags=["chat"])  # noqa: D102
-def chat(req: ChatRequest):  # noqa: D103
+async def chat(req: ChatRequest):  # noqa: D103
     """
     Chat endpoint: fetches relevant context and generates an LLM response.
 
     Steps:
-      1. Vector similarity search by company slug.
-      2. Build context from retrieved documents.
-      3. Render full prompt (system + context + user question).
-      4. Invoke LLM and return answer with sources.
+      0. Numeric lookups the financials store can answer return immediately.
+      1. Acquire a slot from the chat limiter (503 when saturated).
+      2. BM25 keyword search per company slug; if conclusive, skip to 4.
+      3. Embed the question, check the answer cache for a similar one, run
+         the vector searches (one per company, concurrently) and fuse them
+         with the keyword hits (RRF).
+      4. Pack the retrieved documents, minus chunk overlap, into the prompt
+         token budget (split equally between companies) along with a
+         trimmed window of `history`.
+      5. Render full prompt (system + context + history + user question).
+      6. Invoke LLM, cache and return answer with sources.
 
     Args:
         req (ChatRequest): Parsed request payload.
 
     Raises:
-        HTTPException: On vector search or LLM errors.
+        HTTPException: On saturation, vector search or LLM errors.
 
     Returns:
-        ChatResponse: Generated answer and document sources.
+        ChatResponse: Generated answer and document sources (also per company).
     """
+    structured = route_structured(req)
+    if structured is not None:
+        CHAT_REQUESTS.inc(endpoint="chat", route="structured")
+        return structured
+
+    t0 = perf_counter()
     try:
-        docs = vectordb.similarity_search(
-            req.question,
-            k=4,
-            filter={"company_slug": req.company}
+        async with AsyncExitStack() as slot:
+            with stage("queue"):
+                await slot.enter_async_context(services.chat_limiter.slot())
+            resp = await answer_question(req)
+    except SaturatedError as exc:
+        raise saturated_error(req, exc)
+    route = "cached" if resp.cached else "llm"
+    services.query_router.stats.record(route, perf_counter() - t0)
+    CHAT_REQUESTS.inc(endpoint="chat", route=route)
+    return resp
+
+
+def saturated_error(req: ChatRequest, exc: SaturatedError) -> HTTPException:
+    """Log a limiter rejection and build the matching 503 response."""
+    logger.warning("Rejecting chat for %s: %s", req.scope, exc)
+    return HTTPException(
+        status_code=503,
+        detail="Chat service is busy, please retry shortly",
+        headers={"Retry-After": "1"},
+    )
+
+
+async def embed_question(req: ChatRequest) -> List[float]:
+    """
+    Embed the request question (through the embedding cache).
+
+    Raises:
+        HTTPException: If the embedding call fails.
+    """
+    embeddings = services.embeddings
+    try:
+        return await embeddings.aembed_query(req.question)
+    except Exception:
+        logger.exception("Query embedding failed for %s", req.scope)
+        raise HTTPException(status_code=500, detail="Vector search failed")
+
+
+async def retrieve_docs(company: str, query_vec: List[float]) -> List[Document]:
+    """
+    Run the company-filtered vector search for an embedded question.
+
+    Raises:
+        HTTPException: If the vector search fails.
+    """
+    vectordb = services.vectordb
+    try:
+        docs = await vectordb.asimilarity_search_by_vector(
+            query_vec,
+            k=services.settings.retrieval_candidates,
+            filter={"company_slug": company}
         )
     except Exception:
-        logger.exception("Vector search failed for %s", req.company)
+        logger.exception("Vector search failed for %s", company)
         raise HTTPException(status_code=500, detail="Vector search failed")
 
-    logger.info("Vector search returned %d docs for %s", len(docs), req.company)
+    logger.info("Vector search returned %d docs for %s", len(docs), company)
+    return docs
+
+
+async def search_companies(companies: List[str], query_vec: List[float]) -> List[List[Document]]:
+    """Run the per-company vector searches concurrently, results in `companies` order."""
+    return list(await asyncio.gather(*(retrieve_docs(c, query_vec) for c in companies)))
+
+
+def fuse_docs(*rankings: List[Document]) -> List[Document]:
+    """Reciprocal-rank-fuse ranked document lists and keep the top RETRIEVAL_K."""
+    by_id: Dict[str, Document] = {}
+    id_rankings = []
+    for docs in rankings:
+        ids = [doc_id(d) for d in docs]
+        for i, d in zip(ids, docs):
+            by_id.setdefault(i, d)
+        id_rankings.append(ids)
+    return [by_id[i] for i in reciprocal_rank_fusion(id_rankings)[:RETRIEVAL_K]]
+
+
+@dataclass
+class RetrievedContext:
+    """
+    Outcome of retrieval for one question.
+
+    `query_vec` is None on the keyword fast path; `hit` is a cached answer
+    (semantic or exact) for the retrieved docs. `history` is the
+    conversation window sent with the question (empty for a first
+    question); follow-ups are cached by exact key only.
+    """
+
+    query_vec: Optional[List[float]]
+    docs_by_company: Dict[str, List[Document]]
+    key: Optional[str]
+    hit: Optional[CachedAnswer]
+    history: List[Tuple[str, str]]
+
+    @property
+    def doc_ids(self) -> List[str]:
+        return [doc_id(d) for docs in self.docs_by_company.values() for d in docs]
+
+    @property
+    def docs(self) -> List[Document]:
+        return [d for docs in self.docs_by_company.values() for d in docs]
+
+    @property
+    def cache_vector(self) -> Optional[List[float]]:
+        """Vector to store with the answer; None keeps follow-ups out of semantic lookups."""
+        return None if self.history else self.query_vec
+
+
+async def retrieve_context(req: ChatRequest, query_vec: Optional[List[float]] = None) -> RetrievedContext:
+    """
+    Hybrid retrieval with answer-cache lookups, per company for comparisons:
+    the question is embedded once and the company-filtered vector searches
+    run concurrently, so latency stays close to a single-company question.
+    `query_vec` is the question's embedding when the caller already has it.
+
+    Raises:
+        HTTPException: If embedding or vector search fails.
+    """
+    services.refresh_index_version()
+    answer_cache = services.answer_cache
+    retrieval_stats = services.retrieval_stats
+    history = services.context_builder.history_window(req.history, req.question)
+    companies = req.slugs
+    with stage("keyword_search"):
+        hits = {
+            c: services.keyword_index.search(req.question, c, k=services.settings.retrieval_candidates)
+            for c in companies
+        }
+    if services.settings.keyword_fast_path and all(is_conclusive(req.question, hits[c], RETRIEVAL_K) for c in companies):
+        retrieval_stats["keyword_only"] += 1
+        query_vec = None
+        docs_by_company = {c: [h.doc for h in hits[c][:RETRIEVAL_K]] for c in companies}
+        logger.info("Keyword fast path for %s (%d docs)", req.scope, sum(map(len, docs_by_company.values())))
+    else:
+        retrieval_stats["embedded"] += 1
+        if query_vec is None:
+            with stage("embed"):
+                query_vec = await embed_question(req)
+        with stage("vector_search"):
+            vector_docs = await search_companies(companies, query_vec)
+        docs_by_company = {
+            c: fuse_docs(v, [h.doc for h in hits[c]]) for c, v in zip(companies, vector_docs)
+        }
+    ctx = RetrievedContext(query_vec, docs_by_company, None, None, history)
+    ctx.key = answer_cache.key(req.scope, req.question, ctx.doc_ids, render_history(history))
+    with stage("cache_lookup"):
+        ctx.hit = answer_cache.get(ctx.key)
+        if ctx.hit is None and ctx.cache_vector is not None:
+            ctx.hit = answer_cache.lookup_similar(req.scope, ctx.cache_vector, req.question, ctx.doc_ids)
+    return ctx
+
+
+def build_prompt(req: ChatRequest, ctx: RetrievedContext) -> BuiltPrompt:
+    """
+    Render the full prompt (system + context + history + user question)
+    within the PROMPT_MAX_TOKENS budget, shared equally between compared
+    companies, and count the tokens it saved.
+    """
+    built = services.context_builder.build(services.system_prompt, req.question, ctx.docs_by_company, ctx.history)
+    PROMPT_TOKENS.inc(built.tokens, kind="sent")
+    PROMPT_TOKENS.inc(built.saved_tokens, kind="saved")
+    logger.info(
+        "Prompt for %s: %d tokens (%d saved; %d/%d docs, %d overlap chars dropped, %d history turns)",
+        req.scope, built.tokens, built.saved_tokens, built.dropped_docs, len(ctx.docs),
+        built.overlap_chars, len(built.history),
+    )
+    return built
+
+
+def doc_sources(docs: List[Document]) -> List[str]:
+    """Return the source identifiers of the retrieved documents."""
+    return [d.metadata.get("source_txt", "unknown") for d in docs]
 
-    context = "\n---\n".join(d.page_content for d in docs) or "No relevant context."
 
-    full_prompt = "\n\n".join([
-        SYSTEM_PROMPT,
-        "Context:\n" + context,
-        f"User: {req.question}"
-    ])
+def grouped_sources(prompt: BuiltPrompt) -> Dict[str, List[str]]:
+    """Sources of the documents in the prompt, per company slug."""
+    return {company: doc_sources(docs) for company, docs in prompt.docs_by_group.items()}
+
+
+def cached_response(hit: CachedAnswer) -> ChatResponse:
+    return ChatResponse(
+        answer=hit.answer, sources=hit.sources, cached=True, sources_by_company=hit.sources_by_company,
+    )
+
+
+async def answer_question(req: ChatRequest) -> ChatResponse:
+    """
+    Run retrieval and generation for one request without blocking the loop.
+
+    Retrieval fuses keyword and vector results (or uses keyword hits alone
+    when they are conclusive). A cached answer for the retrieved docs, to
+    the same question or a close paraphrase about the same period,
+    short-circuits the LLM call.
+
+    Args:
+        req (ChatRequest): Parsed request payload.
+
+    Raises:
+        HTTPException: On vector search or LLM errors.
+
+    Returns:
+        ChatResponse: Generated answer and document sources.
+    """
+    ctx = await retrieve_context(req)
+    if ctx.hit is not None:
+        logger.info("Answer cache hit for %s", req.scope)
+        return cached_response(ctx.hit)
+    return await generate_answer(req, ctx)
+
+
+async def generate_answer(req: ChatRequest, ctx: RetrievedContext) -> ChatResponse:
+    """
+    Prompt the LLM with the retrieved context and cache its answer.
+
+    Raises:
+        HTTPException: If the LLM call fails.
+    """
+    answer_cache = services.answer_cache
+    answer_cache.record_miss()
+    with stage("prompt"):
+        prompt = build_prompt(req, ctx)
+    llm = services.llm
     try:
-        resp = llm([HumanMessage(content=full_prompt)])
+        with stage("llm"):
+            resp = await llm.ainvoke([HumanMessage(content=prompt.text)])
     except Exception:
         logger.exception("LLM generation failed")
         raise HTTPException(status_code=500, detail="LLM generation failed")
+    record_llm_usage(prompt.text, resp.content, getattr(resp, "usage_metadata", None))
+
+    sources, by_company = doc_sources(prompt.docs), grouped_sources(prompt)
+    answer_cache.put(
+        ctx.key, req.scope, req.question, ctx.cache_vector, resp.content, sources, by_company, ctx.doc_ids,
+    )
+    return ChatResponse(answer=resp.content, sources=sources, sources_by_company=by_company)
+
+
+def sse_event(event: str, data: Dict[str, Any]) -> str:
+    """Format one Server-Sent Event frame with a JSON payload."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+@app.post("/api/chat/stream", tags=["chat"])  # noqa: D102
+async def chat_stream(req: ChatRequest):  # noqa: D103
+    """
+    Streaming chat endpoint (Server-Sent Events).
+
+    Event sequence:
+      * ``sources`` – sent as soon as retrieval finishes:
+                      {"sources": [...], "by_company": {slug: [...]}}
+      * ``token``   – one per LLM chunk as it arrives:   {"token": "..."}
+      * ``done``    – timings for the request: {"ttfb_ms", "ttft_ms", "total_ms", "cached"}
+      * ``error``   – sent instead of further tokens if generation fails
+
+    Cached and structured answers are sent as a single ``token`` event;
+    the latter add ``"structured": true`` to ``done``.
+    Time-to-first-byte is measured up to the ``sources`` event and
+    time-to-first-token up to the first non-empty LLM chunk; both are
+    logged per request and returned in the ``done`` event.
+
+    Args:
+        req (ChatRequest): Parsed request payload.
+
+    Raises:
+        HTTPException: On saturation or vector search errors (before streaming starts).
+
+    Returns:
+        StreamingResponse: ``text/event-stream`` body.
+    """
+    t0 = perf_counter()
+    structured = route_structured(req)
+    if structured is not None:
+        CHAT_REQUESTS.inc(endpoint="stream", route="structured")
+        return StreamingResponse(
+            single_answer_events(structured, t0),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
+
+    slot = AsyncExitStack()
+    try:
+        with stage("queue"):
+            await slot.enter_async_context(services.chat_limiter.slot())
+    except SaturatedError as exc:
+        raise saturated_error(req, exc)
 
-    sources = [d.metadata.get("source_txt", "unknown") for d in docs]
-    return ChatResponse(answer=resp.content, sources=sources)
+    answer_cache = services.answer_cache
+    try:
+        ctx = await retrieve_context(req)
+        llm = services.llm if ctx.hit is None else None
+        if ctx.hit is None:
+            answer_cache.record_miss()
+            with stage("prompt"):
+                prompt = build_prompt(req, ctx)
+    except BaseException:
+        await slot.aclose()
+        raise
+    hit = ctx.hit
+
+    async def cached_events() -> AsyncIterator[str]:
+        try:
+            async for event in single_answer_events(cached_response(hit), t0):
+                yield event
+            services.query_router.stats.record("cached", perf_counter() - t0)
+            CHAT_REQUESTS.inc(endpoint="stream", route="cached")
+            logger.info("Streamed cached answer for %s", req.scope)
+        finally:
+            await slot.aclose()
+
+    async def events() -> AsyncIterator[str]:
+        ttft = None
+        usage = None
+        parts: List[str] = []
+        try:
+            sources, by_company = doc_sources(prompt.docs), grouped_sources(prompt)
+            yield sse_event("sources", {"sources": sources, "by_company": by_company})
+            ttfb = perf_counter() - t0
+            t_llm = perf_counter()
+            try:
+                async for chunk in llm.astream([HumanMessage(content=prompt.text)]):
+                    usage = getattr(chunk, "usage_metadata", None) or usage
+                    token = getattr(chunk, "content", str(chunk))
+                    if not token:
+                        continue
+                    if ttft is None:
+                        ttft = perf_counter() - t0
+                        CHAT_STAGE_SECONDS.observe(perf_counter() - t_llm, stage="llm_first_token")
+                    parts.append(token)
+                    yield sse_event("token", {"token": token})
+            except Exception:
+                CHAT_ERRORS.inc(stage="llm")
+                logger.exception("LLM streaming failed")
+                yield sse_event("error", {"detail": "LLM generation failed"})
+                return
+            finally:
+                CHAT_STAGE_SECONDS.observe(perf_counter() - t_llm, stage="llm")
+
+            record_llm_usage(prompt.text, "".join(parts), usage)
+            CHAT_REQUESTS.inc(endpoint="stream", route="llm")
+            answer_cache.put(
+                ctx.key, req.scope, req.question, ctx.cache_vector, "".join(parts), sources, by_company,
+                ctx.doc_ids,
+            )
+            total = perf_counter() - t0
+            services.query_router.stats.record("llm", total)
+            timings = {
+                "ttfb_ms": round(ttfb * 1000, 1),
+                "ttft_ms": round(ttft * 1000, 1) if ttft is not None else None,
+                "total_ms": round(total * 1000, 1),
+                "cached": False,
+            }
+            logger.info(
+                "Streamed chat for %s: ttfb=%.0fms ttft=%sms total=%.0fms",
+                req.scope, timings["ttfb_ms"], timings["ttft_ms"], timings["total_ms"],
+            )
+            yield sse_event("done", timings)
+        finally:
+            await slot.aclose()
+
+    return StreamingResponse(
+        cached_events() if hit is not None else events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+async def single_answer_events(resp: ChatResponse, t0: float) -> AsyncIterator[str]:
+    """SSE frames for an answer that is already complete (cached or structured)."""
+    yield sse_event("sources", {"sources": resp.sources, "by_company": resp.sources_by_company})
+    ttfb = round((perf_counter() - t0) * 1000, 1)
+    yield sse_event("token", {"token": resp.answer})
+    done = {"ttfb_ms": ttfb, "ttft_ms": ttfb, "total_ms": ttfb, "cached": resp.cached}
+    if resp.structured:
+        done["structured"] = True
+    yield sse_event("done", done)
+
+
+@app.post("/api/chat/batch", tags=["chat"])  # noqa: D102
+async def chat_batch(req: BatchChatRequest):  # noqa: D103
+    """
+    Batch chat endpoint for offline question sets (every question × every company).
+
+    The distinct questions are embedded in one batched call up front. Each
+    (company, question) item then goes through the chat pipeline on its own:
+    the filtered searches run in parallel, and LLM calls are capped at
+    CHAT_BATCH_CONCURRENCY so a batch cannot crowd out interactive chat.
+    Items listed in `skip` are left out, so an interrupted run can be
+    resumed (backend/scripts/chat_batch.py does this from its output file).
+
+    The response streams JSON lines (``application/x-ndjson``) in completion order:
+      * one per item: {"id", "company", "question", "answer", "sources",
+        "sources_by_company", "cached", "structured", "error", "done", "total"}
+        – ``error`` is null on success; ``done``/``total`` report progress
+      * a final {"summary": {"total", "answered", "failed", "skipped", "seconds"}}
+
+    Args:
+        req (BatchChatRequest): Parsed request payload.
+
+    Raises:
+        HTTPException: 422 if the batch is larger than CHAT_BATCH_MAX_ITEMS,
+            500 if embedding the questions fails (before streaming starts).
+
+    Returns:
+        StreamingResponse: One JSON object per line.
+    """
+    t0 = perf_counter()
+    skip = set(req.skip)
+    companies = list(dict.fromkeys(req.companies))
+    items = [
+        (company, i, question)
+        for company in companies
+        for i, question in enumerate(req.questions)
+        if batch_item_id(company, i) not in skip
+    ]
+    limit = services.settings.batch_max_items
+    if len(items) > limit:
+        raise HTTPException(status_code=422, detail=f"Batch has {len(items)} items; the limit is {limit}")
+    skipped = len(companies) * len(req.questions) - len(items)
+
+    unique = list(dict.fromkeys(q for _, _, q in items))
+    embeddings = services.embeddings
+    services.llm  # fail with 503 now, not once per item, when chat is not configured
+    try:
+        with stage("embed"):
+            vectors = dict(zip(unique, await embeddings.aembed_documents(unique))) if unique else {}
+    except Exception:
+        logger.exception("Batch embedding of %d questions failed", len(unique))
+        raise HTTPException(status_code=500, detail="Question embedding failed")
+    logger.info("Batch of %d items (%d questions embedded, %d skipped)", len(items), len(unique), skipped)
+
+    search_slots = asyncio.Semaphore(services.settings.chat_max_concurrency)
+    llm_slots = asyncio.Semaphore(services.settings.batch_concurrency)
+
+    async def answer_item(company: str, index: int, question: str) -> Dict[str, Any]:
+        item: Dict[str, Any] = {"id": batch_item_id(company, index), "company": company, "question": question}
+        chat_req = ChatRequest(company_slug=company, question=question)
+        try:
+            resp = route_structured(chat_req)
+            if resp is None:
+                async with search_slots:
+                    ctx = await retrieve_context(chat_req, vectors[question])
+                if ctx.hit is not None:
+                    resp = cached_response(ctx.hit)
+                else:
+                    async with llm_slots:
+                        resp = await generate_answer(chat_req, ctx)
+        except Exception as exc:
+            if not isinstance(exc, HTTPException):
+                logger.exception("Batch item %s failed", item["id"])
+            return {**item, "answer": None, "error": getattr(exc, "detail", "Internal error")}
+        route = "structured" if resp.structured else "cached" if resp.cached else "llm"
+        CHAT_REQUESTS.inc(endpoint="batch", route=route)
+        return {**item, **resp.model_dump(), "error": None}
+
+    async def lines() -> AsyncIterator[str]:
+        tasks = [asyncio.ensure_future(answer_item(*item)) for item in items]
+        failed = 0
+        every = max(1, len(tasks) // 10)
+        try:
+            for done, next_result in enumerate(asyncio.as_completed(tasks), 1):
+                result = await next_result
+                failed += result["error"] is not None
+                yield json.dumps({**result, "done": done, "total": len(tasks)}) + "\n"
+                if done % every == 0 or done == len(tasks):
+                    logger.info("Batch progress: %d/%d (%d failed)", done, len(tasks), failed)
+        finally:
+            for task in tasks:
+                task.cancel()
+        summary = {
+            "total": len(tasks), "answered": len(tasks) - failed, "failed": failed,
+            "skipped": skipped, "seconds": round(perf_counter() - t0, 3),
+        }
+        yield json.dumps({"summary": summary}) + "\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """Whether an If-None-Match header (``*`` or a list of tags, weak or not) matches `etag`."""
+    tags = [t.strip() for t in if_none_match.split(",")]
+    return "*" in tags or etag in (t[2:] if t.startswith("W/") else t for t in tags)
+
+
+@app.get("/api/financials", tags=["financials"])  # noqa: D102
+def financials(  # noqa: D103
+    request: Request,
+    company: List[str] = Query(default=[]),
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    fields: Optional[str] = None,
+):
+    """
+    Quarterly P&L records from the columnar store.
+
+    Args:
+        company: Company slug(s); repeat the parameter for several. All when omitted.
+        start: Inclusive lower bound on period_end_date (YYYY-MM-DD).
+        end: Inclusive upper bound on period_end_date (YYYY-MM-DD).
+        fields: Comma-separated fields to return; period_end_date is always included.
+
+    Raises:
+        HTTPException: 404 for an unknown company, 400 for an unknown field.
+
+    Returns:
+        Response: ``{"version", "data": {slug: [record, ...]}}`` with an ETag
+        (304 on a matching If-None-Match), gzip-encoded when accepted.
+    """
+    services.refresh_financials()
+    financial_store = services.financial_store
+    wanted = [f.strip() for f in fields.split(",") if f.strip()] if fields else None
+    query = json.dumps([sorted(set(company)), str(start), str(end), wanted])
+    etag = f'"{financial_store.version}-{hashlib.sha1(query.encode()).hexdigest()[:12]}"'
+    headers = {"ETag": etag, "Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+    if etag_matches(request.headers.get("if-none-match", ""), etag):
+        return Response(status_code=304, headers=headers)
+
+    try:
+        data = financial_store.query(company or None, start, end, wanted)
+    except KeyError as exc:
+        raise HTTPException(status_code=404, detail=exc.args[0])
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+    body = json.dumps({"version": financial_store.version, "data": data}).encode("utf-8")
+    if len(body) >= GZIP_MIN_BYTES and "gzip" in request.headers.get("accept-encoding", ""):
+        body = gzip.compress(body, compresslevel=6)
+        headers["Content-Encoding"] = "gzip"
+    return Response(content=body, media_type="application/json", headers=headers)
 
 
 @app.get("/api/slugs", tags=["metadata"])  # noqa: D102
@@ -180,9 +860,61 @@ def list_slugs():  # noqa: D103
     """
     List all available company slugs in the index.
 
+    Served from the index catalog, reloaded when the index version changes.
+
     Returns:
         dict: Sorted list of unique company slugs.
     """
-    data = vectordb._collection.get(include=["metadatas"], limit=1000)
-    slugs = sorted({m["company_slug"] for m in data["metadatas"]})
-    return {"company_slugs": slugs}
+    services.refresh_index_version()
+    return {"company_slugs": services.index_catalog.slugs()}
+
+
+@app.get("/api/catalog", tags=["metadata"])  # noqa: D102
+def catalog():  # noqa: D103
+    """
+    Summary of the indexed reports.
+
+    Returns:
+        dict: Index version plus, per company slug, its name, chunk and
+        report counts and the indexed period end dates.
+    """
+    services.refresh_index_version()
+    index_catalog = services.index_catalog
+    return {
+        "index_version": index_catalog.index_version,
+        "chunks": index_catalog.chunks,
+        "companies": index_catalog.companies,
+    }
+
+
+@app.get("/api/stats", tags=["metadata"])  # noqa: D102
+def service_stats():  # noqa: D103
+    """
+    Runtime counters for the chat pipeline.
+
+    Returns:
+        dict: Chat limiter occupancy, embedding/answer cache counters,
+        how many questions took the keyword-only retrieval path, and the
+        share and latency of structured vs. LLM-answered chats, and the
+        circuit-breaker state and retry count per upstream.
+    """
+    return {
+        "chat_limiter": services.chat_limiter.stats(),
+        "embedding_cache": services.embeddings.stats(),
+        "answer_cache": services.answer_cache.stats(),
+        "retrieval": {**services.retrieval_stats, "keyword_index_chunks": len(services.keyword_index)},
+        "routing": services.query_router.stats.stats(),
+        "upstream": upstream_stats(),
+    }
+
+
+@app.get("/metrics", tags=["metadata"], response_class=PlainTextResponse)  # noqa: D102
+def prometheus_metrics():  # noqa: D103
+    """
+    Prometheus scrape endpoint.
+
+    Returns:
+        PlainTextResponse: Metrics in the text exposition format, summed over
+        all workers when METRICS_MULTIPROC_DIR is set.
+    """
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
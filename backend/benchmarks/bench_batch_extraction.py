@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+Benchmark batched vs per-PDF extraction prompts against a local stub LLM.
+
+Builds synthetic quarterly P&L snippets and extracts them with:
+
+  * per-pdf – one financial_extraction.j2 request per snippet
+              (ask_llm_with_retries, as run_pipelined sends them)
+  * batched – several snippets per financial_extraction_batch.j2 request,
+              packed to a token budget (pack_batches + extract_batch), with
+              invalid records re-asked one by one
+
+The stub answers from the snippet text, so every record can be checked. Its
+latency is a fixed cost per request plus a cost per prompt and per completion
+token, and in a batch it garbles every `--bad-every`th record (a string
+revenue) so the re-ask path is exercised. Reports LLM calls, prompt and
+completion tokens and wall-clock time, scaled to 100 PDFs.
+
+Usage:
+    python -m backend.benchmarks.bench_batch_extraction --pdfs 100 --batch-tokens 4000
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+from langchain.schema import AIMessage
+
+from backend.src import extract_interim_financials as extract
+from backend.src.context_builder import TokenCounter
+
+LINE_ITEMS = {
+    "revenue": "Revenue",
+    "cogs": "Cost of sales",
+    "gross_profit": "Gross profit",
+    "operating_expenses": "Distribution and administrative expenses",
+    "operating_income": "Profit from operations",
+    "net_income": "Profit for the period",
+}
+STATEMENT_RE = re.compile(r"### Statement (\S+)\nheader: .*?\n(.*?)(?=\n### Statement |\n\nwith schema)", re.DOTALL)
+
+
+# ─── Synthetic reports ───────────────────────────────────────────────────────
+def make_snippet(i: int) -> Tuple[str, str]:
+    """A (snippet, header) shaped like extract_qtr_snippet's output for report `i`."""
+    year, month = 2015 + i // 4, (3, 6, 9, 12)[i % 4]
+    header = f"03 months to {30 if month in (6, 9) else 31}/{month:02d}/{year}"
+    revenue = 9_000_000 + 37_013 * i
+    values = {
+        "revenue": revenue,
+        "cogs": -int(revenue * 0.78),
+        "gross_profit": revenue - int(revenue * 0.78),
+        "operating_expenses": -int(revenue * 0.11),
+        "operating_income": revenue - int(revenue * 0.89),
+        "net_income": int(revenue * 0.08),
+    }
+    lines = [f"{header} {header.replace('03 months', '12 months')} Change %", f"Company SYNTH{i % 7} PLC"]
+    for key, label in LINE_ITEMS.items():
+        v = values[key]
+        lines.append(f"{label} {'(' if v < 0 else ''}{abs(v):,}{')' if v < 0 else ''} {abs(v) * 3:,} 4.2")
+    lines += [f"Other line item {n} {n * 1_234:,} {n * 4_321:,} 1.{n}" for n in range(1, 15)]
+    return "\n".join(lines), header
+
+
+def expected_record(snippet: str, header: str) -> Dict[str, Any]:
+    """What a perfect extraction returns for a snippet."""
+    day, month, year = header.split()[-1].split("/")
+    rec: Dict[str, Any] = {
+        "company": re.search(r"Company (\S+ PLC)", snippet).group(1),
+        "symbol": None,
+        "fiscal_year": f"{year}/{int(year[2:]) + 1:02d}",
+        "quarter": f"Q{(int(month) - 1) // 3 + 1}",
+        "period_end_date": f"{year}-{month}-{day}",
+        "currency": "LKR",
+        "unit_multiplier": 1000,
+    }
+    for key, label in LINE_ITEMS.items():
+        m = re.search(rf"^{label} (\(?)([\d,]+)", snippet, re.MULTILINE)
+        rec[key] = (-1 if m.group(1) else 1) * int(m.group(2).replace(",", ""))
+    return rec
+
+
+# ─── Stub LLM ────────────────────────────────────────────────────────────────
+class StubExtractionLLM:
+    """Deterministic chat model that extracts records from either prompt and sleeps like an API."""
+
+    def __init__(self, base: float, per_prompt_token: float, per_completion_token: float, bad_every: int) -> None:
+        self.base = base
+        self.per_prompt_token = per_prompt_token
+        self.per_completion_token = per_completion_token
+        self.bad_every = bad_every
+        self.counter = TokenCounter()
+        self.calls = self.prompt_tokens = self.completion_tokens = 0
+        self._lock = threading.Lock()
+
+    def invoke(self, messages: List[Any], **_: Any) -> AIMessage:
+        prompt = messages[0].content
+        statements = STATEMENT_RE.findall(prompt)
+        if statements:
+            records = []
+            for sid, body in statements:
+                snippet = body.strip()
+                rec = {"id": sid, **expected_record(snippet, snippet.split(" 12 months")[0])}
+                if self.bad_every and sum(map(ord, snippet)) % self.bad_every == 0:
+                    rec["revenue"] = "n/a"
+                records.append(rec)
+            reply = json.dumps(records, indent=2)
+        else:
+            snippet = prompt.split("Given:\n", 1)[1].split("\n\nand header:\n", 1)[0]
+            header = prompt.split("\n\nand header:\n", 1)[1].split("\n", 1)[0]
+            reply = json.dumps(expected_record(snippet, header), indent=2)
+
+        prompt_tokens, completion_tokens = self.counter.count(prompt), self.counter.count(reply)
+        with self._lock:
+            self.calls += 1
+            self.prompt_tokens += prompt_tokens
+            self.completion_tokens += completion_tokens
+        time.sleep(self.base + prompt_tokens * self.per_prompt_token + completion_tokens * self.per_completion_token)
+        return AIMessage(content=reply)
+
+
+# ─── Modes ───────────────────────────────────────────────────────────────────
+def run_per_pdf(statements: List[extract.Statement], llm: StubExtractionLLM, concurrency: int) -> Dict[Path, Any]:
+    tmpl = extract.read_prompt()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        futures = {
+            p: pool.submit(extract.ask_llm_with_retries, tmpl, h, s, extract.EXAMPLE_SCHEMA, llm, p.name)
+            for p, h, s in statements
+        }
+        return {p: f.result() for p, f in futures.items()}
+
+
+def run_batched(
+    statements: List[extract.Statement],
+    llm: StubExtractionLLM,
+    concurrency: int,
+    batch_tokens: int,
+    batch_size: int,
+) -> Dict[Path, Any]:
+    tmpl, batch_tmpl = extract.read_prompt(), extract.read_batch_prompt()
+    batches = extract.pack_batches(statements, batch_tokens, batch_size)
+    out: Dict[Path, Any] = {}
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for result in pool.map(
+            lambda b: extract.extract_batch(b, batch_tmpl, tmpl, extract.EXAMPLE_SCHEMA, llm), batches
+        ):
+            out.update(result)
+    return out
+
+
+# ─── Main ────────────────────────────────────────────────────────────────────
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--pdfs", type=int, default=100)
+    parser.add_argument("--batch-tokens", type=int, default=4000)
+    parser.add_argument("--batch-size", type=int, default=extract.BATCH_SIZE)
+    parser.add_argument("--llm-concurrency", type=int, default=4)
+    parser.add_argument("--base-latency", type=float, default=0.25, help="seconds per request")
+    parser.add_argument("--prompt-token-ms", type=float, default=0.02, help="ms per prompt token")
+    parser.add_argument("--completion-token-ms", type=float, default=2.0, help="ms per completion token")
+    parser.add_argument("--bad-every", type=int, default=10, help="garble ~1 in N batched records (0 = never)")
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    statements = []
+    for i in range(args.pdfs):
+        snippet, header = make_snippet(i)
+        statements.append((Path(f"synth_{i:04d}.pdf"), header, snippet))
+    expected = {p: expected_record(s, h) for p, h, s in statements}
+
+    scale = 100 / args.pdfs
+    print(f"{'mode':<9}{'calls':>7}{'re-asks':>9}{'prompt tok':>12}{'compl tok':>11}{'wall s':>8}{'correct':>9}"
+          "   (per 100 PDFs)")
+    for name in ("per-pdf", "batched"):
+        llm = StubExtractionLLM(args.base_latency, args.prompt_token_ms / 1000,
+                                args.completion_token_ms / 1000, args.bad_every)
+        t0 = time.perf_counter()
+        if name == "per-pdf":
+            records = run_per_pdf(statements, llm, args.llm_concurrency)
+            reasks = 0
+        else:
+            records = run_batched(statements, llm, args.llm_concurrency, args.batch_tokens, args.batch_size)
+            reasks = llm.calls - len(extract.pack_batches(statements, args.batch_tokens, args.batch_size))
+        wall = time.perf_counter() - t0
+        correct = sum(records.get(p) == rec for p, rec in expected.items())
+        print(
+            f"{name:<9}{llm.calls * scale:>7.0f}{reasks * scale:>9.0f}{llm.prompt_tokens * scale:>12.0f}"
+            f"{llm.completion_tokens * scale:>11.0f}{wall * scale:>8.2f}{correct:>5}/{len(expected)}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Wall-clock benchmark for an analyst pack: N questions × M companies.
+
+The Chroma store, embeddings and ChatOpenAI client are replaced with stubs
+that sleep for fixed latencies (the embedder per call, whatever its size),
+and each mode asks its own questions so the answer cache never hits. Compared:
+
+  * serial  – one POST /api/chat per item, one after another (the nightly
+              job before the batch endpoint)
+  * batch   – one POST /api/chat/batch: one embedding call, parallel
+              searches, LLM calls capped at --concurrency
+
+Usage:
+    python -m backend.benchmarks.bench_chat_batch --companies 10 --questions 20
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import time
+from typing import List
+
+import httpx
+
+os.environ.setdefault("OPENAI_EMBEDDING_KEY", "bench-stub-key")
+os.environ.setdefault("STRUCTURED_ROUTING", "0")
+os.environ.setdefault("KEYWORD_FAST_PATH", "0")
+
+from backend import app as chat_app  # noqa: E402
+from backend.benchmarks.bench_chat_load import StubLLM  # noqa: E402
+from backend.benchmarks.bench_multi_company import SLUGS, StubCompanyStore  # noqa: E402
+from backend.src.services import Settings  # noqa: E402
+
+
+class StubBatchEmbedder:
+    """Embedding API stub: every call takes `latency`, however many texts it carries."""
+
+    def __init__(self, latency: float) -> None:
+        self.latency = latency
+        self.calls = 0
+
+    async def _embed(self, texts: List[str]) -> List[List[float]]:
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+        return [self._direction(t) for t in texts]
+
+    @staticmethod
+    def _direction(text: str) -> List[float]:
+        """A random direction per text, so no two questions look alike to the semantic cache."""
+        rng = random.Random(text)
+        return [rng.gauss(0, 1) for _ in range(256)]
+
+    async def aembed_query(self, text: str) -> List[float]:
+        return (await self._embed([text]))[0]
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        return await self._embed(texts)
+
+
+async def run_serial(companies: List[str], questions: List[str]) -> int:
+    transport = httpx.ASGITransport(app=chat_app.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=600) as client:
+        for company in companies:
+            for question in questions:
+                resp = await client.post("/api/chat", json={"company_slug": company, "question": question})
+                resp.raise_for_status()
+    return len(companies) * len(questions)
+
+
+async def run_batch(companies: List[str], questions: List[str]) -> int:
+    transport = httpx.ASGITransport(app=chat_app.app)
+    answered = 0
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=600) as client:
+        payload = {"company_slugs": companies, "questions": questions}
+        async with client.stream("POST", "/api/chat/batch", json=payload) as resp:
+            async for line in resp.aiter_lines():
+                if line and "summary" not in json.loads(line):
+                    answered += 1
+    return answered
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--companies", type=int, default=10)
+    parser.add_argument("--questions", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=Settings.batch_concurrency)
+    parser.add_argument("--embed-latency", type=float, default=0.1)
+    parser.add_argument("--search-latency", type=float, default=0.05)
+    parser.add_argument("--llm-latency", type=float, default=0.25)
+    args = parser.parse_args()
+    logging.disable(logging.CRITICAL)  # the stub store has no collection for the catalog scan
+
+    companies = SLUGS[:args.companies]
+    services = chat_app.services
+    services.settings = Settings(**{**vars(services.settings), "batch_concurrency": args.concurrency})
+    services.vectordb = StubCompanyStore(args.search_latency)
+    services.llm = StubLLM(args.llm_latency)
+
+    print(f"{len(companies)} companies × {args.questions} questions, LLM concurrency {args.concurrency}\n")
+    print(f"{'mode':<8}{'items':>7}{'embed calls':>13}{'wall s':>9}{'items/s':>9}")
+    for mode, run in (("serial", run_serial), ("batch", run_batch)):
+        services.embeddings = StubBatchEmbedder(args.embed_latency)
+        questions = [f"How did revenue develop in period {i} ({mode})?" for i in range(args.questions)]
+        t0 = time.perf_counter()
+        items = asyncio.run(run(companies, questions))
+        wall = time.perf_counter() - t0
+        print(f"{mode:<8}{items:>7}{services.embeddings.calls:>13}{wall:>9.2f}{items / wall:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
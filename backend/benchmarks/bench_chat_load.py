@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Load benchmark for /api/chat against a local stub retriever + LLM.
+
+The real Chroma store and ChatOpenAI client are swapped for stubs that
+sleep for a fixed latency, and every request asks a distinct question so
+the answer cache never short-circuits. The numbers reflect only the
+serving path:
+
+  * async   – the current `backend.app` endpoint (async retrieval + LLM,
+              admission-controlled by the chat limiter)
+  * legacy  – the previous sync endpoint shape, i.e. blocking calls that
+              run in FastAPI's threadpool
+
+Usage:
+    python -m backend.benchmarks.bench_chat_load --clients 10 100 500
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import os
+import statistics
+import time
+from typing import Any, Dict, List
+
+import httpx
+from fastapi import FastAPI
+from langchain.docstore.document import Document
+
+os.environ.setdefault("OPENAI_EMBEDDING_KEY", "bench-stub-key")
+# the questions are numeric lookups the structured router would answer without the LLM
+os.environ.setdefault("STRUCTURED_ROUTING", "0")
+
+from backend import app as chat_app  # noqa: E402
+from backend.src.concurrency import ConcurrencyLimiter  # noqa: E402
+
+
+# ─── Stubs ────────────────────────────────────────────────────────────────────
+class StubMessage:
+    """Minimal stand-in for an AIMessage."""
+
+    def __init__(self, content: str) -> None:
+        self.content = content
+
+
+class StubVectorStore:
+    """Vector store whose searches take a fixed amount of time."""
+
+    def __init__(self, latency: float) -> None:
+        self.latency = latency
+        self.docs = [
+            Document(page_content=f"chunk {i}", metadata={"source_txt": f"stub_{i}.txt"})
+            for i in range(4)
+        ]
+
+    def similarity_search(self, query: str, k: int = 4, **_: Any) -> List[Document]:
+        time.sleep(self.latency)
+        return self.docs[:k]
+
+    async def asimilarity_search_by_vector(
+        self, embedding: List[float], k: int = 4, **_: Any
+    ) -> List[Document]:
+        await asyncio.sleep(self.latency)
+        return self.docs[:k]
+
+
+class StubEmbedder:
+    """Returns a distinct unit vector per question so the answer cache never hits."""
+
+    def __init__(self) -> None:
+        self.calls = 0
+
+    async def aembed_query(self, text: str) -> List[float]:
+        self.calls += 1
+        vec = [0.0] * 64
+        vec[hash(text) % 64] = 1.0
+        vec[(self.calls * 7) % 64] += 1.0
+        return vec
+
+
+class StubLLM:
+    """Chat model whose completions take a fixed amount of time."""
+
+    def __init__(self, latency: float) -> None:
+        self.latency = latency
+
+    def __call__(self, messages: List[Any]) -> StubMessage:
+        time.sleep(self.latency)
+        return StubMessage("stub answer")
+
+    async def ainvoke(self, messages: List[Any], **_: Any) -> StubMessage:
+        await asyncio.sleep(self.latency)
+        return StubMessage("stub answer")
+
+
+def legacy_app(store: StubVectorStore, llm: StubLLM) -> FastAPI:
+    """Recreate the old sync endpoint shape on top of the same stubs."""
+    legacy = FastAPI()
+
+    @legacy.post("/api/chat")
+    def chat(req: chat_app.ChatRequest):
+        docs = store.similarity_search(req.question, k=4)
+        resp = llm([req.question])
+        return {"answer": resp.content, "sources": [d.metadata["source_txt"] for d in docs]}
+
+    return legacy
+
+
+# ─── Load generator ───────────────────────────────────────────────────────────
+async def run_load(app: FastAPI, clients: int, requests_per_client: int) -> Dict[str, Any]:
+    """Fire `clients` concurrent callers and collect latency statistics."""
+    latencies: List[float] = []
+    statuses: Dict[int, int] = {}
+    counter = iter(range(10**9))
+
+    transport = httpx.ASGITransport(app=app)
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=None)
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://bench", timeout=120, limits=limits
+    ) as client:
+
+        async def worker() -> None:
+            for _ in range(requests_per_client):
+                payload = {
+                    "company_slug": "dipped-products",
+                    "question": f"What was revenue last quarter? #{next(counter)}",
+                }
+                t0 = time.perf_counter()
+                resp = await client.post("/api/chat", json=payload)
+                elapsed = time.perf_counter() - t0
+                statuses[resp.status_code] = statuses.get(resp.status_code, 0) + 1
+                if resp.status_code == 200:
+                    latencies.append(elapsed)
+
+        t0 = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(clients)))
+        wall = time.perf_counter() - t0
+
+    ok = statuses.get(200, 0)
+    return {
+        "clients": clients,
+        "ok": ok,
+        "rejected": sum(v for k, v in statuses.items() if k != 200),
+        "p50_ms": statistics.median(latencies) * 1000 if latencies else float("nan"),
+        "p99_ms": _percentile(latencies, 99) * 1000 if latencies else float("nan"),
+        "rps": ok / wall if wall else 0.0,
+    }
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    idx = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[idx]
+
+
+# ─── Main ────────────────────────────────────────────────────────────────────
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--clients", type=int, nargs="+", default=[10, 100, 500])
+    parser.add_argument("--requests-per-client", type=int, default=3)
+    parser.add_argument("--search-latency", type=float, default=0.02)
+    parser.add_argument("--llm-latency", type=float, default=0.25)
+    parser.add_argument("--max-concurrency", type=int, default=chat_app.services.settings.chat_max_concurrency)
+    parser.add_argument("--max-queue", type=int, default=chat_app.services.settings.chat_max_queue)
+    parser.add_argument("--queue-timeout", type=float, default=chat_app.services.settings.chat_queue_timeout)
+    parser.add_argument("--skip-legacy", action="store_true")
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    store = StubVectorStore(args.search_latency)
+    llm = StubLLM(args.llm_latency)
+    chat_app.services.vectordb = store
+    chat_app.services.llm = llm
+    chat_app.services.embeddings = StubEmbedder()
+
+    modes = [("async", chat_app.app)]
+    if not args.skip_legacy:
+        modes.append(("legacy", legacy_app(store, llm)))
+
+    print(f"{'mode':<8}{'clients':>8}{'ok':>7}{'503':>7}{'p50 ms':>10}{'p99 ms':>10}{'req/s':>9}")
+    for name, app in modes:
+        for clients in args.clients:
+            # fresh limiter per run so counters and queue state don't leak
+            chat_app.services.chat_limiter = ConcurrencyLimiter(
+                args.max_concurrency,
+                max_queue=args.max_queue,
+                queue_timeout=args.queue_timeout,
+            )
+            r = asyncio.run(run_load(app, clients, args.requests_per_client))
+            print(
+                f"{name:<8}{r['clients']:>8}{r['ok']:>7}{r['rejected']:>7}"
+                f"{r['p50_ms']:>10.1f}{r['p99_ms']:>10.1f}{r['rps']:>9.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
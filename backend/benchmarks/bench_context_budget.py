@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Prompt-size and latency benchmark for token-budgeted context assembly.
+
+Chunks data/interim/<company>/txt/ like build_index.py, retrieves the top
+RETRIEVAL_K chunks per question with the keyword index (no API calls), and
+renders each prompt as:
+
+  * join            – the previous prompt: system prompt + every retrieved chunk as-is
+  * budget          – ContextBuilder: overlap between neighbouring chunks removed,
+                      chunks packed by relevance into --max-tokens
+  * budget+history  – the same, asked as a follow-up with a history window
+
+The questions are bench_hybrid_retrieval's. End-to-end latency is the local
+prompt-build time plus a model of the LLM call: --llm-base seconds plus
+--prefill-ms per 1k prompt tokens.
+
+Usage:
+    python -m backend.benchmarks.bench_context_budget --max-tokens 3000
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import time
+from pathlib import Path
+from typing import List
+
+from langchain.text_splitter import RecursiveCharacterTextSplitter
+
+from backend.benchmarks.bench_hybrid_retrieval import build_queries
+from backend.scripts.build_index import CHUNK_OVERLAP, CHUNK_SIZE, INTERIM_DIR, collect_chunks
+from backend.src.context_builder import CONTEXT_SEPARATOR, ContextBuilder, TokenCounter
+from backend.src.keyword_index import KeywordIndex
+
+RETRIEVAL_K = 4
+PROMPT_FILE = Path(__file__).resolve().parents[1] / "prompts" / "system_prompt.j2"
+HISTORY = [
+    {"role": "assistant", "content": "Hello! How can I assist you today?"},
+    {"role": "user", "content": "How did revenue develop over the last year?"},
+    {"role": "assistant", "content": "Revenue grew in each of the last four quarters, led by exports. " * 4},
+]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--max-tokens", type=int, default=3000)
+    parser.add_argument("--llm-base", type=float, default=0.4, help="seconds per LLM call besides prefill")
+    parser.add_argument("--prefill-ms", type=float, default=60.0, help="milliseconds per 1k prompt tokens")
+    args = parser.parse_args()
+
+    from jinja2 import Template
+
+    system_prompt = Template(PROMPT_FILE.read_text(encoding="utf-8")).render()
+    splitter = RecursiveCharacterTextSplitter(chunk_size=CHUNK_SIZE, chunk_overlap=CHUNK_OVERLAP)
+    chunks = collect_chunks(INTERIM_DIR, splitter)
+    keyword = KeywordIndex(list(chunks.values()))
+    queries = build_queries(chunks)
+    counter = TokenCounter()
+    builder = ContextBuilder(counter, max_tokens=args.max_tokens)
+    tokenizer = "tiktoken" if counter._load() is not False else "~4 chars/token estimate"
+    print(f"{len(chunks)} chunks, {len(queries)} questions, top {RETRIEVAL_K}, tokens by {tokenizer}\n")
+
+    def llm_seconds(tokens: int) -> float:
+        return args.llm_base + tokens / 1000 * args.prefill_ms / 1000
+
+    rows = {"join": [], "budget": [], "budget+history": []}
+    overlap_chars = dropped = 0
+    for company, question, _ in queries:
+        docs = [h.doc for h in keyword.search(question, company, k=RETRIEVAL_K)]
+
+        t0 = time.perf_counter()
+        joined = "\n\n".join([
+            system_prompt,
+            "Context:\n" + CONTEXT_SEPARATOR.join(d.page_content for d in docs),
+            f"User: {question}",
+        ])
+        tokens = counter.count(joined)
+        rows["join"].append((tokens, time.perf_counter() - t0 + llm_seconds(tokens)))
+
+        for mode, history in (("budget", []), ("budget+history", builder.history_window(HISTORY, question))):
+            t0 = time.perf_counter()
+            built = builder.build(system_prompt, question, docs, history)
+            rows[mode].append((built.tokens, time.perf_counter() - t0 + llm_seconds(built.tokens)))
+            if mode == "budget":
+                overlap_chars += built.overlap_chars
+                dropped += built.dropped_docs
+
+    base_tokens = statistics.mean(t for t, _ in rows["join"])
+    base_latency = statistics.mean(s for _, s in rows["join"])
+    print(f"{'mode':<16}{'tokens':>9}{'p95 tok':>9}{'saved':>8}{'mean ms':>10}{'p95 ms':>9}{'vs join':>9}")
+    for mode, values in rows.items():
+        tokens: List[int] = sorted(t for t, _ in values)
+        latency = sorted(s for _, s in values)
+        p95 = int(len(values) * 0.95) - 1
+        print(f"{mode:<16}{statistics.mean(tokens):>9.0f}{tokens[p95]:>9}"
+              f"{1 - statistics.mean(tokens) / base_tokens:>8.1%}"
+              f"{statistics.mean(latency) * 1000:>10.1f}{latency[p95] * 1000:>9.1f}"
+              f"{statistics.mean(latency) / base_latency - 1:>+9.1%}")
+    print(f"\noverlap removed: {overlap_chars} chars over {len(queries)} prompts; "
+          f"chunks left out by the budget: {dropped}")
+
+
+if __name__ == "__main__":
+    main()
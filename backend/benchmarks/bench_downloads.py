@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Report download benchmark against a local HTTP server.
+
+Serves --files PDFs of --size bytes from memory, each response delayed by
+--latency seconds to stand in for the exchange's servers, and times:
+
+  * serial   – the previous scraper: requests.get per file, body held in
+               memory through resp.content, then written
+  * pooled   – downloader.download_all: one pooled session, --workers
+               threads, streamed through .part files
+  * rerun    – download_all again over the same files: conditional GETs, all 304
+
+Usage:
+    python -m backend.benchmarks.bench_downloads --files 100 --workers 8
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import os
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import requests
+
+from backend.src.downloader import DownloadIndex, download_all, make_session
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, so pooled connections are reused
+
+    def log_message(self, *args: object) -> None:
+        pass
+
+    def do_GET(self) -> None:
+        time.sleep(self.server.latency)  # type: ignore[attr-defined]
+        body = self.server.body  # type: ignore[attr-defined]
+        etag = '"%s"' % hashlib.md5(body).hexdigest()
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("ETag", etag)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--files", type=int, default=100)
+    parser.add_argument("--size", type=int, default=400_000, help="bytes per PDF")
+    parser.add_argument("--latency", type=float, default=0.1, help="seconds per response")
+    parser.add_argument("--workers", type=int, default=8)
+    args = parser.parse_args()
+
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    httpd.latency, httpd.body = args.latency, os.urandom(args.size)  # type: ignore[attr-defined]
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    urls = [f"http://127.0.0.1:{httpd.server_port}/report_{i}.pdf" for i in range(args.files)]
+
+    print(f"{args.files} files × {args.size / 1e6:.1f} MB, {args.latency * 1000:.0f}ms per response\n")
+    print(f"{'mode':<8}{'wall s':>9}{'files/s':>9}{'MB/s':>8}")
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        t0 = time.perf_counter()
+        for url in urls:
+            resp = requests.get(url, timeout=30)
+            resp.raise_for_status()
+            (root / Path(url).name).write_bytes(resp.content)
+        rows = [("serial", time.perf_counter() - t0, args.files)]
+
+        session = make_session(pool_size=args.workers)
+        jobs = [(url, root / "pooled" / Path(url).name) for url in urls]
+        for mode in ("pooled", "rerun"):
+            t0 = time.perf_counter()
+            results = download_all(session, jobs, DownloadIndex(root / "index.json", root), workers=args.workers)
+            rows.append((mode, time.perf_counter() - t0, sum(r.status == "downloaded" for r in results)))
+
+    for mode, wall, fetched in rows:
+        print(f"{mode:<8}{wall:>9.2f}{args.files / wall:>9.1f}{fetched * args.size / 1e6 / wall:>8.1f}")
+    httpd.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+Benchmark document embedding for the indexer against a local fake
+OpenAI-compatible embeddings endpoint.
+
+The fake server answers POST /v1/embeddings after `base + per_token * tokens`
+seconds and returns 429 (with Retry-After) once more than `--server-limit`
+requests are in flight, so both request overhead and rate limiting show up.
+It compares:
+
+  * serial     – one request per 500-chunk upsert window, one at a time
+                 (what OpenAIEmbeddings.embed_documents did for the previous
+                 build_index path)
+  * batched    – BatchEmbedder with token-packed batches and --concurrency
+                 requests in flight
+  * overdriven – BatchEmbedder with twice the server limit in flight, to
+                 exercise 429 backoff
+
+Usage:
+    python -m backend.benchmarks.bench_embed_batching --chunks 2000 --concurrency 4
+"""
+
+from __future__ import annotations
+
+import argparse
+import base64
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, List
+
+import numpy as np
+import openai
+
+from backend.src.batch_embedder import BatchEmbedder
+
+DIM = 64
+WORDS = ["revenue", "cost", "of", "sales", "gross", "profit", "operating", "expenses",
+         "net", "income", "quarter", "ended", "31", "March", "2024", "Rs.'000", "group"]
+
+
+class FakeEmbeddingServer:
+    """Threaded HTTP server mimicking the latency and rate limits of /v1/embeddings."""
+
+    def __init__(self, base: float, per_token: float, limit: int) -> None:
+        self.base = base
+        self.per_token = per_token
+        self.limit = limit
+        self.in_flight = 0
+        self.requests = 0
+        self.throttled = 0
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._httpd.daemon_threads = True
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self._httpd.server_address[1]}/v1"
+
+    def __enter__(self) -> "FakeEmbeddingServer":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def reset(self) -> None:
+        self.requests = self.throttled = 0
+
+    def _handler(self) -> type:
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args) -> None:  # keep the table readable
+                pass
+
+            def _reply(self, status: int, body: dict, headers: dict = {}) -> None:
+                data = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                for k, v in headers.items():
+                    self.send_header(k, v)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_POST(self) -> None:  # noqa: N802
+                payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                with server._lock:
+                    server.requests += 1
+                    if server.in_flight >= server.limit:
+                        server.throttled += 1
+                        over = True
+                    else:
+                        server.in_flight += 1
+                        over = False
+                if over:
+                    self._reply(429, {"error": {"message": "rate limited", "type": "requests"}},
+                                {"Retry-After": "0.2"})
+                    return
+                try:
+                    inputs = payload["input"]
+                    if isinstance(inputs, str) or (inputs and isinstance(inputs[0], int)):
+                        inputs = [inputs]
+                    # strings are ~4 chars per token; token id lists count as-is
+                    tokens = [len(x) // 4 if isinstance(x, str) else len(x) for x in inputs]
+                    time.sleep(server.base + server.per_token * sum(tokens))
+                    data = []
+                    for i, x in enumerate(inputs):
+                        vec = np.random.default_rng(len(x)).random(DIM, dtype=np.float32)
+                        emb = (base64.b64encode(vec.tobytes()).decode()
+                               if payload.get("encoding_format") == "base64" else vec.tolist())
+                        data.append({"object": "embedding", "index": i, "embedding": emb})
+                    self._reply(200, {
+                        "object": "list", "data": data, "model": payload.get("model"),
+                        "usage": {"prompt_tokens": sum(tokens), "total_tokens": sum(tokens)},
+                    })
+                finally:
+                    with server._lock:
+                        server.in_flight -= 1
+
+        return Handler
+
+
+def corpus(n: int, seed: int = 7) -> List[str]:
+    """~2,000-character chunks, like build_index produces."""
+    rnd = random.Random(seed)
+    out = []
+    for i in range(n):
+        words = [f"chunk{i}"]
+        while sum(len(w) + 1 for w in words) < rnd.randint(1_200, 2_000):
+            words.append(rnd.choice(WORDS))
+        out.append(" ".join(words))
+    return out
+
+
+def run_windows(embed: Callable[[List[str]], List[List[float]]], texts: List[str], window: int) -> float:
+    t0 = time.perf_counter()
+    for start in range(0, len(texts), window):
+        vectors = embed(texts[start:start + window])
+        assert len(vectors) == len(texts[start:start + window])
+    return time.perf_counter() - t0
+
+
+def report(name: str, seconds: float, n: int, server: FakeEmbeddingServer) -> None:
+    print(f"{name:<12}{seconds:>10.2f}{n / seconds:>12.1f}{server.requests:>10}{server.throttled:>10}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--chunks", type=int, default=2000)
+    parser.add_argument("--window", type=int, default=500, help="chunks per upsert window")
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--max-batch-tokens", type=int, default=50_000)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--base-latency", type=float, default=0.2, help="per-request latency (s)")
+    parser.add_argument("--per-token", type=float, default=2e-6, help="latency per token (s)")
+    parser.add_argument("--server-limit", type=int, default=4, help="requests in flight before 429")
+    args = parser.parse_args()
+
+    texts = corpus(args.chunks)
+    print(f"{'mode':<12}{'seconds':>10}{'chunks/s':>12}{'requests':>10}{'429s':>10}")
+
+    with FakeEmbeddingServer(args.base_latency, args.per_token, args.server_limit) as server:
+        modes = (
+            # OpenAIEmbeddings sent up to 1,000 texts per request, serially
+            ("serial", args.window, 1_000, 10**9, 1),
+            ("batched", args.window * 4, args.batch_size, args.max_batch_tokens, args.concurrency),
+            ("overdriven", args.window * 4, args.batch_size, args.max_batch_tokens,
+             args.server_limit * 2),
+        )
+        for name, window, batch_size, max_tokens, in_flight in modes:
+            server.reset()
+            batcher = BatchEmbedder.for_openai(
+                openai.OpenAI(api_key="sk-bench", base_url=server.url, max_retries=0),
+                "text-embedding-ada-002",
+                batch_size=batch_size,
+                max_batch_tokens=max_tokens,
+                max_in_flight=in_flight,
+            )
+            report(name, run_windows(batcher.embed_documents, texts, window), len(texts), server)
+            s = batcher.stats
+            print(f"  {s.tokens_per_s:,.0f} tokens/s, {s.batches} batches, {s.retries} retries")
+
+
+if __name__ == "__main__":
+    main()
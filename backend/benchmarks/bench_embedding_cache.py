@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Benchmark the query-embedding cache against a slow stub embedder.
+
+Replays a skewed stream of dashboard questions (a few popular ones asked
+most of the time, with casing/whitespace variations) through:
+
+  * uncached   – every question goes to the embedder
+  * memory     – CachedEmbeddings with the in-process LRU only
+  * disk-warm  – a fresh process-local LRU backed by an already-populated
+                 SQLite store (what a newly started uvicorn worker sees)
+
+Usage:
+    python -m backend.benchmarks.bench_embedding_cache --queries 2000 --latency 0.05
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import random
+import statistics
+import tempfile
+import time
+from pathlib import Path
+from typing import List
+
+from langchain_core.embeddings import Embeddings
+
+from backend.src.embedding_cache import CachedEmbeddings, LRUCache, SQLiteEmbeddingStore
+
+QUESTIONS = [
+    "What was revenue last quarter?",
+    "What is the latest net income?",
+    "Show the gross margin trend",
+    "How did operating income change QoQ?",
+    "What was the highest revenue quarter?",
+    "Compare cost of sales year over year",
+    "What is the TTM net income?",
+    "How much were operating expenses in Q3?",
+]
+
+
+class SlowStubEmbedder(Embeddings):
+    """Deterministic embedder that sleeps to mimic a network round trip."""
+
+    def __init__(self, latency: float, dim: int = 1536) -> None:
+        self.latency = latency
+        self.dim = dim
+        self.calls = 0
+
+    def _vec(self, text: str) -> List[float]:
+        seed = int(hashlib.md5(text.encode("utf-8")).hexdigest()[:8], 16)
+        rnd = random.Random(seed)
+        return [rnd.random() for _ in range(self.dim)]
+
+    def embed_query(self, text: str) -> List[float]:
+        self.calls += 1
+        time.sleep(self.latency)
+        return self._vec(text)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        self.calls += 1
+        time.sleep(self.latency)
+        return [self._vec(t) for t in texts]
+
+
+def workload(n: int, seed: int = 7) -> List[str]:
+    """Zipf-like question stream with cosmetic variations."""
+    rnd = random.Random(seed)
+    weights = [1 / (rank + 1) for rank in range(len(QUESTIONS))]
+    out = []
+    for _ in range(n):
+        q = rnd.choices(QUESTIONS, weights)[0]
+        if rnd.random() < 0.3:
+            q = q.lower()
+        if rnd.random() < 0.2:
+            q = "  " + q.replace(" ", "  ")
+        # a long tail of one-off questions
+        if rnd.random() < 0.05:
+            q = f"{q} (variant {rnd.randint(0, 10_000)})"
+        out.append(q)
+    return out
+
+
+def replay(embedder: Embeddings, queries: List[str]) -> List[float]:
+    latencies = []
+    for q in queries:
+        t0 = time.perf_counter()
+        embedder.embed_query(q)
+        latencies.append(time.perf_counter() - t0)
+    return latencies
+
+
+def report(name: str, latencies: List[float], calls: int) -> None:
+    ordered = sorted(latencies)
+    p99 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))]
+    print(
+        f"{name:<10}{statistics.mean(latencies) * 1000:>10.2f}"
+        f"{statistics.median(latencies) * 1000:>10.3f}{p99 * 1000:>10.2f}{calls:>10}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--latency", type=float, default=0.05, help="stub embed latency (s)")
+    args = parser.parse_args()
+
+    queries = workload(args.queries)
+    print(f"{'mode':<10}{'mean ms':>10}{'p50 ms':>10}{'p99 ms':>10}{'calls':>10}")
+
+    stub = SlowStubEmbedder(args.latency)
+    report("uncached", replay(stub, queries), stub.calls)
+
+    stub = SlowStubEmbedder(args.latency)
+    cached = CachedEmbeddings(stub, model="stub", memory=LRUCache(512, ttl=3600))
+    report("memory", replay(cached, queries), stub.calls)
+    print(f"  stats: {cached.stats()}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Path(tmp) / "embeddings.sqlite3"
+        warm = CachedEmbeddings(SlowStubEmbedder(args.latency), "stub", disk=SQLiteEmbeddingStore(db))
+        replay(warm, queries)
+
+        stub = SlowStubEmbedder(args.latency)
+        fresh = CachedEmbeddings(stub, "stub", memory=LRUCache(512), disk=SQLiteEmbeddingStore(db))
+        report("disk-warm", replay(fresh, queries), stub.calls)
+        print(f"  stats: {fresh.stats()}")
+
+
+if __name__ == "__main__":
+    main()
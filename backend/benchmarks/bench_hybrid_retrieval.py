@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Offline recall@k and latency benchmark for chat retrieval on the interim TXT corpus.
+
+Chunks data/interim/<company>/txt/ exactly like build_index.py and asks, for
+every extracted report, questions about its quarterly P&L ("What was the
+gross profit for the 3 months ended 31/12/2023?", plus paraphrases without
+exact tokens). A chunk is relevant if it comes from that report and holds
+the 3-month income statement line for the asked field.
+
+Modes:
+  * vector   – cosine search over local hashed character-trigram vectors
+               (an offline stand-in for OpenAI embeddings; no API calls)
+  * bm25     – KeywordIndex alone
+  * hybrid   – RRF of vector and bm25 candidates, as /api/chat does
+  * fastpath – hybrid, except conclusive keyword hits skip the embedding
+
+Latency is local compute plus --embed-latency for each query that needs
+an embedding call.
+
+Usage:
+    python -m backend.benchmarks.bench_hybrid_retrieval --k 4 --embed-latency 0.15
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import time
+import zlib
+from typing import Dict, List, Tuple
+
+import numpy as np
+from langchain.docstore.document import Document
+from langchain.text_splitter import RecursiveCharacterTextSplitter
+
+from backend.scripts.build_index import CHUNK_OVERLAP, CHUNK_SIZE, INTERIM_DIR, collect_chunks
+from backend.src.answer_cache import doc_id
+from backend.src.keyword_index import KeywordIndex, is_conclusive, reciprocal_rank_fusion
+
+DIM = 2048
+CANDIDATES = 8
+FIELDS = [
+    ("revenue", "revenue"),
+    ("gross profit", "gross profit"),
+    ("net profit", "profit for the period"),
+]
+TEMPLATES = [
+    "What was the {label} for the 3 months ended {date}?",
+    "{label} in Q{quarter} {year}",
+    "How did the company's {label} look in the latest quarter of its {season} report?",
+]
+SEASONS = {3: "March", 6: "June", 9: "September", 12: "December"}
+
+
+def embed(text: str) -> np.ndarray:
+    """Hashed character-trigram vector, L2-normalized."""
+    vec = np.zeros(DIM, dtype=np.float32)
+    t = " ".join(text.lower().split())
+    for i in range(len(t) - 2):
+        vec[zlib.crc32(t[i:i + 3].encode()) % DIM] += 1.0
+    vec = np.log1p(vec)
+    norm = np.linalg.norm(vec)
+    return vec / norm if norm else vec
+
+
+def build_queries(chunks: Dict[str, Document]) -> List[Tuple[str, str, set]]:
+    """(company, question, relevant doc ids) for every report × field × template."""
+    by_source: Dict[Tuple[str, str], List[Document]] = {}
+    for d in chunks.values():
+        by_source.setdefault((d.metadata["company_slug"], d.metadata["source_txt"]), []).append(d)
+
+    queries = []
+    for (company, source), docs in sorted(by_source.items()):
+        meta_path = INTERIM_DIR / company / "json" / source.replace(".txt", ".json")
+        try:
+            rec = json.loads(meta_path.read_text(encoding="utf-8"))
+            year, month, day = (int(x) for x in rec["period_end_date"].split("-"))
+        except Exception:
+            continue
+        for label, marker in FIELDS:
+            gold = {
+                doc_id(d) for d in docs
+                if marker in d.page_content.lower()
+                and ("03 months" in d.page_content.lower() or "3 months" in d.page_content.lower())
+            }
+            if not gold:
+                continue
+            for tmpl in TEMPLATES:
+                q = tmpl.format(label=label, date=f"{day:02d}/{month:02d}/{year}",
+                                quarter=(month - 1) // 3 + 1, year=year, season=SEASONS.get(month, ""))
+                queries.append((company, q, gold))
+    return queries
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--k", type=int, default=4)
+    parser.add_argument("--embed-latency", type=float, default=0.15, help="seconds per embedding call")
+    args = parser.parse_args()
+
+    splitter = RecursiveCharacterTextSplitter(chunk_size=CHUNK_SIZE, chunk_overlap=CHUNK_OVERLAP)
+    chunks = collect_chunks(INTERIM_DIR, splitter)
+    docs = list(chunks.values())
+    ids = [doc_id(d) for d in docs]
+    companies = np.array([d.metadata["company_slug"] for d in docs])
+    matrix = np.stack([embed(d.page_content) for d in docs])
+    keyword = KeywordIndex(docs)
+    queries = build_queries(chunks)
+    print(f"{len(docs)} chunks, {len(queries)} questions, recall@{args.k}\n")
+
+    def vector_search(company: str, question: str, k: int) -> List[str]:
+        sims = matrix @ embed(question)
+        sims[companies != company] = -np.inf
+        return [ids[i] for i in np.argsort(-sims)[:k]]
+
+    def bm25_search(company: str, question: str, k: int) -> Tuple[List[str], bool]:
+        hits = keyword.search(question, company, k=k)
+        return [doc_id(h.doc) for h in hits], is_conclusive(question, hits, args.k)
+
+    results: Dict[str, List[Tuple[bool, float]]] = {m: [] for m in ("vector", "bm25", "hybrid", "fastpath")}
+    fast = fast_hits = 0
+    for company, question, gold in queries:
+        t0 = time.perf_counter()
+        vec = vector_search(company, question, CANDIDATES)
+        t_vec = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        kw, conclusive = bm25_search(company, question, CANDIDATES)
+        t_kw = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        fused = reciprocal_rank_fusion([vec, kw])[:args.k]
+        t_fuse = time.perf_counter() - t0
+
+        results["vector"].append((bool(gold & set(vec[:args.k])), t_vec + args.embed_latency))
+        results["bm25"].append((bool(gold & set(kw[:args.k])), t_kw))
+        hybrid_latency = t_vec + t_kw + t_fuse + args.embed_latency
+        results["hybrid"].append((bool(gold & set(fused)), hybrid_latency))
+        if conclusive:
+            fast += 1
+            fast_hits += bool(gold & set(kw[:args.k]))
+            results["fastpath"].append((bool(gold & set(kw[:args.k])), t_kw))
+        else:
+            results["fastpath"].append((bool(gold & set(fused)), hybrid_latency))
+
+    print(f"{'mode':<10}{'recall':>10}{'mean ms':>10}{'p95 ms':>10}{'embeds':>10}")
+    for mode, rows in results.items():
+        recall = sum(hit for hit, _ in rows) / len(rows)
+        lat = sorted(t for _, t in rows)
+        embeds = {"vector": len(rows), "bm25": 0, "hybrid": len(rows), "fastpath": len(rows) - fast}[mode]
+        print(f"{mode:<10}{recall:>10.3f}{statistics.mean(lat) * 1000:>10.2f}"
+              f"{lat[int(len(lat) * 0.95) - 1] * 1000:>10.2f}{embeds:>10}")
+    print(f"\nkeyword fast path taken for {fast}/{len(queries)} questions "
+          f"(recall {fast_hits / fast if fast else 0:.3f} on those)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Benchmark the vectorized derived-metrics pass against per-record loops.
+
+Generates synthetic quarterly P&L for C companies × Q quarters and times:
+
+  * loop       – per-company Python loops doing what the dashboard charts
+                 did in the browser (margins per record, QoQ against the
+                 previous record, TTM by filtering + sorting per date)
+  * vectorized – metrics.compute_metrics over all companies in one pass
+
+The loop baseline is skipped above --loop-max-rows since it is quadratic
+in quarters per company.
+
+Usage:
+    python -m backend.benchmarks.bench_metrics --sizes 10x40,100x80,500x120,1000x200
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from backend.src.metrics import compute_metrics
+
+
+def synthetic(companies: int, quarters: int, seed: int = 7) -> Tuple[np.ndarray, np.ndarray, Dict[str, np.ndarray]]:
+    """Rows sorted by (company, date), like FinancialStore keeps them."""
+    rng = np.random.default_rng(seed)
+    n = companies * quarters
+    company = np.repeat(np.arange(companies), quarters)
+    # quarter ends: months 3, 6, 9, 12 from 1990 onwards
+    month = np.tile(np.arange(quarters) * 3 + 3, companies)
+    first = (np.datetime64("1990-01", "M") + month).astype("datetime64[D]")
+    dates = first - np.timedelta64(1, "D")
+    revenue = rng.uniform(1e5, 1e7, n)
+    gross_profit = revenue * rng.uniform(0.1, 0.5, n)
+    operating_income = gross_profit * rng.uniform(0.2, 0.8, n)
+    columns = {
+        "revenue": revenue,
+        "gross_profit": gross_profit,
+        "operating_income": operating_income,
+        "net_income": operating_income * rng.uniform(0.5, 0.9, n),
+        "unit_multiplier": np.full(n, 1000.0),
+    }
+    return company, dates, columns
+
+
+def loop_metrics(company: np.ndarray, dates: np.ndarray, columns: Dict[str, np.ndarray]) -> List[dict]:
+    records: Dict[int, List[dict]] = {}
+    for i, code in enumerate(company.tolist()):
+        records.setdefault(code, []).append({
+            "date": str(dates[i]),
+            **{k: float(v[i]) for k, v in columns.items()},
+        })
+    out = []
+    for recs in records.values():
+        ordered = sorted(recs, key=lambda r: r["date"])
+        for i, rec in enumerate(ordered):
+            row = {
+                "gross_margin": rec["gross_profit"] / rec["revenue"] * 100,
+                "operating_margin": rec["operating_income"] / rec["revenue"] * 100,
+                "net_margin": rec["net_income"] / rec["revenue"] * 100,
+            }
+            prev = ordered[i - 1] if i else None
+            row["revenue_qoq"] = (rec["revenue"] - prev["revenue"]) / abs(prev["revenue"]) * 100 if prev else None
+            last4 = sorted((r for r in ordered if r["date"] <= rec["date"]),
+                           key=lambda r: r["date"], reverse=True)[:4]
+            row["ttm_net_income"] = sum(r["net_income"] * r["unit_multiplier"] for r in last4)
+            out.append(row)
+    return out
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", default="10x40,100x80,500x120,1000x200",
+                        help="comma-separated COMPANIESxQUARTERS")
+    parser.add_argument("--loop-max-rows", type=int, default=60_000)
+    args = parser.parse_args()
+
+    print(f"{'companies':>10}{'quarters':>10}{'rows':>10}{'loop s':>10}{'vector s':>10}{'rows/s':>14}")
+    for size in args.sizes.split(","):
+        companies, quarters = (int(x) for x in size.lower().split("x"))
+        company, dates, columns = synthetic(companies, quarters)
+        rows = len(company)
+
+        loop_s = float("nan")
+        if rows <= args.loop_max_rows:
+            t0 = time.perf_counter()
+            loop_metrics(company, dates, columns)
+            loop_s = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        compute_metrics(company, dates, columns)
+        vec_s = time.perf_counter() - t0
+        print(f"{companies:>10}{quarters:>10}{rows:>10}{loop_s:>10.3f}{vec_s:>10.4f}{rows / vec_s:>14,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Latency benchmark for multi-company chat against stub retrieval + LLM.
+
+POSTs /api/chat with 1, 2, 4 and 8 companies. The Chroma store, embeddings
+and ChatOpenAI client are replaced with stubs that sleep for fixed latencies,
+and every question is distinct so the answer cache never short-circuits.
+Two modes are timed:
+
+  * concurrent  – the current `backend.app` pipeline: one embedding call,
+                  then the company-filtered vector searches run together
+  * sequential  – the same pipeline with the searches awaited one by one
+
+Usage:
+    python -m backend.benchmarks.bench_multi_company --companies 1 2 4 8
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import os
+import statistics
+import time
+from typing import Any, List
+
+import httpx
+from langchain.docstore.document import Document
+
+os.environ.setdefault("OPENAI_EMBEDDING_KEY", "bench-stub-key")
+os.environ.setdefault("STRUCTURED_ROUTING", "0")
+os.environ.setdefault("KEYWORD_FAST_PATH", "0")
+
+from backend import app as chat_app  # noqa: E402
+from backend.benchmarks.bench_chat_load import StubEmbedder, StubLLM  # noqa: E402
+
+SLUGS = [f"company-{i}" for i in range(16)]
+
+
+class StubCompanyStore:
+    """Vector store whose company-filtered searches take a fixed amount of time."""
+
+    def __init__(self, latency: float) -> None:
+        self.latency = latency
+
+    async def asimilarity_search_by_vector(
+        self, embedding: List[float], k: int = 4, filter: Any = None, **_: Any
+    ) -> List[Document]:
+        await asyncio.sleep(self.latency)
+        slug = filter["company_slug"]
+        return [
+            Document(
+                page_content=f"{slug} quarterly revenue and gross profit, part {i}. " * 20,
+                metadata={"company_slug": slug, "source_txt": f"{slug}_{i}.txt"},
+            )
+            for i in range(k)
+        ]
+
+
+async def search_sequentially(companies: List[str], query_vec: List[float]) -> List[List[Document]]:
+    return [await chat_app.retrieve_docs(c, query_vec) for c in companies]
+
+
+async def time_requests(companies: int, requests: int) -> List[float]:
+    latencies: List[float] = []
+    transport = httpx.ASGITransport(app=chat_app.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60) as client:
+        for i in range(requests):
+            payload = {
+                "company_slugs": SLUGS[:companies],
+                "question": f"Compare revenue growth last quarter #{companies}-{i}-{time.monotonic_ns()}",
+            }
+            t0 = time.perf_counter()
+            resp = await client.post("/api/chat", json=payload)
+            resp.raise_for_status()
+            latencies.append(time.perf_counter() - t0)
+    return latencies
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--companies", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--requests", type=int, default=20)
+    parser.add_argument("--search-latency", type=float, default=0.05)
+    parser.add_argument("--llm-latency", type=float, default=0.25)
+    args = parser.parse_args()
+    logging.disable(logging.CRITICAL)  # the stub store has no collection for the catalog scan
+
+    chat_app.services.vectordb = StubCompanyStore(args.search_latency)
+    chat_app.services.embeddings = StubEmbedder()
+    chat_app.services.llm = StubLLM(args.llm_latency)
+    concurrent = chat_app.search_companies
+
+    print(f"{'mode':<12}{'companies':>10}{'p50 ms':>10}{'p95 ms':>10}{'vs 1':>8}")
+    for mode, search in (("concurrent", concurrent), ("sequential", search_sequentially)):
+        chat_app.search_companies = search
+        base = None
+        for n in args.companies:
+            latencies = sorted(asyncio.run(time_requests(n, args.requests)))
+            p50 = statistics.median(latencies)
+            base = base or p50
+            p95 = latencies[max(0, int(len(latencies) * 0.95) - 1)]
+            print(f"{mode:<12}{n:>10}{p50 * 1000:>10.1f}{p95 * 1000:>10.1f}{p50 / base - 1:>+8.1%}")
+    chat_app.search_companies = concurrent
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Benchmark PDF parsing for the extraction stage over data/raw.
+
+For every PDF compares:
+
+  * before – pdfplumber layout extraction of the first 8 pages (the old
+             find_pnl_pages)
+  * after  – PyPDF2 page locator + pdfplumber on the located page and its
+             neighbour (the current find_pnl_pages)
+
+and reports wall time, peak Python heap (tracemalloc, measured in a separate
+pass so it does not skew the timings) and the characters handed to the LLM.
+
+Usage:
+    python -m backend.benchmarks.bench_pdf_parsing [--raw-dir data/raw] [--limit 10]
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, List, Tuple
+
+import pdfplumber
+
+from backend.src.extract_interim_financials import RAW_DIR, SCAN_PAGES, find_pnl_pages, locate_pnl_page
+
+
+def first_pages(pdf_path: Path) -> str:
+    """The previous find_pnl_pages: layout text of the first SCAN_PAGES pages."""
+    with pdfplumber.open(pdf_path) as pdf:
+        return "\n".join(p.extract_text() or "" for p in pdf.pages[:SCAN_PAGES])
+
+
+def measure(fn: Callable[[Path], str], pdf_path: Path) -> Tuple[float, float, int]:
+    """Return (seconds, peak MiB, chars) for one call."""
+    t0 = time.perf_counter()
+    text = fn(pdf_path)
+    seconds = time.perf_counter() - t0
+
+    tracemalloc.start()
+    fn(pdf_path)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return seconds, peak / 2**20, len(text)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--raw-dir", type=Path, default=RAW_DIR)
+    parser.add_argument("--limit", type=int, default=0, help="only the first N PDFs")
+    args = parser.parse_args()
+    logging.getLogger("pdfminer").setLevel(logging.ERROR)  # "CropBox missing" on every page
+
+    pdfs: List[Path] = sorted(args.raw_dir.rglob("*.pdf"))
+    if args.limit:
+        pdfs = pdfs[:args.limit]
+    if not pdfs:
+        raise SystemExit(f"no PDFs under {args.raw_dir}")
+
+    print(f"{'pdf':<34}{'page':>5}{'before s':>10}{'after s':>9}"
+          f"{'before MiB':>12}{'after MiB':>11}{'before ch':>11}{'after ch':>10}")
+    totals = [0.0, 0.0]
+    peaks = [0.0, 0.0]
+    for pdf in pdfs:
+        b_s, b_mib, b_ch = measure(first_pages, pdf)
+        a_s, a_mib, a_ch = measure(find_pnl_pages, pdf)
+        page = locate_pnl_page(pdf)
+        totals[0] += b_s
+        totals[1] += a_s
+        peaks[0] = max(peaks[0], b_mib)
+        peaks[1] = max(peaks[1], a_mib)
+        name = f"{pdf.parent.name[:12]}/{pdf.name}"[:33]
+        print(f"{name:<34}{'-' if page is None else page:>5}{b_s:>10.3f}{a_s:>9.3f}"
+              f"{b_mib:>12.1f}{a_mib:>11.1f}{b_ch:>11}{a_ch:>10}")
+
+    print(f"\n{len(pdfs)} PDFs: before {totals[0]:.2f}s, after {totals[1]:.2f}s "
+          f"({totals[0] / totals[1]:.1f}x); max peak {peaks[0]:.1f} → {peaks[1]:.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -6,19 +6,28 @@ This script:
   * Reads P&L text files from data/interim/<company>/txt/
   * Loads corresponding JSON metadata from data/interim/<company>/json/
   * Splits text into ~2,000-character chunks (~500 tokens)
-  * Embeds using OpenAI text-embedding-ada-002
-  * Persists to data/index/ via Chroma
+  * Gives each chunk a deterministic id from (company, source_txt, chunk hash)
+  * Embeds new chunks in token-packed batches, several in flight at once,
+    backing off on 429s, and upserts them; updates changed metadata in place
+    and deletes chunks whose source is gone (--rebuild starts from an empty index)
+  * Persists to data/index/ via Chroma, plus a BM25 keyword index of the same
+    chunks (data/index/keyword_index.json) for hybrid retrieval
 """
 
 from __future__ import annotations
 
+import argparse
+import hashlib
 import io
 import json
 import logging
 import os
 import sys
+import uuid
+from dataclasses import dataclass
 from pathlib import Path
 from time import perf_counter
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
 import numpy as np
 from dotenv import load_dotenv
@@ -27,6 +36,16 @@ from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain_openai import OpenAIEmbeddings
 from langchain_community.vectorstores import Chroma
 
+# allow `python backend/scripts/build_index.py` as well as `python -m backend.scripts.build_index`
+_REPO_ROOT = str(Path(__file__).resolve().parents[2])
+if _REPO_ROOT not in sys.path:
+    sys.path.insert(0, _REPO_ROOT)
+
+from backend.src.batch_embedder import BatchEmbedder  # noqa: E402
+from backend.src.http_clients import ClientConfig, langchain_kwargs, openai_client  # noqa: E402
+from backend.src.index_catalog import IndexCatalog  # noqa: E402
+from backend.src.keyword_index import KeywordIndex  # noqa: E402
+
 # ─── Monkey-patch NumPy 2.0 dtype removals ────────────────────────────────────
 np.float_ = np.float64  # type: ignore
 np.int_ = np.int64      # type: ignore
@@ -37,11 +56,21 @@ PROJECT_ROOT = Path(__file__).resolve().parents[2]
 DATA_DIR     = PROJECT_ROOT / "data"
 INTERIM_DIR  = DATA_DIR / "interim"
 INDEX_DIR    = DATA_DIR / "index"
+# rewritten after every successful build; the API clears its answer cache when it changes
+INDEX_VERSION_FILE = INDEX_DIR / "index_version"
+KEYWORD_INDEX_FILE = INDEX_DIR / "keyword_index.json"
+CATALOG_FILE       = INDEX_DIR / "index_catalog.json"   # companies/periods/chunk counts for /api/slugs
 LOG_DIR      = PROJECT_ROOT / "logs"
 ENV_FILE     = PROJECT_ROOT / ".env"
 
 CHUNK_SIZE    = 2_000
 CHUNK_OVERLAP =   200
+UPSERT_BATCH  = 2_000   # chunks per embed + upsert window
+
+EMBED_MODEL            = "text-embedding-ada-002"
+EMBED_BATCH_SIZE       = 256      # texts per embeddings request
+EMBED_MAX_BATCH_TOKENS = 50_000   # tokens per embeddings request
+EMBED_CONCURRENCY      = 4        # embeddings requests in flight
 
 # ─── Logging Setup ────────────────────────────────────────────────────────────
 def setup_logging() -> None:
@@ -92,37 +121,36 @@ def load_api_key() -> str:
     return key
 
 
-# ─── Main Indexing Logic ─────────────────────────────────────────────────────
-def build_index() -> None:
-    """
-    Read interim P&L text + metadata, chunk, embed, and persist a Chroma vector store.
-    """
-    setup_logging()
-    api_key = load_api_key()
-    logging.info("Embedding key loaded; initializing embedder.")
+# ─── Chunk collection ────────────────────────────────────────────────────────
+def chunk_id(company: str, source_txt: str, chunk: str) -> str:
+    """Deterministic chunk id: same company, source file and text → same id."""
+    chunk_hash = hashlib.sha256(chunk.encode("utf-8")).hexdigest()
+    raw = f"{company}\x00{source_txt}\x00{chunk_hash}".encode("utf-8")
+    return hashlib.sha256(raw).hexdigest()[:32]
 
-    INDEX_DIR.mkdir(parents=True, exist_ok=True)
 
-    splitter = RecursiveCharacterTextSplitter(
-        chunk_size=CHUNK_SIZE,
-        chunk_overlap=CHUNK_OVERLAP,
-    )
-    embedder = OpenAIEmbeddings(
-        model="text-embedding-ada-002",
-        openai_api_key=api_key,
-    )
-    logging.info("OpenAIEmbeddings ready (model=text-embedding-ada-002)")
-
-    docs = []
-    txt_paths = list(INTERIM_DIR.rglob("txt/*.txt"))
-    logging.info("Discovered %d interim TXT files in %s", len(txt_paths), INTERIM_DIR)
+def collect_chunks(
+    interim_dir: Path,
+    splitter: RecursiveCharacterTextSplitter,
+    slugs: Optional[Iterable[str]] = None,
+) -> Dict[str, Document]:
+    """
+    Split every interim TXT that has JSON metadata (or only those of the
+    companies `slugs`) into chunks, keyed by chunk id.
+    """
+    chunks: Dict[str, Document] = {}
+    if slugs is None:
+        txt_paths = sorted(interim_dir.rglob("txt/*.txt"))
+    else:
+        txt_paths = sorted(p for slug in slugs for p in (interim_dir / slug / "txt").glob("*.txt"))
+    logging.info("Discovered %d interim TXT files in %s", len(txt_paths), interim_dir)
 
     for txt_path in txt_paths:
         stem = txt_path.stem
-        company = txt_path.parent.parent.name
+        company = txt_path.parent.parent.name.lower().replace(" ", "-")
         json_path = txt_path.parent.parent / "json" / f"{stem}.json"
         if not json_path.exists():
-            logging.warning("Skipping %s (no JSON metadata)", txt_path.relative_to(INTERIM_DIR))
+            logging.warning("Skipping %s (no JSON metadata)", txt_path.relative_to(interim_dir))
             continue
 
         raw_meta = json.loads(json_path.read_text(encoding="utf-8"))
@@ -130,40 +158,251 @@ def build_index() -> None:
             k: v
             for k, v in {
                 **raw_meta,
-                "company_slug": company.lower().replace(" ", "-"),
+                "company_slug": company,
                 "source_txt": txt_path.name,
             }.items()
             if isinstance(v, (str, int, float, bool))
         }
 
         text = txt_path.read_text(encoding="utf-8")
-        chunks = splitter.split_text(text)
-        logging.info("  - %s -> %d chunks", txt_path.relative_to(INTERIM_DIR), len(chunks))
+        pieces = splitter.split_text(text)
+        logging.info("  - %s -> %d chunks", txt_path.relative_to(interim_dir), len(pieces))
+
+        for piece in pieces:
+            # identical text within one file collapses to a single chunk
+            chunks.setdefault(
+                chunk_id(company, txt_path.name, piece),
+                Document(page_content=piece, metadata=meta),
+            )
+
+    return chunks
+
+
+# ─── Incremental sync ────────────────────────────────────────────────────────
+@dataclass
+class IndexStats:
+    """Outcome of one incremental index sync."""
+
+    added: int = 0
+    updated: int = 0
+    deleted: int = 0
+    skipped: int = 0
+    seconds: float = 0.0
+
+    @property
+    def changed(self) -> bool:
+        return bool(self.added or self.updated or self.deleted)
+
+
+def existing_metadata(
+    collection: Any,
+    page_size: int = 5_000,
+    where: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Dict[str, Any]]:
+    """Fetch id → metadata for every chunk already in the collection (matching `where`), page by page."""
+    out: Dict[str, Dict[str, Any]] = {}
+    offset = 0
+    while True:
+        page = collection.get(include=["metadatas"], limit=page_size, offset=offset, where=where)
+        out.update(zip(page["ids"], page["metadatas"]))
+        if len(page["ids"]) < page_size:
+            return out
+        offset += page_size
+
+
+def _batches(items: List[str], size: int) -> List[List[str]]:
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+def sync_index(
+    collection: Any,
+    embedder: Any,
+    chunks: Dict[str, Document],
+    batch_size: int = UPSERT_BATCH,
+    where: Optional[Dict[str, Any]] = None,
+) -> IndexStats:
+    """
+    Bring `collection` in line with `chunks`.
+
+    `embedder` is anything with `embed_documents` (a BatchEmbedder in
+    production, a fake in tests). With `where` (e.g. {"company_slug": slug})
+    only the chunks matching it are compared, so one company can be synced
+    without reading the rest of the index.
+
+    * new ids are embedded and upserted
+    * known ids whose metadata changed are updated without re-embedding
+      (the text, and therefore the id, is unchanged)
+    * ids no longer produced by any source are deleted
+    * everything else is skipped
+    """
+    t0 = perf_counter()
+    existing = existing_metadata(collection, where=where)
+
+    to_add = [cid for cid in chunks if cid not in existing]
+    to_update = [cid for cid in chunks if cid in existing and existing[cid] != chunks[cid].metadata]
+    to_delete = [cid for cid in existing if cid not in chunks]
+    stats = IndexStats(skipped=len(chunks) - len(to_add) - len(to_update))
+
+    for ids in _batches(to_delete, batch_size):
+        collection.delete(ids=ids)
+        stats.deleted += len(ids)
+
+    for ids in _batches(to_update, batch_size):
+        collection.update(ids=ids, metadatas=[chunks[i].metadata for i in ids])
+        stats.updated += len(ids)
 
-        for chunk in chunks:
-            docs.append(Document(page_content=chunk, metadata=meta))
+    for ids in _batches(to_add, batch_size):
+        texts = [chunks[i].page_content for i in ids]
+        collection.upsert(
+            ids=ids,
+            embeddings=embedder.embed_documents(texts),
+            metadatas=[chunks[i].metadata for i in ids],
+            documents=texts,
+        )
+        stats.added += len(ids)
+        logging.info("  upserted %d/%d new chunks", stats.added, len(to_add))
+
+    stats.seconds = perf_counter() - t0
+    return stats
+
+
+# ─── Side files read by the API ──────────────────────────────────────────────
+def write_side_files(chunks: Dict[str, Document], changed: bool) -> None:
+    """
+    Write the keyword index and catalog, then the index version (last, since
+    the API reloads the other two when it sees a new version).
+
+    Nothing is rewritten for an unchanged index unless a file is missing.
+    """
+    if not changed and KEYWORD_INDEX_FILE.exists() and CATALOG_FILE.exists():
+        return
+    try:
+        current = INDEX_VERSION_FILE.read_text(encoding="utf-8").strip()
+    except FileNotFoundError:
+        current = None
+    version = uuid.uuid4().hex if changed or current is None else current
+
+    docs = list(chunks.values())
+    KeywordIndex(docs).save(KEYWORD_INDEX_FILE)
+    logging.info("Keyword index written -> %s", KEYWORD_INDEX_FILE.relative_to(PROJECT_ROOT))
+    catalog = IndexCatalog.from_metadatas((d.metadata for d in docs), version)
+    catalog.save(CATALOG_FILE)
+    logging.info(
+        "Index catalog written -> %s (%d companies, %d chunks)",
+        CATALOG_FILE.relative_to(PROJECT_ROOT), len(catalog), catalog.chunks,
+    )
+    if version != current:
+        INDEX_VERSION_FILE.write_text(version, encoding="utf-8")
 
-    if not docs:
+
+# ─── Main Indexing Logic ─────────────────────────────────────────────────────
+def make_splitter() -> RecursiveCharacterTextSplitter:
+    return RecursiveCharacterTextSplitter(chunk_size=CHUNK_SIZE, chunk_overlap=CHUNK_OVERLAP)
+
+
+def make_embedders(
+    api_key: str,
+    batch_size: int = EMBED_BATCH_SIZE,
+    max_batch_tokens: int = EMBED_MAX_BATCH_TOKENS,
+    concurrency: int = EMBED_CONCURRENCY,
+) -> Tuple[OpenAIEmbeddings, BatchEmbedder]:
+    """
+    The Chroma embedding function and the BatchEmbedder used for syncing,
+    sharing one keep-alive pool sized for the batches in flight. Retries are
+    handled by BatchEmbedder so that 429s back off across all workers.
+    """
+    http_config = ClientConfig.from_env(max_connections=max(1, concurrency), max_retries=0)
+    embedder = OpenAIEmbeddings(
+        model=EMBED_MODEL,
+        openai_api_key=api_key,
+        **langchain_kwargs("openai", http_config),
+    )
+    batcher = BatchEmbedder.for_openai(
+        openai_client(api_key, "openai", http_config),
+        EMBED_MODEL,
+        batch_size=batch_size,
+        max_batch_tokens=max_batch_tokens,
+        max_in_flight=concurrency,
+    )
+    logging.info(
+        "Embedder ready (model=%s, batch=%d texts/%d tokens, %d in flight)",
+        EMBED_MODEL, batch_size, max_batch_tokens, concurrency,
+    )
+    return embedder, batcher
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Parse command-line flags."""
+    parser = argparse.ArgumentParser(description="Build or update the Chroma index.")
+    parser.add_argument(
+        "--rebuild", action="store_true",
+        help="drop the existing collection and re-embed every chunk",
+    )
+    parser.add_argument("--batch-size", type=int, default=EMBED_BATCH_SIZE,
+                        help="texts per embeddings request")
+    parser.add_argument("--max-batch-tokens", type=int, default=EMBED_MAX_BATCH_TOKENS,
+                        help="token budget per embeddings request")
+    parser.add_argument("--concurrency", type=int, default=EMBED_CONCURRENCY,
+                        help="embeddings requests in flight")
+    return parser.parse_args(argv)
+
+
+def build_index(argv: Optional[List[str]] = None) -> IndexStats:
+    """
+    Read interim P&L text + metadata, chunk, and sync the persisted Chroma store.
+    """
+    args = parse_args(argv)
+    setup_logging()
+    api_key = load_api_key()
+    logging.info("Embedding key loaded; initializing embedder.")
+
+    INDEX_DIR.mkdir(parents=True, exist_ok=True)
+
+    splitter = make_splitter()
+    embedder, batcher = make_embedders(api_key, args.batch_size, args.max_batch_tokens, args.concurrency)
+
+    chunks = collect_chunks(INTERIM_DIR, splitter)
+    if not chunks:
         logging.error("No document chunks found; nothing to index.")
         sys.exit(1)
 
-    t0 = perf_counter()
     try:
-        vectordb = Chroma.from_documents(
-            docs,
-            embedding=embedder,
+        vectordb = Chroma(
             persist_directory=str(INDEX_DIR),
+            embedding_function=embedder,
         )
-        elapsed = perf_counter() - t0
+        if args.rebuild:
+            logging.info("--rebuild: dropping existing collection")
+            vectordb.delete_collection()
+            vectordb = Chroma(
+                persist_directory=str(INDEX_DIR),
+                embedding_function=embedder,
+            )
+
+        stats = sync_index(vectordb._collection, batcher, chunks)
         logging.info(
-            "Successfully indexed %d chunks -> %s (%.1fs)",
-            len(docs),
+            "Indexed %d chunks -> %s: %d added, %d updated, %d deleted, %d skipped (%.1fs)",
+            len(chunks),
             INDEX_DIR.relative_to(PROJECT_ROOT),
-            elapsed,
+            stats.added,
+            stats.updated,
+            stats.deleted,
+            stats.skipped,
+            stats.seconds,
         )
+        if batcher.stats.chunks:
+            logging.info(
+                "Embedding throughput: %.1f chunks/s, %.0f tokens/s (%d batches, %d retries)",
+                batcher.stats.chunks_per_s,
+                batcher.stats.tokens_per_s,
+                batcher.stats.batches,
+                batcher.stats.retries,
+            )
+        write_side_files(chunks, stats.changed)
     except Exception:
         logging.exception("Chroma index build failed")
         sys.exit(1)
+    return stats
 
 
 if __name__ == "__main__":
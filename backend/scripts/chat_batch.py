@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Run a question set against every company through the chat API's batch endpoint.
+
+This script:
+  * Reads questions from a text file (one per line; blank lines and # comments skipped)
+  * Asks them of the given company slugs, or of every indexed company (GET /api/slugs)
+  * POSTs one /api/chat/batch request and appends each answer to --out as a JSON line
+  * Resumes: items already answered in --out (same company and question) are skipped,
+    so re-running after a crash or with failed items only redoes what is missing
+  * Logs progress as the answers arrive; exits 1 if any item failed
+
+Usage:
+    python -m backend.scripts.chat_batch questions.txt --out answers.jsonl
+    python -m backend.scripts.chat_batch questions.txt --companies dipped-products --out a.jsonl
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional, Set
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_URL = "http://localhost:8000"
+
+
+def read_questions(path: Path) -> List[str]:
+    """Questions in file order, without blank lines and # comments."""
+    lines = (line.strip() for line in path.read_text(encoding="utf-8").splitlines())
+    return [line for line in lines if line and not line.startswith("#")]
+
+
+def answered_ids(out: Path, questions: List[str]) -> Set[str]:
+    """
+    Ids of items answered in an earlier run's output. An id only counts if
+    its question is still the same one, so editing the question file redoes
+    the affected items; a later failed line for an id does not undo an answer.
+    """
+    done: Set[str] = set()
+    if not out.exists():
+        return done
+    for line in out.read_text(encoding="utf-8").splitlines():
+        try:
+            row = json.loads(line)
+        except json.JSONDecodeError:
+            continue  # a line cut short by the interruption
+        item_id = row.get("id")
+        if not item_id or row.get("error") is not None:
+            continue
+        index = item_id.rpartition("#")[2]
+        if index.isdigit() and int(index) < len(questions) and questions[int(index)] == row.get("question"):
+            done.add(item_id)
+    return done
+
+
+def run_batch(
+    client: httpx.Client,
+    companies: List[str],
+    questions: List[str],
+    out: Path,
+    skip: Set[str],
+) -> Optional[Dict[str, int]]:
+    """Stream one batch into `out`; returns the server's summary (None if cut off)."""
+    payload = {"company_slugs": companies, "questions": questions, "skip": sorted(skip)}
+    summary = None
+    try:
+        with client.stream("POST", "/api/chat/batch", json=payload) as resp:
+            if resp.status_code != 200:
+                resp.read()
+                raise SystemExit(f"Batch request failed ({resp.status_code}): {resp.text}")
+            with out.open("a", encoding="utf-8") as fh:
+                for line in resp.iter_lines():
+                    if not line:
+                        continue
+                    row = json.loads(line)
+                    if "summary" in row:
+                        summary = row["summary"]
+                        continue
+                    fh.write(line + "\n")
+                    fh.flush()
+                    status = "failed: " + str(row["error"]) if row["error"] is not None else (
+                        "structured" if row.get("structured") else "cached" if row.get("cached") else "ok"
+                    )
+                    logger.info("[%d/%d] %s %s", row["done"], row["total"], row["id"], status)
+    except httpx.HTTPError as exc:
+        logger.error("Batch stream interrupted: %s", exc)
+    return summary
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Parse command-line arguments."""
+    parser = argparse.ArgumentParser(description="Answer a question set for many companies.")
+    parser.add_argument("questions", type=Path, help="text file with one question per line")
+    parser.add_argument("--out", type=Path, required=True, help="JSON lines file, appended to and resumed from")
+    parser.add_argument("--companies", nargs="+", help="company slugs (default: every indexed company)")
+    parser.add_argument("--url", default=DEFAULT_URL, help=f"chat API base URL (default {DEFAULT_URL})")
+    parser.add_argument("--timeout", type=float, default=600.0, help="seconds to wait for the next answer")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)-8s %(message)s")
+    questions = read_questions(args.questions)
+    if not questions:
+        raise SystemExit(f"No questions in {args.questions}")
+
+    with httpx.Client(base_url=args.url, timeout=args.timeout) as client:
+        companies = args.companies or client.get("/api/slugs").raise_for_status().json()["company_slugs"]
+        ids = {f"{c}#{i}" for c in companies for i in range(len(questions))}
+        skip = answered_ids(args.out, questions) & ids
+        logger.info("%d companies × %d questions; %d already answered in %s",
+                    len(companies), len(questions), len(skip), args.out)
+        summary = run_batch(client, companies, questions, args.out, skip)
+
+    if summary is None:
+        logger.error("Batch stream ended early; re-run to resume")
+        return 1
+    logger.info("Answered %d, failed %d, skipped %d of %d in %.1fs",
+                summary["answered"], summary["failed"], summary["skipped"], len(ids), summary["seconds"])
+    return 1 if summary["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
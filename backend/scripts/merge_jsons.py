@@ -6,6 +6,9 @@ Repair, merge and export LLM‐extracted JSON into a single payload for the dash
 2) Fixes parse errors by extracting fenced JSON or re‐evaluating arithmetic
 3) Coerces any remaining string expressions into floats
 4) Writes merged array to frontend/financial-dashboard/public/data/<slug>/all.json
+
+for every company in the registry (data/companies.json), or those given as
+arguments (symbols, slugs or names).
 """
 
 import json
@@ -15,16 +18,18 @@ import sys
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 
+# allow `python backend/scripts/merge_jsons.py` as well as `python -m backend.scripts.merge_jsons`
+_REPO_ROOT = str(Path(__file__).resolve().parents[2])
+if _REPO_ROOT not in sys.path:
+    sys.path.insert(0, _REPO_ROOT)
+
+from backend.src.company_registry import Company, load_registry  # noqa: E402
+
 # ─── Configuration ────────────────────────────────────────────────────────────
 PROJECT_ROOT = Path(__file__).resolve().parents[2]
 SRC_ROOT     = PROJECT_ROOT / "data" / "interim"
 DST_ROOT     = PROJECT_ROOT / "frontend" / "financial-dashboard" / "public" / "data"
 
-COMPANY_SLUGS: Dict[str, str] = {
-    "Dipped Products":   "dipped-products",
-    "Richard Pieris":    "richard-pieris",
-}
-
 # regex to pull out ```json { … } ``` snippets
 JSON_SNIPPET = re.compile(r"```json\s*\n(\{.*?\})\s*```", re.DOTALL)
 
@@ -126,49 +131,61 @@ def repair_record(rec: Dict[str, Any]) -> Dict[str, Any]:
 
 
 # ─── Main ────────────────────────────────────────────────────────────────────
-def main() -> None:
+def merge_company(company: Company) -> int:
+    """
+    Merge and repair one company's interim JSON records into its all.json;
+    return the number of records written.
     """
-    Iterate over each slug's interim JSON folder, merge and repair records,
+    slug = company.slug
+    # Look under data/interim/<slug>/json
+    src_dir = SRC_ROOT / slug / "json"
+    if not src_dir.exists():
+        logger.warning("Source folder not found, skipping: %s", src_dir)
+        return 0
+
+    # Load all JSON files
+    records: List[Dict[str, Any]] = []
+    for json_file in sorted(src_dir.glob("*.json")):
+        try:
+            rec = json.loads(json_file.read_text(encoding="utf-8"))
+            records.append(rec)
+        except Exception as exc:
+            logger.error("Failed to read %s: %s", json_file, exc)
+
+    # Repair and clean
+    cleaned: List[Dict[str, Any]] = [repair_record(rec) for rec in records]
+    # ─── Derive quarter number from the ISO date ────────────────────────────────────
+    for rec in cleaned:
+        if rec.get("period_end_date"):
+            month = int(rec["period_end_date"].split("-")[1])
+            rec["quarter"] = f"Q{((month - 1) // 3) + 1}"
+
+    # Write out
+    out_dir = DST_ROOT / slug
+    out_dir.mkdir(parents=True, exist_ok=True)
+    out_path = out_dir / "all.json"
+
+    try:
+        out_path.write_text(json.dumps(cleaned, indent=2), encoding="utf-8")
+        logger.info("Wrote %d records → %s", len(cleaned), out_path.relative_to(DST_ROOT))
+    except Exception as exc:
+        logger.exception("Failed to write merged JSON for %s: %s", slug, exc)
+        return 0
+    return len(cleaned)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """
+    Iterate over each company's interim JSON folder, merge and repair records,
     then write out consolidated all.json under the frontend data folder.
     """
     setup_logging()
     logger.info("Starting merge_jsons")
 
-    for company_name, slug in COMPANY_SLUGS.items():
-        # Look under data/interim/<slug>/json
-        src_dir = SRC_ROOT / slug / "json"
-        if not src_dir.exists():
-            logger.warning("Source folder not found, skipping: %s", src_dir)
-            continue
-
-        # Load all JSON files
-        records: List[Dict[str, Any]] = []
-        for json_file in sorted(src_dir.glob("*.json")):
-            try:
-                rec = json.loads(json_file.read_text(encoding="utf-8"))
-                records.append(rec)
-            except Exception as exc:
-                logger.error("Failed to read %s: %s", json_file, exc)
-
-        # Repair and clean
-        cleaned: List[Dict[str, Any]] = [repair_record(rec) for rec in records]
-        # ─── Derive quarter number from the ISO date ────────────────────────────────────
-        for rec in cleaned:
-            if rec.get("period_end_date"):
-                month = int(rec["period_end_date"].split("-")[1])
-                rec["quarter"] = f"Q{((month - 1) // 3) + 1}"
-
-
-        # Write out
-        out_dir = DST_ROOT / slug
-        out_dir.mkdir(parents=True, exist_ok=True)
-        out_path = out_dir / "all.json"
-
-        try:
-            out_path.write_text(json.dumps(cleaned, indent=2), encoding="utf-8")
-            logger.info("Wrote %d records → %s", len(cleaned), out_path.relative_to(DST_ROOT))
-        except Exception as exc:
-            logger.exception("Failed to write merged JSON for %s: %s", slug, exc)
+    argv = sys.argv[1:] if argv is None else argv
+    registry = load_registry()
+    for company in registry.select(argv) if argv else registry:
+        merge_company(company)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,298 @@
+#!/usr/bin/env python3
+"""
+Run the data pipeline as an incremental task graph, reprocessing only what changed.
+
+Unlike run_pipeline.py, which runs each stage over all selected companies
+before the next, this models the pipeline per file (backend/src/pipeline_dag.py):
+
+  scrape:<company>            download the company's new or changed reports (always runs)
+    → extract:<company>/<pdf> one per PDF, in file order within a company
+    → merge:<company>         all.json for the dashboard and the company's pnl.csv
+    → index:<company>         sync only this company's chunks into Chroma
+  publish                     keyword index, catalog and index version, once
+
+Each task records a fingerprint of its input files and parameters and the
+outputs it wrote (data/pipeline_state.json); unchanged tasks are skipped.
+Companies run in parallel and a PDF moves on to merge and index as soon as
+its company's extractions finish, so one new report reaches the index
+without rescanning the other companies or re-reading the rest of the index.
+A report of each stage and of the critical path is logged at the end.
+
+Usage:
+    python -m backend.scripts.orchestrate
+    python -m backend.scripts.orchestrate --companies DIPD.N0000 --no-scrape
+    python -m backend.scripts.orchestrate --force --llm-concurrency 8
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from dotenv import load_dotenv
+
+# allow `python backend/scripts/orchestrate.py` as well as `python -m backend.scripts.orchestrate`
+_REPO_ROOT = str(Path(__file__).resolve().parents[2])
+if _REPO_ROOT not in sys.path:
+    sys.path.insert(0, _REPO_ROOT)
+
+from backend.scripts import build_index as index_mod  # noqa: E402
+from backend.scripts import merge_jsons  # noqa: E402
+from backend.scripts.run_pipeline import parse_shard  # noqa: E402
+from backend.src import extract_interim_financials as extract  # noqa: E402
+from backend.src.company_registry import Company, load_registry  # noqa: E402
+from backend.src.manifest import ExtractionManifest  # noqa: E402
+from backend.src.pipeline_dag import DagReport, Task, TaskState, run_dag  # noqa: E402
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+STATE_FILE = PROJECT_ROOT / "data" / "pipeline_state.json"
+MANIFEST_CHECKPOINT = 25      # extractions between manifest saves
+
+logger = logging.getLogger(__name__)
+
+
+class Pipeline:
+    """
+    Builds each company's tasks and holds what its tasks share: the HTTP
+    session and download index, the LLM client, the extraction manifest,
+    the PDF parsing pool and the index writer (created on first use).
+    """
+
+    def __init__(self, args: argparse.Namespace, parse_pool: Optional[ProcessPoolExecutor] = None) -> None:
+        self.args = args
+        self.parse_pool = parse_pool
+        self.manifest = ExtractionManifest(extract.MANIFEST_FILE, extract.RAW_DIR)
+        self.fingerprint = {"prompt_hash": extract.prompt_hash(), "model": extract.model_name()}
+        self.index_changed = False
+        self._lock = threading.Lock()
+        self._client: Any = None
+        self._scraper: Optional[Tuple[Any, Any]] = None
+        self._index: Optional[Tuple[Any, Any]] = None
+
+    # ─── Shared resources ────────────────────────────────────────────────────
+    def llm(self) -> Any:
+        with self._lock:
+            if self._client is None:
+                self._client = extract.llm_client(max(1, self.args.llm_concurrency))
+                if not self.args.no_cache:
+                    self._client = extract.cached_llm(self._client, refresh=self.args.refresh)
+            return self._client
+
+    def index_writer(self) -> Tuple[Any, Any]:
+        """(Chroma collection, BatchEmbedder), opened once; index tasks run one at a time."""
+        with self._lock:
+            if self._index is None:
+                from langchain_community.vectorstores import Chroma
+
+                embedder, batcher = index_mod.make_embedders(index_mod.load_api_key())
+                index_mod.INDEX_DIR.mkdir(parents=True, exist_ok=True)
+                store = Chroma(persist_directory=str(index_mod.INDEX_DIR), embedding_function=embedder)
+                self._index = (store._collection, batcher)
+            return self._index
+
+    def close(self) -> None:
+        with self._lock:
+            if self.manifest.dirty:
+                self.manifest.save()
+
+    # ─── Task bodies ─────────────────────────────────────────────────────────
+    def scrape(self, company: Company) -> List[Path]:
+        if self.args.no_scrape:
+            return []
+        from backend.scripts import scrape_reports
+        from backend.src.downloader import DownloadIndex, make_session
+
+        with self._lock:
+            if self._scraper is None:
+                self._scraper = (
+                    make_session(pool_size=self.args.download_workers),
+                    DownloadIndex(scrape_reports.DOWNLOAD_INDEX, scrape_reports.RAW_DIR),
+                )
+            session, downloads = self._scraper
+        results = scrape_reports.scrape(
+            [company], workers=self.args.download_workers, link_workers=1, session=session, index=downloads,
+        )
+        return [r.dest for r in results if r.status in ("downloaded", "resumed")]
+
+    def extract(self, pdf_path: Path) -> List[Path]:
+        """
+        Extract one PDF, recording it in the extraction manifest. A PDF the
+        manifest already has current (e.g. from extract_interim_financials.py)
+        is not sent to the LLM again.
+        """
+        sha256, size, mtime_ns = self.manifest.content_hash(pdf_path)
+        with self._lock:
+            current = self.manifest.is_current(pdf_path, sha256, **self.fingerprint)
+            entry = self.manifest.entries.get(self.manifest.key(pdf_path), {})
+        txt = extract.INTERIM_DIR / pdf_path.parent.name / "txt" / f"{pdf_path.stem}.txt"
+        if current:
+            return [txt, extract.INTERIM_DIR / entry["slug"] / "json" / f"{pdf_path.stem}.json"]
+
+        logger.info("Extracting %s", pdf_path.relative_to(PROJECT_ROOT))
+        snippet_fn = extract.extract_snippet
+        if self.parse_pool is not None:
+            snippet_fn = lambda p: self.parse_pool.submit(extract.extract_snippet, p).result()  # noqa: E731
+        rec = extract.extract_record(pdf_path, extract.read_prompt(), extract.EXAMPLE_SCHEMA, self.llm(), snippet_fn)
+        ok = extract.finalize(pdf_path, rec)
+        slug = extract.record_slug(rec, pdf_path) if ok else None
+        with self._lock:
+            self.manifest.update(
+                pdf_path,
+                {**self.fingerprint, "sha256": sha256, "size": size, "mtime_ns": mtime_ns},
+                slug,
+                rec if ok else None,
+            )
+            if self.manifest.unsaved >= MANIFEST_CHECKPOINT:
+                self.manifest.save()
+        if not ok:
+            raise ValueError(f"no usable record extracted from {pdf_path.name}")
+        return [txt, extract.INTERIM_DIR / slug / "json" / f"{pdf_path.stem}.json"]
+
+    def merge(self, company: Company) -> List[Path]:
+        merge_jsons.merge_company(company)
+        with self._lock:
+            extract.rebuild_csvs(self.manifest, {company.slug})
+        outputs = [
+            merge_jsons.DST_ROOT / company.slug / "all.json",
+            extract.INTERIM_DIR / company.slug / "csv" / "pnl.csv",
+        ]
+        return [p for p in outputs if p.exists()]
+
+    def index(self, company: Company) -> List[Path]:
+        collection, batcher = self.index_writer()
+        chunks = index_mod.collect_chunks(index_mod.INTERIM_DIR, index_mod.make_splitter(), [company.slug])
+        stats = index_mod.sync_index(collection, batcher, chunks, where={"company_slug": company.slug})
+        logger.info(
+            "Indexed %s: %d added, %d updated, %d deleted, %d skipped",
+            company.slug, stats.added, stats.updated, stats.deleted, stats.skipped,
+        )
+        self.index_changed |= stats.changed
+        return []
+
+    def publish(self) -> List[Path]:
+        side_files = [index_mod.KEYWORD_INDEX_FILE, index_mod.CATALOG_FILE]
+        if self.index_changed or not all(p.exists() for p in side_files):
+            chunks = index_mod.collect_chunks(index_mod.INTERIM_DIR, index_mod.make_splitter())
+            index_mod.write_side_files(chunks, self.index_changed)
+        return side_files
+
+    # ─── Graph ───────────────────────────────────────────────────────────────
+    def company_tasks(self, company: Company) -> List[Task]:
+        """Extract, merge and index tasks for the PDFs now in the company's raw folder."""
+        slug = company.slug
+        pdfs = sorted((extract.RAW_DIR / slug).glob("*.pdf"))
+        present = {self.manifest.key(p) for p in pdfs}
+        with self._lock:
+            for key in [k for k in self.manifest.entries if k.split("/", 1)[0] == slug and k not in present]:
+                extract.remove_outputs(key, self.manifest.forget(key))
+        tasks: List[Task] = []
+        extract_keys: List[str] = []
+        for pdf_path in pdfs:
+            key = f"extract:{slug}/{pdf_path.name}"
+            tasks.append(Task(
+                key,
+                fn=lambda p=pdf_path: self.extract(p),
+                inputs=lambda p=pdf_path: [p],
+                params=self.fingerprint,
+                # post_validate may read the previous quarter's output
+                deps=tuple(extract_keys[-1:]),
+            ))
+            extract_keys.append(key)
+
+        interim = extract.INTERIM_DIR / slug
+        tasks.append(Task(
+            f"merge:{slug}",
+            fn=lambda: self.merge(company),
+            inputs=lambda: sorted((interim / "json").glob("*.json")),
+            deps=tuple(extract_keys),
+        ))
+        if "index" in self.args.stages:
+            tasks.append(Task(
+                f"index:{slug}",
+                fn=lambda: self.index(company),
+                inputs=lambda: sorted((interim / "txt").glob("*.txt")) + sorted((interim / "json").glob("*.json")),
+                params={"chunk_size": index_mod.CHUNK_SIZE, "chunk_overlap": index_mod.CHUNK_OVERLAP,
+                        "model": index_mod.EMBED_MODEL},
+                deps=tuple(extract_keys),
+            ))
+        return tasks
+
+    def tasks(self, companies: List[Company]) -> List[Task]:
+        tasks = [
+            Task(f"scrape:{c.slug}", fn=lambda c=c: self.scrape(c), always=True,
+                 expand=lambda c=c: self.company_tasks(c))
+            for c in companies
+        ]
+        if "index" in self.args.stages:
+            # always runs: it only rewrites the side files if an index task changed something
+            tasks.append(Task("publish", fn=self.publish, deps=("index:*",), always=True))
+        return tasks
+
+
+# ─── Main ────────────────────────────────────────────────────────────────────
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Parse command-line flags."""
+    parser = argparse.ArgumentParser(description="Run the pipeline incrementally, per file and company.")
+    parser.add_argument("--companies", nargs="+", metavar="COMPANY",
+                        help="registry symbols, slugs or names (default: all)")
+    parser.add_argument("--shard", type=parse_shard, metavar="I/N",
+                        help="only shard I of N (skips the single-writer index stage)")
+    parser.add_argument("--no-scrape", action="store_true", help="use the PDFs already downloaded")
+    parser.add_argument("--no-index", action="store_true", help="stop after merge")
+    parser.add_argument("--force", action="store_true", help="rerun every task, ignoring the saved state")
+    cache = parser.add_mutually_exclusive_group()
+    cache.add_argument("--no-cache", action="store_true", help="bypass the LLM response cache")
+    cache.add_argument("--refresh", action="store_true", help="re-ask the LLM and overwrite cached responses")
+    parser.add_argument("--state", type=Path, default=STATE_FILE, help="task state file")
+    parser.add_argument("--download-workers", type=int, default=8, help="concurrent report downloads")
+    parser.add_argument("--link-workers", type=int, default=4, help="companies scraped at once")
+    parser.add_argument("--parse-workers", type=int, default=4, help="processes for PDF parsing")
+    parser.add_argument("--llm-concurrency", type=int, default=4, help="extractions in flight")
+    parser.add_argument("--merge-workers", type=int, default=8, help="companies merged at once")
+    args = parser.parse_args(argv)
+    sharded = bool(args.shard and args.shard[1] > 1)
+    args.stages = ("scrape", "extract", "merge") + (() if args.no_index or sharded else ("index",))
+    return args
+
+
+def run(args: argparse.Namespace) -> DagReport:
+    companies = load_registry()
+    if args.companies:
+        companies = companies.select(args.companies)
+    if args.shard:
+        companies = companies.shard(*args.shard)
+
+    limits: Dict[str, int] = {
+        "scrape": max(1, args.link_workers),
+        "extract": max(1, args.llm_concurrency),
+        "merge": max(1, args.merge_workers),
+        "index": 1,
+        "publish": 1,
+    }
+    parse_pool = ProcessPoolExecutor(max_workers=args.parse_workers) if args.parse_workers > 1 else None
+    pipeline = Pipeline(args, parse_pool)
+    try:
+        state = TaskState(args.state, PROJECT_ROOT)
+        return run_dag(pipeline.tasks(list(companies)), state, limits, force=args.force)
+    finally:
+        pipeline.close()
+        if parse_pool is not None:
+            parse_pool.shutdown()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    extract.setup_logging()
+    load_dotenv()
+    report = run(args)
+    logger.info("Pipeline report:\n%s", report.format())
+    return 1 if report.failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Run the data pipeline — scrape → extract → merge → index — for the companies
+in the registry (data/companies.json), or one shard of them.
+
+This script:
+  * Picks the companies: all, --companies, and/or shard I of N (--shard I/N,
+    by a stable hash of the slug, so shards can run on separate machines or
+    side by side on one)
+  * scrape:  fetches several company pages at a time and downloads every
+             report on a thread pool (scrape_reports.scrape)
+  * extract: extracts those companies' new or changed PDFs, pipelined across
+             companies (extract_interim_financials --companies)
+  * merge:   writes each company's all.json, several companies at a time
+  * index:   syncs the vector index over all interim data; incremental but
+             single-writer, so with --shard it only runs when asked for
+             (--stages index, once the shards are done)
+  * Reports the throughput of each stage
+
+Usage:
+    python -m backend.scripts.run_pipeline
+    python -m backend.scripts.run_pipeline --shard 0/4 --llm-concurrency 8
+    python -m backend.scripts.run_pipeline --stages index
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+# allow `python backend/scripts/run_pipeline.py` as well as `python -m backend.scripts.run_pipeline`
+_REPO_ROOT = str(Path(__file__).resolve().parents[2])
+if _REPO_ROOT not in sys.path:
+    sys.path.insert(0, _REPO_ROOT)
+
+from backend.src.company_registry import CompanyRegistry, load_registry  # noqa: E402
+
+STAGES = ("scrape", "extract", "merge", "index")
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class StageReport:
+    """Throughput of one pipeline stage."""
+
+    stage: str
+    companies: int
+    items: int
+    unit: str
+    seconds: float
+    error: Optional[str] = None
+
+    @property
+    def per_second(self) -> float:
+        return self.items / self.seconds if self.seconds else 0.0
+
+
+# ─── Stages ──────────────────────────────────────────────────────────────────
+# Each takes the selected companies and the parsed arguments and returns
+# (items processed, unit). Stage modules are imported when their stage runs.
+def run_scrape(companies: CompanyRegistry, args: argparse.Namespace) -> Tuple[int, str]:
+    from backend.scripts.scrape_reports import scrape
+
+    results = scrape(companies, workers=args.download_workers, link_workers=args.link_workers)
+    return sum(r.status in ("downloaded", "resumed") for r in results), "PDFs downloaded"
+
+
+def run_extract(companies: CompanyRegistry, args: argparse.Namespace) -> Tuple[int, str]:
+    from backend.src import extract_interim_financials as extract
+
+    argv = [
+        "--companies", *companies.slugs(),
+        "--workers", str(args.parse_workers),
+        "--llm-concurrency", str(args.llm_concurrency),
+    ]
+    return extract.main(argv), "PDFs extracted"
+
+
+def run_merge(companies: CompanyRegistry, args: argparse.Namespace) -> Tuple[int, str]:
+    from backend.scripts.merge_jsons import merge_company
+
+    with ThreadPoolExecutor(max_workers=max(1, args.merge_workers)) as pool:
+        return sum(pool.map(merge_company, companies)), "records merged"
+
+
+def run_index(companies: CompanyRegistry, args: argparse.Namespace) -> Tuple[int, str]:
+    from backend.scripts.build_index import build_index
+
+    stats = build_index([])
+    return stats.added + stats.updated, "chunks embedded"
+
+
+STAGE_FNS: Dict[str, Callable[[CompanyRegistry, argparse.Namespace], Tuple[int, str]]] = {
+    "scrape": run_scrape,
+    "extract": run_extract,
+    "merge": run_merge,
+    "index": run_index,
+}
+
+
+def run_stages(companies: CompanyRegistry, stages: List[str], args: argparse.Namespace) -> List[StageReport]:
+    """Run `stages` in order over `companies`; stop at the first that fails."""
+    reports = []
+    for stage in stages:
+        logger.info("── %s: %d companies", stage, len(companies))
+        t0 = time.perf_counter()
+        try:
+            items, unit = STAGE_FNS[stage](companies, args)
+            reports.append(StageReport(stage, len(companies), items, unit, time.perf_counter() - t0))
+        except (Exception, SystemExit) as exc:
+            logger.exception("Stage %s failed", stage)
+            reports.append(StageReport(stage, len(companies), 0, "", time.perf_counter() - t0, repr(exc)))
+            break
+    return reports
+
+
+def format_report(reports: List[StageReport]) -> str:
+    lines = [f"{'stage':<9}{'companies':>10}{'items':>8}  {'unit':<17}{'seconds':>9}{'items/s':>9}"]
+    for r in reports:
+        lines.append(
+            f"{r.stage:<9}{r.companies:>10}{r.items:>8}  {r.unit:<17}{r.seconds:>9.2f}{r.per_second:>9.1f}"
+            + (f"  FAILED: {r.error}" if r.error else "")
+        )
+    return "\n".join(lines)
+
+
+# ─── Main ────────────────────────────────────────────────────────────────────
+def parse_shard(value: str) -> Tuple[int, int]:
+    try:
+        index, count = (int(part) for part in value.split("/"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected I/N, e.g. 0/4, got {value!r}")
+    if not 0 <= index < count:
+        raise argparse.ArgumentTypeError(f"shard {index} out of range for {count} shards")
+    return index, count
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Parse command-line flags."""
+    parser = argparse.ArgumentParser(description="Run scrape → extract → merge → index per company.")
+    parser.add_argument("--companies", nargs="+", metavar="COMPANY",
+                        help="registry symbols, slugs or names (default: all)")
+    parser.add_argument("--shard", type=parse_shard, metavar="I/N", help="only shard I of N")
+    parser.add_argument("--stages", nargs="+", choices=STAGES,
+                        help="stages to run, in pipeline order (default: all; without index when sharded)")
+    parser.add_argument("--download-workers", type=int, default=8, help="concurrent report downloads")
+    parser.add_argument("--link-workers", type=int, default=4, help="company pages fetched at once")
+    parser.add_argument("--parse-workers", type=int, default=4, help="processes for PDF parsing")
+    parser.add_argument("--llm-concurrency", type=int, default=4, help="extraction LLM calls in flight")
+    parser.add_argument("--merge-workers", type=int, default=8, help="companies merged at once")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)-8s %(message)s")
+
+    companies = load_registry()
+    if args.companies:
+        companies = companies.select(args.companies)
+    if args.shard:
+        companies = companies.shard(*args.shard)
+    if args.stages:
+        stages = [s for s in STAGES if s in args.stages]
+    else:
+        stages = [s for s in STAGES if not (args.shard and args.shard[1] > 1 and s == "index")]
+    if not len(companies) and stages != ["index"]:
+        logger.warning("No companies selected; nothing to do")
+        return 0
+
+    logger.info("Pipeline %s over %d companies%s", " → ".join(stages), len(companies),
+                f" (shard {args.shard[0]}/{args.shard[1]})" if args.shard else "")
+    reports = run_stages(companies, stages, args)
+    report = format_report(reports)
+    logger.info("Stage throughput:\n%s", report)
+    return 1 if any(r.error for r in reports) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,26 +1,36 @@
 #!/usr/bin/env python3
 """
 Scrape the CSE website for interim PDF links and download the last N years
-of quarterly reports for each symbol into data/raw/<company-slug>/.
+of quarterly reports for each company in the registry (data/companies.json),
+or those given as arguments, into data/raw/<company-slug>/.
+
+Each company page is first fetched as plain HTML; only when it carries no
+PDF links (they are rendered by JavaScript) is a headless Chrome started,
+once per link worker, and reused for the following symbols. Downloads then run concurrently
+over one pooled session, streamed to disk and resumable; see
+backend/src/downloader.py.
 """
 import logging
 import re
 import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import List, Optional
+from typing import Any, Iterable, List, Optional, Tuple
+from urllib.parse import urljoin
 
 import requests
 from bs4 import BeautifulSoup
 from dotenv import load_dotenv
 
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.chrome.service import Service
-from webdriver_manager.chrome import ChromeDriverManager
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.common.by import By
+# allow `python backend/scripts/scrape_reports.py` as well as `python -m backend.scripts.scrape_reports`
+_REPO_ROOT = str(Path(__file__).resolve().parents[2])
+if _REPO_ROOT not in sys.path:
+    sys.path.insert(0, _REPO_ROOT)
+
+from backend.src.company_registry import Company, load_registry  # noqa: E402
+from backend.src.downloader import DownloadIndex, DownloadResult, download_all, make_session  # noqa: E402
 
 # ─── Configuration ────────────────────────────────────────────────────────────
 PROJECT_ROOT = Path(__file__).resolve().parents[2]
@@ -29,10 +39,9 @@ LOG_DIR      = PROJECT_ROOT / "logs"
 
 YEARS_BACK = 3
 BASE_URL   = "https://www.cse.lk/pages/company-profile/company-profile.component.html"
-SYMBOLS    = {
-    "DIPD.N0000": "dipped-products",
-    "REXP.N0000": "richard-pieris",
-}
+DOWNLOAD_WORKERS = 8
+LINK_WORKERS     = 4                             # company pages fetched at once
+DOWNLOAD_INDEX   = RAW_DIR / ".downloads.json"   # validators for conditional GETs / resume
 
 # ─── Logging Setup ────────────────────────────────────────────────────────────
 def setup_logging() -> None:
@@ -50,29 +59,8 @@ def setup_logging() -> None:
 logger = logging.getLogger(__name__)
 
 # ─── Helpers ─────────────────────────────────────────────────────────────────
-def ensure_dirs() -> None:
-    for slug in SYMBOLS.values():
-        (RAW_DIR / slug).mkdir(parents=True, exist_ok=True)
-
-def fetch_pdf_links(symbol: str) -> List[str]:
-    """
-    Use Selenium to render the page, capture its HTML, then
-    parse with BeautifulSoup to avoid stale-element errors.
-    """
-    options = Options()
-    options.add_argument("--headless")
-    service = Service(ChromeDriverManager().install())
-    driver  = webdriver.Chrome(service=service, options=options)
-    try:
-        driver.get(f"{BASE_URL}?symbol={symbol}")
-        # wait until at least one PDF link appears in the DOM
-        WebDriverWait(driver, 10).until(
-            EC.presence_of_element_located((By.CSS_SELECTOR, "a[href$='.pdf']"))
-        )
-        html = driver.page_source
-    finally:
-        driver.quit()
-
+def parse_pdf_links(html: str, base_url: str) -> List[str]:
+    """Absolute URLs of the interim/quarterly report PDFs linked from `html`."""
     soup = BeautifulSoup(html, "html.parser")
     links = []
     for a in soup.find_all("a", href=True):
@@ -81,10 +69,74 @@ def fetch_pdf_links(symbol: str) -> List[str]:
             continue
         text = (a.get_text() or "").lower()
         if "interim" in text or "quarter" in text:
-            url = href if href.startswith("http") else f"https://www.cse.lk{href}"
-            links.append(url)
+            links.append(urljoin(base_url, href))
     return sorted(set(links))
 
+class LinkFetcher:
+    """
+    Fetch report links per symbol: plain HTML over `session` first, then a
+    headless Chrome (started on first need and reused) for pages that only
+    render their links with JavaScript. Use as a context manager so the
+    browser is closed.
+    """
+
+    def __init__(self, session: requests.Session, base_url: str = BASE_URL) -> None:
+        self.session  = session
+        self.base_url = base_url
+        self._driver: Optional[Any] = None
+
+    def __enter__(self) -> "LinkFetcher":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if self._driver is not None:
+            self._driver.quit()
+            self._driver = None
+
+    def _browser(self) -> Any:
+        if self._driver is None:
+            from selenium import webdriver
+            from selenium.webdriver.chrome.options import Options
+            from selenium.webdriver.chrome.service import Service
+            from webdriver_manager.chrome import ChromeDriverManager
+
+            options = Options()
+            options.add_argument("--headless")
+            service = Service(ChromeDriverManager().install())
+            self._driver = webdriver.Chrome(service=service, options=options)
+        return self._driver
+
+    def _render(self, url: str) -> str:
+        """Render with Selenium and return the HTML, parsed afterwards to avoid stale-element errors."""
+        from selenium.webdriver.common.by import By
+        from selenium.webdriver.support import expected_conditions as EC
+        from selenium.webdriver.support.ui import WebDriverWait
+
+        driver = self._browser()
+        driver.get(url)
+        # wait until at least one PDF link appears in the DOM
+        WebDriverWait(driver, 10).until(
+            EC.presence_of_element_located((By.CSS_SELECTOR, "a[href$='.pdf']"))
+        )
+        return driver.page_source
+
+    def fetch(self, symbol: str) -> List[str]:
+        url = f"{self.base_url}?symbol={symbol}"
+        try:
+            resp = self.session.get(url, timeout=30)
+            resp.raise_for_status()
+            links = parse_pdf_links(resp.text, url)
+        except requests.RequestException as e:
+            logger.debug("Static fetch of %s failed: %s", url, e)
+            links = []
+        if links:
+            logger.info("Found %d links for %s without a browser", len(links), symbol)
+            return links
+        return parse_pdf_links(self._render(url), url)
+
 def parse_date_from_url(url: str) -> Optional[datetime]:
     """
     Extract a date from the PDF filename (either dd-mm-yyyy or yyyy-mm-dd).
@@ -105,50 +157,78 @@ def parse_date_from_url(url: str) -> Optional[datetime]:
             pass
     return None
 
-def download_pdf(url: str, dest: Path) -> None:
-    logger.info("Downloading %s → %s", url, dest.name)
-    resp = requests.get(url, timeout=30)
-    resp.raise_for_status()
-    dest.write_bytes(resp.content)
+def company_jobs(fetcher: LinkFetcher, company: Company, cutoff: datetime) -> List[Tuple[str, Path]]:
+    """(url, destination) of each report of `company` published after `cutoff`."""
+    logger.info("Processing %s → %s", company.symbol, company.slug)
+    try:
+        links = fetcher.fetch(company.symbol)
+    except Exception as e:
+        logger.error("Failed to fetch links for %s: %s", company.symbol, e)
+        return []
+
+    if not links:
+        logger.info("Found 0 candidate PDFs for %s", company.symbol)
+
+    jobs = []
+    for url in links:
+        dt = parse_date_from_url(url)
+        if not dt or dt < cutoff:
+            logger.debug("Skipping %s (date %s)", url, dt)
+            continue
+        jobs.append((url, RAW_DIR / company.slug / Path(url).name))
+    return jobs
 
 # ─── Main Orchestration ───────────────────────────────────────────────────────
-def main() -> None:
-    setup_logging()
-    load_dotenv()
-    logger.info("Starting CSE interim PDF scraper")
+def scrape(
+    companies: Iterable[Company],
+    workers: int = DOWNLOAD_WORKERS,
+    link_workers: int = LINK_WORKERS,
+    session: Optional[requests.Session] = None,
+    index: Optional[DownloadIndex] = None,
+) -> List[DownloadResult]:
+    """
+    Collect the report links of `companies`, `link_workers` pages at a time
+    (each worker thread keeps its own LinkFetcher), then download them all
+    on `workers` threads.
 
-    ensure_dirs()
-    cutoff = datetime.today() - timedelta(days=365 * YEARS_BACK)
+    Concurrent calls (one per company, as in orchestrate.py) must share
+    `index`, since each DownloadIndex rewrites the whole file.
+    """
+    companies = list(companies)
+    for company in companies:
+        (RAW_DIR / company.slug).mkdir(parents=True, exist_ok=True)
+    cutoff  = datetime.today() - timedelta(days=365 * YEARS_BACK)
+    session = session or make_session(pool_size=max(workers, link_workers))
 
-    for symbol, slug in SYMBOLS.items():
-        logger.info("Processing %s → %s", symbol, slug)
-        try:
-            links = fetch_pdf_links(symbol)
-        except Exception as e:
-            logger.error("Failed to fetch links for %s: %s", symbol, e)
-            continue
+    local = threading.local()
+    fetchers: List[LinkFetcher] = []
 
-        if not links:
-            logger.info("Found 0 candidate PDFs for %s", symbol)
+    def jobs_for(company: Company) -> List[Tuple[str, Path]]:
+        if not hasattr(local, "fetcher"):
+            local.fetcher = LinkFetcher(session)
+            fetchers.append(local.fetcher)
+        return company_jobs(local.fetcher, company, cutoff)
 
-        for url in links:
-            dt = parse_date_from_url(url)
-            if not dt or dt < cutoff:
-                logger.debug("Skipping %s (date %s)", url, dt)
-                continue
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, link_workers)) as pool:
+            jobs = [job for found in pool.map(jobs_for, companies) for job in found]
+    finally:
+        for fetcher in fetchers:
+            fetcher.close()
 
-            fname = Path(url).name
-            dest  = RAW_DIR / slug / fname
-            if dest.exists():
-                logger.debug("Already have %s, skipping", fname)
-                continue
+    results = download_all(session, jobs, index or DownloadIndex(DOWNLOAD_INDEX, RAW_DIR), workers=workers)
+    counts = {s: sum(r.status == s for r in results) for s in ("downloaded", "resumed", "not_modified", "skipped", "failed")}
+    logger.info("Scraping complete: %s", ", ".join(f"{n} {s}" for s, n in counts.items()))
+    return results
 
-            try:
-                download_pdf(url, dest)
-            except Exception as e:
-                logger.warning("Error downloading %s: %s", url, e)
+def main(argv: Optional[List[str]] = None) -> None:
+    setup_logging()
+    load_dotenv()
+    logger.info("Starting CSE interim PDF scraper")
 
-    logger.info("Scraping complete")
+    argv = sys.argv[1:] if argv is None else argv
+    registry = load_registry()
+    scrape(registry.select(argv) if argv else registry)
 
 if __name__ == "__main__":
     main()
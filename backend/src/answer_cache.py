@@ -0,0 +1,213 @@
+"""
+answer_cache.py
+
+Per-company cache of generated chat answers:
+ - doc_id:       stable identifier for a retrieved chunk
+ - period_terms: the number, year, quarter and month terms of a question
+ - AnswerCache:  exact + semantic lookup, LRU/TTL bounded, cleared on index rebuilds
+"""
+
+import hashlib
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, FrozenSet, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from backend.src.embedding_cache import normalize_text
+from backend.src.keyword_index import MONTHS, tokenize
+
+PERIOD_TERM_RE = re.compile(r"^(?:\d[\d.]*|q[1-4]|h[12]|fy\d*)$")
+PERIOD_WORDS = frozenset(MONTHS) | frozenset(
+    "first second third fourth last previous prior latest current next".split()
+)
+
+
+def doc_id(doc: Any) -> str:
+    """Hash a retrieved Document's source and text into a short stable id."""
+    source = doc.metadata.get("source_txt", "")
+    raw = f"{source}\x00{doc.page_content}".encode("utf-8")
+    return hashlib.sha1(raw).hexdigest()[:16]
+
+
+def period_terms(question: str) -> FrozenSet[str]:
+    """
+    Terms that pin a question to figures or a period ("2023", "q2", "june",
+    "last"). Questions embedding almost identically can differ only in these,
+    so a semantic cache hit requires them to match exactly.
+    """
+    return frozenset(t for t in tokenize(question) if PERIOD_TERM_RE.match(t) or t in PERIOD_WORDS)
+
+
+@dataclass
+class CachedAnswer:
+    """One cached answer together with what it was generated from."""
+
+    company: str
+    question: str
+    answer: str
+    sources: List[str]
+    vector: Optional[np.ndarray]  # None when the question was never embedded
+    sources_by_company: Dict[str, List[str]] = field(default_factory=dict)
+    doc_ids: Tuple[str, ...] = ()
+    prompt_version: str = ""
+    created: float = field(default_factory=time.monotonic)
+
+
+class AnswerCache:
+    """
+    Cache answers keyed on (company, normalized question, doc ids, prompt version).
+
+    Besides exact key lookups, `lookup_similar` returns an answer for the
+    same company whose question embedding has cosine similarity of at least
+    `similarity_threshold`, so paraphrases can skip the LLM. It must also
+    have been generated from the same docs under the same prompt version,
+    for a question with the same period terms ("Q2 2023" never answers
+    "Q3 2023").
+    The cache holds at most `max_size` answers (LRU), drops entries older
+    than `ttl` seconds, and is cleared whenever the index version changes.
+    """
+
+    def __init__(
+        self,
+        prompt_version: str,
+        max_size: int = 1024,
+        ttl: float = 3600.0,
+        similarity_threshold: float = 0.95,
+    ) -> None:
+        self.prompt_version = prompt_version
+        self.max_size = max(1, max_size)
+        self.ttl = ttl
+        self.similarity_threshold = similarity_threshold
+        self.index_version: Optional[str] = None
+        self._entries: "OrderedDict[str, CachedAnswer]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.exact_hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def key(self, company: str, question: str, doc_ids: Sequence[str], history: str = "") -> str:
+        """
+        Build the exact-match key for a question and its retrieved docs; a
+        follow-up question also keys on the conversation `history` it was asked in.
+        """
+        raw = "\x00".join(
+            [company, normalize_text(question), ",".join(doc_ids), self.prompt_version, history]
+        )
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def sync_index_version(self, version: Optional[str]) -> None:
+        """Clear all answers if the vector index was rebuilt since the last call."""
+        with self._lock:
+            if version == self.index_version:
+                return
+            if self._entries:
+                self.invalidations += 1
+            self._entries.clear()
+            self.index_version = version
+
+    def _expired(self, entry: CachedAnswer) -> bool:
+        return self.ttl > 0 and time.monotonic() - entry.created > self.ttl
+
+    def get(self, key: str) -> Optional[CachedAnswer]:
+        """Exact lookup; counts a hit but not a miss (see `record_miss`)."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if self._expired(entry):
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            self.exact_hits += 1
+            return entry
+
+    def lookup_similar(
+        self,
+        company: str,
+        vector: Sequence[float],
+        question: str,
+        doc_ids: Sequence[str],
+    ) -> Optional[CachedAnswer]:
+        """
+        Return the most similar cached answer for `company` above the
+        threshold, among those for the same `doc_ids`, prompt version and
+        period terms as `question`.
+        """
+        query = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(query)
+        if not norm:
+            return None
+        terms, doc_ids = period_terms(question), tuple(doc_ids)
+        with self._lock:
+            keys = [
+                k for k, e in self._entries.items()
+                if e.company == company and e.vector is not None
+                and e.vector.shape == query.shape and not self._expired(e)
+                and e.doc_ids == doc_ids and e.prompt_version == self.prompt_version
+                and period_terms(e.question) == terms
+            ]
+            if not keys:
+                return None
+            matrix = np.stack([self._entries[k].vector for k in keys])
+            sims = matrix @ (query / norm)
+            best = int(np.argmax(sims))
+            if sims[best] < self.similarity_threshold:
+                return None
+            self._entries.move_to_end(keys[best])
+            self.semantic_hits += 1
+            return self._entries[keys[best]]
+
+    def record_miss(self) -> None:
+        with self._lock:
+            self.misses += 1
+
+    def put(
+        self,
+        key: str,
+        company: str,
+        question: str,
+        vector: Optional[Sequence[float]],
+        answer: str,
+        sources: List[str],
+        sources_by_company: Optional[Dict[str, List[str]]] = None,
+        doc_ids: Sequence[str] = (),
+    ) -> None:
+        """
+        Store an answer; the question vector is normalized for cosine lookups.
+        Without a vector the answer is only reachable by exact key. `company`
+        is the cache scope: a slug, or several comma-joined for a comparison;
+        `doc_ids` are the retrieved docs the answer was generated from.
+        """
+        vec = None
+        if vector is not None:
+            vec = np.asarray(vector, dtype=np.float32)
+            norm = np.linalg.norm(vec)
+            vec = vec / norm if norm else vec
+        entry = CachedAnswer(
+            company, question, answer, sources, vec, sources_by_company or {}, tuple(doc_ids), self.prompt_version,
+        )
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return size, hit/miss counters and the overall hit ratio."""
+        hits = self.exact_hits + self.semantic_hits
+        lookups = hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "prompt_version": self.prompt_version,
+            "index_version": self.index_version,
+            "exact_hits": self.exact_hits,
+            "semantic_hits": self.semantic_hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+            "hit_ratio": hits / lookups if lookups else 0.0,
+        }
@@ -0,0 +1,177 @@
+"""
+batch_embedder.py
+
+Throughput-oriented document embedding for the indexer:
+ - pack_batches: group texts into batches bounded by count and token budget
+ - BatchEmbedder: embed batches concurrently with backoff on 429s / transient errors
+"""
+
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, List, Optional, Sequence
+
+import openai
+import tiktoken
+
+from backend.src.http_clients import backoff_delay
+
+logger = logging.getLogger(__name__)
+
+Vector = List[float]
+EmbedFn = Callable[[List[str]], List[Vector]]
+
+RETRYABLE_ERRORS = (
+    openai.RateLimitError,
+    openai.APITimeoutError,
+    openai.APIConnectionError,
+    openai.InternalServerError,
+)
+
+
+def pack_batches(
+    token_counts: Sequence[int],
+    max_items: int,
+    max_tokens: int,
+) -> List[List[int]]:
+    """
+    Greedily pack consecutive texts into batches of indices.
+
+    A batch closes when adding the next text would exceed `max_items` texts
+    or `max_tokens` tokens; a single text larger than `max_tokens` still
+    gets a batch of its own.
+    """
+    batches: List[List[int]] = []
+    current: List[int] = []
+    current_tokens = 0
+    for i, n in enumerate(token_counts):
+        if current and (len(current) >= max_items or current_tokens + n > max_tokens):
+            batches.append(current)
+            current, current_tokens = [], 0
+        current.append(i)
+        current_tokens += n
+    if current:
+        batches.append(current)
+    return batches
+
+
+@dataclass
+class EmbedStats:
+    """Counters for one or more `embed_documents` calls."""
+
+    chunks: int = 0
+    tokens: int = 0
+    batches: int = 0
+    retries: int = 0
+    seconds: float = 0.0
+
+    @property
+    def chunks_per_s(self) -> float:
+        return self.chunks / self.seconds if self.seconds else 0.0
+
+    @property
+    def tokens_per_s(self) -> float:
+        return self.tokens / self.seconds if self.seconds else 0.0
+
+
+class BatchEmbedder:
+    """
+    Embed documents in token-packed batches with bounded concurrency.
+
+    `embed_fn` sends one batch (a list of strings) to the provider and
+    returns its vectors. Up to `max_in_flight` batches run at once; a batch
+    that hits a rate limit or transient error is retried with exponential
+    backoff (full jitter, or the server's Retry-After when given).
+    """
+
+    def __init__(
+        self,
+        embed_fn: EmbedFn,
+        batch_size: int = 256,
+        max_batch_tokens: int = 50_000,
+        max_in_flight: int = 4,
+        max_retries: int = 6,
+        backoff_base: float = 0.5,
+        backoff_max: float = 30.0,
+        encoding: str = "cl100k_base",
+    ) -> None:
+        self.embed_fn = embed_fn
+        self.batch_size = max(1, batch_size)
+        self.max_batch_tokens = max(1, max_batch_tokens)
+        self.max_in_flight = max(1, max_in_flight)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.encoding = encoding
+        self._encoding: Optional[Any] = None
+        self._lock = threading.Lock()
+        self.stats = EmbedStats()
+
+    @classmethod
+    def for_openai(cls, client: Any, model: str, **kwargs: Any) -> "BatchEmbedder":
+        """Build an embedder that calls `client.embeddings.create` directly."""
+
+        def embed_fn(texts: List[str]) -> List[Vector]:
+            resp = client.embeddings.create(model=model, input=texts)
+            return [d.embedding for d in sorted(resp.data, key=lambda d: d.index)]
+
+        return cls(embed_fn, **kwargs)
+
+    def count_tokens(self, texts: Sequence[str]) -> List[int]:
+        """
+        Token counts for packing. Falls back to ~4 characters per token when
+        the tiktoken encoding cannot be loaded (it is downloaded on first use).
+        """
+        if self._encoding is None:
+            try:
+                self._encoding = tiktoken.get_encoding(self.encoding)
+            except Exception as exc:
+                logger.warning("tiktoken encoding %s unavailable (%s); estimating tokens", self.encoding, exc)
+                self._encoding = False
+        if self._encoding is False:
+            return [len(t) // 4 + 1 for t in texts]
+        return [len(t) for t in self._encoding.encode_batch(list(texts), disallowed_special=())]
+
+    def _delay(self, exc: Exception, attempt: int) -> float:
+        return backoff_delay(attempt, self.backoff_base, self.backoff_max, getattr(exc, "response", None))
+
+    def _embed_batch(self, texts: List[str]) -> List[Vector]:
+        for attempt in range(self.max_retries + 1):
+            try:
+                return self.embed_fn(texts)
+            except RETRYABLE_ERRORS as exc:
+                if attempt == self.max_retries:
+                    raise
+                delay = self._delay(exc, attempt)
+                with self._lock:
+                    self.stats.retries += 1
+                logger.warning(
+                    "Embedding batch of %d failed (%s); retry %d/%d in %.2fs",
+                    len(texts), exc.__class__.__name__, attempt + 1, self.max_retries, delay,
+                )
+                time.sleep(delay)
+        raise AssertionError("unreachable")
+
+    def embed_documents(self, texts: List[str]) -> List[Vector]:
+        """Embed `texts`, preserving order; stats accumulate across calls."""
+        if not texts:
+            return []
+        t0 = time.perf_counter()
+        token_counts = self.count_tokens(texts)
+        batches = pack_batches(token_counts, self.batch_size, self.max_batch_tokens)
+
+        out: List[Optional[Vector]] = [None] * len(texts)
+        with ThreadPoolExecutor(max_workers=self.max_in_flight) as pool:
+            futures = [pool.submit(self._embed_batch, [texts[i] for i in idx]) for idx in batches]
+            for idx, fut in zip(batches, futures):
+                for i, vec in zip(idx, fut.result()):
+                    out[i] = vec
+
+        with self._lock:
+            self.stats.chunks += len(texts)
+            self.stats.tokens += sum(token_counts)
+            self.stats.batches += len(batches)
+            self.stats.seconds += time.perf_counter() - t0
+        return out  # type: ignore[return-value]
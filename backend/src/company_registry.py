@@ -0,0 +1,132 @@
+"""
+company_registry.py
+
+The companies every pipeline stage works on (scrape → extract → merge → index):
+ - Company:          CSE symbol, slug (the data/ directory name) and display name
+ - CompanyRegistry:  the list, indexed by symbol, slug and (case-insensitive) name,
+                     with stable sharding for parallel runs
+ - load_registry:    read data/companies.json (or $COMPANY_REGISTRY) once per process
+"""
+
+import json
+import os
+import re
+import zlib
+from dataclasses import dataclass, field
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+REGISTRY_FILE = PROJECT_ROOT / "data" / "companies.json"
+
+
+def slugify(name: str) -> str:
+    """Lower-case `name`, other characters collapsed to hyphens ("Richard Pieris" → "richard-pieris")."""
+    return re.sub(r"[^a-z0-9]+", "-", name.lower()).strip("-")
+
+
+@dataclass(frozen=True)
+class Company:
+    """One listed company; `aliases` are other names its reports use (e.g. "... PLC")."""
+
+    symbol: str
+    slug: str
+    name: str
+    aliases: Tuple[str, ...] = field(default=())
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Company":
+        name = data["name"]
+        return cls(
+            symbol=data["symbol"],
+            slug=data.get("slug") or slugify(name),
+            name=name,
+            aliases=tuple(data.get("aliases", ())),
+        )
+
+
+class CompanyRegistry:
+    """
+    Ordered collection of companies with lookups by symbol, slug and name.
+
+    Raises:
+        ValueError: If two companies share a symbol, slug or name.
+    """
+
+    def __init__(self, companies: Iterable[Company]) -> None:
+        self.companies: List[Company] = list(companies)
+        self._by_symbol: Dict[str, Company] = {}
+        self._by_slug: Dict[str, Company] = {}
+        self._by_name: Dict[str, Company] = {}
+        for company in self.companies:
+            for index, key in (
+                (self._by_symbol, company.symbol.upper()),
+                (self._by_slug, company.slug),
+                *((self._by_name, n.casefold()) for n in (company.name, *company.aliases)),
+            ):
+                if key in index:
+                    raise ValueError(f"Duplicate company registry key {key!r}")
+                index[key] = company
+
+    @classmethod
+    def load(cls, path: Path) -> "CompanyRegistry":
+        """Read a JSON list of {"symbol", "name", "slug"?, "aliases"?} objects."""
+        data = json.loads(Path(path).read_text(encoding="utf-8"))
+        return cls(Company.from_dict(item) for item in data)
+
+    def __iter__(self) -> Iterator[Company]:
+        return iter(self.companies)
+
+    def __len__(self) -> int:
+        return len(self.companies)
+
+    def by_symbol(self, symbol: str) -> Optional[Company]:
+        return self._by_symbol.get((symbol or "").upper())
+
+    def by_slug(self, slug: str) -> Optional[Company]:
+        return self._by_slug.get(slug)
+
+    def by_name(self, name: str) -> Optional[Company]:
+        return self._by_name.get((name or "").strip().casefold())
+
+    def get(self, key: str) -> Optional[Company]:
+        """Look `key` up as a symbol, then a slug, then a name."""
+        return self.by_symbol(key) or self.by_slug(key) or self.by_name(key)
+
+    def slugs(self) -> List[str]:
+        return [c.slug for c in self.companies]
+
+    def select(self, keys: Iterable[str]) -> "CompanyRegistry":
+        """
+        The companies named by `keys` (symbols, slugs or names), in registry order.
+
+        Raises:
+            KeyError: If a key matches no company.
+        """
+        wanted = set()
+        for key in keys:
+            company = self.get(key)
+            if company is None:
+                raise KeyError(f"Unknown company {key!r}")
+            wanted.add(company.slug)
+        return CompanyRegistry(c for c in self.companies if c.slug in wanted)
+
+    def shard(self, index: int, count: int) -> "CompanyRegistry":
+        """
+        Shard `index` of `count`, by a hash of the slug: a company stays in
+        the same shard as the registry grows.
+        """
+        if not 0 <= index < count:
+            raise ValueError(f"Shard {index} out of range for {count} shards")
+        return CompanyRegistry(c for c in self.companies if zlib.crc32(c.slug.encode()) % count == index)
+
+
+@lru_cache(maxsize=None)
+def _load(path: str) -> CompanyRegistry:
+    return CompanyRegistry.load(Path(path))
+
+
+def load_registry(path: Optional[Path] = None) -> CompanyRegistry:
+    """The registry at `path`, $COMPANY_REGISTRY or data/companies.json; read once per process."""
+    return _load(str(path or os.getenv("COMPANY_REGISTRY") or REGISTRY_FILE))
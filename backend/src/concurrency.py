@@ -0,0 +1,80 @@
+"""
+concurrency.py
+
+Admission control for the async chat endpoints:
+ - SaturatedError:     raised when a request cannot get a slot in time
+ - ConcurrencyLimiter: bounded in-flight slots plus a short, bounded wait queue
+"""
+
+import asyncio
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict
+
+
+class SaturatedError(RuntimeError):
+    """Raised when the limiter rejects a request instead of queueing it."""
+
+
+class ConcurrencyLimiter:
+    """
+    Cap the number of requests doing retrieval + LLM work at the same time.
+
+    Up to `max_concurrency` callers run at once. Up to `max_queue` more may
+    wait for a slot, each for at most `queue_timeout` seconds. Anything
+    beyond that is rejected immediately with SaturatedError, so callers can
+    answer 503 fast instead of piling up behind slow LLM calls.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int,
+        max_queue: int = 0,
+        queue_timeout: float = 0.0,
+    ) -> None:
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be >= 1")
+        self.max_concurrency = max_concurrency
+        self.max_queue = max(0, max_queue)
+        self.queue_timeout = max(0.0, queue_timeout)
+        self._sem = asyncio.Semaphore(max_concurrency)
+        self.in_flight = 0
+        self.waiting = 0
+        self.admitted = 0
+        self.rejected = 0
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """Hold one concurrency slot for the duration of the block."""
+        if self._sem.locked():
+            if self.waiting >= self.max_queue or self.queue_timeout <= 0:
+                self.rejected += 1
+                raise SaturatedError("no free slot and wait queue is full")
+            self.waiting += 1
+            try:
+                await asyncio.wait_for(self._sem.acquire(), timeout=self.queue_timeout)
+            except asyncio.TimeoutError:
+                self.rejected += 1
+                raise SaturatedError("timed out waiting for a free slot") from None
+            finally:
+                self.waiting -= 1
+        else:
+            await self._sem.acquire()
+
+        self.in_flight += 1
+        self.admitted += 1
+        try:
+            yield
+        finally:
+            self.in_flight -= 1
+            self._sem.release()
+
+    def stats(self) -> Dict[str, int]:
+        """Return a snapshot of the limiter counters."""
+        return {
+            "max_concurrency": self.max_concurrency,
+            "max_queue": self.max_queue,
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+        }
@@ -0,0 +1,268 @@
+"""
+context_builder.py
+
+Token-budgeted prompt assembly for chat:
+ - TokenCounter:     tiktoken counts, ~4 characters per token when the encoding is unavailable
+ - strip_overlap:    remove text a chunk repeats from an already-kept neighbour
+                     (the CHUNK_OVERLAP the splitter adds between consecutive chunks)
+ - ContextBuilder:   pack retrieved chunks by relevance into a prompt token budget,
+                     with a trimmed window of the conversation history; for
+                     comparisons, each company gets its own share of the budget
+ - BuiltPrompt:      the rendered prompt, the docs it includes and its token accounting
+ - render_history:   history turns as they appear in the prompt (and answer-cache keys)
+"""
+
+import logging
+import re
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple, Union
+
+import tiktoken
+from langchain.docstore.document import Document
+
+logger = logging.getLogger(__name__)
+
+CONTEXT_SEPARATOR = "\n---\n"
+NO_CONTEXT = "No relevant context."
+ROLE_LABELS = {"user": "User", "assistant": "Assistant"}
+_BLANK_LINES_RE = re.compile(r"\n\s*\n+")
+_SPACES_RE = re.compile(r"[ \t]+")
+
+
+class TokenCounter:
+    """
+    Count and truncate text in tokens of `encoding`. Falls back to ~4
+    characters per token when tiktoken cannot load it (it is downloaded on
+    first use).
+    """
+
+    def __init__(self, encoding: str = "cl100k_base") -> None:
+        self.encoding = encoding
+        self._encoding: Optional[Any] = None
+        self._lock = threading.Lock()
+
+    def _load(self) -> Any:
+        with self._lock:
+            if self._encoding is None:
+                try:
+                    self._encoding = tiktoken.get_encoding(self.encoding)
+                except Exception as exc:
+                    logger.warning("tiktoken encoding %s unavailable (%s); estimating tokens", self.encoding, exc)
+                    self._encoding = False
+        return self._encoding
+
+    def count(self, text: str) -> int:
+        enc = self._load()
+        if enc is False:
+            return len(text) // 4 + 1 if text else 0
+        return len(enc.encode(text, disallowed_special=()))
+
+    def truncate(self, text: str, max_tokens: int) -> str:
+        """The longest prefix of `text` within `max_tokens`."""
+        if max_tokens <= 0:
+            return ""
+        enc = self._load()
+        if enc is False:
+            return text[:max_tokens * 4]
+        tokens = enc.encode(text, disallowed_special=())
+        return text if len(tokens) <= max_tokens else enc.decode(tokens[:max_tokens])
+
+
+def compact(text: str) -> str:
+    """Collapse runs of spaces and blank lines (PDF text extraction leaves many)."""
+    lines = (_SPACES_RE.sub(" ", line).strip() for line in text.strip().splitlines())
+    return _BLANK_LINES_RE.sub("\n\n", "\n".join(lines))
+
+
+def _overlap(left: str, right: str, min_chars: int, max_chars: int) -> int:
+    """Length of the longest suffix of `left` that is also a prefix of `right`."""
+    for n in range(min(len(left), len(right), max_chars), min_chars - 1, -1):
+        if left.endswith(right[:n]):
+            return n
+    return 0
+
+
+def strip_overlap(text: str, neighbours: Sequence[str], min_chars: int = 20, max_chars: int = 400) -> str:
+    """
+    Remove from `text` whatever it shares with `neighbours` at its edges: a
+    head repeating a neighbour's tail, a tail repeating a neighbour's head.
+    Returns "" when `text` is wholly contained in a neighbour.
+    """
+    for other in neighbours:
+        if text in other:
+            return ""
+        head = _overlap(other, text, min_chars, max_chars)
+        if head:
+            text = text[head:].lstrip()
+        tail = _overlap(text, other, min_chars, max_chars)
+        if tail:
+            text = text[:-tail].rstrip()
+    return text
+
+
+def render_history(turns: Sequence[Tuple[str, str]]) -> str:
+    """One "User: …" / "Assistant: …" line per (role, content) turn."""
+    return "\n".join(f"{ROLE_LABELS[role]}: {content}" for role, content in turns)
+
+
+@dataclass
+class BuiltPrompt:
+    """A rendered prompt and what went into it."""
+
+    text: str
+    tokens: int
+    unbudgeted_tokens: int            # system + every retrieved chunk as-is + question
+    context_tokens: int
+    docs: List[Document]              # chunks included, in relevance order
+    docs_by_group: Dict[str, List[Document]]  # the same per company ("" when not grouped)
+    history: List[Tuple[str, str]]    # (role, content) turns included, oldest first
+    dropped_docs: int = 0
+    overlap_chars: int = 0            # characters removed as chunk overlap or duplicates
+
+    @property
+    def saved_tokens(self) -> int:
+        return max(0, self.unbudgeted_tokens - self.tokens)
+
+
+class ContextBuilder:
+    """
+    Assemble system prompt, context, history and question within `max_tokens`.
+
+    The system prompt and question always go in. History gets up to
+    `history_max_tokens` (the newest `history_max_turns` messages, starting
+    at a user turn); retrieved chunks, in relevance order and with their
+    overlap removed, fill what is left. A chunk that does not fit is skipped
+    for smaller ones after it; if none fits, the best one is truncated.
+    """
+
+    def __init__(
+        self,
+        counter: Optional[TokenCounter] = None,
+        max_tokens: int = 3000,
+        history_max_tokens: int = 500,
+        history_max_turns: int = 6,
+        max_overlap_chars: int = 400,   # at least build_index.py's CHUNK_OVERLAP
+    ) -> None:
+        self.counter = counter or TokenCounter()
+        self.max_tokens = max_tokens
+        self.history_max_tokens = history_max_tokens
+        self.history_max_turns = history_max_turns
+        self.max_overlap_chars = max_overlap_chars
+
+    def history_window(self, history: Sequence[Dict[str, Any]], question: str) -> List[Tuple[str, str]]:
+        """
+        The recent turns worth sending, oldest first. The current question
+        (which clients append to `history`) and assistant messages before the
+        first user turn (greetings) are left out.
+        """
+        turns = [
+            (str(m.get("role", "")).lower(), str(m.get("content") or "").strip())
+            for m in history if isinstance(m, dict)
+        ]
+        turns = [(r, c) for r, c in turns if r in ROLE_LABELS and c]
+        if turns and turns[-1] == ("user", question.strip()):
+            turns.pop()
+
+        window: List[Tuple[str, str]] = []
+        used = 0
+        for role, content in reversed(turns[-self.history_max_turns:] if self.history_max_turns > 0 else []):
+            cost = self.counter.count(render_history([(role, content)]) + "\n")
+            if used + cost > self.history_max_tokens:
+                break
+            window.append((role, content))
+            used += cost
+        window.reverse()
+        while window and window[0][0] != "user":
+            window.pop(0)
+        return window
+
+    def _pack(self, docs: Sequence[Document], budget: int) -> Tuple[List[Document], List[str], int, int]:
+        """Pick (docs, their deduplicated texts, tokens used, overlap chars removed)."""
+        kept: List[Document] = []
+        texts: List[str] = []
+        used = removed = 0
+        sep = self.counter.count(CONTEXT_SEPARATOR)
+        for doc in docs:
+            source = (doc.metadata.get("company_slug"), doc.metadata.get("source_txt"))
+            raw = compact(doc.page_content)
+            same_source = [
+                t for d, t in zip(kept, texts)
+                if (d.metadata.get("company_slug"), d.metadata.get("source_txt")) == source
+            ]
+            text = strip_overlap(raw, same_source, max_chars=self.max_overlap_chars)
+            if text and any(text in t for t in texts):
+                text = ""
+            removed += len(raw) - len(text)
+            if not text:
+                continue
+            cost = self.counter.count(text) + (sep if texts else 0)
+            if used + cost > budget:
+                continue
+            kept.append(doc)
+            texts.append(text)
+            used += cost
+        if not kept and docs and budget > 0:
+            text = self.counter.truncate(compact(docs[0].page_content), budget)
+            if text:
+                kept, texts, used = [docs[0]], [text], self.counter.count(text)
+        return kept, texts, used, removed
+
+    def build(
+        self,
+        system_prompt: str,
+        question: str,
+        docs: Union[Sequence[Document], Mapping[str, Sequence[Document]]],
+        history: Optional[List[Tuple[str, str]]] = None,
+    ) -> BuiltPrompt:
+        """
+        Render the prompt; `history` is a window from `history_window`.
+
+        `docs` may map company slug → its docs, for comparisons: each company
+        then gets an equal share of the context budget (plus whatever the
+        ones before it left unused) and its own "[slug]" section.
+        """
+        history = history or []
+        groups = {k: list(v) for k, v in docs.items()} if isinstance(docs, Mapping) else {"": list(docs)}
+        docs = [d for group in groups.values() for d in group]
+        user = f"User: {question}"
+        history_block = "Conversation so far:\n" + render_history(history) if history else ""
+        fixed = [system_prompt, "Context:\n", history_block, user]
+        overhead = sum(self.counter.count(part) for part in fixed if part) + 8  # part separators
+        budget = self.max_tokens - overhead
+
+        kept_by_group: Dict[str, List[Document]] = {}
+        sections: List[str] = []
+        context_tokens = removed = 0
+        for i, (name, group) in enumerate(groups.items()):
+            header = f"[{name}]\n" if len(groups) > 1 else ""
+            share = (budget - context_tokens) // (len(groups) - i)
+            header_tokens = self.counter.count(header) + (2 if sections else 0)
+            kept, texts, used, dropped_chars = self._pack(group, share - header_tokens)
+            kept_by_group[name] = kept
+            removed += dropped_chars
+            context_tokens += used + header_tokens
+            sections.append(header + (CONTEXT_SEPARATOR.join(texts) or (NO_CONTEXT if header else "")))
+        kept = [d for group in kept_by_group.values() for d in group]
+
+        parts = [system_prompt, "Context:\n" + ("\n\n".join(sections).strip() or NO_CONTEXT)]
+        if history_block:
+            parts.append(history_block)
+        parts.append(user)
+        text = "\n\n".join(parts)
+        unbudgeted = "\n\n".join([
+            system_prompt,
+            "Context:\n" + (CONTEXT_SEPARATOR.join(d.page_content for d in docs) or NO_CONTEXT),
+            user,
+        ])
+        return BuiltPrompt(
+            text=text,
+            tokens=self.counter.count(text),
+            unbudgeted_tokens=self.counter.count(unbudgeted),
+            context_tokens=context_tokens,
+            docs=kept,
+            docs_by_group=kept_by_group,
+            history=history,
+            dropped_docs=len(docs) - len(kept),
+            overlap_chars=removed,
+        )
@@ -0,0 +1,190 @@
+"""
+downloader.py
+
+Concurrent, resumable file downloads for the report scraper:
+ - make_session:     pooled requests.Session with retries on transient errors
+ - DownloadIndex:    JSON record of each file's URL and validators (ETag / Last-Modified),
+                     for conditional GETs and resuming partial downloads
+ - download_file:    stream one URL to disk through `<name>.part` and an atomic rename;
+                     resumes a partial file with Range + If-Range, skips unchanged files on 304
+ - download_all:     download_file for many (url, dest) pairs on a thread pool
+"""
+
+import json
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 1 << 16
+PART_SUFFIX = ".part"
+
+
+def make_session(pool_size: int = 8, retries: int = 3, user_agent: Optional[str] = None) -> requests.Session:
+    """A Session whose connection pool fits `pool_size` concurrent downloads per host."""
+    retry = Retry(
+        total=retries,
+        backoff_factor=0.5,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=frozenset({"GET", "HEAD"}),
+        respect_retry_after_header=True,
+    )
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    if user_agent:
+        session.headers["User-Agent"] = user_agent
+    return session
+
+
+class DownloadIndex:
+    """
+    Map each downloaded file (by path relative to `root`) to its URL, size
+    and validators. A `partial` entry describes the `.part` file of an
+    unfinished download. Every update is saved at once (atomically), so an
+    interrupted run still knows what it can resume.
+    """
+
+    def __init__(self, path: Path, root: Path) -> None:
+        self.path = path
+        self.root = root
+        self._lock = threading.Lock()
+        try:
+            self._entries: Dict[str, Dict[str, Any]] = json.loads(path.read_text(encoding="utf-8"))
+        except (FileNotFoundError, ValueError):
+            self._entries = {}
+
+    def _key(self, dest: Path) -> str:
+        return dest.relative_to(self.root).as_posix()
+
+    def get(self, dest: Path) -> Dict[str, Any]:
+        with self._lock:
+            return dict(self._entries.get(self._key(dest), {}))
+
+    def put(self, dest: Path, entry: Dict[str, Any]) -> None:
+        with self._lock:
+            self._entries[self._key(dest)] = entry
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_suffix(self.path.suffix + ".tmp")
+            tmp.write_text(json.dumps(self._entries, indent=1, sort_keys=True), encoding="utf-8")
+            os.replace(tmp, self.path)
+
+
+@dataclass
+class DownloadResult:
+    """Outcome of one download; `status` is downloaded, resumed, not_modified, skipped or failed."""
+
+    url: str
+    dest: Path
+    status: str
+    bytes: int = 0              # bytes received in this run
+    error: Optional[str] = None
+
+
+def _validators(resp: requests.Response) -> Dict[str, Optional[str]]:
+    return {"etag": resp.headers.get("ETag"), "last_modified": resp.headers.get("Last-Modified")}
+
+
+def download_file(
+    session: requests.Session,
+    url: str,
+    dest: Path,
+    index: DownloadIndex,
+    timeout: float = 30.0,
+) -> DownloadResult:
+    """
+    Download `url` to `dest`, streaming to `dest.part` and renaming on completion.
+
+    - `dest` exists with recorded validators: conditional GET; 304 leaves it as is.
+    - `dest` exists without them (fetched by an older scraper): skipped.
+    - `dest.part` exists with recorded validators: Range request with
+      If-Range, appending if the server answers 206 and restarting on 200.
+
+    The body is requested and written without content coding, so the bytes
+    on disk are the ones Content-Length and Range offsets count.
+    """
+    entry = index.get(dest)
+    part = dest.with_name(dest.name + PART_SUFFIX)
+    headers: Dict[str, str] = {"Accept-Encoding": "identity"}
+    offset = 0
+    if dest.exists():
+        if not (entry.get("etag") or entry.get("last_modified")):
+            return DownloadResult(url, dest, "skipped")
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+    elif part.exists():
+        partial = entry.get("partial") or {}
+        validator = partial.get("etag") or partial.get("last_modified")
+        if validator and partial.get("url") == url:
+            offset = part.stat().st_size
+            headers["Range"] = f"bytes={offset}-"
+            headers["If-Range"] = validator
+
+    with session.get(url, headers=headers, stream=True, timeout=timeout) as resp:
+        if resp.status_code == 304:
+            return DownloadResult(url, dest, "not_modified")
+        if resp.status_code == 416:  # the part file already holds everything (or is bogus)
+            part.unlink(missing_ok=True)
+            return download_file(session, url, dest, index, timeout)
+        resp.raise_for_status()
+        resumed = resp.status_code == 206
+        if not resumed:
+            offset = 0
+        validators = _validators(resp)
+        index.put(dest, {**entry, "partial": {"url": url, **validators}})
+
+        expected = resp.headers.get("Content-Length")
+        received = 0
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        with open(part, "ab" if resumed else "wb") as fh:
+            for chunk in resp.raw.stream(CHUNK_SIZE, decode_content=False):
+                fh.write(chunk)
+                received += len(chunk)
+        if expected is not None and received != int(expected):
+            raise IOError(f"connection closed after {received} of {expected} bytes; {part.name} kept for resume")
+
+    os.replace(part, dest)
+    index.put(dest, {"url": url, "size": offset + received, **validators})
+    return DownloadResult(url, dest, "resumed" if resumed else "downloaded", received)
+
+
+def download_all(
+    session: requests.Session,
+    jobs: Iterable[Tuple[str, Path]],
+    index: DownloadIndex,
+    workers: int = 8,
+    timeout: float = 30.0,
+) -> List[DownloadResult]:
+    """Run `download_file` for every (url, dest) on `workers` threads; failures are returned, not raised."""
+    def run(url: str, dest: Path) -> DownloadResult:
+        try:
+            return download_file(session, url, dest, index, timeout)
+        except Exception as exc:
+            return DownloadResult(url, dest, "failed", error=str(exc))
+
+    results: List[DownloadResult] = []
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(run, url, dest) for url, dest in jobs]
+        for future in as_completed(futures):
+            result = future.result()
+            results.append(result)
+            if result.status == "failed":
+                logger.warning("Error downloading %s: %s", result.url, result.error)
+            elif result.status in ("downloaded", "resumed"):
+                logger.info("%s %s → %s (%d bytes)", result.status.capitalize(), result.url,
+                            result.dest.name, result.bytes)
+            else:
+                logger.debug("%s: %s", result.status, result.dest.name)
+    return results
@@ -0,0 +1,210 @@
+"""
+embedding_cache.py
+
+Caching layer in front of the query embedder:
+ - normalize_text:       canonical form used for cache keys
+ - LRUCache:             in-process LRU with size and TTL bounds
+ - SQLiteEmbeddingStore: optional on-disk tier shared by all uvicorn workers
+ - CachedEmbeddings:     LangChain Embeddings wrapper that consults both tiers
+"""
+
+import asyncio
+import hashlib
+import sqlite3
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from langchain_core.embeddings import Embeddings
+
+Vector = List[float]
+
+
+def normalize_text(text: str) -> str:
+    """Collapse whitespace and case so trivially different questions share a key."""
+    return " ".join(text.split()).casefold()
+
+
+def cache_key(model: str, text: str) -> str:
+    """Return the hex key for `text` embedded with `model`."""
+    raw = f"{model}\x00{normalize_text(text)}".encode("utf-8")
+    return hashlib.sha256(raw).hexdigest()
+
+
+class LRUCache:
+    """
+    Thread-safe LRU mapping with an optional time-to-live.
+
+    Entries older than `ttl` seconds are treated as missing; `ttl <= 0`
+    disables expiry. Once `max_size` is exceeded the least recently used
+    entry is dropped.
+    """
+
+    def __init__(self, max_size: int = 2048, ttl: float = 0.0) -> None:
+        self.max_size = max(1, max_size)
+        self.ttl = ttl
+        self._data: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            stored_at, value = item
+            if self.ttl > 0 and time.monotonic() - stored_at > self.ttl:
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any) -> None:
+        with self._lock:
+            self._data[key] = (time.monotonic(), value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class SQLiteEmbeddingStore:
+    """
+    Embedding vectors persisted in a SQLite file.
+
+    WAL mode lets several uvicorn worker processes read and write the same
+    file concurrently. Vectors are stored as packed float64 arrays, so a
+    round trip returns exactly what the embedder produced.
+    """
+
+    def __init__(self, path: Path, ttl: float = 0.0) -> None:
+        self.path = Path(path)
+        self.ttl = ttl
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        with self._conn() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings ("
+                " key TEXT PRIMARY KEY, vector BLOB NOT NULL, created REAL NOT NULL)"
+            )
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: str) -> Optional[Vector]:
+        row = self._conn().execute(
+            "SELECT vector, created FROM embeddings WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        blob, created = row
+        if self.ttl > 0 and time.time() - created > self.ttl:
+            return None
+        return array("d", blob).tolist()
+
+    def set(self, key: str, vector: Vector) -> None:
+        with self._conn() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO embeddings (key, vector, created) VALUES (?, ?, ?)",
+                (key, array("d", vector).tobytes(), time.time()),
+            )
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    Wrap an Embeddings object with an in-process LRU and an optional disk tier.
+
+    Lookups go memory → disk → underlying embedder; disk hits are promoted
+    into memory. Keys combine `model` with the normalized text, so switching
+    embedding models never serves stale vectors.
+    """
+
+    def __init__(
+        self,
+        embedder: Embeddings,
+        model: str,
+        memory: Optional[LRUCache] = None,
+        disk: Optional[SQLiteEmbeddingStore] = None,
+    ) -> None:
+        self.embedder = embedder
+        self.model = model
+        self.memory = memory if memory is not None else LRUCache()
+        self.disk = disk
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def _lookup(self, key: str) -> Optional[Vector]:
+        vec = self.memory.get(key)
+        if vec is not None:
+            self.hits += 1
+            return vec
+        if self.disk is not None:
+            vec = self.disk.get(key)
+            if vec is not None:
+                self.disk_hits += 1
+                self.memory.set(key, vec)
+                return vec
+        return None
+
+    def _store(self, key: str, vec: Vector) -> None:
+        self.memory.set(key, vec)
+        if self.disk is not None:
+            self.disk.set(key, vec)
+
+    def embed_query(self, text: str) -> Vector:
+        key = cache_key(self.model, text)
+        vec = self._lookup(key)
+        if vec is None:
+            self.misses += 1
+            vec = self.embedder.embed_query(text)
+            self._store(key, vec)
+        return vec
+
+    async def aembed_query(self, text: str) -> Vector:
+        key = cache_key(self.model, text)
+        loop = asyncio.get_running_loop()
+        vec = await loop.run_in_executor(None, self._lookup, key)
+        if vec is None:
+            self.misses += 1
+            vec = await self.embedder.aembed_query(text)
+            await loop.run_in_executor(None, self._store, key, vec)
+        return vec
+
+    def embed_documents(self, texts: List[str]) -> List[Vector]:
+        keys = [cache_key(self.model, t) for t in texts]
+        out: List[Optional[Vector]] = [self._lookup(k) for k in keys]
+        todo = [i for i, v in enumerate(out) if v is None]
+        if todo:
+            self.misses += len(todo)
+            fresh = self.embedder.embed_documents([texts[i] for i in todo])
+            for i, vec in zip(todo, fresh):
+                out[i] = vec
+                self._store(keys[i], vec)
+        return out  # type: ignore[return-value]
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters and the overall hit ratio."""
+        lookups = self.hits + self.disk_hits + self.misses
+        return {
+            "model": self.model,
+            "memory_entries": len(self.memory),
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_ratio": (self.hits + self.disk_hits) / lookups if lookups else 0.0,
+        }
@@ -4,27 +4,59 @@ extract_interim_financials.py
 
 Extract & structure quarterly P&L tables from raw CSE PDFs via an LLM.
 
+Locate the quarterly statement page with a cheap PyPDF2 text scan and run
+pdfplumber layout extraction on that page and its neighbour only
 Snip only the “03 months to …” table
 Inject its exact header into the Jinja2 prompt
 Post-validate & auto-fix YTD→QTR mismatches
-Output per-PDF JSON and append to a per-company CSV
+Output per-PDF JSON and rebuild a per-company CSV from the manifest
+
+A content-hashed manifest (data/interim/manifest.json) records the PDF hash,
+prompt hash and model used for every extraction, so re-runs only process
+new or changed PDFs; --force reprocesses everything. --companies limits a run
+to some companies of the registry (data/companies.json), e.g. one shard of
+backend/scripts/run_pipeline.py; shards can run side by side.
+
+Raw LLM responses are cached on disk (data/cache/llm_responses.sqlite3,
+size-bounded) by model, temperature and rendered prompt, so a --force re-run
+over unchanged snippets makes no LLM calls; --refresh re-asks and overwrites,
+--no-cache bypasses the cache.
+
+With --workers / --llm-concurrency > 1 the run is pipelined: PDF parsing
+happens in a process pool, LLM calls in a bounded thread pool, and the
+post-validate/write stage runs in the same order as a serial run, so the
+outputs are identical. With --batch-tokens N, several snippets (up to N
+tokens) share one LLM request that returns an array of records; each record
+is validated on its own and only the invalid ones are re-asked singly.
 """
 
+import argparse
+import hashlib
 import json
 import logging
 import os
+import re
 import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, as_completed, wait
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple, TypeVar
 
+import openai
 import pandas as pd
 import pdfplumber
+from PyPDF2 import PdfReader
 from dotenv import load_dotenv
 from jinja2 import Template
 from langchain.schema import HumanMessage
 from langchain_openai import ChatOpenAI, AzureChatOpenAI
 
 # ─── Shared utilities ─────────────────────────────────────────────────────────
+from backend.src.company_registry import load_registry
+from backend.src.context_builder import TokenCounter
+from backend.src.http_clients import ClientConfig, backoff_delay, langchain_kwargs
+from backend.src.llm_cache import CachedChatModel, SQLiteResponseCache
+from backend.src.manifest import ExtractionManifest
 from backend.src.utils import extract_qtr_snippet, post_validate
 
 # ─── Constants & Paths ────────────────────────────────────────────────────────
@@ -32,19 +64,56 @@ PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
 RAW_DIR = PROJECT_ROOT / "data" / "raw"
 INTERIM_DIR = PROJECT_ROOT / "data" / "interim"
 PROMPT_FILE = PROJECT_ROOT / "backend" / "src" / "prompts" / "financial_extraction.j2"
+BATCH_PROMPT_FILE = PROJECT_ROOT / "backend" / "src" / "prompts" / "financial_extraction_batch.j2"
+MANIFEST_FILE = INTERIM_DIR / "manifest.json"
 LOG_DIR = PROJECT_ROOT / "logs"
 
-LLM_TIMEOUT = 60         # seconds per LLM call
+SCAN_PAGES = 8           # pages searched for the quarterly statement
+# "03 months to 31/12/2023" (DIPD) / "3 months ended 31st December" (REXP)
+QTR_PAGE_RE = re.compile(r"\b0?3\s+months\s+(?:to|ended)\b", re.IGNORECASE)
+SNIPPET_VERSION = 2      # bump when the text sent to the LLM changes shape
 
-COMPANY_MAP: Dict[str, str] = {
-    "DIPD.N0000": "dipped-products",
-    "REXP.N0000": "richard-pieris",
+LLM_TIMEOUT = 60         # seconds per LLM call
+LLM_MAX_RETRIES = 5      # retries on rate limits / transient API errors
+LLM_BACKOFF_BASE = 2.0   # seconds; doubled per attempt, with jitter
+LLM_BACKOFF_MAX = 60.0
+
+# raw LLM responses, keyed by model + temperature + rendered prompt (--no-cache / --refresh)
+LLM_CACHE_FILE = Path(os.getenv("LLM_CACHE_PATH") or PROJECT_ROOT / "data" / "cache" / "llm_responses.sqlite3")
+LLM_CACHE_MAX_BYTES = int(os.getenv("LLM_CACHE_MAX_MB", "256")) * 1024 * 1024
+
+BATCH_SIZE = 8           # statements per request with --batch-tokens
+ISO_DATE_RE = re.compile(r"\d{4}-\d{2}-\d{2}")
+NUMERIC_FIELDS = ("revenue", "cogs", "gross_profit", "operating_expenses", "operating_income", "net_income")
+
+RETRYABLE_ERRORS = (
+    openai.RateLimitError,
+    openai.APITimeoutError,
+    openai.APIConnectionError,
+    openai.InternalServerError,
+)
+
+EXAMPLE_SCHEMA: Dict[str, Any] = {
+    "company": "<COMPANY NAME>",
+    "symbol": "<TICKER>",
+    "fiscal_year": "YYYY/YY",
+    "quarter": "Q1",
+    "period_end_date": "YYYY-MM-DD",
+    "currency": "LKR",
+    "unit_multiplier": 1000,
+    "revenue": 0,
+    "cogs": 0,
+    "gross_profit": 0,
+    "operating_expenses": 0,
+    "operating_income": 0,
+    "net_income": 0,
 }
 
-# ensure output dirs exist
-for slug in COMPANY_MAP.values():
-    for sub in ("json", "csv", "txt"):
-        (INTERIM_DIR / slug / sub).mkdir(parents=True, exist_ok=True)
+CSV_COLUMNS = [
+    "company", "symbol", "fiscal_year", "quarter", "period_end_date",
+    "currency", "unit_multiplier", "revenue", "cogs", "gross_profit",
+    "operating_expenses", "operating_income", "net_income", "ytd_qtr_fixed",
+]
 
 # ─── Logging Setup ────────────────────────────────────────────────────────────
 def setup_logging() -> None:
@@ -63,16 +132,22 @@ def setup_logging() -> None:
 logger = logging.getLogger(__name__)
 
 # ─── LLM Client ──────────────────────────────────────────────────────────────
-def llm_client() -> Any:
+def llm_client(max_connections: int = 1) -> Any:
     """
-    Initialize ChatOpenAI or AzureChatOpenAI using OPENAI_EMBEDDING_KEY.
+    Initialize ChatOpenAI or AzureChatOpenAI using OPENAI_EMBEDDING_KEY,
+    on the shared HTTP pool sized for `max_connections` concurrent calls.
+
+    Transport retries are off: ask_llm_with_retries already backs off on
+    rate limits with the longer delays a batch run can afford.
     """
     embed_key = os.getenv("OPENAI_EMBEDDING_KEY") or os.getenv("openai_embedding_key")
     if not embed_key:
         logger.error("Missing OPENAI_EMBEDDING_KEY in environment")
         raise RuntimeError("Missing OPENAI_EMBEDDING_KEY")
 
-    common = {"temperature": 0}
+    upstream = "azure-openai" if os.getenv("OPENAI_API_BASE") else "openai"
+    config = ClientConfig.from_env(max_connections=max_connections, read_timeout=LLM_TIMEOUT, max_retries=0)
+    common = {"temperature": 0, **langchain_kwargs(upstream, config)}
     if os.getenv("OPENAI_API_BASE"):
         client = AzureChatOpenAI(
             azure_endpoint=os.getenv("OPENAI_API_BASE"),
@@ -91,19 +166,66 @@ def llm_client() -> Any:
     logger.info("Initialized LLM client: %s", client.__class__.__name__)
     return client
 
+def cached_llm(client: Any, refresh: bool = False) -> CachedChatModel:
+    """
+    Put the response cache in front of `client`: a re-run whose snippets and
+    prompt are unchanged (e.g. --force after a post_validate fix) makes no
+    LLM calls. `refresh` re-asks every prompt and overwrites the cache.
+    """
+    return CachedChatModel(client, SQLiteResponseCache(LLM_CACHE_FILE, LLM_CACHE_MAX_BYTES), model_name(),
+                           refresh=refresh)
+
+
+def model_name() -> str:
+    """Model/deployment name the LLM client will use (for the manifest)."""
+    return os.getenv("OPENAI_MODEL") or ""
+
 # ─── Prompt Loader ───────────────────────────────────────────────────────────
 def read_prompt() -> Template:
     """Read and return the Jinja2 prompt template."""
     text = PROMPT_FILE.read_text(encoding="utf-8")
     return Template(text)
 
+
+def prompt_hash() -> str:
+    """Hash both prompt templates, the example schema and snippet version; a change invalidates extractions."""
+    digest = hashlib.sha256(PROMPT_FILE.read_bytes())
+    digest.update(BATCH_PROMPT_FILE.read_bytes())
+    digest.update(json.dumps(EXAMPLE_SCHEMA, sort_keys=True).encode("utf-8"))
+    digest.update(f"snippet-v{SNIPPET_VERSION}".encode("utf-8"))
+    return digest.hexdigest()
+
 # ─── PDF Snipping ────────────────────────────────────────────────────────────
+def locate_pnl_page(pdf_path: Path, max_pages: int = SCAN_PAGES) -> Optional[int]:
+    """
+    Return the index of the first page mentioning the 3-month statement, or None.
+
+    Uses PyPDF2's plain text extraction, which is several times cheaper than
+    pdfplumber's layout pass, and stops at the first hit.
+    """
+    reader = PdfReader(str(pdf_path))
+    for idx, page in enumerate(reader.pages[:max_pages]):
+        if QTR_PAGE_RE.search(page.extract_text() or ""):
+            return idx
+    return None
+
+
 def find_pnl_pages(pdf_path: Path) -> str:
-    """Extract raw text from up to the first few pages for P&L detection."""
+    """
+    Extract layout text of the P&L page and its neighbour (the statement
+    often runs on, or the group figures follow). Falls back to the first
+    SCAN_PAGES pages when the locator finds nothing.
+    """
+    idx = locate_pnl_page(pdf_path)
     with pdfplumber.open(pdf_path) as pdf:
-        pages = pdf.pages[:8]
+        pages = pdf.pages[idx:idx + 2] if idx is not None else pdf.pages[:SCAN_PAGES]
         return "\n".join(p.extract_text() or "" for p in pages)
 
+
+def extract_snippet(pdf_path: Path) -> Tuple[str, str]:
+    """Parse a PDF and return its (snippet, header); picklable for process pools."""
+    return extract_qtr_snippet(find_pnl_pages(pdf_path))
+
 # ─── LLM Extraction ──────────────────────────────────────────────────────────
 def ask_llm(
     tmpl: Template,
@@ -115,17 +237,29 @@ def ask_llm(
 ) -> Dict[str, Any]:
     """
     Send Jinja2-rendered prompt to LLM, parse JSON response,
-    fallback to safe eval if JSON loads fails.
+    fallback to safe eval if JSON loads fails. Only a reply that yields a
+    valid record is kept in the response cache, so a bad one is re-asked
+    on the next run.
     """
     prompt = tmpl.render(
         header_text=header_text,
         content=snippet,
         example_output_format=json.dumps(example, indent=2),
     )
-    resp = getattr(client, "invoke", client)(
-        [HumanMessage(content=prompt)], timeout=LLM_TIMEOUT
-    )
+    messages = [HumanMessage(content=prompt)]
+    resp = getattr(client, "invoke", client)(messages, timeout=LLM_TIMEOUT)
     raw = getattr(resp, "content", str(resp)).strip()
+    rec = parse_record(raw)
+    if rec is None:
+        logger.error("Bad JSON from LLM for %s: %s", pdf_name, raw)
+        return {"parse_error": "bad_json", "raw": raw}
+    if isinstance(client, CachedChatModel) and not validate_record(rec):
+        client.store(messages, raw)
+    return rec
+
+
+def parse_record(raw: str) -> Optional[Dict[str, Any]]:
+    """The JSON object in an LLM reply (or a Python-literal dict), or None."""
 
     # extract {...}
     start, end = raw.find("{"), raw.rfind("}")
@@ -141,83 +275,553 @@ def ask_llm(
                 return rec
         except Exception:
             pass
+    return None
+
+
+def retry_delay(exc: Exception, attempt: int) -> float:
+    """
+    Seconds to wait before retrying: the server's Retry-After if it sent
+    one, otherwise exponential backoff with full jitter.
+    """
+    return backoff_delay(attempt, LLM_BACKOFF_BASE, LLM_BACKOFF_MAX, getattr(exc, "response", None))
 
-    logger.error("Bad JSON from LLM for %s: %s", pdf_name, raw)
-    return {"parse_error": "bad_json", "raw": raw}
+
+def ask_llm_with_retries(
+    tmpl: Template,
+    header_text: str,
+    snippet: str,
+    example: Dict[str, Any],
+    client: Any,
+    pdf_name: str,
+) -> Dict[str, Any]:
+    """Call `ask_llm`, backing off on rate limits and transient API errors."""
+    return call_with_retries(lambda: ask_llm(tmpl, header_text, snippet, example, client, pdf_name), pdf_name)
+
+
+T = TypeVar("T")
+
+
+def call_with_retries(call: Callable[[], T], name: str) -> T:
+    """Run an LLM `call`, backing off on rate limits and transient API errors."""
+    for attempt in range(LLM_MAX_RETRIES + 1):
+        try:
+            return call()
+        except RETRYABLE_ERRORS as exc:
+            if attempt == LLM_MAX_RETRIES:
+                raise
+            delay = retry_delay(exc, attempt)
+            logger.warning(
+                "LLM call for %s failed (%s); retry %d/%d in %.1fs",
+                name, exc.__class__.__name__, attempt + 1, LLM_MAX_RETRIES, delay,
+            )
+            time.sleep(delay)
+    raise AssertionError("unreachable")
+
+# ─── Batched LLM Extraction ──────────────────────────────────────────────────
+Statement = Tuple[Path, str, str]    # (pdf_path, header, snippet)
+
+
+def read_batch_prompt() -> Template:
+    """Read and return the Jinja2 prompt template for several statements per request."""
+    return Template(BATCH_PROMPT_FILE.read_text(encoding="utf-8"))
+
+
+def validate_record(rec: Any) -> List[str]:
+    """Return what is wrong with an extracted record (empty if it is usable)."""
+    if not isinstance(rec, dict):
+        return ["not a JSON object"]
+    if rec.get("parse_error"):
+        return [f"parse error ({rec['parse_error']})"]
+    problems = [f"missing {key}" for key in EXAMPLE_SCHEMA if key not in rec]
+    date = rec.get("period_end_date")
+    if date is not None and not (isinstance(date, str) and ISO_DATE_RE.fullmatch(date)):
+        problems.append(f"period_end_date {date!r} is not YYYY-MM-DD")
+    for key in NUMERIC_FIELDS:
+        value = rec.get(key)
+        if value is not None and (isinstance(value, bool) or not isinstance(value, (int, float))):
+            problems.append(f"{key} {value!r} is not a number")
+    return problems
+
+
+def pack_batches(
+    statements: List[Statement],
+    max_tokens: int,
+    max_items: int,
+    counter: Optional[TokenCounter] = None,
+) -> List[List[Statement]]:
+    """
+    Group statements, in order, into batches of at most `max_items` whose
+    headers and snippets total at most `max_tokens` (a larger statement
+    gets a batch of its own).
+    """
+    counter = counter or TokenCounter()
+    batches: List[List[Statement]] = []
+    batch: List[Statement] = []
+    used = 0
+    for stmt in statements:
+        tokens = counter.count(stmt[1]) + counter.count(stmt[2])
+        if batch and (used + tokens > max_tokens or len(batch) >= max_items):
+            batches.append(batch)
+            batch, used = [], 0
+        batch.append(stmt)
+        used += tokens
+    if batch:
+        batches.append(batch)
+    return batches
+
+
+def ask_llm_batch(
+    tmpl: Template,
+    statements: List[Dict[str, str]],
+    example: Dict[str, Any],
+    client: Any,
+) -> Dict[str, Any]:
+    """
+    Send several {"id", "header_text", "content"} statements in one prompt
+    and return the records of the JSON array reply by id. Records that are
+    missing or not objects are simply absent.
+    """
+    prompt = tmpl.render(statements=statements, example_output_format=json.dumps(example, indent=2))
+    messages = [HumanMessage(content=prompt)]
+    resp = getattr(client, "invoke", client)(messages, timeout=LLM_TIMEOUT * max(1, len(statements) // 2))
+    raw = getattr(resp, "content", str(resp)).strip()
+
+    start, end = raw.find("["), raw.rfind("]")
+    try:
+        records = json.loads(raw[start : end + 1])
+    except Exception:
+        logger.error("Bad JSON array from LLM for a batch of %d: %s", len(statements), raw[:500])
+        return {}
+    if not isinstance(records, list):
+        return {}
+    out = {str(rec.pop("id")): rec for rec in records if isinstance(rec, dict) and "id" in rec}
+    # cache the reply only if no statement will have to be re-asked
+    if isinstance(client, CachedChatModel) and len(out) == len(statements) \
+            and not any(validate_record(rec) for rec in out.values()):
+        client.store(messages, raw)
+    return out
+
+
+def extract_batch(
+    batch: List[Statement],
+    batch_tmpl: Template,
+    tmpl: Template,
+    example: Dict[str, Any],
+    client: Any,
+) -> Dict[Path, Optional[Dict[str, Any]]]:
+    """
+    Extract a batch of statements in one request, validate each record on
+    its own and re-ask (with the one-statement prompt) only for those that
+    are missing or invalid. A record is None if that also fails.
+    """
+    statements = [{"id": str(i), "header_text": h, "content": s} for i, (_, h, s) in enumerate(batch, 1)]
+    try:
+        replies = call_with_retries(
+            lambda: ask_llm_batch(batch_tmpl, statements, example, client), f"a batch of {len(batch)}"
+        )
+    except Exception:
+        logger.exception("Batched LLM extraction failed for %d PDFs; asking one by one", len(batch))
+        replies = {}
+
+    out: Dict[Path, Optional[Dict[str, Any]]] = {}
+    for stmt, (pdf_path, header, snippet) in zip(statements, batch):
+        rec = replies.get(stmt["id"])
+        problems = validate_record(rec) if rec is not None else ["missing from the batch reply"]
+        if not problems:
+            out[pdf_path] = rec
+            continue
+        logger.warning("Re-asking for %s: %s", pdf_path.name, "; ".join(problems))
+        try:
+            out[pdf_path] = ask_llm_with_retries(tmpl, header, snippet, example, client, pdf_path.name)
+        except Exception:
+            logger.exception("LLM extraction failed for %s", pdf_path.name)
+            out[pdf_path] = None
+    return out
 
 # ─── Output Writers ──────────────────────────────────────────────────────────
+def record_slug(rec: Dict[str, Any], pdf_path: Path) -> str:
+    """Company slug a record is filed under (by symbol or company name, else the PDF folder)."""
+    registry = load_registry()
+    company = registry.by_symbol(rec.get("symbol") or "") or registry.by_name(rec.get("company") or "")
+    return company.slug if company else pdf_path.parent.name
+
+
 def write_outputs(rec: Dict[str, Any], pdf_path: Path) -> None:
     """
-    Determine company slug, write JSON file, and append a CSV row.
+    Determine company slug and write the JSON file.
     """
-    slug = COMPANY_MAP.get(rec.get("symbol", ""), pdf_path.parent.name)
+    slug = record_slug(rec, pdf_path)
 
-    # JSON
     out_json = INTERIM_DIR / slug / "json" / f"{pdf_path.stem}.json"
+    out_json.parent.mkdir(parents=True, exist_ok=True)
     out_json.write_text(json.dumps(rec, indent=2), encoding="utf-8")
     logger.info("Wrote JSON → %s", out_json.relative_to(PROJECT_ROOT))
 
-    # CSV
-    out_csv = INTERIM_DIR / slug / "csv" / "pnl.csv"
-    columns = [
-        "company", "symbol", "fiscal_year", "quarter", "period_end_date",
-        "currency", "unit_multiplier", "revenue", "cogs", "gross_profit",
-        "operating_expenses", "operating_income", "net_income", "ytd_qtr_fixed",
-    ]
-    row = {col: rec.get(col, "") for col in columns}
-    pd.DataFrame([row]).to_csv(
-        out_csv, mode="a", header=not out_csv.exists(), index=False, columns=columns
-    )
-    logger.info("Appended CSV → %s", out_csv.relative_to(PROJECT_ROOT))
+
+def rebuild_csvs(manifest: ExtractionManifest, slugs: Optional[Set[str]] = None) -> None:
+    """
+    Rewrite each company's pnl.csv (or only those of `slugs`) from the
+    manifest's successful records, in serial-run order, instead of
+    appending on every run. A company left without successful records
+    gets a header-only CSV, so none of its stale rows survive.
+    """
+    if slugs is None:
+        slugs = {entry["slug"] for entry in manifest.entries.values() if entry.get("slug")}
+        slugs |= {path.parent.parent.name for path in INTERIM_DIR.glob("*/csv/pnl.csv")}
+    rows: Dict[str, List[Dict[str, Any]]] = {slug: [] for slug in slugs}
+    for _, entry in manifest.records():
+        if entry["slug"] not in rows:
+            continue
+        rec = entry["record"]
+        rows[entry["slug"]].append({col: rec.get(col, "") for col in CSV_COLUMNS})
+
+    for slug, slug_rows in sorted(rows.items()):
+        out_csv = INTERIM_DIR / slug / "csv" / "pnl.csv"
+        out_csv.parent.mkdir(parents=True, exist_ok=True)
+        pd.DataFrame(slug_rows, columns=CSV_COLUMNS, dtype=object).to_csv(out_csv, index=False)
+        logger.info("Rebuilt CSV → %s (%d rows)", out_csv.relative_to(PROJECT_ROOT), len(slug_rows))
+
+
+def remove_outputs(pdf_key: str, entry: Dict[str, Any]) -> None:
+    """Delete the snippet/JSON produced for a PDF that no longer exists."""
+    pdf_rel = Path(pdf_key)
+    stale = [INTERIM_DIR / pdf_rel.parent.name / "txt" / f"{pdf_rel.stem}.txt"]
+    if entry.get("slug"):
+        stale.append(INTERIM_DIR / entry["slug"] / "json" / f"{pdf_rel.stem}.json")
+    for path in stale:
+        if path.exists():
+            path.unlink()
+            logger.info("Removed %s (source PDF gone)", path.relative_to(PROJECT_ROOT))
+
+# ─── Pipeline stages ─────────────────────────────────────────────────────────
+def write_snippet(pdf_path: Path, snippet: str) -> None:
+    """Dump the raw snippet next to the company's interim outputs."""
+    txt_out = INTERIM_DIR / pdf_path.parent.name / "txt" / f"{pdf_path.stem}.txt"
+    txt_out.parent.mkdir(parents=True, exist_ok=True)
+    txt_out.write_text(snippet, encoding="utf-8")
+
+
+def finalize(pdf_path: Path, rec: Optional[Dict[str, Any]]) -> bool:
+    """Post-validate and write one record; return True if it was written."""
+    if rec is None:
+        return False
+    if rec.get("parse_error"):
+        logger.error("Skipping %s due to parse_error", pdf_path.name)
+        return False
+
+    post_validate(rec, pdf_path)
+    write_outputs(rec, pdf_path)
+    return True
+
+
+class OrderedFinalizer:
+    """
+    Release finished records to `finalize` in serial-run order.
+
+    `post_validate` reads the previous quarter's JSON, and `write_outputs`
+    files records under a company chosen from the record's symbol (which
+    need not match the PDF's folder), so a record may only be finalized once
+    every PDF before it in the serial order has been. Records that complete early
+    are held back until their predecessors arrive; this only delays the
+    cheap write stage, never parsing or LLM calls.
+    """
+
+    def __init__(
+        self,
+        pdf_paths: List[Path],
+        finalize_fn: "FinalizeFn" = finalize,
+    ) -> None:
+        self.finalize_fn = finalize_fn
+        self._order = list(pdf_paths)
+        self._next = 0
+        self._ready: Dict[Path, Optional[Dict[str, Any]]] = {}
+        self.succeeded = 0
+
+    def submit(self, pdf_path: Path, rec: Optional[Dict[str, Any]]) -> None:
+        """Hand over a finished record (None = failed) and flush what is now in order."""
+        self._ready[pdf_path] = rec
+        while self._next < len(self._order) and self._order[self._next] in self._ready:
+            path = self._order[self._next]
+            if self.finalize_fn(path, self._ready.pop(path)):
+                self.succeeded += 1
+            self._next += 1
+
+
+FinalizeFn = Callable[[Path, Optional[Dict[str, Any]]], bool]
+
+
+def extract_record(
+    pdf_path: Path,
+    tmpl: Template,
+    example: Dict[str, Any],
+    client: Any,
+    snippet_fn: Callable[[Path], Tuple[str, str]] = extract_snippet,
+) -> Optional[Dict[str, Any]]:
+    """
+    Snippet one PDF (writing the snippet out) and ask the LLM; None if the
+    PDF could not be parsed or the LLM call failed, as in run_pipelined.
+    """
+    try:
+        snippet, header = snippet_fn(pdf_path)
+    except Exception:
+        logger.exception("PDF parsing failed for %s", pdf_path.name)
+        return None
+    write_snippet(pdf_path, snippet)
+    try:
+        return ask_llm_with_retries(tmpl, header, snippet, example, client, pdf_path.name)
+    except Exception:
+        logger.exception("LLM extraction failed for %s", pdf_path.name)
+        return None
+
+
+def run_serial(
+    pdf_paths: List[Path],
+    tmpl: Template,
+    example: Dict[str, Any],
+    client: Any,
+    finalize_fn: FinalizeFn = finalize,
+) -> int:
+    """Process PDFs one after another; return the number extracted."""
+    succeeded = 0
+    for pdf_path in pdf_paths:
+        logger.info("Processing %s", pdf_path.relative_to(PROJECT_ROOT))
+        rec = extract_record(pdf_path, tmpl, example, client)
+        if finalize_fn(pdf_path, rec):
+            succeeded += 1
+    return succeeded
+
+
+def run_pipelined(
+    pdf_paths: List[Path],
+    tmpl: Template,
+    example: Dict[str, Any],
+    client: Any,
+    workers: int,
+    llm_concurrency: int,
+    finalize_fn: FinalizeFn = finalize,
+) -> int:
+    """
+    Parse PDFs in a process pool while LLM calls run in a thread pool.
+
+    At most `llm_concurrency` prompts are in flight; parsed snippets queue up
+    behind them. Finished records go through an OrderedFinalizer so the
+    JSON/CSV outputs match a serial run.
+    """
+    finalizer = OrderedFinalizer(pdf_paths, finalize_fn)
+    with ProcessPoolExecutor(max_workers=workers) as parse_pool, \
+            ThreadPoolExecutor(max_workers=llm_concurrency) as llm_pool:
+        parsing = {parse_pool.submit(extract_snippet, p): p for p in pdf_paths}
+        asking: Dict[Any, Path] = {}
+
+        while parsing or asking:
+            done, _ = wait(list(parsing) + list(asking), return_when=FIRST_COMPLETED)
+            for fut in done:
+                if fut in parsing:
+                    pdf_path = parsing.pop(fut)
+                    try:
+                        snippet, header = fut.result()
+                    except Exception:
+                        logger.exception("PDF parsing failed for %s", pdf_path.name)
+                        finalizer.submit(pdf_path, None)
+                        continue
+                    logger.info("Parsed %s", pdf_path.relative_to(PROJECT_ROOT))
+                    write_snippet(pdf_path, snippet)
+                    asking[llm_pool.submit(
+                        ask_llm_with_retries, tmpl, header, snippet, example, client, pdf_path.name
+                    )] = pdf_path
+                else:
+                    pdf_path = asking.pop(fut)
+                    try:
+                        rec = fut.result()
+                    except Exception:
+                        logger.exception("LLM extraction failed for %s", pdf_path.name)
+                        rec = None
+                    finalizer.submit(pdf_path, rec)
+
+    return finalizer.succeeded
+
+
+def run_batched(
+    pdf_paths: List[Path],
+    tmpl: Template,
+    batch_tmpl: Template,
+    example: Dict[str, Any],
+    client: Any,
+    workers: int,
+    llm_concurrency: int,
+    batch_tokens: int,
+    batch_size: int = BATCH_SIZE,
+    finalize_fn: FinalizeFn = finalize,
+) -> int:
+    """
+    Parse every PDF (in a process pool when `workers` > 1), pack the snippets
+    into batches of up to `batch_size` statements and `batch_tokens` tokens,
+    and send up to `llm_concurrency` batches at once, so the long extraction
+    instructions are sent once per batch instead of once per PDF. Records go
+    through an OrderedFinalizer, as in run_pipelined.
+    """
+    finalizer = OrderedFinalizer(pdf_paths, finalize_fn)
+    statements: List[Statement] = []
+    with ProcessPoolExecutor(max_workers=workers) if workers > 1 else ThreadPoolExecutor(max_workers=1) as pool:
+        parsing = [(p, pool.submit(extract_snippet, p)) for p in pdf_paths]
+        for pdf_path, fut in parsing:
+            try:
+                snippet, header = fut.result()
+            except Exception:
+                logger.exception("PDF parsing failed for %s", pdf_path.name)
+                finalizer.submit(pdf_path, None)
+                continue
+            write_snippet(pdf_path, snippet)
+            statements.append((pdf_path, header, snippet))
+
+    batches = pack_batches(statements, batch_tokens, batch_size)
+    logger.info("Batched mode: %d PDFs in %d requests", len(statements), len(batches))
+    with ThreadPoolExecutor(max_workers=llm_concurrency) as llm_pool:
+        asking = [llm_pool.submit(extract_batch, b, batch_tmpl, tmpl, example, client) for b in batches]
+        for fut in as_completed(asking):
+            for pdf_path, rec in fut.result().items():
+                finalizer.submit(pdf_path, rec)
+
+    return finalizer.succeeded
+
 
 # ─── Main ────────────────────────────────────────────────────────────────────
-def main() -> None:
-    """Orchestrate the full extraction pipeline over all raw PDFs."""
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Parse command-line flags."""
+    parser = argparse.ArgumentParser(description="Extract quarterly P&L tables from raw PDFs.")
+    parser.add_argument(
+        "--workers", type=int, default=1,
+        help="processes for PDF parsing (1 = serial run)",
+    )
+    parser.add_argument(
+        "--llm-concurrency", type=int, default=1,
+        help="maximum LLM calls in flight",
+    )
+    parser.add_argument(
+        "--force", action="store_true",
+        help="re-extract every PDF, ignoring the manifest",
+    )
+    parser.add_argument(
+        "--companies", nargs="+", metavar="COMPANY",
+        help="only these companies (registry symbols, slugs or names)",
+    )
+    parser.add_argument(
+        "--batch-tokens", type=int, default=0,
+        help="pack several snippets, up to this many tokens, into each LLM request (0 = one PDF per request)",
+    )
+    parser.add_argument(
+        "--batch-size", type=int, default=BATCH_SIZE,
+        help="most snippets per request with --batch-tokens",
+    )
+    cache = parser.add_mutually_exclusive_group()
+    cache.add_argument(
+        "--no-cache", action="store_true",
+        help="always call the LLM and leave the response cache untouched",
+    )
+    cache.add_argument(
+        "--refresh", action="store_true",
+        help="call the LLM for every prompt and overwrite its cached response",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Orchestrate the extraction pipeline over new or changed raw PDFs; return the number extracted."""
+    args = parse_args(argv)
     setup_logging()
     load_dotenv()
     logger.info("Starting interim financial extraction")
+    t0 = time.perf_counter()
 
-    example_schema = {
-        "company": "<COMPANY NAME>",
-        "symbol": "<TICKER>",
-        "fiscal_year": "YYYY/YY",
-        "quarter": "Q1",
-        "period_end_date": "YYYY-MM-DD",
-        "currency": "LKR",
-        "unit_multiplier": 1000,
-        "revenue": 0,
-        "cogs": 0,
-        "gross_profit": 0,
-        "operating_expenses": 0,
-        "operating_income": 0,
-        "net_income": 0,
-    }
-
-    client = llm_client()
-    tmpl = read_prompt()
-
-    total = succeeded = 0
-    for pdf_path in RAW_DIR.rglob("*.pdf"):
-        total += 1
-        logger.info("Processing %s", pdf_path.relative_to(PROJECT_ROOT))
-
-        full_text = find_pnl_pages(pdf_path)
-        snippet, header = extract_qtr_snippet(full_text)
+    manifest = ExtractionManifest(MANIFEST_FILE, RAW_DIR)
+    fingerprint = {"prompt_hash": prompt_hash(), "model": model_name()}
 
-        # dump raw snippet
-        txt_out = INTERIM_DIR / pdf_path.parent.name / "txt" / f"{pdf_path.stem}.txt"
-        txt_out.write_text(snippet, encoding="utf-8")
-
-        rec = ask_llm(tmpl, header, snippet, example_schema, client, pdf_path.name)
-        if rec.get("parse_error"):
-            logger.error("Skipping %s due to parse_error", pdf_path.name)
-            continue
+    # sorted so that per-company order (which post_validate depends on) is stable
+    slugs: Optional[Set[str]] = None
+    if args.companies:
+        slugs = set(load_registry().select(args.companies).slugs())
+        pdf_paths = sorted(p for slug in slugs for p in (RAW_DIR / slug).rglob("*.pdf"))
+    else:
+        pdf_paths = sorted(RAW_DIR.rglob("*.pdf"))
+    fingerprints: Dict[Path, Dict[str, Any]] = {}
+    stale: List[Path] = []
+    for pdf_path in pdf_paths:
+        sha256, size, mtime_ns = manifest.content_hash(pdf_path)
+        fingerprints[pdf_path] = {**fingerprint, "sha256": sha256, "size": size, "mtime_ns": mtime_ns}
+        if args.force or not manifest.is_current(pdf_path, sha256, **fingerprint):
+            stale.append(pdf_path)
+        else:
+            manifest.touch(pdf_path, size, mtime_ns)
+
+    present = {manifest.key(p) for p in pdf_paths}
+    removed = [
+        k for k in manifest.entries
+        if k not in present and (slugs is None or k.split("/", 1)[0] in slugs)
+    ]
+    for key in removed:
+        remove_outputs(key, manifest.forget(key))
 
-        post_validate(rec, pdf_path)
-        write_outputs(rec, pdf_path)
-        succeeded += 1
+    logger.info(
+        "%d PDFs found: %d new or changed, %d unchanged",
+        len(pdf_paths), len(stale), len(pdf_paths) - len(stale),
+    )
 
-    logger.info("Done: %d/%d PDFs extracted", succeeded, total)
+    succeeded = 0
+    if stale:
+        client = llm_client(max(1, args.llm_concurrency))
+        if not args.no_cache:
+            client = cached_llm(client, refresh=args.refresh)
+        tmpl = read_prompt()
+
+        def finalize_and_record(pdf_path: Path, rec: Optional[Dict[str, Any]]) -> bool:
+            ok = finalize(pdf_path, rec)
+            manifest.update(
+                pdf_path,
+                fingerprints[pdf_path],
+                record_slug(rec, pdf_path) if ok else None,
+                rec if ok else None,
+            )
+            # checkpoint so an interrupted run keeps its progress
+            if manifest.unsaved >= 25:
+                manifest.save()
+            return ok
+
+        if args.batch_tokens > 0:
+            succeeded = run_batched(
+                stale, tmpl, read_batch_prompt(), EXAMPLE_SCHEMA, client,
+                max(1, args.workers), max(1, args.llm_concurrency),
+                args.batch_tokens, max(1, args.batch_size),
+                finalize_and_record,
+            )
+        elif args.workers <= 1 and args.llm_concurrency <= 1:
+            succeeded = run_serial(stale, tmpl, EXAMPLE_SCHEMA, client, finalize_and_record)
+        else:
+            logger.info(
+                "Pipelined mode: %d parse workers, %d concurrent LLM calls",
+                args.workers, args.llm_concurrency,
+            )
+            succeeded = run_pipelined(
+                stale, tmpl, EXAMPLE_SCHEMA, client,
+                max(1, args.workers), max(1, args.llm_concurrency),
+                finalize_and_record,
+            )
+
+    if stale and isinstance(client, CachedChatModel):
+        stats = client.stats()
+        logger.info(
+            "LLM response cache: %d hits, %d misses (%d entries, %.1f MB)",
+            stats["hits"], stats["misses"], stats["entries"], stats["bytes"] / 1e6,
+        )
+    if stale or removed:
+        rebuild_csvs(manifest, slugs)
+    if manifest.dirty:
+        manifest.save()
+
+    logger.info(
+        "Done: %d/%d PDFs extracted in %.2fs",
+        succeeded, len(stale), time.perf_counter() - t0,
+    )
+    return succeeded
 
 
 if __name__ == "__main__":
@@ -0,0 +1,209 @@
+"""
+financial_store.py
+
+Columnar, in-memory store for the merged quarterly P&L records:
+ - FinancialStore: loads frontend/.../public/data/<slug>/all.json (written by
+                   merge_jsons.py) once into typed NumPy columns, precomputes
+                   the derived metrics (see metrics.py) alongside them, and
+                   answers company / date-range / field-projection queries
+"""
+
+import hashlib
+import json
+import logging
+import threading
+from dataclasses import dataclass
+from datetime import date
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+from backend.src.metrics import METRIC_FIELDS, compute_metrics
+
+logger = logging.getLogger(__name__)
+
+NUMERIC_FIELDS = (
+    "unit_multiplier", "revenue", "cogs", "gross_profit",
+    "operating_expenses", "operating_income", "net_income",
+)
+TEXT_FIELDS = ("company", "symbol", "fiscal_year", "quarter", "currency")
+FLOAT_FIELDS = NUMERIC_FIELDS + METRIC_FIELDS
+FIELDS = ("period_end_date",) + TEXT_FIELDS + FLOAT_FIELDS
+
+
+def _to_number(value: Any) -> float:
+    if isinstance(value, bool):
+        return float("nan")
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return float("nan")
+
+
+def _to_date(value: Any) -> np.datetime64:
+    try:
+        return np.datetime64(str(value)[:10], "D") if value else np.datetime64("NaT", "D")
+    except ValueError:
+        return np.datetime64("NaT", "D")
+
+
+def _json_number(value: float) -> Optional[float]:
+    if value != value:  # NaN
+        return None
+    return int(value) if value.is_integer() else value
+
+
+@dataclass(frozen=True)
+class _Table:
+    """One immutable snapshot of the store; swapped wholesale on reload."""
+
+    version: str
+    slugs: List[str]
+    company_code: np.ndarray             # int index into `slugs`, per row
+    columns: Dict[str, np.ndarray]       # field -> column, rows sorted by (slug, date)
+
+
+class FinancialStore:
+    """
+    Typed column store over every company's merged `all.json`.
+
+    Rows are sorted by (company slug, period_end_date); dates are
+    `datetime64[D]`, numeric fields and derived metrics `float64` (NaN for
+    missing) and text fields object arrays. Metrics are computed once per
+    load, so queries only slice precomputed columns. `version` changes whenever a source file does, so
+    it can be used as an ETag component.
+    """
+
+    def __init__(self, data_dir: Path) -> None:
+        self.data_dir = Path(data_dir)
+        self._lock = threading.Lock()
+        self._signature: Optional[tuple] = None
+        self._table = self._build([])
+
+    # ─── Loading ──────────────────────────────────────────────────────────────
+    def _source_files(self) -> List[Path]:
+        if not self.data_dir.is_dir():
+            return []
+        return sorted(self.data_dir.glob("*/all.json"))
+
+    def _signature_of(self, files: Sequence[Path]) -> tuple:
+        return tuple((f.parent.name, f.stat().st_size, f.stat().st_mtime_ns) for f in files)
+
+    def _build(self, files: Sequence[Path]) -> _Table:
+        slug_rows: List[int] = []
+        rows: List[Dict[str, Any]] = []
+        slugs = [f.parent.name for f in files]
+        digest = hashlib.sha1()
+        for code, path in enumerate(files):
+            raw = path.read_bytes()
+            digest.update(path.parent.name.encode("utf-8") + b"\0" + raw)
+            try:
+                records = json.loads(raw)
+            except ValueError:
+                logger.error("Skipping unreadable %s", path)
+                continue
+            for rec in records:
+                if isinstance(rec, dict):
+                    rows.append(rec)
+                    slug_rows.append(code)
+
+        company_code = np.asarray(slug_rows, dtype=np.int32)
+        dates = np.array([_to_date(r.get("period_end_date")) for r in rows], dtype="datetime64[D]")
+        order = np.lexsort((dates, company_code))
+
+        columns: Dict[str, np.ndarray] = {"period_end_date": dates[order]}
+        for field in NUMERIC_FIELDS:
+            col = np.array([_to_number(r.get(field)) for r in rows], dtype=np.float64)
+            columns[field] = col[order]
+        for field in TEXT_FIELDS:
+            col = np.empty(len(rows), dtype=object)
+            col[:] = [r.get(field) for r in rows]
+            columns[field] = col[order]
+        columns.update(compute_metrics(company_code[order], columns["period_end_date"], columns))
+
+        return _Table(
+            version=digest.hexdigest()[:16],
+            slugs=slugs,
+            company_code=company_code[order],
+            columns=columns,
+        )
+
+    def reload_if_changed(self) -> bool:
+        """Rebuild the table if any source file was added, removed or modified."""
+        files = self._source_files()
+        signature = self._signature_of(files)
+        if signature == self._signature:
+            return False
+        with self._lock:
+            if signature == self._signature:
+                return False
+            self._table = self._build(files)
+            self._signature = signature
+        logger.info(
+            "Financial store loaded: %d rows for %d companies (version %s)",
+            len(self._table.company_code), len(self._table.slugs), self._table.version,
+        )
+        return True
+
+    # ─── Queries ──────────────────────────────────────────────────────────────
+    @property
+    def version(self) -> str:
+        return self._table.version
+
+    def companies(self) -> List[str]:
+        return list(self._table.slugs)
+
+    def query(
+        self,
+        companies: Optional[Iterable[str]] = None,
+        start: Optional[date] = None,
+        end: Optional[date] = None,
+        fields: Optional[Sequence[str]] = None,
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Return {slug: [record, ...]} for the requested slice, oldest first.
+
+        `companies=None` means all; `start`/`end` are inclusive bounds on
+        period_end_date; `fields` projects the returned records
+        (period_end_date is always included).
+
+        Raises:
+            KeyError: For an unknown company.
+            ValueError: For an unknown field.
+        """
+        table = self._table
+        fields = list(FIELDS if not fields else dict.fromkeys(("period_end_date", *fields)))
+        unknown = [f for f in fields if f not in FIELDS]
+        if unknown:
+            raise ValueError(f"unknown field(s): {', '.join(unknown)}")
+
+        wanted = table.slugs if companies is None else list(dict.fromkeys(companies))
+        missing = [c for c in wanted if c not in table.slugs]
+        if missing:
+            raise KeyError(f"unknown company: {', '.join(missing)}")
+        codes = [table.slugs.index(c) for c in wanted]
+
+        dates = table.columns["period_end_date"]
+        mask = np.isin(table.company_code, codes)
+        if start is not None:
+            mask &= dates >= np.datetime64(start, "D")
+        if end is not None:
+            mask &= dates <= np.datetime64(end, "D")
+        idx = np.flatnonzero(mask)
+
+        values: Dict[str, List[Any]] = {}
+        for field in fields:
+            col = table.columns[field][idx]
+            if field == "period_end_date":
+                values[field] = [None if np.isnat(d) else str(d) for d in col]
+            elif field in FLOAT_FIELDS:
+                values[field] = [_json_number(v) for v in col.tolist()]
+            else:
+                values[field] = col.tolist()
+
+        out: Dict[str, List[Dict[str, Any]]] = {slug: [] for slug in wanted}
+        row_slugs = table.company_code[idx].tolist()
+        for i, code in enumerate(row_slugs):
+            out[table.slugs[code]].append({f: values[f][i] for f in fields})
+        return out
@@ -0,0 +1,375 @@
+"""
+http_clients.py
+
+Shared HTTP plumbing for every OpenAI / Azure OpenAI caller (API, extraction, indexer):
+ - ClientConfig:        pool size, timeouts, retry budget and breaker settings (env-driven)
+ - CircuitBreaker:      fail fast while an upstream keeps failing, probe after a cooldown
+ - RetryTransport /
+   AsyncRetryTransport: bounded retries with full jitter inside an overall deadline
+ - backoff_delay:       Retry-After when the server sent one, else jittered exponential backoff
+ - http_clients:        per-process keep-alive httpx clients, one pair per upstream name
+ - openai_client, langchain_kwargs: wire those clients into the OpenAI SDK / langchain
+
+The SDK's own retries are disabled (max_retries=0) wherever these clients are
+used, so one policy applies everywhere and attempts never multiply.
+"""
+
+import asyncio
+import logging
+import os
+import random
+import threading
+import time
+from dataclasses import dataclass, fields
+from typing import TYPE_CHECKING, Any, Dict, Optional, Tuple
+
+import httpx
+
+if TYPE_CHECKING:  # the SDK is only needed by openai_client(); keep it off the import path
+    import openai
+
+logger = logging.getLogger(__name__)
+
+RETRY_STATUSES = frozenset({408, 429, 500, 502, 503, 504})
+
+# ClientConfig field → environment variable overriding it
+ENV_VARS: Dict[str, str] = {
+    "max_connections": "LLM_POOL_SIZE",
+    "connect_timeout": "LLM_CONNECT_TIMEOUT",
+    "read_timeout": "LLM_TIMEOUT",
+    "deadline": "LLM_DEADLINE",
+    "max_retries": "LLM_MAX_RETRIES",
+    "breaker_threshold": "LLM_BREAKER_THRESHOLD",
+    "breaker_reset": "LLM_BREAKER_RESET",
+}
+
+
+@dataclass(frozen=True)
+class ClientConfig:
+    """Connection pool, timeout, retry and circuit-breaker settings for one upstream."""
+
+    max_connections: int = 32       # per process, i.e. per uvicorn worker
+    keepalive_expiry: float = 30.0
+    connect_timeout: float = 5.0
+    read_timeout: float = 60.0      # per attempt
+    deadline: float = 90.0          # all attempts and backoff together
+    max_retries: int = 2
+    backoff_base: float = 0.25
+    backoff_max: float = 4.0
+    breaker_threshold: int = 5      # consecutive failures that open the circuit
+    breaker_reset: float = 30.0     # seconds before a half-open probe
+
+    @classmethod
+    def from_env(cls, **defaults: Any) -> "ClientConfig":
+        """Build a config from `defaults`, overridden by any LLM_* variables that are set."""
+        values = dict(defaults)
+        types = {f.name: f.type for f in fields(cls)}
+        for name, var in ENV_VARS.items():
+            raw = os.getenv(var)
+            if raw:
+                values[name] = types[name](raw)
+        return cls(**values)
+
+    def limits(self) -> httpx.Limits:
+        return httpx.Limits(
+            max_connections=self.max_connections,
+            max_keepalive_connections=self.max_connections,
+            keepalive_expiry=self.keepalive_expiry,
+        )
+
+    def timeout(self) -> httpx.Timeout:
+        return httpx.Timeout(self.read_timeout, connect=self.connect_timeout)
+
+
+def backoff_delay(attempt: int, base: float, cap: float, response: Optional[Any] = None) -> float:
+    """
+    Seconds to wait before retry `attempt` (0-based): the response's
+    Retry-After if present (capped), otherwise full-jitter exponential backoff.
+    """
+    retry_after = getattr(response, "headers", {}).get("retry-after") if response is not None else None
+    if retry_after:
+        try:
+            return min(float(retry_after), cap)
+        except ValueError:
+            pass
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+class CircuitOpenError(httpx.TransportError):
+    """Raised instead of sending a request while the circuit is open."""
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker.
+
+    After `threshold` failures in a row the circuit opens and requests are
+    rejected for `reset_after` seconds; then a single probe is let through,
+    closing the circuit on success or re-opening it on failure.
+    """
+
+    def __init__(self, threshold: int, reset_after: float, clock=time.monotonic) -> None:
+        self.threshold = max(1, threshold)
+        self.reset_after = reset_after
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._probing = False
+        self.rejected = 0
+        self.opened = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+            return "half-open" if self._probing else "open"
+
+    def allow(self) -> bool:
+        """Whether a request may be sent now."""
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if not self._probing and self._clock() - self._opened_at >= self.reset_after:
+                self._probing = True
+                return True
+            self.rejected += 1
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._probing = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._probing or (self._opened_at is None and self._failures >= self.threshold):
+                if self._opened_at is None:
+                    self.opened += 1
+                self._opened_at = self._clock()
+            self._probing = False
+
+    def record_abandoned(self) -> None:
+        """
+        The request ended without an outcome (cancelled, or an error that is
+        not the upstream's); let another probe through instead of waiting forever.
+        """
+        with self._lock:
+            self._probing = False
+
+    def stats(self) -> Dict[str, Any]:
+        return {"state": self.state, "opened": self.opened, "rejected": self.rejected}
+
+
+class _RetryPolicy:
+    """Decisions shared by the sync and async transports."""
+
+    def __init__(self, config: ClientConfig, breaker: CircuitBreaker) -> None:
+        self.config = config
+        self.breaker = breaker
+        self.retries = 0
+
+    def _check_breaker(self, request: httpx.Request) -> None:
+        if not self.breaker.allow():
+            raise CircuitOpenError(f"circuit open for {request.url.host}", request=request)
+
+    def _budgeted(self, request: httpx.Request, started: float) -> httpx.Request:
+        """Cap this attempt's timeouts at what is left of the deadline."""
+        remaining = max(0.001, self.config.deadline - (time.monotonic() - started))
+        timeout = request.extensions.get("timeout") or {}
+        request.extensions["timeout"] = {
+            key: remaining if value is None else min(value, remaining)
+            for key, value in {**dict.fromkeys(("connect", "read", "write", "pool")), **timeout}.items()
+        }
+        return request
+
+    def _record(self, response: httpx.Response) -> None:
+        if response.status_code >= 500:
+            self.breaker.record_failure()
+        else:
+            self.breaker.record_success()
+
+    def _next_delay(self, attempt: int, started: float, response: Optional[httpx.Response]) -> Optional[float]:
+        """Backoff before the next attempt, or None when retries or the deadline are spent."""
+        if attempt >= self.config.max_retries:
+            return None
+        delay = backoff_delay(attempt, self.config.backoff_base, self.config.backoff_max, response)
+        if time.monotonic() - started + delay >= self.config.deadline:
+            return None
+        self.retries += 1
+        return delay
+
+
+class RetryTransport(_RetryPolicy, httpx.BaseTransport):
+    """Pooled HTTP transport retrying transient failures within the deadline."""
+
+    def __init__(self, config: ClientConfig, breaker: CircuitBreaker,
+                 transport: Optional[httpx.BaseTransport] = None) -> None:
+        super().__init__(config, breaker)
+        self._transport = transport or httpx.HTTPTransport(limits=config.limits())
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        started = time.monotonic()
+        request.read()  # so the body can be replayed
+        for attempt in range(self.config.max_retries + 1):
+            self._check_breaker(request)
+            try:
+                response = self._transport.handle_request(self._budgeted(request, started))
+            except httpx.TransportError:
+                self.breaker.record_failure()
+                delay = self._next_delay(attempt, started, None)
+                if delay is None:
+                    raise
+            except BaseException:
+                self.breaker.record_abandoned()
+                raise
+            else:
+                self._record(response)
+                if response.status_code not in RETRY_STATUSES:
+                    return response
+                delay = self._next_delay(attempt, started, response)
+                if delay is None:
+                    return response
+                response.close()
+            logger.warning("%s %s failed; retry %d in %.2fs", request.method, request.url.path, attempt + 1, delay)
+            time.sleep(delay)
+        raise AssertionError("unreachable")
+
+    def close(self) -> None:
+        self._transport.close()
+
+
+class AsyncRetryTransport(_RetryPolicy, httpx.AsyncBaseTransport):
+    """Async counterpart of RetryTransport."""
+
+    def __init__(self, config: ClientConfig, breaker: CircuitBreaker,
+                 transport: Optional[httpx.AsyncBaseTransport] = None) -> None:
+        super().__init__(config, breaker)
+        self._transport = transport or httpx.AsyncHTTPTransport(limits=config.limits())
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        started = time.monotonic()
+        await request.aread()
+        for attempt in range(self.config.max_retries + 1):
+            self._check_breaker(request)
+            try:
+                response = await self._transport.handle_async_request(self._budgeted(request, started))
+            except httpx.TransportError:
+                self.breaker.record_failure()
+                delay = self._next_delay(attempt, started, None)
+                if delay is None:
+                    raise
+            except BaseException:
+                self.breaker.record_abandoned()
+                raise
+            else:
+                self._record(response)
+                if response.status_code not in RETRY_STATUSES:
+                    return response
+                delay = self._next_delay(attempt, started, response)
+                if delay is None:
+                    return response
+                await response.aclose()
+            logger.warning("%s %s failed; retry %d in %.2fs", request.method, request.url.path, attempt + 1, delay)
+            await asyncio.sleep(delay)
+        raise AssertionError("unreachable")
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+
+# ─── Per-process client registry ─────────────────────────────────────────────
+@dataclass
+class _Upstream:
+    config: ClientConfig
+    breaker: CircuitBreaker
+    transport: RetryTransport
+    async_transport: AsyncRetryTransport
+    client: httpx.Client
+    async_client: httpx.AsyncClient
+
+
+_upstreams: Dict[str, _Upstream] = {}
+_upstreams_lock = threading.Lock()
+
+
+def http_clients(name: str = "openai", config: Optional[ClientConfig] = None) -> Tuple[httpx.Client, httpx.AsyncClient]:
+    """
+    The (sync, async) httpx clients for upstream `name`, created on first use.
+
+    Both share one circuit breaker. The first caller's `config` wins; later
+    calls with a different config get the existing clients and a warning.
+    """
+    with _upstreams_lock:
+        upstream = _upstreams.get(name)
+        if upstream is None:
+            config = config or ClientConfig.from_env()
+            breaker = CircuitBreaker(config.breaker_threshold, config.breaker_reset)
+            transport = RetryTransport(config, breaker)
+            async_transport = AsyncRetryTransport(config, breaker)
+            upstream = _upstreams[name] = _Upstream(
+                config,
+                breaker,
+                transport,
+                async_transport,
+                httpx.Client(transport=transport, timeout=config.timeout()),
+                httpx.AsyncClient(transport=async_transport, timeout=config.timeout()),
+            )
+            logger.info(
+                "HTTP clients for %s: %d connections, %.0fs timeout, %d retries, %.0fs deadline",
+                name, config.max_connections, config.read_timeout, config.max_retries, config.deadline,
+            )
+        elif config is not None and config != upstream.config:
+            logger.warning("HTTP clients for %s already exist; ignoring new config", name)
+        return upstream.client, upstream.async_client
+
+
+def client_config(name: str = "openai") -> ClientConfig:
+    """Config the clients for `name` were created with (creating them if needed)."""
+    http_clients(name)
+    return _upstreams[name].config
+
+
+def openai_client(api_key: str, name: str = "openai", config: Optional[ClientConfig] = None,
+                  **kwargs: Any) -> "openai.OpenAI":
+    """An OpenAI SDK client on the shared pool, with SDK retries disabled."""
+    import openai
+
+    client, _ = http_clients(name, config)
+    return openai.OpenAI(
+        api_key=api_key, http_client=client, max_retries=0, timeout=client_config(name).timeout(), **kwargs
+    )
+
+
+def langchain_kwargs(name: str = "openai", config: Optional[ClientConfig] = None) -> Dict[str, Any]:
+    """Keyword arguments putting a langchain-openai model on the shared pool."""
+    client, async_client = http_clients(name, config)
+    return {
+        "http_client": client,
+        "http_async_client": async_client,
+        "max_retries": 0,
+        "request_timeout": client_config(name).timeout(),
+    }
+
+
+def upstream_stats() -> Dict[str, Dict[str, Any]]:
+    """Breaker state and retry counts per upstream, for /api/stats."""
+    with _upstreams_lock:
+        return {
+            name: {
+                **u.breaker.stats(),
+                "retries": u.transport.retries + u.async_transport.retries,
+            }
+            for name, u in _upstreams.items()
+        }
+
+
+def reset_clients() -> None:
+    """Close and forget every client (tests, or after fork); async pools are left to the GC."""
+    with _upstreams_lock:
+        for upstream in _upstreams.values():
+            upstream.client.close()
+        _upstreams.clear()
@@ -0,0 +1,113 @@
+"""
+index_catalog.py
+
+Small summary of what the vector index holds, so the API never scans Chroma:
+ - IndexCatalog.from_metadatas: companies, report periods and chunk counts from chunk metadata
+ - IndexCatalog.from_collection: the same, paging through a Chroma collection
+                                 (fallback for indexes built before the catalog existed)
+ - IndexCatalog.save / load:     JSON file written by build_index.py next to the index
+"""
+
+import json
+import logging
+import os
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+CATALOG_VERSION = 1
+
+
+@dataclass
+class IndexCatalog:
+    """
+    Per-company summary of the indexed chunks.
+
+    `companies` maps slug → {"name", "chunks", "sources", "periods"} where
+    `periods` are the sorted period_end_date values of the indexed reports.
+    """
+
+    index_version: Optional[str] = None
+    companies: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    generated_at: Optional[str] = None
+
+    @property
+    def chunks(self) -> int:
+        return sum(c["chunks"] for c in self.companies.values())
+
+    def slugs(self) -> List[str]:
+        return sorted(self.companies)
+
+    def __len__(self) -> int:
+        return len(self.companies)
+
+    @classmethod
+    def from_metadatas(cls, metadatas: Iterable[Dict[str, Any]], index_version: Optional[str] = None) -> "IndexCatalog":
+        """Summarize chunk metadata dicts (company_slug, source_txt, period_end_date, company)."""
+        acc: Dict[str, Dict[str, Any]] = {}
+        for meta in metadatas:
+            slug = meta.get("company_slug")
+            if not slug:
+                continue
+            entry = acc.setdefault(slug, {"name": None, "chunks": 0, "sources": set(), "periods": set()})
+            entry["chunks"] += 1
+            entry["name"] = entry["name"] or meta.get("company")
+            if meta.get("source_txt"):
+                entry["sources"].add(meta["source_txt"])
+            if meta.get("period_end_date"):
+                entry["periods"].add(str(meta["period_end_date"]))
+        companies = {
+            slug: {
+                "name": e["name"] or slug,
+                "chunks": e["chunks"],
+                "sources": len(e["sources"]),
+                "periods": sorted(e["periods"]),
+            }
+            for slug, e in sorted(acc.items())
+        }
+        return cls(index_version, companies, datetime.now(timezone.utc).isoformat(timespec="seconds"))
+
+    @classmethod
+    def from_collection(cls, collection: Any, index_version: Optional[str] = None,
+                        page_size: int = 5_000) -> "IndexCatalog":
+        """Build the catalog by paging through every chunk's metadata in a Chroma collection."""
+        metadatas: List[Dict[str, Any]] = []
+        offset = 0
+        while True:
+            page = collection.get(include=["metadatas"], limit=page_size, offset=offset)
+            metadatas.extend(page["metadatas"])
+            if len(page["ids"]) < page_size:
+                break
+            offset += page_size
+        return cls.from_metadatas(metadatas, index_version)
+
+    # ─── Persistence ──────────────────────────────────────────────────────────
+    def save(self, path: Path) -> None:
+        """Atomically write the catalog (temp file + rename)."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(path.suffix + ".tmp")
+        payload = {
+            "version": CATALOG_VERSION,
+            "index_version": self.index_version,
+            "generated_at": self.generated_at,
+            "chunks": self.chunks,
+            "companies": self.companies,
+        }
+        tmp.write_text(json.dumps(payload, indent=2), encoding="utf-8")
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: Path) -> Optional["IndexCatalog"]:
+        """Load a saved catalog; None if it is missing or has an old format."""
+        try:
+            payload = json.loads(Path(path).read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return None
+        if payload.get("version") != CATALOG_VERSION:
+            logger.warning("Index catalog %s has an old format; rebuild the index", path)
+            return None
+        return cls(payload.get("index_version"), payload.get("companies", {}), payload.get("generated_at"))
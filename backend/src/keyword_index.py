@@ -0,0 +1,173 @@
+"""
+keyword_index.py
+
+Local keyword retrieval to complement the Chroma vector search:
+ - tokenize:                 lower-case terms, keeping dates, quarters and numbers intact
+ - KeywordIndex:             BM25 over the indexed chunks, persisted next to Chroma
+                             by build_index.py and loaded by the API
+ - is_conclusive:            whether keyword hits alone are good enough to skip embedding
+ - reciprocal_rank_fusion:   merge several ranked id lists into one
+"""
+
+import json
+import logging
+import math
+import os
+import re
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+from langchain.docstore.document import Document
+
+logger = logging.getLogger(__name__)
+
+KEYWORD_INDEX_VERSION = 1
+
+MONTHS = (
+    "january", "february", "march", "april", "may", "june",
+    "july", "august", "september", "october", "november", "december",
+)
+STOPWORDS = frozenset(
+    "a an and are as at be by for from how in is it its of on or the this to was were "
+    "what which with did does do show me tell give".split()
+)
+TOKEN_RE = re.compile(
+    r"\d{1,2}/\d{1,2}/\d{2,4}|\d{4}-\d{2}-\d{2}|\d+(?:st|nd|rd|th)\b|[a-z]+\d*|\d[\d,]*(?:\.\d+)?"
+)
+ORDINAL_RE = re.compile(r"^(\d+)(?:st|nd|rd|th)$")
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Split text into index terms.
+
+    Numbers lose their thousands separators ("12,730" → "12730"), ordinals
+    their suffix ("31st" → "31"), and dates become their day, month name and
+    year so "31/12/2023" matches "31st December 2023".
+    """
+    out: List[str] = []
+    for tok in TOKEN_RE.findall(text.lower()):
+        if "/" in tok or (len(tok) == 10 and tok[4] == "-"):
+            parts = tok.split("/") if "/" in tok else tok.split("-")[::-1]
+            day, month, year = parts
+            if day.isdigit():
+                out.append(str(int(day)))
+            if month.isdigit() and 1 <= int(month) <= 12:
+                out.append(MONTHS[int(month) - 1])
+            out.append(year if len(year) == 4 else f"20{year}")
+            continue
+        m = ORDINAL_RE.match(tok)
+        if m:
+            out.append(m.group(1))
+        elif tok.isdigit():
+            out.append(str(int(tok)))  # "03 months" == "3 months"
+        elif tok[0].isdigit():
+            out.append(tok.replace(",", ""))
+        elif tok not in STOPWORDS:
+            out.append(tok)
+    return out
+
+
+def reciprocal_rank_fusion(rankings: Sequence[Sequence[str]], k: int = 60) -> List[str]:
+    """Fuse ranked id lists: score(id) = Σ 1 / (k + rank), best first."""
+    scores: Dict[str, float] = defaultdict(float)
+    for ranking in rankings:
+        for rank, item in enumerate(ranking, start=1):
+            scores[item] += 1.0 / (k + rank)
+    return sorted(scores, key=lambda item: (-scores[item], item))
+
+
+@dataclass
+class KeywordHit:
+    """One BM25 result; `coverage` is the share of query terms the chunk contains."""
+
+    doc: Document
+    score: float
+    coverage: float
+
+
+class KeywordIndex:
+    """
+    In-memory BM25 (Okapi, k1/b) over chunk texts, filterable by company slug.
+
+    Only the chunks themselves are persisted; postings and document
+    frequencies are rebuilt on load, which takes milliseconds for this corpus.
+    """
+
+    def __init__(self, docs: Sequence[Document] = (), k1: float = 1.5, b: float = 0.75) -> None:
+        self.k1 = k1
+        self.b = b
+        self.docs: List[Document] = list(docs)
+        self._postings: Dict[str, List[tuple]] = defaultdict(list)
+        self._lengths: List[int] = []
+        for i, doc in enumerate(self.docs):
+            counts = Counter(tokenize(doc.page_content))
+            self._lengths.append(sum(counts.values()))
+            for term, tf in counts.items():
+                self._postings[term].append((i, tf))
+        self._avgdl = sum(self._lengths) / len(self._lengths) if self._lengths else 0.0
+
+    def __len__(self) -> int:
+        return len(self.docs)
+
+    def _idf(self, term: str) -> float:
+        df = len(self._postings.get(term, ()))
+        return math.log(1 + (len(self.docs) - df + 0.5) / (df + 0.5))
+
+    def search(self, query: str, company: Optional[str] = None, k: int = 8) -> List[KeywordHit]:
+        """Return the top-`k` chunks for `query`, optionally restricted to one company."""
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms or not self.docs:
+            return []
+        scores: Dict[int, float] = defaultdict(float)
+        matched: Dict[int, int] = defaultdict(int)
+        for term in terms:
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            idf = self._idf(term)
+            for i, tf in postings:
+                if company is not None and self.docs[i].metadata.get("company_slug") != company:
+                    continue
+                norm = self.k1 * (1 - self.b + self.b * self._lengths[i] / self._avgdl)
+                scores[i] += idf * tf * (self.k1 + 1) / (tf + norm)
+                matched[i] += 1
+        best = sorted(scores, key=lambda i: (-scores[i], i))[:k]
+        return [KeywordHit(self.docs[i], scores[i], matched[i] / len(terms)) for i in best]
+
+    # ─── Persistence ──────────────────────────────────────────────────────────
+    def save(self, path: Path) -> None:
+        """Atomically write the indexed chunks (temp file + rename)."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(path.suffix + ".tmp")
+        payload: Dict[str, Any] = {
+            "version": KEYWORD_INDEX_VERSION,
+            "docs": [{"text": d.page_content, "metadata": d.metadata} for d in self.docs],
+        }
+        tmp.write_text(json.dumps(payload), encoding="utf-8")
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: Path) -> "KeywordIndex":
+        """Load a saved index; a missing or outdated file gives an empty index."""
+        try:
+            payload = json.loads(Path(path).read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            logger.warning("Keyword index %s not found; keyword retrieval disabled", path)
+            return cls()
+        if payload.get("version") != KEYWORD_INDEX_VERSION:
+            logger.warning("Keyword index %s has an old format; rebuild the index", path)
+            return cls()
+        return cls(Document(page_content=d["text"], metadata=d["metadata"]) for d in payload["docs"])
+
+
+def is_conclusive(query: str, hits: Sequence[KeywordHit], k: int) -> bool:
+    """
+    True when keyword hits alone can answer: there are at least `k` of
+    them, the query names something exact (a date, quarter or figure) and
+    the best chunk contains every query term.
+    """
+    return len(hits) >= k and any(ch.isdigit() for ch in query) and hits[0].coverage == 1.0
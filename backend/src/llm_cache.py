@@ -0,0 +1,144 @@
+"""
+llm_cache.py
+
+Persistent cache of raw LLM responses for the extraction stage:
+ - response_key:        hex key from the model, temperature and hash of the rendered prompt
+ - SQLiteResponseCache: content-addressed responses in a SQLite file, bounded in bytes;
+                        the least recently used entries are evicted first
+ - CachedChatModel:     wraps a LangChain chat model so a prompt it has already
+                        answered usefully is served from the cache, with no network call
+"""
+
+import hashlib
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from langchain.schema import AIMessage
+
+
+def response_key(model: str, temperature: Optional[float], prompt: str) -> str:
+    """Return the hex key for `prompt` sent to `model` at `temperature`."""
+    prompt_hash = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+    return hashlib.sha256(f"{model}\x00{temperature}\x00{prompt_hash}".encode("utf-8")).hexdigest()
+
+
+class SQLiteResponseCache:
+    """
+    Raw LLM responses persisted in a SQLite file.
+
+    WAL mode lets pipeline shards running side by side share the file. Once
+    the stored responses exceed `max_bytes`, the least recently read or
+    written ones are deleted until they fit again.
+    """
+
+    def __init__(self, path: Path, max_bytes: int = 256 * 1024 * 1024) -> None:
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.evictions = 0
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        with self._conn() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                " key TEXT PRIMARY KEY, response TEXT NOT NULL, size INTEGER NOT NULL,"
+                " created REAL NOT NULL, used REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS responses_used ON responses (used)")
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: str) -> Optional[str]:
+        with self._conn() as conn:
+            row = conn.execute("SELECT response FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            conn.execute("UPDATE responses SET used = ? WHERE key = ?", (time.time(), key))
+        return row[0]
+
+    def set(self, key: str, response: str) -> None:
+        now = time.time()
+        with self._conn() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO responses (key, response, size, created, used) VALUES (?, ?, ?, ?, ?)",
+                (key, response, len(response.encode("utf-8")), now, now),
+            )
+            total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+            if total > self.max_bytes:
+                self._evict(conn, total - self.max_bytes)
+
+    def _evict(self, conn: sqlite3.Connection, excess: int) -> None:
+        victims: List[str] = []
+        for key, size in conn.execute("SELECT key, size FROM responses ORDER BY used"):
+            victims.append(key)
+            excess -= size
+            if excess <= 0:
+                break
+        conn.executemany("DELETE FROM responses WHERE key = ?", [(k,) for k in victims])
+        self.evictions += len(victims)
+
+    def stats(self) -> Dict[str, Any]:
+        entries, size = self._conn().execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+        return {"entries": entries, "bytes": size, "max_bytes": self.max_bytes, "evictions": self.evictions}
+
+
+class CachedChatModel:
+    """
+    Chat model wrapper that answers repeated prompts from a response cache.
+
+    Keys combine `model`, the temperature and the hash of every message, so a
+    change to the prompt template, snippet or model is always a miss. A reply
+    is only cached when the caller `store`s it after checking it, so one that
+    could not be parsed is asked again next time. With `refresh` the cache is
+    not read, only rewritten. Errors from the wrapped model are raised.
+    """
+
+    def __init__(
+        self,
+        client: Any,
+        cache: SQLiteResponseCache,
+        model: str,
+        temperature: Optional[float] = None,
+        refresh: bool = False,
+    ) -> None:
+        self.client = client
+        self.cache = cache
+        self.model = model
+        self.temperature = temperature if temperature is not None else getattr(client, "temperature", None)
+        self.refresh = refresh
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def _key(self, messages: List[Any]) -> str:
+        prompt = "\x00".join(f"{getattr(m, 'type', '')}\x00{getattr(m, 'content', m)}" for m in messages)
+        return response_key(self.model, self.temperature, prompt)
+
+    def invoke(self, messages: List[Any], **kwargs: Any) -> Any:
+        key = self._key(messages)
+        if not self.refresh:
+            cached = self.cache.get(key)
+            if cached is not None:
+                with self._lock:
+                    self.hits += 1
+                return AIMessage(content=cached)
+        with self._lock:
+            self.misses += 1
+        return getattr(self.client, "invoke", self.client)(messages, **kwargs)
+
+    def store(self, messages: List[Any], response: str) -> None:
+        """Cache `response` as the reply to `messages`."""
+        self.cache.set(self._key(messages), response)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters and the store's size."""
+        return {"hits": self.hits, "misses": self.misses, **self.cache.stats()}
@@ -0,0 +1,144 @@
+"""
+manifest.py
+
+Incremental bookkeeping for the PDF → JSON extraction stage:
+ - file_sha256:         content hash of a file
+ - ExtractionManifest:  JSON manifest under data/interim/ recording, per raw PDF,
+                        the content hash, prompt hash and model it was extracted
+                        with, plus the resulting record; runs over different
+                        companies (pipeline shards) can share it
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, Set, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows: shards must not run side by side there
+    fcntl = None  # type: ignore[assignment]
+
+MANIFEST_VERSION = 1
+
+
+def file_sha256(path: Path, chunk_size: int = 1 << 20) -> str:
+    """Return the hex SHA-256 of a file, read in chunks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for block in iter(lambda: fh.read(chunk_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class ExtractionManifest:
+    """
+    Map each raw PDF (by path relative to the raw root) to what it was
+    extracted from and what it produced.
+
+    An entry is current when the PDF's content hash, the prompt hash and the
+    model name all match and the previous extraction succeeded. Content
+    hashes are cached against (size, mtime), so an unchanged corpus is
+    checked with one stat() per file and no reads.
+    """
+
+    def __init__(self, path: Path, root: Path) -> None:
+        self.path = Path(path)
+        self.root = Path(root)
+        self.dirty = False
+        self.unsaved = 0
+        self._changed: Set[str] = set()   # keys this instance updated or forgot
+        self.entries: Dict[str, Dict[str, Any]] = self._read()
+
+    def _read(self) -> Dict[str, Dict[str, Any]]:
+        if self.path.exists():
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+            if data.get("version") == MANIFEST_VERSION:
+                return data.get("entries", {})
+        return {}
+
+    def key(self, pdf_path: Path) -> str:
+        return pdf_path.relative_to(self.root).as_posix()
+
+    def content_hash(self, pdf_path: Path) -> Tuple[str, int, int]:
+        """Return (sha256, size, mtime_ns), reusing the stored hash if the file is untouched."""
+        st = pdf_path.stat()
+        entry = self.entries.get(self.key(pdf_path))
+        if entry and entry.get("size") == st.st_size and entry.get("mtime_ns") == st.st_mtime_ns:
+            return entry["sha256"], st.st_size, st.st_mtime_ns
+        return file_sha256(pdf_path), st.st_size, st.st_mtime_ns
+
+    def is_current(self, pdf_path: Path, sha256: str, prompt_hash: str, model: str) -> bool:
+        entry = self.entries.get(self.key(pdf_path))
+        return bool(
+            entry
+            and entry.get("status") == "ok"
+            and entry.get("sha256") == sha256
+            and entry.get("prompt_hash") == prompt_hash
+            and entry.get("model") == model
+        )
+
+    def touch(self, pdf_path: Path, size: int, mtime_ns: int) -> None:
+        """Refresh the cached stat of an unchanged PDF so it is not re-hashed next time."""
+        entry = self.entries.get(self.key(pdf_path))
+        if entry and (entry.get("size"), entry.get("mtime_ns")) != (size, mtime_ns):
+            entry["size"], entry["mtime_ns"] = size, mtime_ns
+            self._changed.add(self.key(pdf_path))
+            self.dirty = True
+
+    def update(
+        self,
+        pdf_path: Path,
+        fingerprint: Dict[str, Any],
+        slug: Optional[str],
+        record: Optional[Dict[str, Any]],
+    ) -> None:
+        """Record the outcome of extracting `pdf_path`; `record=None` marks a failure."""
+        key = self.key(pdf_path)
+        self.entries[key] = {
+            **fingerprint,
+            "status": "ok" if record is not None else "failed",
+            "slug": slug,
+            "record": record,
+        }
+        self._changed.add(key)
+        self.dirty = True
+        self.unsaved += 1
+
+    def forget(self, key: str) -> Optional[Dict[str, Any]]:
+        self._changed.add(key)
+        self.dirty = True
+        return self.entries.pop(key, None)
+
+    def records(self) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """Yield (key, entry) for successful extractions in serial-run (sorted) order."""
+        for key in sorted(self.entries):
+            entry = self.entries[key]
+            if entry.get("status") == "ok":
+                yield key, entry
+
+    def save(self) -> None:
+        """
+        Atomically write the manifest (temp file + rename). Under a lock, this
+        instance's changes are applied to what is on disk, so entries other
+        processes saved since it was loaded are kept.
+        """
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path.with_suffix(self.path.suffix + ".lock"), "w") as lock:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            entries = self._read()
+            for key in self._changed:
+                if key in self.entries:
+                    entries[key] = self.entries[key]
+                else:
+                    entries.pop(key, None)
+            tmp = self.path.with_suffix(self.path.suffix + ".tmp")
+            payload = {"version": MANIFEST_VERSION, "entries": entries}
+            tmp.write_text(json.dumps(payload, indent=1, sort_keys=True), encoding="utf-8")
+            os.replace(tmp, self.path)
+        self.entries = entries
+        self._changed.clear()
+        self.dirty = False
+        self.unsaved = 0
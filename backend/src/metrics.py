@@ -0,0 +1,105 @@
+"""
+metrics.py
+
+Vectorized derived P&L metrics for all companies in one pass:
+ - compute_metrics: margins, QoQ / YoY growth and trailing-twelve-month sums
+                    over rows sorted by (company, period_end_date)
+
+Lagged values only count when they belong to the same company and sit the
+expected distance back in time, so a missing quarter yields NaN rather than
+comparing against the wrong period.
+"""
+
+from typing import Dict, Tuple
+
+import numpy as np
+
+MARGIN_FIELDS: Dict[str, str] = {
+    "gross_margin": "gross_profit",
+    "operating_margin": "operating_income",
+    "net_margin": "net_income",
+}
+GROWTH_BASES = ("revenue", "gross_profit", "net_income")
+TTM_BASES = ("revenue", "gross_profit", "net_income")
+
+METRIC_FIELDS: Tuple[str, ...] = (
+    *MARGIN_FIELDS,
+    *(f"{base}_qoq" for base in GROWTH_BASES),
+    *(f"{base}_yoy" for base in GROWTH_BASES),
+    *(f"ttm_{base}" for base in TTM_BASES),
+)
+
+# allowed gap in days between a quarter and the one `lag` rows back
+QOQ_DAYS = (75, 106)      # lag 1
+YOY_DAYS = (350, 380)     # lag 4
+TTM_SPAN_DAYS = (258, 288)  # lag 3: first and last quarter of a 4-quarter window
+
+
+def _lag_mask(company: np.ndarray, days: np.ndarray, lag: int, window: Tuple[int, int]) -> np.ndarray:
+    """True where row i-`lag` is the same company and `window` days earlier."""
+    ok = np.zeros(len(company), dtype=bool)
+    if lag < len(company):
+        gap = days[lag:] - days[:-lag]
+        ok[lag:] = (company[lag:] == company[:-lag]) & (gap >= window[0]) & (gap <= window[1])
+    return ok
+
+
+def _shift(values: np.ndarray, lag: int) -> np.ndarray:
+    out = np.full(len(values), np.nan)
+    if lag < len(values):
+        out[lag:] = values[:-lag]
+    return out
+
+
+def _pct_change(values: np.ndarray, prev: np.ndarray) -> np.ndarray:
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out = (values - prev) / np.abs(prev) * 100.0
+    out[~np.isfinite(out)] = np.nan
+    return out
+
+
+def compute_metrics(
+    company: np.ndarray,
+    dates: np.ndarray,
+    columns: Dict[str, np.ndarray],
+) -> Dict[str, np.ndarray]:
+    """
+    Compute every metric in METRIC_FIELDS.
+
+    Args:
+        company: Integer company code per row.
+        dates: `datetime64[D]` period_end_date per row.
+        columns: float64 P&L columns (revenue, gross_profit, operating_income,
+            net_income, unit_multiplier); NaN where missing.
+
+    Rows must be sorted by (company, date). Margins and growth are
+    percentages; TTM sums are in absolute currency (values × unit_multiplier,
+    a missing multiplier counting as 1) and need four consecutive quarters.
+
+    Returns:
+        dict: metric name → float64 array aligned with the input rows.
+    """
+    days = dates.astype("int64")
+    revenue = columns["revenue"]
+    out: Dict[str, np.ndarray] = {}
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for name, base in MARGIN_FIELDS.items():
+            margin = columns[base] / revenue * 100.0
+            margin[~np.isfinite(margin)] = np.nan
+            out[name] = margin
+
+    for suffix, lag, window in (("qoq", 1, QOQ_DAYS), ("yoy", 4, YOY_DAYS)):
+        ok = _lag_mask(company, days, lag, window)
+        for base in GROWTH_BASES:
+            prev = np.where(ok, _shift(columns[base], lag), np.nan)
+            out[f"{base}_{suffix}"] = _pct_change(columns[base], prev)
+
+    multiplier = np.where(np.isnan(columns["unit_multiplier"]), 1.0, columns["unit_multiplier"])
+    window_ok = _lag_mask(company, days, 3, TTM_SPAN_DAYS)
+    for base in TTM_BASES:
+        scaled = columns[base] * multiplier
+        total = scaled + _shift(scaled, 1) + _shift(scaled, 2) + _shift(scaled, 3)
+        out[f"ttm_{base}"] = np.where(window_ok, total, np.nan)
+
+    return out
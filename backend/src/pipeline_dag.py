@@ -0,0 +1,327 @@
+"""
+pipeline_dag.py
+
+Incremental task graph for the data pipeline (backend/scripts/orchestrate.py):
+ - Task:        one unit of work ("extract:<company>/<pdf>") with its input files,
+                parameters and dependencies; may add follow-on tasks once it has run
+ - TaskState:   JSON record of each task's input fingerprint and the outputs it
+                wrote, so a task whose inputs and outputs are unchanged is skipped
+ - run_dag:     run tasks as soon as their dependencies finish, with a
+                concurrency limit per stage
+ - DagReport:   per-task timings, a per-stage breakdown and the critical path
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from backend.src.manifest import file_sha256
+
+logger = logging.getLogger(__name__)
+
+STATE_VERSION = 1
+
+
+def _no_inputs() -> List[Path]:
+    return []
+
+
+@dataclass
+class Task:
+    """
+    A node of the pipeline graph; the key's prefix up to ":" is its stage.
+
+    `inputs` is called just before the task would run, so it can list files
+    written by its dependencies. `deps` are task keys, or "stage:*" for every
+    task of a stage, including any still to be added by `expand`. A task
+    waits for its dependencies to finish but runs even if one failed, as the
+    stage scripts always have, on whatever inputs exist.
+    """
+
+    key: str
+    fn: Callable[[], Optional[Iterable[Path]]]          # does the work; returns the files it wrote
+    inputs: Callable[[], Iterable[Path]] = _no_inputs
+    params: Dict[str, Any] = field(default_factory=dict)
+    deps: Tuple[str, ...] = ()
+    always: bool = False                                # never skipped (e.g. network fetches)
+    expand: Optional[Callable[[], Iterable["Task"]]] = None
+
+    @property
+    def stage(self) -> str:
+        return self.key.split(":", 1)[0]
+
+
+class TaskState:
+    """
+    Fingerprints of the last successful run of each task, saved as JSON.
+
+    A task is fresh when the hash of its inputs and parameters matches and
+    every output it wrote still has the recorded content. File hashes are
+    cached against (size, mtime), so checking an unchanged tree costs one
+    stat() per file.
+    """
+
+    def __init__(self, path: Path, root: Path) -> None:
+        self.path = Path(path)
+        self.root = Path(root)
+        self._lock = threading.Lock()
+        self.files: Dict[str, Dict[str, Any]] = {}
+        self.tasks: Dict[str, Dict[str, Any]] = {}
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except (FileNotFoundError, ValueError):
+            data = {}
+        if data.get("version") == STATE_VERSION:
+            self.files, self.tasks = data.get("files", {}), data.get("tasks", {})
+
+    def _key(self, path: Path) -> str:
+        try:
+            return path.resolve().relative_to(self.root.resolve()).as_posix()
+        except ValueError:
+            return path.resolve().as_posix()
+
+    def file_hash(self, path: Path) -> Optional[str]:
+        """Content hash of `path`, or None if it does not exist."""
+        try:
+            st = path.stat()
+        except FileNotFoundError:
+            return None
+        key = self._key(path)
+        with self._lock:
+            cached = self.files.get(key)
+        if cached and (cached["size"], cached["mtime_ns"]) == (st.st_size, st.st_mtime_ns):
+            return cached["sha256"]
+        sha256 = file_sha256(path)
+        with self._lock:
+            self.files[key] = {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "sha256": sha256}
+        return sha256
+
+    def fingerprint(self, inputs: Iterable[Path], params: Dict[str, Any]) -> str:
+        files = sorted((self._key(p), self.file_hash(p)) for p in inputs)
+        blob = json.dumps({"params": params, "files": files}, sort_keys=True, default=str)
+        return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+    def is_fresh(self, key: str, fingerprint: str) -> bool:
+        with self._lock:
+            entry = self.tasks.get(key)
+        return bool(
+            entry
+            and entry["fingerprint"] == fingerprint
+            and all(self.file_hash(self.root / p) == h for p, h in entry["outputs"].items())
+        )
+
+    def record(self, key: str, fingerprint: str, outputs: Iterable[Path]) -> None:
+        hashes = {self._key(p): self.file_hash(p) for p in outputs}
+        with self._lock:
+            self.tasks[key] = {
+                "fingerprint": fingerprint,
+                "outputs": {p: h for p, h in hashes.items() if h is not None},
+            }
+
+    def forget(self, key: str) -> None:
+        with self._lock:
+            self.tasks.pop(key, None)
+
+    def save(self) -> None:
+        """Write the state atomically."""
+        with self._lock:
+            payload = json.dumps(
+                {"version": STATE_VERSION, "files": self.files, "tasks": self.tasks},
+                indent=1, sort_keys=True,
+            )
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(self.path.suffix + ".tmp")
+        tmp.write_text(payload, encoding="utf-8")
+        os.replace(tmp, self.path)
+
+
+# ─── Report ──────────────────────────────────────────────────────────────────
+@dataclass
+class TaskResult:
+    """Outcome of one task; `status` is ran, fresh, failed or blocked. Times are seconds since the run began."""
+
+    key: str
+    status: str
+    start: float
+    end: float
+    error: Optional[str] = None
+    preds: Tuple[str, ...] = ()      # dependencies (wildcards resolved) and the task that added it
+
+    @property
+    def stage(self) -> str:
+        return self.key.split(":", 1)[0]
+
+    @property
+    def seconds(self) -> float:
+        return self.end - self.start
+
+
+@dataclass
+class DagReport:
+    """Timings of one run_dag call."""
+
+    results: Dict[str, TaskResult]
+    wall: float
+
+    @property
+    def failed(self) -> List[TaskResult]:
+        return [r for r in self.results.values() if r.status in ("failed", "blocked")]
+
+    def stages(self) -> Dict[str, Dict[str, Any]]:
+        """Per stage, in order of first start: task counts by status, busy seconds and wall-clock span."""
+        out: Dict[str, Dict[str, Any]] = {}
+        for r in sorted(self.results.values(), key=lambda r: r.start):
+            s = out.setdefault(r.stage, {
+                "tasks": 0, "ran": 0, "fresh": 0, "failed": 0, "blocked": 0,
+                "busy": 0.0, "first": r.start, "last": r.end,
+            })
+            s["tasks"] += 1
+            s[r.status] += 1
+            s["busy"] += r.seconds
+            s["last"] = max(s["last"], r.end)
+        return out
+
+    def critical_path(self) -> List[TaskResult]:
+        """
+        The chain of tasks that determined the run's length: from the task that
+        finished last, repeatedly step back to the predecessor that finished last.
+        """
+        finished = [r for r in self.results.values() if r.status != "blocked"]
+        if not finished:
+            return []
+        node = max(finished, key=lambda r: r.end)
+        path = [node]
+        while True:
+            preds = [self.results[k] for k in node.preds if k in self.results]
+            if not preds:
+                return path[::-1]
+            node = max(preds, key=lambda r: r.end)
+            path.append(node)
+
+    def format(self) -> str:
+        lines = [f"{'stage':<9}{'tasks':>7}{'ran':>6}{'fresh':>7}{'failed':>8}{'busy s':>9}{'span s':>9}"]
+        for stage, s in self.stages().items():
+            lines.append(
+                f"{stage:<9}{s['tasks']:>7}{s['ran']:>6}{s['fresh']:>7}{s['failed'] + s['blocked']:>8}"
+                f"{s['busy']:>9.2f}{s['last'] - s['first']:>9.2f}"
+            )
+        path = self.critical_path()
+        lines.append(
+            f"critical path {sum(r.seconds for r in path):.2f}s of {self.wall:.2f}s wall: "
+            + " → ".join(f"{r.key} ({r.seconds:.2f}s)" for r in path)
+        )
+        for r in self.failed:
+            lines.append(f"{r.status.upper()}: {r.key}: {r.error}")
+        return "\n".join(lines)
+
+
+# ─── Scheduler ───────────────────────────────────────────────────────────────
+def run_dag(
+    tasks: Iterable[Task],
+    state: TaskState,
+    limits: Optional[Dict[str, int]] = None,
+    default_limit: int = 4,
+    force: bool = False,
+) -> DagReport:
+    """
+    Run `tasks`, and those they add, as their dependencies finish.
+
+    At most `limits[stage]` (else `default_limit`) tasks of a stage run at
+    once. A task is skipped if `state` says it is fresh, unless `force` or
+    `task.always`. Tasks still waiting when nothing else can run (a
+    dependency that never appeared) are reported as blocked. The state is
+    saved at the end.
+    """
+    limits = dict(limits or {})
+    t0 = time.perf_counter()
+    pending: Dict[str, Task] = {}
+    parents: Dict[str, str] = {}
+    results: Dict[str, TaskResult] = {}
+    running: Dict[Future, Task] = {}
+    per_stage: Dict[str, int] = {}
+    expanding = 0           # unfinished tasks that may still add more
+
+    def add(task: Task, parent: Optional[str] = None) -> None:
+        nonlocal expanding
+        if task.key in pending or task.key in results or any(t.key == task.key for t in running.values()):
+            raise ValueError(f"Duplicate task {task.key!r}")
+        pending[task.key] = task
+        if parent:
+            parents[task.key] = parent
+        expanding += task.expand is not None
+
+    def resolve(dep: str) -> Optional[List[str]]:
+        """Finished task keys `dep` stands for, or None while it is unfinished."""
+        if dep.endswith("*"):
+            prefix = dep[:-1]
+            if expanding or any(k.startswith(prefix) for k in pending) \
+                    or any(t.key.startswith(prefix) for t in running.values()):
+                return None
+            return [k for k in results if k.startswith(prefix)]
+        return [dep] if dep in results else None
+
+    def execute(task: Task, preds: Tuple[str, ...]) -> Tuple[TaskResult, List[Task]]:
+        start = time.perf_counter() - t0
+        status, error = "ran", None
+        try:
+            fingerprint = state.fingerprint(task.inputs(), task.params)
+            if not (force or task.always) and state.is_fresh(task.key, fingerprint):
+                status = "fresh"
+            else:
+                state.record(task.key, fingerprint, task.fn() or ())
+        except (Exception, SystemExit) as exc:
+            logger.exception("Task %s failed", task.key)
+            state.forget(task.key)
+            status, error = "failed", repr(exc)
+        added: List[Task] = []
+        if task.expand is not None:
+            try:
+                added = list(task.expand())
+            except Exception as exc:
+                logger.exception("Task %s could not list its follow-on tasks", task.key)
+                status, error = "failed", repr(exc)
+        return TaskResult(task.key, status, start, time.perf_counter() - t0, error, preds), added
+
+    for task in tasks:
+        add(task)
+    workers = sum(limits.values()) + default_limit
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        while pending or running:
+            for key, task in list(pending.items()):
+                if per_stage.get(task.stage, 0) >= limits.get(task.stage, default_limit):
+                    continue
+                resolved = [resolve(d) for d in task.deps]
+                if any(r is None for r in resolved):
+                    continue
+                preds = tuple(k for r in resolved for k in r) + tuple(filter(None, [parents.get(key)]))
+                del pending[key]
+                per_stage[task.stage] = per_stage.get(task.stage, 0) + 1
+                running[pool.submit(execute, task, preds)] = task
+
+            if not running:
+                now = time.perf_counter() - t0
+                for key, task in pending.items():
+                    results[key] = TaskResult(key, "blocked", now, now, "dependency never ran: "
+                                              + ", ".join(d for d in task.deps if resolve(d) is None))
+                pending.clear()
+                break
+
+            done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+            for fut in done:
+                task = running.pop(fut)
+                per_stage[task.stage] -= 1
+                result, added = fut.result()
+                results[task.key] = result
+                for new in added:
+                    add(new, parent=task.key)
+                expanding -= task.expand is not None
+
+    state.save()
+    return DagReport(results, time.perf_counter() - t0)
@@ -0,0 +1,309 @@
+"""
+query_router.py
+
+Answer simple numeric P&L questions straight from the financials store:
+ - parse_intent:   pull metric(s), period(s) and comparison out of a question
+ - QueryRouter:    answer a parsed intent from FinancialStore, or return None
+                   so the caller falls back to retrieval + LLM
+ - RoutingStats:   per-route request counts and latency percentiles
+"""
+
+import re
+import threading
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from time import perf_counter
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from backend.src.financial_store import FinancialStore
+from backend.src.metrics import QOQ_DAYS, YOY_DAYS
+
+METRIC_ALIASES: Dict[str, str] = {
+    "gross profit margin": "gross_margin",
+    "gross margin": "gross_margin",
+    "net profit margin": "net_margin",
+    "net margin": "net_margin",
+    "operating profit margin": "operating_margin",
+    "operating margin": "operating_margin",
+    "ttm revenue": "ttm_revenue",
+    "trailing twelve month revenue": "ttm_revenue",
+    "ttm net income": "ttm_net_income",
+    "ttm net profit": "ttm_net_income",
+    "trailing twelve month net income": "ttm_net_income",
+    "gross profit": "gross_profit",
+    "net income": "net_income",
+    "net profit": "net_income",
+    "profit after tax": "net_income",
+    "profit for the period": "net_income",
+    "earnings": "net_income",
+    "operating income": "operating_income",
+    "operating profit": "operating_income",
+    "ebit": "operating_income",
+    "operating expenses": "operating_expenses",
+    "opex": "operating_expenses",
+    "cost of sales": "cogs",
+    "cost of goods sold": "cogs",
+    "cogs": "cogs",
+    "revenue": "revenue",
+    "sales": "revenue",
+    "turnover": "revenue",
+}
+METRIC_LABELS: Dict[str, str] = {
+    "revenue": "Revenue",
+    "cogs": "Cost of sales",
+    "gross_profit": "Gross profit",
+    "operating_expenses": "Operating expenses",
+    "operating_income": "Operating income",
+    "net_income": "Net income",
+    "gross_margin": "Gross margin",
+    "operating_margin": "Operating margin",
+    "net_margin": "Net margin",
+    "ttm_revenue": "TTM revenue",
+    "ttm_net_income": "TTM net income",
+}
+PERCENT_METRICS = {"gross_margin", "operating_margin", "net_margin"}
+ABSOLUTE_METRICS = {"ttm_revenue", "ttm_net_income"}  # already × unit_multiplier
+UNIT_WORDS = {1: "", 1_000: " thousand", 1_000_000: " million", 1_000_000_000: " billion"}
+
+METRIC_RE = re.compile(
+    r"\b(" + "|".join(re.escape(a) for a in sorted(METRIC_ALIASES, key=len, reverse=True)) + r")\b"
+)
+YEAR = r"((?:19|20)\d{2})"
+PERIOD_RES = [
+    ("quarter", re.compile(r"\bq([1-4])(?:\s+of|,)?\s*(?:fy\s*)?" + YEAR + r"\b")),
+    ("year_quarter", re.compile(r"\b" + YEAR + r"\s*q([1-4])\b")),
+    ("dmy", re.compile(r"\b(\d{1,2})/(\d{1,2})/" + YEAR + r"\b")),
+    ("iso", re.compile(r"\b" + YEAR + r"-(\d{2})-(\d{2})\b")),
+    ("month", re.compile(
+        r"\b(jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*\.?\s+" + YEAR + r"\b"
+    )),
+]
+LATEST_RE = re.compile(r"\b(latest|most recent|last|current|recent)\b")
+QOQ_RE = re.compile(r"\b(qoq|quarter[- ]on[- ]quarter|quarter[- ]over[- ]quarter|previous quarter|prior quarter|sequential)")
+YOY_RE = re.compile(r"\b(yoy|year[- ]on[- ]year|year[- ]over[- ]year|same quarter last year|previous year|prior year|last year)")
+CHANGE_RE = re.compile(r"\b(change|changed|growth|grow|grew|increase|decrease|compare|compared|comparison|vs\.?|versus|difference)\b")
+OPEN_ENDED_RE = re.compile(
+    r"\b(why|explain|reason|driver|drivers|cause|caused|outlook|forecast|predict|should|"
+    r"recommend|trend|trends|summar\w*|analy\w*|risk|risks|strategy|impact|insight)\b"
+)
+MONTHS = ("jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec")
+
+
+def quarter_end(year: int, month: int) -> date:
+    """Last day of the calendar quarter containing `month`."""
+    end_month = ((month - 1) // 3 + 1) * 3
+    nxt = date(year + (end_month == 12), end_month % 12 + 1, 1)
+    return nxt - timedelta(days=1)
+
+
+@dataclass
+class Intent:
+    """A parsed lookup: metrics for one or two periods, optionally compared."""
+
+    metrics: List[str]
+    periods: List[date] = field(default_factory=list)   # empty + latest=True → latest quarter
+    latest: bool = False
+    comparison: Optional[str] = None                     # "periods", "qoq" or "yoy"
+
+
+def parse_intent(question: str) -> Optional[Intent]:
+    """
+    Parse a numeric lookup question, or return None if it is open-ended
+    or lacks a metric or period.
+    """
+    q = " ".join(question.lower().split())
+    if OPEN_ENDED_RE.search(q):
+        return None
+    metrics = list(dict.fromkeys(METRIC_ALIASES[m] for m in METRIC_RE.findall(q)))
+    if not metrics:
+        return None
+
+    found = []
+    for kind, regex in PERIOD_RES:
+        for m in regex.finditer(q):
+            g = m.groups()
+            try:
+                if kind == "quarter":
+                    d = quarter_end(int(g[1]), int(g[0]) * 3)
+                elif kind == "year_quarter":
+                    d = quarter_end(int(g[0]), int(g[1]) * 3)
+                elif kind == "dmy":
+                    d = quarter_end(int(g[2]), date(int(g[2]), int(g[1]), int(g[0])).month)
+                elif kind == "iso":
+                    d = quarter_end(int(g[0]), date(int(g[0]), int(g[1]), int(g[2])).month)
+                else:
+                    d = quarter_end(int(g[1]), MONTHS.index(g[0]) + 1)
+            except ValueError:
+                continue
+            found.append((m.start(), d))
+    periods = list(dict.fromkeys(d for _, d in sorted(found)))
+    latest = not periods and bool(LATEST_RE.search(q))
+    if not periods and not latest:
+        return None
+    if len(periods) > 2:
+        return None
+
+    comparison = None
+    if len(periods) == 2:
+        comparison = "periods"
+    elif YOY_RE.search(q):
+        comparison = "yoy"
+    elif QOQ_RE.search(q) or CHANGE_RE.search(q):
+        comparison = "qoq"
+    return Intent(metrics, sorted(periods), latest, comparison)
+
+
+@dataclass
+class StructuredAnswer:
+    """An answer produced without the LLM."""
+
+    answer: str
+    sources: List[str]
+
+
+class RoutingStats:
+    """Counts and recent latencies (bounded window) per route."""
+
+    def __init__(self, window: int = 1024) -> None:
+        self._lock = threading.Lock()
+        self._latencies: Dict[str, Deque[float]] = {}
+        self._counts: Dict[str, int] = {}
+        self.window = window
+
+    def record(self, route: str, seconds: float) -> None:
+        with self._lock:
+            self._counts[route] = self._counts.get(route, 0) + 1
+            self._latencies.setdefault(route, deque(maxlen=self.window)).append(seconds)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = sum(self._counts.values())
+            out: Dict[str, Any] = {}
+            for route, count in self._counts.items():
+                lat = sorted(self._latencies[route])
+                out[route] = {
+                    "count": count,
+                    "ratio": count / total,
+                    "mean_ms": round(sum(lat) / len(lat) * 1000, 2),
+                    "p50_ms": round(lat[len(lat) // 2] * 1000, 2),
+                    "p95_ms": round(lat[min(len(lat) - 1, int(len(lat) * 0.95))] * 1000, 2),
+                }
+            return out
+
+
+class QueryRouter:
+    """
+    Answer lookup questions ("net income in Q2 2023", "revenue growth vs
+    last year for the latest quarter") from the financials store.
+
+    Anything the store cannot answer exactly returns None, so the caller
+    falls back to retrieval + LLM.
+    """
+
+    def __init__(self, store: FinancialStore) -> None:
+        self.store = store
+        self.stats = RoutingStats()
+
+    def _rows(self, company: str) -> List[Dict[str, Any]]:
+        try:
+            return self.store.query([company])[company]
+        except KeyError:
+            return []
+
+    @staticmethod
+    def _find(rows: List[Dict[str, Any]], period: date) -> Optional[Dict[str, Any]]:
+        iso = period.isoformat()
+        return next((r for r in rows if r["period_end_date"] == iso), None)
+
+    @staticmethod
+    def _back(rows: List[Dict[str, Any]], row: Dict[str, Any], window: Tuple[int, int]) -> Optional[Dict[str, Any]]:
+        """The row whose period ends `window` days before `row`'s (same windows as metrics.py)."""
+        end = date.fromisoformat(row["period_end_date"])
+        for r in rows:
+            if window[0] <= (end - date.fromisoformat(r["period_end_date"])).days <= window[1]:
+                return r
+        return None
+
+    @staticmethod
+    def _fmt(metric: str, row: Dict[str, Any]) -> Optional[str]:
+        value = row.get(metric)
+        if value is None:
+            return None
+        if metric in PERCENT_METRICS:
+            return f"{value:.2f}%"
+        currency = row.get("currency") or "LKR"
+        if metric in ABSOLUTE_METRICS:
+            return f"{currency} {value:,.0f}"
+        mult = row.get("unit_multiplier") or 1
+        unit = UNIT_WORDS.get(int(mult), f" (× {mult:,.0f})")
+        return f"{currency} {value:,.0f}{unit}"
+
+    @staticmethod
+    def _period(row: Dict[str, Any]) -> str:
+        end = date.fromisoformat(row["period_end_date"])
+        return f"the quarter ended {end.isoformat()} (Q{(end.month - 1) // 3 + 1} {end.year})"
+
+    def _describe_change(self, metric: str, old: Dict[str, Any], new: Dict[str, Any]) -> Optional[str]:
+        a, b = old.get(metric), new.get(metric)
+        if a is None or b is None:
+            return None
+        label = METRIC_LABELS[metric]
+        if metric in PERCENT_METRICS:
+            delta = f"{b - a:+.2f} percentage points"
+        else:
+            pct = f" ({(b - a) / abs(a) * 100:+.1f}%)" if a else ""
+            delta = f"{b - a:+,.0f}{pct}"
+        return (
+            f"{label} went from {self._fmt(metric, old)} in {self._period(old)} "
+            f"to {self._fmt(metric, new)} in {self._period(new)}, a change of {delta}."
+        )
+
+    def answer(self, question: str, company: str) -> Optional[StructuredAnswer]:
+        """Answer `question` for `company` from the store, or None to fall back."""
+        intent = parse_intent(question)
+        if intent is None:
+            return None
+        rows = [r for r in self._rows(company) if r["period_end_date"]]
+        if not rows:
+            return None
+
+        if intent.latest:
+            target = rows[-1]
+        else:
+            target = self._find(rows, intent.periods[-1])
+        if target is None:
+            return None
+
+        base = None
+        if intent.comparison == "periods":
+            base = self._find(rows, intent.periods[0])
+        elif intent.comparison == "qoq":
+            base = self._back(rows, target, QOQ_DAYS)
+        elif intent.comparison == "yoy":
+            base = self._back(rows, target, YOY_DAYS)
+        if intent.comparison and base is None:
+            return None
+
+        lines = []
+        for metric in intent.metrics:
+            if base is not None:
+                line = self._describe_change(metric, base, target)
+            else:
+                value = self._fmt(metric, target)
+                line = value and f"{METRIC_LABELS[metric]} in {self._period(target)} was {value}."
+            if line is None:
+                return None
+            lines.append(line)
+
+        name = target.get("company") or company
+        sources = [f"{company}:{r['period_end_date']}" for r in (base, target) if r is not None]
+        return StructuredAnswer(f"{name}: " + " ".join(lines), sources)
+
+    def route(self, question: str, company: str) -> Optional[StructuredAnswer]:
+        """`answer`, recording the structured-route latency when it succeeds."""
+        t0 = perf_counter()
+        result = self.answer(question, company)
+        if result is not None:
+            self.stats.record("structured", perf_counter() - t0)
+        return result
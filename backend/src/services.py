@@ -0,0 +1,401 @@
+"""
+services.py
+
+Runtime dependencies of the chat API, built lazily so importing the app stays cheap:
+ - Settings:          env-driven configuration, read after backend/.env is loaded
+ - Services:          container whose clients, caches and indexes are created on
+                      first use (OpenAI clients, Chroma, answer cache, context
+                      builder, financials)
+ - Services.warm_up:  build everything and page the vector index into memory;
+                      the app runs it from its lifespan and /health/ready reports it
+ - ConfigError:       a required setting (e.g. the OpenAI key) is missing
+"""
+
+import hashlib
+import logging
+import os
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from time import monotonic, perf_counter
+from typing import Any, Callable, Dict, Optional
+
+from backend.src.answer_cache import AnswerCache
+from backend.src.concurrency import ConcurrencyLimiter
+from backend.src.context_builder import ContextBuilder
+from backend.src.embedding_cache import CachedEmbeddings, LRUCache, SQLiteEmbeddingStore
+from backend.src.financial_store import FinancialStore
+from backend.src.http_clients import ClientConfig, langchain_kwargs
+from backend.src.index_catalog import IndexCatalog
+from backend.src.keyword_index import KeywordIndex
+from backend.src.query_router import QueryRouter
+
+logger = logging.getLogger(__name__)
+
+INDEX_VERSION_CHECK_INTERVAL = 5.0
+FINANCIALS_CHECK_INTERVAL = 5.0
+
+
+class ConfigError(RuntimeError):
+    """A setting the requested service needs is missing."""
+
+
+@dataclass(frozen=True)
+class Settings:
+    """Chat API configuration; `from_env` documents the variable behind each field."""
+
+    index_dir: Path
+    financials_dir: Path
+    prompts_dir: Path
+    embed_key: Optional[str] = None
+    chat_key: Optional[str] = None          # defaults to embed_key
+    embedding_model: Optional[str] = None
+    chat_max_concurrency: int = 64
+    chat_max_queue: int = 128
+    chat_queue_timeout: float = 2.0
+    embed_cache_size: int = 2048
+    embed_cache_ttl: float = 86400.0
+    embed_cache_path: Optional[Path] = None
+    answer_cache_size: int = 1024
+    answer_cache_ttl: float = 3600.0
+    answer_cache_similarity: float = 0.95
+    retrieval_candidates: int = 8
+    prompt_max_tokens: int = 3000
+    history_max_tokens: int = 500
+    history_max_turns: int = 6
+    batch_max_items: int = 5000
+    batch_concurrency: int = 8
+    keyword_fast_path: bool = True
+    structured_routing: bool = True
+
+    @classmethod
+    def from_env(cls, project_root: Path) -> "Settings":
+        """Read the settings from the environment (`project_root` is the backend/ directory)."""
+        embed_key = os.getenv("OPENAI_EMBEDDING_KEY") or os.getenv("openai_embedding_key")
+        embed_cache_path = os.getenv("EMBED_CACHE_PATH")
+        return cls(
+            index_dir=project_root.parent / "data" / "index",
+            # merge_jsons.py writes <slug>/all.json here
+            financials_dir=Path(os.getenv(
+                "FINANCIALS_DIR",
+                str(project_root.parent / "frontend" / "financial-dashboard" / "public" / "data"),
+            )),
+            prompts_dir=project_root / "prompts",
+            embed_key=embed_key,
+            chat_key=os.getenv("OPENAI_API_KEY"),
+            embedding_model=os.getenv("OPENAI_EMBEDDING_MODEL"),
+            chat_max_concurrency=int(os.getenv("CHAT_MAX_CONCURRENCY", "64")),
+            chat_max_queue=int(os.getenv("CHAT_MAX_QUEUE", "128")),
+            chat_queue_timeout=float(os.getenv("CHAT_QUEUE_TIMEOUT", "2.0")),
+            embed_cache_size=int(os.getenv("EMBED_CACHE_SIZE", "2048")),
+            embed_cache_ttl=float(os.getenv("EMBED_CACHE_TTL", "86400")),
+            embed_cache_path=Path(embed_cache_path) if embed_cache_path else None,
+            answer_cache_size=int(os.getenv("ANSWER_CACHE_SIZE", "1024")),
+            answer_cache_ttl=float(os.getenv("ANSWER_CACHE_TTL", "3600")),
+            answer_cache_similarity=float(os.getenv("ANSWER_CACHE_SIMILARITY", "0.95")),
+            retrieval_candidates=int(os.getenv("RETRIEVAL_CANDIDATES", "8")),
+            prompt_max_tokens=int(os.getenv("PROMPT_MAX_TOKENS", "3000")),
+            history_max_tokens=int(os.getenv("HISTORY_MAX_TOKENS", "500")),
+            history_max_turns=int(os.getenv("HISTORY_MAX_TURNS", "6")),
+            batch_max_items=int(os.getenv("CHAT_BATCH_MAX_ITEMS", "5000")),
+            batch_concurrency=int(os.getenv("CHAT_BATCH_CONCURRENCY", "8")),
+            keyword_fast_path=os.getenv("KEYWORD_FAST_PATH", "1") != "0",
+            structured_routing=os.getenv("STRUCTURED_ROUTING", "1") != "0",
+        )
+
+    @property
+    def keyword_index_file(self) -> Path:
+        return self.index_dir / "keyword_index.json"
+
+    @property
+    def catalog_file(self) -> Path:
+        return self.index_dir / "index_catalog.json"
+
+    @property
+    def index_version_file(self) -> Path:
+        # build_index.py rewrites this file on every rebuild
+        return self.index_dir / "index_version"
+
+
+class lazy:  # noqa: N801 - used like functools.cached_property
+    """
+    Build an attribute on first access under the container's lock.
+
+    The value is stored in the instance dict, so later reads skip the lock
+    and assigning the attribute (e.g. a stub in a benchmark) replaces it.
+    """
+
+    def __init__(self, build: Callable[[Any], Any]) -> None:
+        self.build = build
+        self.name = build.__name__
+        self.__doc__ = build.__doc__
+
+    def __set_name__(self, owner: type, name: str) -> None:
+        self.name = name
+
+    def __get__(self, obj: Any, owner: Optional[type] = None) -> Any:
+        if obj is None:
+            return self
+        with obj._lock:
+            if self.name not in obj.__dict__:
+                obj.__dict__[self.name] = self.build(obj)
+            return obj.__dict__[self.name]
+
+
+class Services:
+    """
+    Lazily initialised dependencies of the chat API.
+
+    Nothing is read or connected in the constructor: each attribute below is
+    built the first time it is used, and `warm_up()` builds them all ahead of
+    traffic. `state` goes starting → warming → ready (or failed, with `error`).
+    """
+
+    def __init__(self, project_root: Path, settings: Optional[Settings] = None) -> None:
+        self.project_root = project_root
+        self._lock = threading.RLock()
+        if settings is not None:
+            self.__dict__["settings"] = settings
+        self.state = "starting"
+        self.error: Optional[str] = None
+        self.warmup_seconds: Optional[float] = None
+        self.keyword_index = KeywordIndex()
+        self.index_catalog = IndexCatalog()
+        self.retrieval_stats = {"keyword_only": 0, "embedded": 0}
+        self._index_version_checked_at = float("-inf")
+        self._keyword_index_version: Any = object()  # forces the first load
+        self._financials_checked_at = float("-inf")
+
+    def built(self, name: str) -> bool:
+        """Whether the lazy attribute `name` exists yet (without building it)."""
+        return name in self.__dict__
+
+    # ─── Configuration & prompt ──────────────────────────────────────────────
+    @lazy
+    def settings(self) -> Settings:
+        from dotenv import load_dotenv
+
+        load_dotenv(self.project_root / ".env")
+        return Settings.from_env(self.project_root)
+
+    @lazy
+    def system_prompt(self) -> str:
+        from jinja2 import Environment, FileSystemLoader, select_autoescape
+
+        env = Environment(
+            loader=FileSystemLoader(str(self.settings.prompts_dir)),
+            autoescape=select_autoescape([]),
+        )
+        prompt = env.get_template("system_prompt.j2").render()
+        logger.info(
+            "Loaded system prompt from backend/prompts/system_prompt.j2 (version %s)",
+            hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:12],
+        )
+        return prompt
+
+    @lazy
+    def prompt_version(self) -> str:
+        return hashlib.sha256(self.system_prompt.encode("utf-8")).hexdigest()[:12]
+
+    @lazy
+    def context_builder(self) -> ContextBuilder:
+        s = self.settings
+        return ContextBuilder(
+            max_tokens=s.prompt_max_tokens,
+            history_max_tokens=s.history_max_tokens,
+            history_max_turns=s.history_max_turns,
+        )
+
+    # ─── OpenAI clients & Chroma ─────────────────────────────────────────────
+    @lazy
+    def http_kwargs(self) -> Dict[str, Any]:
+        # One keep-alive pool per worker, sized to the chat limiter, with per-attempt
+        # timeouts, jittered retries inside LLM_DEADLINE and a circuit breaker.
+        config = ClientConfig.from_env(
+            max_connections=self.settings.chat_max_concurrency, read_timeout=30.0, deadline=45.0,
+        )
+        return langchain_kwargs("openai", config)
+
+    def _require_key(self, key: Optional[str]) -> str:
+        if not key:
+            raise ConfigError("Missing OPENAI_EMBEDDING_KEY in .env")
+        return key
+
+    @lazy
+    def embeddings(self) -> CachedEmbeddings:
+        from langchain_openai import OpenAIEmbeddings
+
+        s = self.settings
+        openai_embeddings = OpenAIEmbeddings(
+            model=s.embedding_model,
+            openai_api_key=self._require_key(s.embed_key),
+            **self.http_kwargs,
+        )
+        # Query embeddings are cached in-process (LRU + TTL) and, when
+        # EMBED_CACHE_PATH is set, in a SQLite file shared by all workers.
+        logger.info(
+            "Embedding cache: %d entries, %.0fs TTL, disk=%s",
+            s.embed_cache_size, s.embed_cache_ttl, s.embed_cache_path or "off",
+        )
+        return CachedEmbeddings(
+            openai_embeddings,
+            model=openai_embeddings.model,
+            memory=LRUCache(max_size=s.embed_cache_size, ttl=s.embed_cache_ttl),
+            disk=SQLiteEmbeddingStore(s.embed_cache_path, ttl=s.embed_cache_ttl)
+            if s.embed_cache_path else None,
+        )
+
+    @lazy
+    def vectordb(self) -> Any:
+        from langchain_community.vectorstores import Chroma
+
+        vectordb = Chroma(
+            persist_directory=str(self.settings.index_dir),
+            embedding_function=self.embeddings,
+        )
+        logger.info("Chroma index opened at %s", self.settings.index_dir)
+        return vectordb
+
+    @lazy
+    def llm(self) -> Any:
+        from langchain_openai import ChatOpenAI
+
+        s = self.settings
+        llm = ChatOpenAI(
+            model=s.embedding_model,
+            openai_api_key=self._require_key(s.chat_key or s.embed_key),
+            temperature=0.8,
+            stream_usage=True,
+            **self.http_kwargs,
+        )
+        logger.info("ChatOpenAI initialized (model=%s)", s.embedding_model)
+        return llm
+
+    # ─── Admission control & caches ──────────────────────────────────────────
+    @lazy
+    def chat_limiter(self) -> ConcurrencyLimiter:
+        s = self.settings
+        logger.info(
+            "Chat limiter: %d concurrent, %d queued, %.1fs queue timeout",
+            s.chat_max_concurrency, s.chat_max_queue, s.chat_queue_timeout,
+        )
+        return ConcurrencyLimiter(
+            s.chat_max_concurrency,
+            max_queue=s.chat_max_queue,
+            queue_timeout=s.chat_queue_timeout,
+        )
+
+    @lazy
+    def answer_cache(self) -> AnswerCache:
+        s = self.settings
+        return AnswerCache(
+            self.prompt_version,
+            max_size=s.answer_cache_size,
+            ttl=s.answer_cache_ttl,
+            similarity_threshold=s.answer_cache_similarity,
+        )
+
+    # ─── Keyword index & catalog ─────────────────────────────────────────────
+    def load_catalog(self, version: Optional[str]) -> IndexCatalog:
+        """The catalog build_index.py wrote, or one built by paging Chroma for older indexes."""
+        path = self.settings.catalog_file
+        catalog = IndexCatalog.load(path)
+        if catalog is not None and catalog.index_version == version:
+            return catalog
+        logger.warning("Index catalog %s missing or stale; scanning the vector store once", path)
+        try:
+            return IndexCatalog.from_collection(self.vectordb._collection, version)
+        except Exception:
+            logger.exception("Vector store scan for the index catalog failed")
+            return IndexCatalog(version)
+
+    def refresh_index_version(self) -> None:
+        """
+        Re-read the index version (at most every few seconds), reload the
+        keyword index and catalog when it changed, and sync the answer cache.
+        """
+        now = monotonic()
+        if now - self._index_version_checked_at < INDEX_VERSION_CHECK_INTERVAL:
+            return
+        self._index_version_checked_at = now
+        try:
+            version = self.settings.index_version_file.read_text(encoding="utf-8").strip()
+        except FileNotFoundError:
+            version = None
+        if version != self._keyword_index_version:
+            self.keyword_index = KeywordIndex.load(self.settings.keyword_index_file)
+            self.index_catalog = self.load_catalog(version)
+            self._keyword_index_version = version
+            logger.info(
+                "Keyword index loaded: %d chunks; catalog: %d companies (index version %s)",
+                len(self.keyword_index), len(self.index_catalog), version,
+            )
+        self.answer_cache.sync_index_version(version)
+
+    # ─── Financials ──────────────────────────────────────────────────────────
+    @lazy
+    def financial_store(self) -> FinancialStore:
+        store = FinancialStore(self.settings.financials_dir)
+        store.reload_if_changed()
+        self._financials_checked_at = monotonic()
+        return store
+
+    def refresh_financials(self) -> None:
+        """Reload the financials store (at most every few seconds) if merge_jsons rewrote it."""
+        store = self.financial_store
+        now = monotonic()
+        if now - self._financials_checked_at < FINANCIALS_CHECK_INTERVAL:
+            return
+        self._financials_checked_at = now
+        store.reload_if_changed()
+
+    @lazy
+    def query_router(self) -> QueryRouter:
+        return QueryRouter(self.financial_store)
+
+    # ─── Warm-up ─────────────────────────────────────────────────────────────
+    def prefetch_vectors(self) -> int:
+        """
+        Run one query against the Chroma collection so its HNSW segment is
+        loaded before the first chat; returns the number of indexed chunks.
+        """
+        collection = self.vectordb._collection
+        sample = collection.get(limit=1, include=["embeddings"])
+        if not sample["ids"]:
+            return 0
+        collection.query(query_embeddings=[sample["embeddings"][0]], n_results=1, include=["distances"])
+        return collection.count()
+
+    def warm_up(self) -> None:
+        """Build every service and load the indexes; failures leave `state` at "failed"."""
+        t0 = perf_counter()
+        self.state = "warming"
+        try:
+            self.system_prompt
+            self.context_builder.counter.count(self.system_prompt)  # loads the tiktoken encoding
+            self.chat_limiter
+            self.llm
+            self.refresh_index_version()
+            chunks = self.prefetch_vectors()
+            self.query_router
+        except Exception as exc:
+            self.error = f"{type(exc).__name__}: {exc}"
+            self.state = "failed"
+            logger.exception("Warm-up failed")
+            return
+        self.warmup_seconds = perf_counter() - t0
+        self.state = "ready"
+        logger.info(
+            "Warm-up done in %.2fs: %d vectors, %d keyword chunks, %d companies with financials",
+            self.warmup_seconds, chunks, len(self.keyword_index), len(self.financial_store.companies()),
+        )
+
+    def readiness(self) -> Dict[str, Any]:
+        """Body of the readiness probe."""
+        body: Dict[str, Any] = {"status": self.state}
+        if self.state == "ready":
+            body["index_version"] = self.index_catalog.index_version
+            body["warmup_ms"] = round(self.warmup_seconds * 1000, 1)
+        elif self.error:
+            body["error"] = self.error
+        return body
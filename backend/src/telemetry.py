@@ -0,0 +1,287 @@
+"""
+telemetry.py
+
+Dependency-free Prometheus metrics and request correlation for the API:
+ - Counter / Histogram:   labelled metrics owned by a Registry
+ - Registry:              renders the Prometheus text format; with a multiprocess
+                          directory every worker flushes a snapshot there and a
+                          scrape of any worker sums all of them
+ - request_id_var /
+   RequestIdFilter:       request id carried into every log record
+ - TelemetryMiddleware:   ASGI middleware assigning X-Request-ID and timing requests
+
+As with prometheus_client's multiprocess mode, the snapshot directory should
+be emptied when the server (re)starts.
+"""
+
+import json
+import logging
+import os
+import re
+import threading
+import uuid
+from bisect import bisect_left
+from contextvars import ContextVar
+from pathlib import Path
+from time import monotonic, perf_counter
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+REQUEST_ID_HEADER = "x-request-id"
+REQUEST_ID_RE = re.compile(r"^[A-Za-z0-9._-]{1,64}$")
+
+request_id_var: ContextVar[str] = ContextVar("request_id", default="-")
+
+
+class RequestIdFilter(logging.Filter):
+    """Add `request_id` to log records (use `%(request_id)s` in the format)."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = request_id_var.get()
+        return True
+
+
+# ─── Metrics ─────────────────────────────────────────────────────────────────
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str], lock: threading.Lock) -> None:
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._lock = lock
+        self._series: Dict[Tuple[str, ...], Any] = {}
+
+    def _key(self, labels: Dict[str, Any]) -> Tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} takes labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[n]) for n in self.labelnames)
+
+    def _snapshot(self) -> Dict[str, Any]:
+        return {
+            "kind": self.kind,
+            "help": self.help,
+            "labelnames": list(self.labelnames),
+            "series": [[list(k), v] for k, v in self._series.items()],
+        }
+
+
+class Counter(_Metric):
+    """Monotonic counter; the name should end in `_total`."""
+
+    kind = "counter"
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._series[key] = self._series.get(key, 0.0) + amount
+
+    def set_total(self, value: float, **labels: Any) -> None:
+        """Mirror a counter kept elsewhere (e.g. a cache's hit count)."""
+        key = self._key(labels)
+        with self._lock:
+            self._series[key] = float(value)
+
+
+class Histogram(_Metric):
+    """Cumulative-bucket histogram; series hold per-bucket counts plus sum and count."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str], lock: threading.Lock,
+                 buckets: Sequence[float] = DEFAULT_BUCKETS) -> None:
+        super().__init__(name, help, labelnames, lock)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = self._key(labels)
+        idx = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * (len(self.buckets) + 1) + [0.0, 0]
+            series[idx] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def _snapshot(self) -> Dict[str, Any]:
+        return {**super()._snapshot(), "buckets": list(self.buckets)}
+
+
+def _merge(into: Dict[str, Any], snapshot: Dict[str, Any]) -> None:
+    """Add `snapshot`'s series into `into` (counters and histogram cells sum)."""
+    for name, metric in snapshot.items():
+        target = into.setdefault(name, {**metric, "series": []})
+        index = {tuple(labels): i for i, (labels, _) in enumerate(target["series"])}
+        for labels, value in metric["series"]:
+            i = index.get(tuple(labels))
+            if i is None:
+                target["series"].append([labels, value])
+                index[tuple(labels)] = len(target["series"]) - 1
+            elif isinstance(value, list):
+                target["series"][i][1] = [a + b for a, b in zip(target["series"][i][1], value)]
+            else:
+                target["series"][i][1] += value
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names: Sequence[str], values: Sequence[str], le: Optional[str] = None) -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if le is not None:
+        pairs.append(f'le="{le}"')
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _num(value: float) -> str:
+    value = float(value)
+    return str(int(value)) if value.is_integer() else repr(value)
+
+
+class Registry:
+    """
+    Holds the process's metrics.
+
+    With `multiprocess_dir`, `flush()` writes this worker's snapshot to
+    `<dir>/metrics-<pid>.json` (at most every `flush_interval` seconds) and
+    `render()` sums the snapshots of every worker that has written one.
+    """
+
+    def __init__(self, multiprocess_dir: Optional[Path] = None, flush_interval: float = 1.0) -> None:
+        self.multiprocess_dir = Path(multiprocess_dir) if multiprocess_dir else None
+        self.flush_interval = flush_interval
+        self._lock = threading.Lock()
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: List[Callable[[], None]] = []
+        self._flushed_at = float("-inf")
+        if self.multiprocess_dir:
+            self.multiprocess_dir.mkdir(parents=True, exist_ok=True)
+
+    def _register(self, metric: _Metric) -> Any:
+        if metric.name in self._metrics:
+            raise ValueError(f"metric {metric.name} already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, help, labelnames, self._lock))
+
+    def histogram(self, name: str, help: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, help, labelnames, self._lock, buckets))
+
+    def add_collector(self, fn: Callable[[], None]) -> None:
+        """Run `fn` before every snapshot, e.g. to mirror counters kept elsewhere."""
+        self._collectors.append(fn)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """This process's metrics as JSON-serializable data."""
+        for fn in self._collectors:
+            try:
+                fn()
+            except Exception:
+                logger.exception("Metrics collector %s failed", getattr(fn, "__name__", fn))
+        with self._lock:
+            return json.loads(json.dumps({name: m._snapshot() for name, m in self._metrics.items()}))
+
+    def _snapshot_file(self, pid: int) -> Path:
+        return self.multiprocess_dir / f"metrics-{pid}.json"
+
+    def flush(self, force: bool = False) -> None:
+        """Write this worker's snapshot for the others to read (no-op without a directory)."""
+        if self.multiprocess_dir is None:
+            return
+        now = monotonic()
+        if not force and now - self._flushed_at < self.flush_interval:
+            return
+        self._write(self.snapshot())
+
+    def _write(self, snapshot: Dict[str, Any]) -> None:
+        self._flushed_at = monotonic()
+        path = self._snapshot_file(os.getpid())
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(snapshot), encoding="utf-8")
+        os.replace(tmp, path)
+
+    def collect(self) -> Dict[str, Any]:
+        """Sum of this process's live metrics and every other worker's last snapshot."""
+        merged: Dict[str, Any] = {}
+        snapshot = self.snapshot()
+        _merge(merged, snapshot)
+        if self.multiprocess_dir is not None:
+            self._write(snapshot)
+            own = self._snapshot_file(os.getpid())
+            for path in sorted(self.multiprocess_dir.glob("metrics-*.json")):
+                if path == own:
+                    continue
+                try:
+                    _merge(merged, json.loads(path.read_text(encoding="utf-8")))
+                except (OSError, ValueError):
+                    logger.warning("Skipping unreadable metrics snapshot %s", path)
+        return merged
+
+    def render(self) -> str:
+        """Prometheus text exposition format (version 0.0.4)."""
+        lines: List[str] = []
+        for name, metric in sorted(self.collect().items()):
+            names = metric["labelnames"]
+            lines.append(f"# HELP {name} {metric['help']}")
+            lines.append(f"# TYPE {name} {metric['kind']}")
+            for values, value in sorted(metric["series"]):
+                if metric["kind"] == "counter":
+                    lines.append(f"{name}{_labels(names, values)} {_num(value)}")
+                    continue
+                cumulative = 0
+                for bound, count in zip([*metric["buckets"], "+Inf"], value[:-2]):
+                    cumulative += count
+                    le = "+Inf" if bound == "+Inf" else f"{bound:g}"
+                    lines.append(f"{name}_bucket{_labels(names, values, le)} {cumulative}")
+                lines.append(f"{name}_sum{_labels(names, values)} {_num(value[-2])}")
+                lines.append(f"{name}_count{_labels(names, values)} {value[-1]}")
+        return "\n".join(lines) + "\n"
+
+
+# ─── ASGI middleware ─────────────────────────────────────────────────────────
+class TelemetryMiddleware:
+    """
+    Give every HTTP request an id (the client's X-Request-ID when it is
+    sane, else a new one), echo it in the response, expose it to logging,
+    and observe the request duration by route template and status.
+    """
+
+    def __init__(self, app: Any, registry: Registry, histogram: Histogram) -> None:
+        self.app = app
+        self.registry = registry
+        self.histogram = histogram
+
+    async def __call__(self, scope: Dict[str, Any], receive: Callable, send: Callable) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        sent = dict(scope.get("headers") or []).get(REQUEST_ID_HEADER.encode(), b"").decode("latin-1")
+        request_id = sent if REQUEST_ID_RE.match(sent) else uuid.uuid4().hex[:16]
+        token = request_id_var.set(request_id)
+        status = 500
+        t0 = perf_counter()
+
+        async def send_with_id(message: Dict[str, Any]) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                message["headers"] = [*message.get("headers", []),
+                                      (REQUEST_ID_HEADER.encode(), request_id.encode())]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            route = scope.get("route")
+            path = getattr(route, "path", None) or "unmatched"  # templates keep cardinality bounded
+            self.histogram.observe(perf_counter() - t0, method=scope["method"], path=path, status=status)
+            self.registry.flush()
+            request_id_var.reset(token)
@@ -0,0 +1,66 @@
+import asyncio
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+from langchain.docstore.document import Document
+from backend.src.services import Services, Settings
+
+BACKEND = Path(__file__).resolve().parents[1]
+
+class SlowStore:
+    """Vector store whose company-filtered searches each take 100ms; records how many overlapped."""
+
+    def __init__(self):
+        self.filters = []
+        self.active = self.max_active = 0
+
+    async def asimilarity_search_by_vector(self, embedding, k=4, filter=None):
+        self.filters.append(filter["company_slug"])
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        try:
+            await asyncio.sleep(0.1)
+        finally:
+            self.active -= 1
+        slug = filter["company_slug"]
+        return [Document(page_content=f"{slug} revenue grew {i}%", metadata={"company_slug": slug, "source_txt": f"{slug}_{i}.txt"})
+                for i in range(2)]
+
+class StubEmbedder:
+    async def aembed_query(self, text):
+        return [1.0, 0.0]
+
+class StubLLM:
+    def __init__(self):
+        self.prompts = []
+
+    async def ainvoke(self, messages, **_):
+        self.prompts.append(messages[0].content)
+        return SimpleNamespace(content="stub answer")
+
+@pytest.fixture
+def make_services(tmp_path):
+    """Build Services over `tmp_path` with the repo's prompts; keyword arguments override Settings."""
+    def make(**overrides):
+        settings = Settings(
+            index_dir=tmp_path / "index",
+            financials_dir=tmp_path / "financials",
+            prompts_dir=BACKEND / "prompts",
+            **overrides,
+        )
+        return Services(BACKEND, settings)
+
+    return make
+
+@pytest.fixture
+def slow_store():
+    return SlowStore()
+
+@pytest.fixture
+def stub_embedder():
+    return StubEmbedder()
+
+@pytest.fixture
+def stub_llm():
+    return StubLLM()
@@ -0,0 +1,73 @@
+from types import SimpleNamespace
+
+import pytest
+from backend.src.answer_cache import AnswerCache, doc_id
+
+def make_cache(**kw):
+    return AnswerCache("v1", **kw)
+
+def test_exact_key_depends_on_docs_and_prompt():
+    cache = make_cache()
+    k1 = cache.key("acme", "What was revenue?", ["d1", "d2"])
+    assert k1 == cache.key("acme", "  what was REVENUE? ", ["d1", "d2"])
+    assert k1 != cache.key("acme", "What was revenue?", ["d1", "d3"])
+    assert k1 != cache.key("other", "What was revenue?", ["d1", "d2"])
+    assert k1 != AnswerCache("v2").key("acme", "What was revenue?", ["d1", "d2"])
+    assert k1 != cache.key("acme", "What was revenue?", ["d1", "d2"], history="User: and last year?")
+
+def test_semantic_lookup_respects_threshold_and_company():
+    cache = make_cache(similarity_threshold=0.9)
+    cache.put("k", "acme", "revenue?", [1.0, 0.0], "42", ["a.txt"], doc_ids=["d1"])
+
+    assert cache.lookup_similar("acme", [0.99, 0.05], "what was revenue", ["d1"]).answer == "42"
+    assert cache.lookup_similar("acme", [0.0, 1.0], "revenue?", ["d1"]) is None
+    assert cache.lookup_similar("other", [1.0, 0.0], "revenue?", ["d1"]) is None
+    assert cache.stats()["semantic_hits"] == 1
+
+def test_semantic_lookup_never_crosses_periods_docs_or_prompts():
+    cache = make_cache(similarity_threshold=0.9)
+    cache.put("k", "acme", "What was net profit in Q2 2023?", [1.0, 0.0], "1.2bn", ["a.txt"], doc_ids=["d1"])
+
+    assert cache.lookup_similar("acme", [1.0, 0.0], "Net profit for Q2 2023?", ["d1"]).answer == "1.2bn"
+    assert cache.lookup_similar("acme", [1.0, 0.0], "What was net profit in Q3 2023?", ["d1"]) is None
+    assert cache.lookup_similar("acme", [1.0, 0.0], "What was net profit in Q2 2022?", ["d1"]) is None
+    assert cache.lookup_similar("acme", [1.0, 0.0], "Net profit for Q2 2023?", ["d2"]) is None
+    cache.prompt_version = "v2"
+    assert cache.lookup_similar("acme", [1.0, 0.0], "Net profit for Q2 2023?", ["d1"]) is None
+
+def test_lru_eviction():
+    cache = make_cache(max_size=2)
+    for i in range(3):
+        cache.put(f"k{i}", "acme", "q", [1.0, float(i)], str(i), [])
+    assert cache.get("k0") is None
+    assert cache.get("k2").answer == "2"
+
+def test_index_version_change_clears_cache():
+    cache = make_cache()
+    cache.sync_index_version("a")
+    cache.put("k", "acme", "q", [1.0], "x", [])
+    cache.sync_index_version("a")
+    assert cache.get("k") is not None
+    cache.sync_index_version("b")
+    assert cache.get("k") is None
+    assert cache.stats()["invalidations"] == 1
+
+def test_hit_ratio():
+    cache = make_cache()
+    cache.put("k", "acme", "q", [1.0], "x", [])
+    cache.get("k")
+    cache.record_miss()
+    assert cache.stats()["hit_ratio"] == pytest.approx(0.5)
+
+def test_doc_id_is_stable():
+    doc = SimpleNamespace(page_content="Revenue 1", metadata={"source_txt": "a.txt"})
+    same = SimpleNamespace(page_content="Revenue 1", metadata={"source_txt": "a.txt"})
+    other = SimpleNamespace(page_content="Revenue 2", metadata={"source_txt": "a.txt"})
+    assert doc_id(doc) == doc_id(same)
+    assert doc_id(doc) != doc_id(other)
+
+def test_answer_without_vector_is_exact_match_only():
+    cache = make_cache(similarity_threshold=0.9)
+    cache.put("k", "acme", "revenue on 31/12/2023?", None, "42", ["a.txt"])
+    assert cache.get("k").answer == "42"
+    assert cache.lookup_similar("acme", [1.0, 0.0], "revenue on 31/12/2023?", ["d1"]) is None
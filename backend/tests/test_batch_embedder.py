@@ -0,0 +1,51 @@
+import httpx
+import openai
+import pytest
+from backend.src import batch_embedder
+from backend.src.batch_embedder import BatchEmbedder, pack_batches
+
+def rate_limit_error():
+    request = httpx.Request("POST", "http://llm.local/v1/embeddings")
+    response = httpx.Response(429, headers={"retry-after": "0"}, request=request)
+    return openai.RateLimitError("rate limited", response=response, body=None)
+
+def test_pack_batches_respects_count_and_token_limits():
+    assert pack_batches([1, 1, 1, 1, 1], max_items=2, max_tokens=100) == [[0, 1], [2, 3], [4]]
+    assert pack_batches([40, 40, 40, 10], max_items=10, max_tokens=90) == [[0, 1], [2, 3]]
+    # an oversized text still gets a batch of its own
+    assert pack_batches([5, 500, 5], max_items=10, max_tokens=100) == [[0], [1], [2]]
+
+def test_embed_documents_preserves_order():
+    batches = []
+
+    def embed(texts):
+        batches.append(texts)
+        return [[float(t)] for t in texts]
+
+    embedder = BatchEmbedder(embed, batch_size=3, max_in_flight=4)
+    texts = [str(i) for i in range(10)]
+    assert embedder.embed_documents(texts) == [[float(i)] for i in range(10)]
+    assert len(batches) == 4
+    assert (embedder.stats.chunks, embedder.stats.batches) == (10, 4)
+
+def test_embed_batch_retries_on_rate_limit(monkeypatch):
+    calls = []
+
+    def flaky(texts):
+        calls.append(texts)
+        if len(calls) < 3:
+            raise rate_limit_error()
+        return [[1.0] for _ in texts]
+
+    monkeypatch.setattr(batch_embedder.time, "sleep", lambda s: None)
+    embedder = BatchEmbedder(flaky)
+    assert embedder.embed_documents(["a", "b"]) == [[1.0], [1.0]]
+    assert embedder.stats.retries == 2
+
+def test_embed_batch_gives_up_after_max_retries(monkeypatch):
+    def always_limited(texts):
+        raise rate_limit_error()
+
+    monkeypatch.setattr(batch_embedder.time, "sleep", lambda s: None)
+    with pytest.raises(openai.RateLimitError):
+        BatchEmbedder(always_limited, max_retries=2).embed_documents(["a"])
@@ -0,0 +1,115 @@
+import json
+from typing import List
+
+import chromadb
+import pytest
+from chromadb.config import Settings
+from langchain.text_splitter import RecursiveCharacterTextSplitter
+from langchain_core.embeddings import Embeddings
+from backend.scripts import build_index
+from backend.scripts.build_index import collect_chunks, sync_index
+
+class FakeEmbedder(Embeddings):
+    def __init__(self):
+        self.embedded: List[str] = []
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        self.embedded.extend(texts)
+        return [[float(len(t)), 1.0, 0.0] for t in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_documents([text])[0]
+
+def write_report(interim, company, stem, text, meta):
+    (interim / company / "txt").mkdir(parents=True, exist_ok=True)
+    (interim / company / "json").mkdir(parents=True, exist_ok=True)
+    (interim / company / "txt" / f"{stem}.txt").write_text(text, encoding="utf-8")
+    (interim / company / "json" / f"{stem}.json").write_text(json.dumps(meta), encoding="utf-8")
+
+@pytest.fixture
+def collection(tmp_path):
+    client = chromadb.PersistentClient(
+        path=str(tmp_path / "index"), settings=Settings(anonymized_telemetry=False)
+    )
+    return client.get_or_create_collection("langchain", embedding_function=None)
+
+@pytest.fixture
+def splitter():
+    return RecursiveCharacterTextSplitter(chunk_size=20, chunk_overlap=0)
+
+def sync(tmp_path, collection, splitter):
+    embedder = FakeEmbedder()
+    stats = sync_index(collection, embedder, collect_chunks(tmp_path / "interim", splitter))
+    return stats, embedder
+
+def test_second_run_skips_everything(tmp_path, collection, splitter):
+    interim = tmp_path / "interim"
+    write_report(interim, "acme", "q1", "Revenue 100\n\nCost of sales 40", {"revenue": 100})
+    write_report(interim, "acme", "q2", "Revenue 120", {"revenue": 120})
+
+    stats, _ = sync(tmp_path, collection, splitter)
+    assert (stats.added, stats.updated, stats.deleted) == (3, 0, 0)
+
+    stats, embedder = sync(tmp_path, collection, splitter)
+    assert (stats.added, stats.updated, stats.deleted, stats.skipped) == (0, 0, 0, 3)
+    assert embedder.embedded == []
+    assert collection.count() == 3
+
+def test_changed_text_and_removed_source(tmp_path, collection, splitter):
+    interim = tmp_path / "interim"
+    write_report(interim, "acme", "q1", "Revenue 100\n\nCost of sales 40", {"revenue": 100})
+    write_report(interim, "acme", "q2", "Revenue 120", {"revenue": 120})
+    sync(tmp_path, collection, splitter)
+
+    write_report(interim, "acme", "q1", "Revenue 101\n\nCost of sales 40", {"revenue": 101})
+    (interim / "acme" / "txt" / "q2.txt").unlink()
+
+    stats, embedder = sync(tmp_path, collection, splitter)
+    # q1's first chunk changed text, its second only metadata; q2 is gone
+    assert embedder.embedded == ["Revenue 101"]
+    assert (stats.added, stats.updated, stats.deleted, stats.skipped) == (1, 1, 2, 0)
+    metas = collection.get(include=["metadatas"])["metadatas"]
+    assert {m["revenue"] for m in metas} == {101}
+    assert {m["source_txt"] for m in metas} == {"q1.txt"}
+
+def test_chunk_ids_are_deterministic(tmp_path, splitter):
+    interim = tmp_path / "interim"
+    write_report(interim, "acme", "q1", "Revenue 100", {})
+    write_report(interim, "other", "q1", "Revenue 100", {})
+    first = collect_chunks(interim, splitter)
+    assert list(first) == list(collect_chunks(interim, splitter))
+    assert len(first) == 2  # same text, different company → different ids
+def test_side_files_share_the_index_version(tmp_path, splitter, monkeypatch):
+    for name in ("INDEX_VERSION_FILE", "KEYWORD_INDEX_FILE", "CATALOG_FILE"):
+        monkeypatch.setattr(build_index, name, tmp_path / "index" / getattr(build_index, name).name)
+    monkeypatch.setattr(build_index, "PROJECT_ROOT", tmp_path)
+    write_report(tmp_path / "interim", "acme", "q1", "Revenue 100", {"period_end_date": "2023-03-31"})
+    chunks = collect_chunks(tmp_path / "interim", splitter)
+
+    build_index.write_side_files(chunks, changed=True)
+    version = build_index.INDEX_VERSION_FILE.read_text()
+    catalog = json.loads(build_index.CATALOG_FILE.read_text())
+    assert catalog["index_version"] == version
+    assert catalog["companies"]["acme"]["periods"] == ["2023-03-31"]
+
+    build_index.write_side_files(chunks, changed=False)
+    assert build_index.INDEX_VERSION_FILE.read_text() == version
+    build_index.CATALOG_FILE.unlink()
+    build_index.write_side_files(chunks, changed=False)  # restores the file, same version
+    assert json.loads(build_index.CATALOG_FILE.read_text())["index_version"] == version
+    build_index.write_side_files(chunks, changed=True)
+    assert build_index.INDEX_VERSION_FILE.read_text() != version
+
+def test_sync_one_company_leaves_the_others_alone(tmp_path, collection, splitter):
+    interim = tmp_path / "interim"
+    write_report(interim, "acme", "q1", "Revenue 100", {"revenue": 100})
+    write_report(interim, "globex", "q1", "Revenue 300", {"revenue": 300})
+    sync(tmp_path, collection, splitter)
+
+    write_report(interim, "acme", "q2", "Revenue 120", {"revenue": 120})
+    embedder = FakeEmbedder()
+    chunks = collect_chunks(interim, splitter, ["acme"])
+    stats = sync_index(collection, embedder, chunks, where={"company_slug": "acme"})
+    assert (stats.added, stats.deleted, stats.skipped) == (1, 0, 1)
+    assert embedder.embedded == ["Revenue 120"]
+    assert collection.count() == 3
@@ -0,0 +1,59 @@
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+from backend.scripts.chat_batch import answered_ids, run_batch
+
+class BatchEmbedder:
+    def __init__(self):
+        self.batches = []
+
+    async def aembed_documents(self, texts):
+        self.batches.append(list(texts))
+        return [[1.0, float(i)] for i in range(len(texts))]
+
+class FlakyLLM:
+    def __init__(self, llm):
+        self.llm = llm
+
+    async def ainvoke(self, messages, **_):
+        if "globex revenue" in messages[0].content and "User: Why did margin fall?" in messages[0].content:
+            raise RuntimeError("upstream error")
+        return await self.llm.ainvoke(messages)
+
+@pytest.fixture
+def batch_client(make_services, slow_store, stub_llm, monkeypatch):
+    from backend import app as chat_app
+
+    services = make_services(embed_key="sk-test", embedding_model="m", structured_routing=False)
+    services.vectordb, services.embeddings, services.llm = slow_store, BatchEmbedder(), FlakyLLM(stub_llm)
+    monkeypatch.setattr(chat_app, "services", services)
+    return TestClient(chat_app.app), services
+
+def test_batch_embeds_once_and_streams_every_item(batch_client):
+    client, services = batch_client
+    payload = {"company_slugs": ["acme", "globex"], "questions": ["How did revenue grow?", "Why did margin fall?"]}
+    rows = [json.loads(line) for line in client.post("/api/chat/batch", json=payload).iter_lines() if line]
+    assert services.embeddings.batches == [payload["questions"]]
+    items, summary = rows[:-1], rows[-1]["summary"]
+    assert sorted(r["id"] for r in items) == ["acme#0", "acme#1", "globex#0", "globex#1"]
+    assert [r["done"] for r in items] == [1, 2, 3, 4] and {r["total"] for r in items} == {4}
+    failed = [r for r in items if r["error"] is not None]
+    assert [r["id"] for r in failed] == ["globex#1"] and failed[0]["answer"] is None
+    assert summary["answered"] == 3 and summary["failed"] == 1 and summary["skipped"] == 0
+    over = client.post("/api/chat/batch", json={**payload, "company_slugs": [f"c{i}" for i in range(2501)]})
+    assert over.status_code == 422
+
+def test_cli_resumes_from_its_output(batch_client, stub_llm, tmp_path):
+    client, services = batch_client
+    out = tmp_path / "answers.jsonl"
+    questions = ["How did revenue grow?", "Why did margin fall?"]
+    summary = run_batch(client, ["acme", "globex"], questions, out, set())
+    assert summary["failed"] == 1
+    done = answered_ids(out, questions)
+    assert done == {"acme#0", "acme#1", "globex#0"}
+    assert answered_ids(out, ["How did revenue grow?", "What changed?"]) == {"acme#0", "globex#0"}
+    services.llm = stub_llm  # the upstream recovered
+    summary = run_batch(client, ["acme", "globex"], questions, out, done)
+    assert summary == {**summary, "total": 1, "answered": 1, "failed": 0, "skipped": 3}
+    assert answered_ids(out, questions) == done | {"globex#1"}
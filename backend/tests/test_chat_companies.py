@@ -0,0 +1,70 @@
+
+import pytest
+from fastapi.testclient import TestClient
+from pydantic import ValidationError
+
+def test_chat_request_takes_a_list_of_companies():
+    from backend.app import MAX_CHAT_COMPANIES, ChatRequest
+
+    req = ChatRequest(company_slugs=["acme", "globex", "acme"], question="Compare revenue")
+    assert req.company == "acme" and req.slugs == ["acme", "globex"] and req.scope == "acme,globex"
+    assert ChatRequest(company_slug="acme", question="q").scope == "acme"
+    with pytest.raises(ValidationError):
+        ChatRequest(question="q")
+    with pytest.raises(ValidationError):
+        ChatRequest(company_slugs=[f"c{i}" for i in range(MAX_CHAT_COMPANIES + 1)], question="q")
+
+def test_companies_are_searched_concurrently_and_sources_grouped(make_services, slow_store, stub_embedder, stub_llm, monkeypatch):
+    from backend import app as chat_app
+
+    services = make_services(embed_key="sk-test", embedding_model="m", structured_routing=False)
+    services.vectordb, services.embeddings, services.llm = slow_store, stub_embedder, stub_llm
+    monkeypatch.setattr(chat_app, "services", services)
+    slugs = ["acme", "globex", "initech", "umbrella"]
+    client = TestClient(chat_app.app)  # no lifespan: nothing warms up in the background
+    resp = client.post("/api/chat", json={"company_slugs": slugs, "question": "How did revenue grow?"})
+    assert resp.status_code == 200 and services.vectordb.max_active == len(slugs)
+    body = resp.json()
+    assert sorted(services.vectordb.filters) == sorted(slugs)
+    assert list(body["sources_by_company"]) == slugs
+    assert body["sources_by_company"]["globex"] == ["globex_0.txt", "globex_1.txt"]
+    assert "[umbrella]\numbrella revenue grew 0%" in services.llm.prompts[0]
+
+def test_stream_releases_its_slot_when_the_prompt_cannot_be_built(make_services, slow_store, stub_embedder, stub_llm, monkeypatch):
+    from backend import app as chat_app
+
+    services = make_services(embed_key="sk-test", embedding_model="m", structured_routing=False)
+    services.vectordb, services.embeddings, services.llm = slow_store, stub_embedder, stub_llm
+    monkeypatch.setattr(chat_app, "services", services)
+    monkeypatch.setattr(chat_app, "build_prompt", lambda req, ctx: 1 / 0)
+    with TestClient(chat_app.app, raise_server_exceptions=False) as client:  # a leaked slot is not closed with the loop
+        resp = client.post("/api/chat/stream", json={"company_slug": "acme", "question": "How did revenue grow?"})
+        assert resp.status_code == 500
+        assert services.chat_limiter.in_flight == 0
+
+def test_period_only_paraphrase_is_not_answered_from_cache(make_services, slow_store, stub_embedder, stub_llm, monkeypatch):
+    from backend import app as chat_app
+
+    services = make_services(embed_key="sk-test", embedding_model="m", structured_routing=False)
+    services.vectordb, services.embeddings, services.llm = slow_store, stub_embedder, stub_llm
+    monkeypatch.setattr(chat_app, "services", services)
+    client = TestClient(chat_app.app)
+    for question in ("What was net profit in Q2 2023?", "What was net profit in Q3 2023?", "Net profit for Q3 2023?"):
+        resp = client.post("/api/chat", json={"company_slug": "acme", "question": question})
+        assert resp.status_code == 200
+    assert len(stub_llm.prompts) == 2   # the embedder maps every question to the same vector
+    assert services.answer_cache.stats()["semantic_hits"] == 1
+
+def test_cached_answers_are_not_counted_as_llm_routes(make_services, slow_store, stub_embedder, stub_llm, monkeypatch):
+    from backend import app as chat_app
+
+    services = make_services(embed_key="sk-test", embedding_model="m", structured_routing=False)
+    services.vectordb, services.embeddings, services.llm = slow_store, stub_embedder, stub_llm
+    monkeypatch.setattr(chat_app, "services", services)
+    client = TestClient(chat_app.app)
+    payload = {"company_slug": "acme", "question": "How did revenue grow?"}
+    assert client.post("/api/chat", json=payload).json()["cached"] is False
+    assert client.post("/api/chat", json=payload).json()["cached"] is True
+    assert b"stub answer" in client.post("/api/chat/stream", json=payload).content
+    routes = services.query_router.stats.stats()
+    assert routes["llm"]["count"] == 1 and routes["cached"]["count"] == 2
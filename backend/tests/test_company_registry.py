@@ -0,0 +1,31 @@
+import json
+
+import pytest
+from backend.src.company_registry import Company, CompanyRegistry, load_registry
+
+def make_registry(n=300):
+    return CompanyRegistry(Company(f"SYM{i}.N0000", f"company-{i}", f"Company {i}") for i in range(n))
+
+def test_lookup_by_symbol_slug_and_name():
+    registry = load_registry()
+    dipd = registry.by_symbol("dipd.n0000")
+    assert dipd.slug == "dipped-products"
+    assert registry.get("dipped-products") is dipd and registry.get("DIPPED PRODUCTS PLC") is dipd
+    assert registry.select(["REXP.N0000", "Dipped Products"]).slugs() == ["dipped-products", "richard-pieris"]
+    with pytest.raises(KeyError):
+        registry.select(["nope"])
+
+def test_duplicates_are_rejected(tmp_path):
+    path = tmp_path / "companies.json"
+    path.write_text(json.dumps([{"symbol": "A.N0000", "name": "Acme Holdings"},
+                                {"symbol": "B.N0000", "name": "Acme  holdings"}]))
+    with pytest.raises(ValueError):
+        CompanyRegistry.load(path)  # both slugify to acme-holdings
+
+def test_shards_partition_and_stay_stable():
+    registry = make_registry()
+    shards = [registry.shard(i, 4) for i in range(4)]
+    assert sorted(s for shard in shards for s in shard.slugs()) == sorted(registry.slugs())
+    assert min(len(s) for s in shards) > 50
+    grown = CompanyRegistry([*registry, Company("NEW.N0000", "new-co", "New Co")])
+    assert set(shards[1].slugs()) <= set(grown.shard(1, 4).slugs())
@@ -0,0 +1,47 @@
+import asyncio
+
+import pytest
+from backend.src.concurrency import ConcurrencyLimiter, SaturatedError
+
+def test_limiter_rejects_when_queue_full():
+    limiter = ConcurrencyLimiter(1, max_queue=0)
+
+    async def scenario():
+        async with limiter.slot():
+            with pytest.raises(SaturatedError):
+                async with limiter.slot():
+                    pass
+
+    asyncio.run(scenario())
+    assert limiter.admitted == 1
+    assert limiter.rejected == 1
+    assert limiter.in_flight == 0
+
+def test_limiter_queued_request_gets_slot():
+    limiter = ConcurrencyLimiter(1, max_queue=1, queue_timeout=1.0)
+    order = []
+
+    async def job(name, delay):
+        async with limiter.slot():
+            order.append(name)
+            await asyncio.sleep(delay)
+
+    async def scenario():
+        await asyncio.gather(job("first", 0.05), job("second", 0))
+
+    asyncio.run(scenario())
+    assert order == ["first", "second"]
+    assert limiter.rejected == 0
+
+def test_limiter_times_out_waiting():
+    limiter = ConcurrencyLimiter(1, max_queue=1, queue_timeout=0.01)
+
+    async def scenario():
+        async with limiter.slot():
+            with pytest.raises(SaturatedError):
+                async with limiter.slot():
+                    pass
+
+    asyncio.run(scenario())
+    assert limiter.rejected == 1
+    assert limiter.waiting == 0
@@ -0,0 +1,76 @@
+from langchain.docstore.document import Document
+from langchain.text_splitter import RecursiveCharacterTextSplitter
+from backend.src.context_builder import ContextBuilder, strip_overlap
+
+class WordCounter:
+    """One token per whitespace-separated word, so budgets are easy to reason about."""
+
+    def count(self, text):
+        return len(text.split())
+
+    def truncate(self, text, max_tokens):
+        return " ".join(text.split()[:max_tokens])
+
+def doc(text, source="q1.txt"):
+    return Document(page_content=text, metadata={"company_slug": "acme", "source_txt": source})
+
+REPORT = " ".join(f"line{i} revenue {i * 100} gross profit {i * 40}." for i in range(60))
+
+def test_strip_overlap_removes_splitter_overlap():
+    first, second = RecursiveCharacterTextSplitter(chunk_size=600, chunk_overlap=150).split_text(REPORT)[:2]
+    shared = next(n for n in range(150, 0, -1) if first.endswith(second[:n]))
+    assert shared > 20
+    assert strip_overlap(second, [first]) == second[shared:].lstrip()
+    assert strip_overlap(first, [second]) == first[:-shared].rstrip()  # retrieved in the other order
+    assert strip_overlap(first[10:200], [first]) == ""
+
+def test_build_packs_by_relevance_within_budget():
+    builder = ContextBuilder(WordCounter(), max_tokens=60, history_max_tokens=0)
+    docs = [doc("alpha " * 20, "a.txt"), doc("beta " * 40, "b.txt"), doc("gamma " * 10, "c.txt")]
+    built = builder.build("system prompt", "What was revenue?", docs)
+    assert [d.metadata["source_txt"] for d in built.docs] == ["a.txt", "c.txt"]  # beta skipped, gamma fits
+    assert built.tokens <= 60 and built.dropped_docs == 1
+    assert built.saved_tokens == built.unbudgeted_tokens - built.tokens > 0
+    assert "beta" not in built.text and built.text.endswith("User: What was revenue?")
+
+def test_build_truncates_when_nothing_fits():
+    builder = ContextBuilder(WordCounter(), max_tokens=30)
+    built = builder.build("system", "q?", [doc("word " * 100)])
+    assert len(built.docs) == 1 and built.tokens <= 30
+
+def test_build_drops_duplicate_chunks_across_sources():
+    builder = ContextBuilder(WordCounter(), max_tokens=500)
+    text = "Revenue for the quarter was Rs. 12,730 million, up 4% on last year."
+    built = builder.build("system", "q?", [doc(text, "a.txt"), doc(text, "b.txt")])
+    assert len(built.docs) == 1 and built.overlap_chars == len(text)
+
+def test_history_window_trims_to_recent_user_turns():
+    builder = ContextBuilder(WordCounter(), history_max_tokens=30, history_max_turns=4)
+    history = [
+        {"role": "assistant", "content": "Hello! How can I assist you today?"},
+        {"role": "user", "content": "Revenue in 2022?"},
+        {"role": "assistant", "content": "It was 10."},
+        {"role": "user", "content": "And gross profit?"},
+        {"role": "assistant", "content": "word " * 40},
+        {"role": "system", "content": "ignored"},
+        {"role": "user", "content": "And in 2023?"},
+    ]
+    assert builder.history_window(history[:1] + history[-1:], "And in 2023?") == []
+    window = builder.history_window(history, "And in 2023?")
+    assert window == []  # the long answer alone exceeds the budget, and a window must start at a user turn
+    builder.history_max_tokens = 100
+    window = builder.history_window(history, "And in 2023?")
+    assert window[0] == ("user", "Revenue in 2022?") and window[-1][0] == "assistant"
+    built = builder.build("system", "And in 2023?", [], window)
+    assert "Conversation so far:\nUser: Revenue in 2022?\nAssistant: It was 10." in built.text
+
+def test_build_gives_each_company_a_share_of_the_budget():
+    builder = ContextBuilder(WordCounter(), max_tokens=80, history_max_tokens=0)
+    acme = [doc("acme " * 20, "a1.txt"), doc("acme more " * 10, "a2.txt")]
+    globex = [Document(page_content="globex " * 5, metadata={"company_slug": "globex", "source_txt": "g.txt"})]
+    built = builder.build("system", "Compare them", {"acme": acme, "globex": globex})
+    assert [d.metadata["source_txt"] for d in built.docs_by_group["acme"]] == ["a1.txt"]  # a2 exceeds acme's half
+    assert built.docs_by_group["globex"] == globex and built.tokens <= 80
+    assert "[acme]\nacme" in built.text and "\n\n[globex]\nglobex" in built.text
+    empty = builder.build("system", "Compare them", {"acme": [], "globex": globex})
+    assert "[acme]\nNo relevant context." in empty.text
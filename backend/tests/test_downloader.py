@@ -0,0 +1,112 @@
+import gzip
+import hashlib
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from backend.src.downloader import DownloadIndex, download_all, download_file, make_session
+
+REPORTS = {f"DIPD_interim_{day:02d}-{month:02d}-2024.pdf": b"%PDF-1.4\n" + os.urandom(20_000 + 97 * day)
+           for month in range(1, 5) for day in range(1, 26)}
+LISTING = "<html><body>" + "".join(
+    f'<a href="/reports/{name}">Interim financial statements {name[-14:-4]}</a>' for name in REPORTS
+) + '<a href="/annual.pdf">Annual report</a></body></html>'
+
+class ReportHandler(BaseHTTPRequestHandler):
+    """Static report server with ETag / If-None-Match / Range / If-Range support; gzips when allowed."""
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        self.server.requests.append((self.path, dict(self.headers)))
+        if self.path.startswith("/company"):
+            return self._send(200, LISTING.encode(), {"Content-Type": "text/html"})
+        body = self.server.reports.get(self.path.rpartition("/")[2])
+        if body is None:
+            return self._send(404, b"")
+        etag = '"%s"' % hashlib.md5(body).hexdigest()
+        if self.headers.get("If-None-Match") == etag:
+            return self._send(304, None, {"ETag": etag})
+        start = 0
+        if self.headers.get("Range") and self.headers.get("If-Range") in (None, etag):
+            start = int(self.headers["Range"].split("=")[1].rstrip("-"))
+            return self._send(206, body[start:], {"ETag": etag, "Content-Range": f"bytes {start}-{len(body) - 1}/{len(body)}"})
+        if "gzip" in self.headers.get("Accept-Encoding", ""):
+            return self._send(200, gzip.compress(body), {"ETag": etag, "Content-Encoding": "gzip"})
+        self._send(200, body, {"ETag": etag})
+
+    def _send(self, status, body, headers=()):
+        self.send_response(status)
+        for k, v in dict(headers).items():
+            self.send_header(k, v)
+        if body is not None:
+            self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if body:
+            self.wfile.write(body)
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), ReportHandler)
+    httpd.reports, httpd.requests = dict(REPORTS), []
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield httpd
+    httpd.shutdown()
+
+def url(server, name):
+    return f"http://127.0.0.1:{server.server_port}/reports/{name}"
+
+def test_downloads_concurrently_then_skips_unchanged_files(server, tmp_path):
+    index = DownloadIndex(tmp_path / ".downloads.json", tmp_path)
+    session = make_session(pool_size=8)
+    jobs = [(url(server, name), tmp_path / "dipd" / name) for name in REPORTS]
+    results = download_all(session, jobs, index, workers=8)
+    assert sorted(r.status for r in results) == ["downloaded"] * len(REPORTS)
+    assert all((tmp_path / "dipd" / n).read_bytes() == body for n, body in REPORTS.items())
+    assert not list(tmp_path.rglob("*.part"))
+
+    changed = next(iter(REPORTS))
+    server.reports[changed] = b"%PDF-1.4\nrestated"
+    results = download_all(session, jobs, DownloadIndex(tmp_path / ".downloads.json", tmp_path), workers=8)
+    assert sorted(r.status for r in results) == ["downloaded"] + ["not_modified"] * (len(REPORTS) - 1)
+    assert (tmp_path / "dipd" / changed).read_bytes() == b"%PDF-1.4\nrestated"
+
+def test_resumes_a_partial_download_with_range(server, tmp_path):
+    name, body = next(iter(REPORTS.items()))
+    index = DownloadIndex(tmp_path / ".downloads.json", tmp_path)
+    dest = tmp_path / name
+    session = make_session()
+    etag = '"%s"' % hashlib.md5(body).hexdigest()
+    (tmp_path / (name + ".part")).write_bytes(body[:5000])
+    index.put(dest, {"partial": {"url": url(server, name), "etag": etag}})
+    result = download_file(session, url(server, name), dest, index)
+    assert result.status == "resumed" and result.bytes == len(body) - 5000
+    assert dest.read_bytes() == body and server.requests[-1][1]["Range"] == "bytes=5000-"
+
+    other, other_body = list(REPORTS.items())[1]
+    (tmp_path / (other + ".part")).write_bytes(b"stale bytes")
+    index.put(tmp_path / other, {"partial": {"url": url(server, other), "etag": '"old"'}})
+    result = download_file(session, url(server, other), tmp_path / other, index)
+    assert result.status == "downloaded" and (tmp_path / other).read_bytes() == other_body  # If-Range failed: 200
+
+    (tmp_path / "legacy.pdf").write_bytes(b"fetched before the index existed")
+    assert download_file(session, url(server, "legacy.pdf"), tmp_path / "legacy.pdf", index).status == "skipped"
+
+def test_static_listing_needs_no_browser(server):
+    pytest.importorskip("bs4")
+    from backend.scripts.scrape_reports import LinkFetcher
+
+    with LinkFetcher(make_session(), base_url=f"http://127.0.0.1:{server.server_port}/company") as fetcher:
+        links = fetcher.fetch("DIPD.N0000")
+        assert fetcher._driver is None
+    assert links == sorted(url(server, name) for name in REPORTS)
+
+def test_asks_for_the_body_without_content_coding(server, tmp_path):
+    name, body = next(iter(REPORTS.items()))
+    index = DownloadIndex(tmp_path / ".downloads.json", tmp_path)
+    result = download_file(make_session(), url(server, name), tmp_path / name, index)
+    assert result.status == "downloaded" and result.bytes == len(body)
+    assert (tmp_path / name).read_bytes() == body
+    assert server.requests[-1][1]["Accept-Encoding"] == "identity"
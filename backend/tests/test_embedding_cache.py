@@ -0,0 +1,91 @@
+import asyncio
+import threading
+from typing import List
+
+import pytest
+from langchain_core.embeddings import Embeddings
+from backend.src.embedding_cache import (
+    CachedEmbeddings,
+    LRUCache,
+    SQLiteEmbeddingStore,
+)
+
+class CountingEmbedder(Embeddings):
+    def __init__(self):
+        self.calls = 0
+
+    def embed_query(self, text: str) -> List[float]:
+        self.calls += 1
+        return [float(len(text)), 0.5]
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return [self.embed_query(t) for t in texts]
+
+def test_lru_evicts_least_recent():
+    cache = LRUCache(max_size=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+
+def test_lru_ttl_expiry(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr("backend.src.embedding_cache.time.monotonic", lambda: now[0])
+    cache = LRUCache(max_size=10, ttl=5)
+    cache.set("a", 1)
+    now[0] += 6
+    assert cache.get("a") is None
+
+def test_normalized_questions_share_entry():
+    inner = CountingEmbedder()
+    cached = CachedEmbeddings(inner, model="m")
+    first = cached.embed_query("What was revenue?")
+    second = cached.embed_query("  what   WAS revenue? ")
+    assert first == second
+    assert inner.calls == 1
+    assert cached.stats()["hits"] == 1
+    assert cached.stats()["misses"] == 1
+
+def test_model_name_is_part_of_key():
+    inner = CountingEmbedder()
+    memory = LRUCache()
+    CachedEmbeddings(inner, model="a", memory=memory).embed_query("q")
+    CachedEmbeddings(inner, model="b", memory=memory).embed_query("q")
+    assert inner.calls == 2
+
+def test_disk_store_shared_between_instances(tmp_path):
+    db = tmp_path / "emb.sqlite3"
+    inner = CountingEmbedder()
+    CachedEmbeddings(inner, "m", disk=SQLiteEmbeddingStore(db)).embed_query("revenue")
+
+    other = CachedEmbeddings(inner, "m", disk=SQLiteEmbeddingStore(db))
+    assert other.embed_query("revenue") == [7.0, 0.5]
+    assert inner.calls == 1
+    assert other.stats()["disk_hits"] == 1
+
+def test_embed_documents_only_embeds_misses():
+    inner = CountingEmbedder()
+    cached = CachedEmbeddings(inner, "m")
+    cached.embed_query("x")
+    vecs = cached.embed_documents(["x", "yy"])
+    assert vecs == [[1.0, 0.5], [2.0, 0.5]]
+    assert inner.calls == 2
+
+def test_async_query_keeps_disk_io_off_the_event_loop(tmp_path):
+    threads = []
+
+    class RecordingStore(SQLiteEmbeddingStore):
+        def get(self, key):
+            threads.append(threading.get_ident())
+            return super().get(key)
+
+        def set(self, key, vec):
+            threads.append(threading.get_ident())
+            super().set(key, vec)
+
+    cached = CachedEmbeddings(CountingEmbedder(), "m", disk=RecordingStore(tmp_path / "emb.sqlite3"))
+    assert asyncio.run(cached.aembed_query("revenue")) == [7.0, 0.5]
+    assert len(threads) == 2 and threading.get_ident() not in threads
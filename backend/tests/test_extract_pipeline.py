@@ -0,0 +1,118 @@
+import json
+from pathlib import Path
+
+import httpx
+import openai
+import pytest
+from backend.src import extract_interim_financials as extract
+
+def rate_limit_error(retry_after="0"):
+    request = httpx.Request("POST", "http://llm.local/v1/chat/completions")
+    response = httpx.Response(429, headers={"retry-after": retry_after}, request=request)
+    return openai.RateLimitError("rate limited", response=response, body=None)
+
+def test_finalizer_releases_in_serial_order():
+    paths = [Path("raw/a/1.pdf"), Path("raw/b/1.pdf"), Path("raw/a/2.pdf")]
+    seen = []
+    finalizer = extract.OrderedFinalizer(paths, lambda p, rec: seen.append(p) or rec is not None)
+
+    finalizer.submit(paths[2], {"x": 3})
+    finalizer.submit(paths[1], {"x": 2})
+    assert seen == []
+    finalizer.submit(paths[0], None)
+
+    assert seen == paths
+    assert finalizer.succeeded == 2
+
+def test_retry_delay_honours_retry_after():
+    assert extract.retry_delay(rate_limit_error("7"), attempt=0) == 7.0
+
+def test_ask_llm_retries_on_rate_limit(monkeypatch):
+    calls = []
+
+    def flaky_ask_llm(*args):
+        calls.append(args)
+        if len(calls) < 3:
+            raise rate_limit_error()
+        return {"revenue": 1}
+
+    monkeypatch.setattr(extract, "ask_llm", flaky_ask_llm)
+    monkeypatch.setattr(extract.time, "sleep", lambda s: None)
+    rec = extract.ask_llm_with_retries(None, "", "", {}, None, "x.pdf")
+    assert rec == {"revenue": 1}
+    assert len(calls) == 3
+
+def test_ask_llm_gives_up_after_max_retries(monkeypatch):
+    def always_limited(*args):
+        raise rate_limit_error()
+
+    monkeypatch.setattr(extract, "ask_llm", always_limited)
+    monkeypatch.setattr(extract.time, "sleep", lambda s: None)
+    monkeypatch.setattr(extract, "LLM_MAX_RETRIES", 2)
+    with pytest.raises(openai.RateLimitError):
+        extract.ask_llm_with_retries(None, "", "", {}, None, "x.pdf")
+
+def test_locator_finds_quarterly_statement_page():
+    pdf = extract.RAW_DIR / "dipped-products" / "670_1644491716959.pdf"
+    if not pdf.exists():
+        pytest.skip("sample PDF not available")
+    assert extract.locate_pnl_page(pdf) == 2
+    assert "03 months to" in extract.find_pnl_pages(pdf)
+
+def test_pack_batches_respects_token_and_item_limits():
+    stmts = [(Path(f"{i}.pdf"), "", "x" * 400 * (3 if i == 2 else 1)) for i in range(6)]  # ~100 tokens, #2 ~300
+    batches = extract.pack_batches(stmts, max_tokens=250, max_items=2)
+    assert [[p.stem for p, _, _ in b] for b in batches] == [["0", "1"], ["2"], ["3", "4"], ["5"]]
+
+def test_extract_batch_re_asks_only_invalid_records():
+    good = {k: None for k in extract.EXAMPLE_SCHEMA}
+    prompts = []
+
+    def client(messages, **kwargs):
+        prompts.append(messages[0].content)
+        if len(prompts) == 1:
+            reply = [{"id": "1", **good, "revenue": 10}, {"id": "2", **good, "revenue": "n/a"}]
+        else:
+            reply = {**good, "revenue": 20}
+        return json.dumps(reply)
+
+    batch = [(Path("a.pdf"), "h1", "snippet a"), (Path("b.pdf"), "h2", "snippet b"), (Path("c.pdf"), "h3", "snippet c")]
+    out = extract.extract_batch(batch, extract.read_batch_prompt(), extract.read_prompt(), good, client)
+    assert out[Path("a.pdf")]["revenue"] == 10
+    assert out[Path("b.pdf")]["revenue"] == 20 and out[Path("c.pdf")]["revenue"] == 20   # invalid / missing
+    assert len(prompts) == 3 and "### Statement 3" in prompts[0]
+    assert "snippet b" in prompts[1] and "### Statement" not in prompts[1]
+
+def test_prompt_hash_covers_the_batch_template(tmp_path, monkeypatch):
+    batch_prompt = tmp_path / "batch.j2"
+    batch_prompt.write_text(extract.BATCH_PROMPT_FILE.read_text())
+    monkeypatch.setattr(extract, "BATCH_PROMPT_FILE", batch_prompt)
+    before = extract.prompt_hash()
+    batch_prompt.write_text(batch_prompt.read_text() + "\n- Never round values.\n")
+    assert extract.prompt_hash() != before
+
+def test_rebuild_csvs_empties_companies_without_records(tmp_path, monkeypatch):
+    monkeypatch.setattr(extract, "PROJECT_ROOT", tmp_path)
+    monkeypatch.setattr(extract, "INTERIM_DIR", tmp_path / "interim")
+    manifest = extract.ExtractionManifest(tmp_path / "manifest.json", tmp_path / "raw")
+    for slug in ("acme", "globex"):
+        manifest.update(tmp_path / "raw" / slug / "q1.pdf", {}, slug, {"revenue": 1})
+    extract.rebuild_csvs(manifest)
+    manifest.update(tmp_path / "raw" / "globex" / "q1.pdf", {}, "globex", None)   # re-extraction failed
+
+    extract.rebuild_csvs(manifest, {"globex"})
+    pnl = tmp_path / "interim" / "globex" / "csv" / "pnl.csv"
+    assert pnl.read_text().splitlines() == [",".join(extract.CSV_COLUMNS)]
+    manifest.forget("acme/q1.pdf")                                                 # source PDF removed
+    extract.rebuild_csvs(manifest)
+    assert (tmp_path / "interim" / "acme" / "csv" / "pnl.csv").read_text().count("\n") == 1
+
+def test_serial_run_marks_a_corrupt_pdf_failed_and_carries_on(tmp_path, monkeypatch):
+    monkeypatch.setattr(extract, "PROJECT_ROOT", tmp_path)
+    pdfs = [tmp_path / "raw" / "acme" / name for name in ("a.pdf", "b.pdf")]
+    pdfs[0].parent.mkdir(parents=True)
+    for pdf in pdfs:
+        pdf.write_bytes(b"%PDF-1.4\nnot really a pdf")
+    finalized = []
+    succeeded = extract.run_serial(pdfs, None, {}, None, lambda p, rec: finalized.append((p, rec)) or rec is not None)
+    assert succeeded == 0 and finalized == [(pdfs[0], None), (pdfs[1], None)]
@@ -0,0 +1,79 @@
+import json
+from datetime import date
+
+import pytest
+from fastapi.testclient import TestClient
+from backend.src.financial_store import FinancialStore
+
+def write_company(root, slug, records):
+    (root / slug).mkdir(parents=True, exist_ok=True)
+    (root / slug / "all.json").write_text(json.dumps(records), encoding="utf-8")
+
+@pytest.fixture
+def store(tmp_path):
+    write_company(tmp_path, "acme", [
+        {"period_end_date": "2023-06-30", "revenue": 120, "net_income": 10.5, "quarter": "Q2"},
+        {"period_end_date": "2023-03-31", "revenue": 100, "net_income": "n/a", "quarter": "Q1"},
+    ])
+    write_company(tmp_path, "globex", [{"period_end_date": "2023-03-31", "revenue": 7}])
+    store = FinancialStore(tmp_path)
+    assert store.reload_if_changed()
+    return store
+
+def test_query_sorts_and_types_columns(store):
+    out = store.query(["acme"], fields=["revenue", "net_income"])
+    assert out == {"acme": [
+        {"period_end_date": "2023-03-31", "revenue": 100, "net_income": None},
+        {"period_end_date": "2023-06-30", "revenue": 120, "net_income": 10.5},
+    ]}
+
+def test_query_filters_by_date_range_and_company(store):
+    out = store.query(start=date(2023, 4, 1), fields=["quarter"])
+    assert out == {"acme": [{"period_end_date": "2023-06-30", "quarter": "Q2"}], "globex": []}
+    assert store.query(["globex"], end=date(2023, 3, 31))["globex"][0]["revenue"] == 7
+
+def test_unknown_company_or_field(store):
+    with pytest.raises(KeyError):
+        store.query(["initech"])
+    with pytest.raises(ValueError):
+        store.query(fields=["ebitda"])
+
+def test_version_changes_only_when_sources_change(store, tmp_path):
+    version = store.version
+    assert not store.reload_if_changed()
+    write_company(tmp_path, "globex", [{"period_end_date": "2023-03-31", "revenue": 8}])
+    assert store.reload_if_changed()
+    assert store.version != version
+
+def test_api_revalidates_with_etag_and_gzips_only_large_bodies(make_services, monkeypatch):
+    from backend import app as chat_app
+
+    services = make_services()
+    write_company(services.settings.financials_dir, "acme", [{"period_end_date": "2023-03-31", "revenue": 100}])
+    write_company(services.settings.financials_dir, "globex", [
+        {"period_end_date": f"{year}-{month:02d}-28", "revenue": year * month}
+        for year in range(2000, 2024) for month in (3, 6, 9, 12)
+    ])
+    monkeypatch.setattr(chat_app, "services", services)
+    client = TestClient(chat_app.app)
+
+    small = client.get("/api/financials", params={"company": "acme", "fields": "revenue"})
+    assert small.status_code == 200 and small.json()["data"] == {"acme": [{"period_end_date": "2023-03-31", "revenue": 100}]}
+    assert len(small.content) < chat_app.GZIP_MIN_BYTES and "content-encoding" not in small.headers
+    again = client.get("/api/financials", params={"company": "acme", "fields": "revenue"},
+                       headers={"If-None-Match": small.headers["etag"]})
+    assert again.status_code == 304 and again.headers["etag"] == small.headers["etag"]
+    for header in (f'"x", W/{small.headers["etag"]}', "*"):
+        revalidated = client.get("/api/financials", params={"company": "acme", "fields": "revenue"},
+                                 headers={"If-None-Match": header})
+        assert revalidated.status_code == 304
+    superstring = small.headers["etag"] + "-gzip"    # contains the current ETag, but is another tag
+    assert client.get("/api/financials", params={"company": "acme", "fields": "revenue"},
+                      headers={"If-None-Match": superstring}).status_code == 200
+    other = client.get("/api/financials", params={"company": "globex", "fields": "revenue"},
+                       headers={"If-None-Match": small.headers["etag"]})
+    assert other.status_code == 200 and other.headers["etag"] != small.headers["etag"]
+    assert other.headers["content-encoding"] == "gzip" and len(other.json()["data"]["globex"]) == 96
+    plain = client.get("/api/financials", params={"company": "globex", "fields": "revenue"},
+                       headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in plain.headers and len(plain.content) >= chat_app.GZIP_MIN_BYTES
@@ -0,0 +1,170 @@
+import asyncio
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+import pytest
+from backend.src import http_clients
+from backend.src.http_clients import CircuitBreaker, ClientConfig, CircuitOpenError, backoff_delay
+
+class MockUpstream:
+    """Local HTTP server whose behaviour per request comes from `script(n)` → (status, delay)."""
+
+    def __init__(self, script):
+        self.script = script
+        self.requests = 0
+        self._lock = threading.Lock()
+        upstream = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):  # noqa: N802
+                self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                with upstream._lock:
+                    upstream.requests += 1
+                    status, delay = upstream.script(upstream.requests)
+                time.sleep(delay)
+                body = json.dumps({
+                    "object": "list", "model": "m", "usage": {"prompt_tokens": 1, "total_tokens": 1},
+                    "data": [{"object": "embedding", "index": 0, "embedding": [0.5]}],
+                } if status == 200 else {"error": {"message": "upstream error"}}).encode()
+                try:
+                    self.send_response(status)
+                    self.send_header("Content-Type", "application/json")
+                    self.send_header("Content-Length", str(len(body)))
+                    if status == 429:
+                        self.send_header("Retry-After", "0")
+                    self.end_headers()
+                    self.wfile.write(body)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass  # client timed out first
+
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._httpd.daemon_threads = True
+        threading.Thread(target=self._httpd.serve_forever, daemon=True).start()
+        self.url = f"http://127.0.0.1:{self._httpd.server_address[1]}/v1"
+
+    def close(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+@pytest.fixture
+def upstream():
+    servers = []
+
+    def start(script):
+        servers.append(MockUpstream(script))
+        return servers[-1]
+
+    yield start
+    http_clients.reset_clients()
+    for server in servers:
+        server.close()
+
+FAST = dict(connect_timeout=1.0, read_timeout=0.3, deadline=1.0, max_retries=3,
+            backoff_base=0.01, backoff_max=0.05, breaker_threshold=100)
+
+def test_backoff_delay_prefers_retry_after():
+    response = httpx.Response(429, headers={"retry-after": "7"})
+    assert backoff_delay(0, 1.0, 60.0, response) == 7.0
+    assert backoff_delay(0, 1.0, 5.0, response) == 5.0
+    assert 0 <= backoff_delay(3, 1.0, 5.0) <= 5.0
+
+def test_breaker_opens_then_probes():
+    now = [0.0]
+    breaker = CircuitBreaker(threshold=2, reset_after=10, clock=lambda: now[0])
+    breaker.record_failure()
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open" and not breaker.allow()
+    now[0] = 10
+    assert breaker.allow() and not breaker.allow()  # one probe at a time
+    breaker.record_failure()
+    assert breaker.state == "open"
+    now[0] = 20
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == "closed" and breaker.opened == 1
+
+def test_openai_client_retries_transient_errors(upstream):
+    server = upstream(lambda n: (503, 0) if n == 1 else (429, 0) if n == 2 else (200, 0))
+    client = http_clients.openai_client("sk-test", "flaky", ClientConfig(**FAST), base_url=server.url)
+    resp = client.embeddings.create(model="m", input=["x"])
+    assert resp.data[0].embedding == [0.5]
+    assert server.requests == 3
+    assert http_clients.upstream_stats()["flaky"]["retries"] == 2
+
+def test_tail_latency_bounded_by_deadline(upstream):
+    rng = random.Random(3)
+    # a quarter of requests hang, a quarter fail: without timeouts the slowest would take 5s
+    server = upstream(lambda n: rng.choice([(200, 5.0), (500, 0), (200, 0.01), (200, 0.02)]))
+    client, _ = http_clients.http_clients("slow", ClientConfig(**FAST))
+    latencies, outcomes = [], []
+    for _ in range(20):
+        t0 = time.monotonic()
+        try:
+            outcomes.append(client.post(f"{server.url}/embeddings", json={}).status_code)
+        except httpx.TimeoutException:
+            outcomes.append("timeout")
+        latencies.append(time.monotonic() - t0)
+    assert max(latencies) < FAST["deadline"] + 0.25
+    assert outcomes.count(200) >= 15  # most recover within the retry budget
+
+def test_open_circuit_fails_fast_without_calling_upstream(upstream):
+    server = upstream(lambda n: (500, 0))
+    config = ClientConfig(**{**FAST, "max_retries": 0, "breaker_threshold": 3, "breaker_reset": 60})
+    client, _ = http_clients.http_clients("down", config)
+    for _ in range(3):
+        assert client.post(f"{server.url}/embeddings", json={}).status_code == 500
+    t0 = time.monotonic()
+    with pytest.raises(CircuitOpenError):
+        client.post(f"{server.url}/embeddings", json={})
+    assert time.monotonic() - t0 < 0.05
+    assert server.requests == 3
+    assert http_clients.upstream_stats()["down"]["state"] == "open"
+
+def test_async_client_retries_within_deadline(upstream):
+    server = upstream(lambda n: (200, 5.0) if n == 1 else (200, 0))
+    _, client = http_clients.http_clients("async", ClientConfig(**FAST))
+
+    async def call():
+        t0 = time.monotonic()
+        resp = await client.post(f"{server.url}/embeddings", json={})
+        return resp.status_code, time.monotonic() - t0
+
+    status, elapsed = asyncio.run(call())
+    assert status == 200 and elapsed < FAST["read_timeout"] + 0.25
+    assert server.requests == 2
+
+def test_cancelled_probe_does_not_lock_the_breaker():
+    now = [0.0]
+    breaker = CircuitBreaker(threshold=1, reset_after=10, clock=lambda: now[0])
+    config = ClientConfig(**{**FAST, "max_retries": 0})
+
+    async def hang(request):
+        await asyncio.sleep(5)
+
+    def broken(request):
+        raise RuntimeError("bug below the transport")
+
+    async_transport = http_clients.AsyncRetryTransport(config, breaker, httpx.MockTransport(hang))
+    transport = http_clients.RetryTransport(config, breaker, httpx.MockTransport(broken))
+    request = httpx.Request("POST", "http://llm.local/v1/chat/completions", json={})
+
+    breaker.record_failure()
+    now[0] = 10
+    with pytest.raises(asyncio.TimeoutError):  # e.g. the chat client disconnected mid-probe
+        asyncio.run(asyncio.wait_for(async_transport.handle_async_request(request), 0.05))
+    now[0] = 30
+    assert breaker.state == "open" and breaker.allow()   # a new probe goes through
+    breaker.record_failure()
+
+    now[0] = 50
+    with pytest.raises(RuntimeError):
+        transport.handle_request(request)
+    assert breaker.state == "open" and breaker.allow()
@@ -0,0 +1,44 @@
+import json
+
+import chromadb
+from chromadb.config import Settings
+from backend.src import index_catalog
+from backend.src.index_catalog import IndexCatalog
+
+METAS = [
+    {"company_slug": "acme", "company": "ACME PLC", "source_txt": "q1.txt", "period_end_date": "2023-03-31"},
+    {"company_slug": "acme", "company": "ACME PLC", "source_txt": "q1.txt", "period_end_date": "2023-03-31"},
+    {"company_slug": "acme", "source_txt": "q2.txt", "period_end_date": "2023-06-30"},
+    {"company_slug": "globex", "source_txt": "q1.txt"},
+    {"source_txt": "orphan.txt"},
+]
+
+def test_from_metadatas_summarizes_companies():
+    catalog = IndexCatalog.from_metadatas(METAS, "v1")
+    assert catalog.slugs() == ["acme", "globex"]
+    assert catalog.companies["acme"] == {
+        "name": "ACME PLC", "chunks": 3, "sources": 2, "periods": ["2023-03-31", "2023-06-30"],
+    }
+    assert catalog.companies["globex"]["name"] == "globex"
+    assert catalog.chunks == 4
+
+def test_save_and_load_round_trip(tmp_path):
+    path = tmp_path / "index_catalog.json"
+    IndexCatalog.from_metadatas(METAS, "v1").save(path)
+    loaded = IndexCatalog.load(path)
+    assert loaded.index_version == "v1" and loaded.slugs() == ["acme", "globex"]
+    assert json.loads(path.read_text())["chunks"] == 4
+
+    assert IndexCatalog.load(tmp_path / "missing.json") is None
+    path.write_text(json.dumps({"version": index_catalog.CATALOG_VERSION + 1}))
+    assert IndexCatalog.load(path) is None
+
+def test_from_collection_pages_past_any_limit(tmp_path):
+    client = chromadb.PersistentClient(path=str(tmp_path / "index"), settings=Settings(anonymized_telemetry=False))
+    collection = client.get_or_create_collection("langchain", embedding_function=None)
+    metas = [{"company_slug": f"co-{i % 7}", "source_txt": f"{i}.txt"} for i in range(25)]
+    collection.add(ids=[str(i) for i in range(25)], embeddings=[[1.0, 0.0]] * 25, metadatas=metas)
+
+    catalog = IndexCatalog.from_collection(collection, "v2", page_size=4)
+    assert catalog.slugs() == [f"co-{i}" for i in range(7)]
+    assert catalog.chunks == 25
@@ -0,0 +1,38 @@
+import pytest
+from langchain.docstore.document import Document
+from backend.src.keyword_index import KeywordIndex, reciprocal_rank_fusion, tokenize
+
+def doc(text, company="acme", source="q1.txt"):
+    return Document(page_content=text, metadata={"company_slug": company, "source_txt": source})
+
+@pytest.fixture
+def index():
+    return KeywordIndex([
+        doc("Revenue 12,730,290 Gross profit 2,308,932 for 3 months ended 31st December 2021"),
+        doc("Statement of financial position: total assets and equity", source="q2.txt"),
+        doc("Gross profit 419,656 for the quarter ended 31st December 2023", source="q3.txt"),
+        doc("Gross profit 1,000 for the quarter ended 31st December 2023", company="other"),
+    ])
+
+def test_tokenize_normalizes_dates_numbers_and_ordinals():
+    assert tokenize("Gross profit on 31/12/2023") == ["gross", "profit", "31", "december", "2023"]
+    assert tokenize("Revenue 12,730,290 in Q3") == ["revenue", "12730290", "q3"]
+    assert tokenize("31st December 2023") == ["31", "december", "2023"]
+
+def test_search_ranks_exact_terms_and_filters_company(index):
+    hits = index.search("gross profit 31/12/2023", company="acme", k=3)
+    assert hits[0].doc.metadata["source_txt"] == "q3.txt"
+    assert hits[0].coverage == 1.0
+    assert all(h.doc.metadata["company_slug"] == "acme" for h in hits)
+    assert index.search("ebitda", company="acme") == []
+
+def test_reciprocal_rank_fusion_rewards_agreement():
+    assert reciprocal_rank_fusion([["a", "b", "c"], ["b", "d", "c"]]) == ["b", "c", "a", "d"]
+
+def test_save_and_load_roundtrip(index, tmp_path):
+    path = tmp_path / "keyword_index.json"
+    index.save(path)
+    loaded = KeywordIndex.load(path)
+    assert len(loaded) == 4
+    assert [h.score for h in loaded.search("gross profit")] == [h.score for h in index.search("gross profit")]
+    assert len(KeywordIndex.load(tmp_path / "missing.json")) == 0
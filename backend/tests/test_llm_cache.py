@@ -0,0 +1,78 @@
+import json
+
+from jinja2 import Template
+from langchain.schema import AIMessage, HumanMessage
+
+from backend.src import extract_interim_financials as extract
+from backend.src.llm_cache import CachedChatModel, SQLiteResponseCache
+
+class CountingLLM:
+    temperature = 0
+
+    def __init__(self, replies=()):
+        self.prompts = []
+        self.replies = list(replies)
+
+    def invoke(self, messages, **kwargs):
+        self.prompts.append(messages[0].content)
+        if self.replies:
+            return AIMessage(content=self.replies.pop(0))
+        return AIMessage(content=json.dumps(record(len(self.prompts))))
+
+def record(revenue):
+    return {**dict.fromkeys(extract.EXAMPLE_SCHEMA), "revenue": revenue}
+
+def test_warm_cache_makes_no_llm_calls(tmp_path):
+    tmpl = Template("{{ header_text }}\n{{ content }}")
+    llm = CountingLLM()
+
+    def ask(snippet, model="gpt-4o", refresh=False):
+        cache = SQLiteResponseCache(tmp_path / "llm.sqlite3")  # reopened: persists across runs
+        client = CachedChatModel(llm, cache, model, refresh=refresh)
+        return extract.ask_llm(tmpl, "03 months to", snippet, {}, client, "q1.pdf"), client
+
+    assert ask("Revenue 100")[0] == record(1)
+    rec, client = ask("Revenue 100")
+    assert rec == record(1) and (client.hits, client.misses) == (1, 0)
+    assert len(llm.prompts) == 1
+
+    assert ask("Revenue 100 ")[0] == record(2)               # any change to the prompt is a miss
+    assert ask("Revenue 100", model="gpt-4o-mini")[0] == record(3)
+    assert ask("Revenue 100", refresh=True)[0] == record(4)
+    assert ask("Revenue 100")[0] == record(4)                # refresh overwrote the entry
+    assert len(llm.prompts) == 4
+
+def test_bad_reply_is_not_cached(tmp_path):
+    tmpl = Template("{{ header_text }}\n{{ content }}")
+    llm = CountingLLM(replies=["Sorry, I cannot find that table.", '{"revenue": "n/a"}'])
+
+    def ask():
+        client = CachedChatModel(llm, SQLiteResponseCache(tmp_path / "llm.sqlite3"), "gpt-4o")
+        return extract.ask_llm(tmpl, "03 months to", "Revenue 100", {}, client, "q1.pdf")
+
+    assert ask()["parse_error"] == "bad_json"
+    assert extract.validate_record(ask())                    # parsed but invalid: not cached either
+    assert ask() == record(3)
+    assert ask() == record(3) and len(llm.prompts) == 3
+
+def test_evicts_least_recently_used_past_the_size_bound(tmp_path):
+    cache = SQLiteResponseCache(tmp_path / "llm.sqlite3", max_bytes=300)
+    llm = CountingLLM()
+    client = CachedChatModel(llm, cache, "m")
+
+    def ask(i):
+        messages = [HumanMessage(content=f"prompt {i}" + "x" * 100)]
+        client.store(messages, client.invoke(messages).content[:90])
+
+    for i in range(3):
+        ask(i)
+    ask(0)                                                  # hit; now most recently used
+    ask(3)                                                  # evicts prompt 1
+
+    stats = client.stats()
+    assert stats["bytes"] <= 300 and stats["evictions"] == 1
+    calls = len(llm.prompts)
+    ask(0)
+    assert len(llm.prompts) == calls
+    ask(1)
+    assert len(llm.prompts) == calls + 1
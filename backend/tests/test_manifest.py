@@ -0,0 +1,65 @@
+import pytest
+from backend.src.manifest import ExtractionManifest, file_sha256
+
+def make_pdf(root, name, data=b"%PDF-1.4 fake"):
+    path = root / "acme" / name
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(data)
+    return path
+
+def record(manifest, pdf, sha, prompt="p1", model="m1", rec=None):
+    fp = {"sha256": sha, "size": pdf.stat().st_size, "mtime_ns": pdf.stat().st_mtime_ns,
+          "prompt_hash": prompt, "model": model}
+    manifest.update(pdf, fp, "acme", rec)
+
+def test_entry_current_until_inputs_change(tmp_path):
+    pdf = make_pdf(tmp_path, "q1.pdf")
+    manifest = ExtractionManifest(tmp_path / "manifest.json", tmp_path)
+    sha = file_sha256(pdf)
+    record(manifest, pdf, sha, rec={"revenue": 1})
+
+    assert manifest.is_current(pdf, sha, "p1", "m1")
+    assert not manifest.is_current(pdf, sha, "p2", "m1")
+    assert not manifest.is_current(pdf, sha, "p1", "m2")
+    assert not manifest.is_current(pdf, "other", "p1", "m1")
+
+def test_failed_extraction_is_not_current(tmp_path):
+    pdf = make_pdf(tmp_path, "q1.pdf")
+    manifest = ExtractionManifest(tmp_path / "manifest.json", tmp_path)
+    sha = file_sha256(pdf)
+    record(manifest, pdf, sha, rec=None)
+    assert not manifest.is_current(pdf, sha, "p1", "m1")
+
+def test_roundtrip_and_sorted_records(tmp_path):
+    path = tmp_path / "manifest.json"
+    manifest = ExtractionManifest(path, tmp_path)
+    for name in ("q2.pdf", "q1.pdf"):
+        pdf = make_pdf(tmp_path, name, name.encode())
+        record(manifest, pdf, file_sha256(pdf), rec={"name": name})
+    manifest.save()
+
+    reloaded = ExtractionManifest(path, tmp_path)
+    assert [k for k, _ in reloaded.records()] == ["acme/q1.pdf", "acme/q2.pdf"]
+    assert not reloaded.dirty
+
+def test_content_hash_reuses_stored_hash_for_untouched_file(tmp_path, monkeypatch):
+    pdf = make_pdf(tmp_path, "q1.pdf")
+    manifest = ExtractionManifest(tmp_path / "manifest.json", tmp_path)
+    record(manifest, pdf, "cached-hash", rec={})
+
+    monkeypatch.setattr("backend.src.manifest.file_sha256", pytest.fail)
+    assert manifest.content_hash(pdf)[0] == "cached-hash"
+
+def test_concurrent_runs_keep_each_others_entries(tmp_path):
+    pdf_a, pdf_b = make_pdf(tmp_path, "a.pdf"), make_pdf(tmp_path, "b.pdf")
+    first = ExtractionManifest(tmp_path / "manifest.json", tmp_path)
+    second = ExtractionManifest(tmp_path / "manifest.json", tmp_path)
+    record(first, pdf_a, file_sha256(pdf_a), rec={"revenue": 1})
+    record(second, pdf_b, file_sha256(pdf_b), rec={"revenue": 2})
+    first.save()
+    second.save()
+    merged = ExtractionManifest(tmp_path / "manifest.json", tmp_path)
+    assert [k for k, _ in merged.records()] == ["acme/a.pdf", "acme/b.pdf"]
+    second.forget("acme/a.pdf")
+    second.save()
+    assert list(ExtractionManifest(tmp_path / "manifest.json", tmp_path).entries) == ["acme/b.pdf"]
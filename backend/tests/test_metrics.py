@@ -0,0 +1,42 @@
+import numpy as np
+import pytest
+from backend.src.metrics import METRIC_FIELDS, compute_metrics
+
+def quarters(*isodates):
+    return np.array(isodates, dtype="datetime64[D]")
+
+def cols(revenue, net_income, multiplier=1000.0):
+    revenue = np.array(revenue, dtype=float)
+    net_income = np.array(net_income, dtype=float)
+    return {
+        "revenue": revenue,
+        "gross_profit": revenue / 2,
+        "operating_income": revenue / 4,
+        "net_income": net_income,
+        "unit_multiplier": np.full(len(revenue), multiplier),
+    }
+
+def test_margins_growth_and_ttm():
+    dates = quarters("2022-03-31", "2022-06-30", "2022-09-30", "2022-12-31", "2023-03-31")
+    out = compute_metrics(np.zeros(5, dtype=int), dates, cols([100, 110, 121, 100, 150], [1, 2, 3, 4, 5]))
+    assert set(out) == set(METRIC_FIELDS)
+    assert out["gross_margin"][0] == 50.0
+    assert out["net_margin"][4] == pytest.approx(5 / 150 * 100)
+    assert np.isnan(out["revenue_qoq"][0])
+    assert out["revenue_qoq"][1] == pytest.approx(10.0)
+    assert out["revenue_yoy"][4] == pytest.approx(50.0)
+    assert np.isnan(out["ttm_net_income"][2])
+    assert out["ttm_net_income"][3] == 10_000  # (1+2+3+4) × unit_multiplier
+    assert out["ttm_net_income"][4] == 14_000
+
+def test_lags_do_not_cross_companies_or_gaps():
+    company = np.array([0, 0, 1, 1])
+    dates = quarters("2022-03-31", "2022-09-30", "2022-06-30", "2022-09-30")
+    out = compute_metrics(company, dates, cols([100, 120, 50, 60], [1, 1, 1, 1]))
+    assert np.isnan(out["revenue_qoq"][1])  # a quarter is missing in between
+    assert np.isnan(out["revenue_qoq"][2])  # previous row is another company
+    assert out["revenue_qoq"][3] == pytest.approx(20.0)
+
+def test_zero_revenue_gives_nan_margin():
+    out = compute_metrics(np.zeros(1, dtype=int), quarters("2022-03-31"), cols([0], [1]))
+    assert np.isnan(out["net_margin"][0])
@@ -0,0 +1,48 @@
+import json
+
+from backend.scripts import merge_jsons, orchestrate
+from backend.src import extract_interim_financials as extract
+
+def test_new_pdf_only_reruns_its_company(tmp_path, monkeypatch):
+    registry = [{"symbol": "ACME.N0000", "name": "Acme"}, {"symbol": "GLOB.N0000", "name": "Globex"}]
+    (tmp_path / "companies.json").write_text(json.dumps(registry))
+    monkeypatch.setenv("COMPANY_REGISTRY", str(tmp_path / "companies.json"))
+    for module in (extract, orchestrate):
+        monkeypatch.setattr(module, "PROJECT_ROOT", tmp_path)
+    monkeypatch.setattr(extract, "RAW_DIR", tmp_path / "raw")
+    monkeypatch.setattr(extract, "INTERIM_DIR", tmp_path / "interim")
+    monkeypatch.setattr(extract, "MANIFEST_FILE", tmp_path / "interim" / "manifest.json")
+    monkeypatch.setattr(merge_jsons, "SRC_ROOT", tmp_path / "interim")
+    monkeypatch.setattr(merge_jsons, "DST_ROOT", tmp_path / "public")
+    monkeypatch.setattr(extract, "llm_client", lambda n: None)
+
+    asked = []
+
+    def fake_extract_record(pdf_path, tmpl, example, client, snippet_fn):
+        asked.append(pdf_path.name)
+        extract.write_snippet(pdf_path, pdf_path.read_text())
+        return {"symbol": pdf_path.parent.name.upper() + ".N0000", "period_end_date": pdf_path.stem,
+                "revenue": f"{len(asked)} * 1"}
+
+    monkeypatch.setattr(extract, "extract_record", fake_extract_record)
+    for company, stems in (("acme", ["2024-03-31", "2024-06-30"]), ("globex", ["2024-03-31"])):
+        (tmp_path / "raw" / company).mkdir(parents=True)
+        for stem in stems:
+            (tmp_path / "raw" / company / f"{stem}.pdf").write_text(f"{company} {stem}")
+
+    def run():
+        args = orchestrate.parse_args(["--no-scrape", "--no-index", "--no-cache", "--parse-workers", "1",
+                                       "--state", str(tmp_path / "state.json")])
+        report = orchestrate.run(args)
+        return sorted(k for k, r in report.results.items() if r.status == "ran" and not k.startswith("scrape"))
+
+    assert run() == ["extract:acme/2024-03-31.pdf", "extract:acme/2024-06-30.pdf",
+                     "extract:globex/2024-03-31.pdf", "merge:acme", "merge:globex"]
+    assert len(json.loads((tmp_path / "public" / "acme" / "all.json").read_text())) == 2
+    assert run() == []
+
+    (tmp_path / "raw" / "acme" / "2024-09-30.pdf").write_text("acme q3")
+    assert run() == ["extract:acme/2024-09-30.pdf", "merge:acme"]
+    assert asked[-1] == "2024-09-30.pdf" and len(asked) == 4
+    assert len(json.loads((tmp_path / "public" / "acme" / "all.json").read_text())) == 3
+    assert (tmp_path / "interim" / "acme" / "csv" / "pnl.csv").read_text().count("\n") == 4
@@ -0,0 +1,85 @@
+import threading
+import time
+
+from backend.src.pipeline_dag import Task, TaskState, run_dag
+
+def copy_task(tmp_path, name, calls):
+    src, dst = tmp_path / f"{name}.txt", tmp_path / f"{name}.out"
+
+    def fn():
+        calls.append(f"copy:{name}")
+        dst.write_text(src.read_text().upper())
+        return [dst]
+
+    return Task(f"copy:{name}", fn=fn, inputs=lambda: [src])
+
+def join_task(tmp_path, calls):
+    outs = [tmp_path / "a.out", tmp_path / "b.out"]
+
+    def fn():
+        calls.append("join")
+        (tmp_path / "joined").write_text("".join(p.read_text() for p in outs))
+        return [tmp_path / "joined"]
+
+    return Task("join", fn=fn, inputs=lambda: outs, deps=("copy:*",))
+
+def test_only_stale_tasks_rerun(tmp_path):
+    (tmp_path / "a.txt").write_text("a")
+    (tmp_path / "b.txt").write_text("b")
+
+    def run():
+        calls = []
+        tasks = [copy_task(tmp_path, "a", calls), copy_task(tmp_path, "b", calls), join_task(tmp_path, calls)]
+        report = run_dag(tasks, TaskState(tmp_path / "state.json", tmp_path))
+        return sorted(calls), report
+
+    calls, report = run()
+    assert calls == ["copy:a", "copy:b", "join"] and not report.failed
+    assert (tmp_path / "joined").read_text() == "AB"
+
+    calls, report = run()
+    assert calls == [] and {r.status for r in report.results.values()} == {"fresh"}
+
+    (tmp_path / "a.txt").write_text("x")
+    assert run()[0] == ["copy:a", "join"]
+    assert (tmp_path / "joined").read_text() == "XB"
+
+    (tmp_path / "joined").write_text("edited by hand")
+    assert run()[0] == ["join"]
+
+def test_expanded_tasks_run_per_company_with_stage_limits(tmp_path):
+    running, peak, lock = [0], [0], threading.Lock()
+
+    def work(seconds):
+        def fn():
+            with lock:
+                running[0] += 1
+                peak[0] = max(peak[0], running[0])
+            time.sleep(seconds)
+            with lock:
+                running[0] -= 1
+        return fn
+
+    def expand(company, seconds):
+        return lambda: [
+            Task(f"work:{company}/1", fn=work(seconds)),
+            Task(f"work:{company}/2", fn=work(seconds), deps=(f"work:{company}/1",)),
+        ]
+
+    tasks = [
+        Task("list:slow", fn=lambda: None, always=True, expand=expand("slow", 0.1)),
+        Task("list:fast", fn=lambda: None, always=True, expand=expand("fast", 0.01)),
+        Task("done", fn=lambda: None, deps=("work:*",), always=True),
+        Task("orphan", fn=lambda: None, deps=("missing",)),
+        Task("broken", fn=lambda: 1 / 0),
+    ]
+    report = run_dag(tasks, TaskState(tmp_path / "state.json", tmp_path), limits={"work": 2})
+
+    results = report.results
+    assert peak[0] == 2
+    assert results["done"].start >= max(r.end for k, r in results.items() if k.startswith("work:"))
+    assert [r.key for r in report.critical_path()] == ["list:slow", "work:slow/1", "work:slow/2", "done"]
+    assert {r.key: r.status for r in report.failed} == {"orphan": "blocked", "broken": "failed"}
+    stages = report.stages()
+    assert (stages["work"]["tasks"], stages["work"]["ran"]) == (4, 4)
+    assert "critical path" in report.format()
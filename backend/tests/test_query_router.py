@@ -0,0 +1,64 @@
+import json
+from datetime import date
+
+import pytest
+from backend.src.financial_store import FinancialStore
+from backend.src.query_router import QueryRouter, RoutingStats, parse_intent
+
+@pytest.fixture
+def router(tmp_path):
+    (tmp_path / "acme").mkdir()
+    records = [
+        {"period_end_date": "2022-06-30", "revenue": 80, "gross_profit": 20, "net_income": 5, "unit_multiplier": 1000},
+        {"period_end_date": "2023-03-31", "revenue": 100, "gross_profit": 30, "net_income": 8, "unit_multiplier": 1000},
+        {"period_end_date": "2023-06-30", "revenue": 120, "gross_profit": 30, "net_income": 10, "unit_multiplier": 1000,
+         "company": "ACME PLC", "currency": "LKR"},
+    ]
+    (tmp_path / "acme" / "all.json").write_text(json.dumps(records), encoding="utf-8")
+    store = FinancialStore(tmp_path)
+    store.reload_if_changed()
+    return QueryRouter(store)
+
+def test_parse_intent_periods_and_metrics():
+    intent = parse_intent("What was the net profit and revenue for the 3 months ended 30/06/2023?")
+    assert intent.metrics == ["net_income", "revenue"]
+    assert intent.periods == [date(2023, 6, 30)] and intent.comparison is None
+    assert parse_intent("gross margin in 2023 Q1").periods == [date(2023, 3, 31)]
+    assert parse_intent("sales for December 2023").periods == [date(2023, 12, 31)]
+    assert parse_intent("latest net margin").latest
+
+def test_parse_intent_comparisons():
+    assert parse_intent("compare revenue Q2 2023 vs Q1 2023").periods == [date(2023, 3, 31), date(2023, 6, 30)]
+    assert parse_intent("revenue growth in Q2 2023").comparison == "qoq"
+    assert parse_intent("revenue YoY in Q2 2023").comparison == "yoy"
+
+def test_open_ended_or_incomplete_questions_fall_back():
+    assert parse_intent("Why did revenue drop in Q2 2023?") is None
+    assert parse_intent("Summarize the quarter") is None
+    assert parse_intent("net income in 2023") is None
+
+def test_answers_lookup_from_store(router):
+    out = router.route("net income of acme in Q2 2023", "acme")
+    assert out.answer == "ACME PLC: Net income in the quarter ended 2023-06-30 (Q2 2023) was LKR 10 thousand."
+    assert out.sources == ["acme:2023-06-30"]
+    assert "25.00%" in router.route("latest gross margin", "acme").answer
+
+def test_answers_comparisons(router):
+    qoq = router.route("revenue change in Q2 2023", "acme").answer
+    assert "LKR 100 thousand" in qoq and "+20 (+20.0%)" in qoq
+    yoy = router.route("gross margin YoY for Q2 2023", "acme").answer
+    assert "+0.00 percentage points" in yoy
+
+def test_missing_data_falls_back(router):
+    assert router.route("net income in Q4 2023", "acme") is None
+    assert router.route("revenue change in Q1 2023", "acme") is None  # no previous quarter
+    assert router.route("net income in Q2 2023", "initech") is None
+    assert router.stats.stats() == {}
+
+def test_routing_stats_ratio():
+    stats = RoutingStats()
+    for route, seconds in [("structured", 0.001), ("structured", 0.003), ("llm", 1.0)]:
+        stats.record(route, seconds)
+    out = stats.stats()
+    assert out["structured"]["count"] == 2 and out["llm"]["ratio"] == pytest.approx(1 / 3)
+    assert out["llm"]["p95_ms"] == 1000.0
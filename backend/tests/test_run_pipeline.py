@@ -0,0 +1,29 @@
+import json
+
+from backend.scripts import merge_jsons, run_pipeline
+
+def test_sharded_merge_covers_every_company_once(tmp_path, monkeypatch):
+    companies = [{"symbol": f"S{i}.N0000", "name": f"Company {i}"} for i in range(12)]
+    (tmp_path / "companies.json").write_text(json.dumps(companies))
+    monkeypatch.setenv("COMPANY_REGISTRY", str(tmp_path / "companies.json"))
+    monkeypatch.setattr(merge_jsons, "SRC_ROOT", tmp_path / "interim")
+    monkeypatch.setattr(merge_jsons, "DST_ROOT", tmp_path / "public")
+    for i in range(12):
+        src = tmp_path / "interim" / f"company-{i}" / "json"
+        src.mkdir(parents=True)
+        (src / "q1.json").write_text(json.dumps({"period_end_date": "2024-06-30", "revenue": "100 + 20"}))
+
+    merged = []
+    merge_company = merge_jsons.merge_company
+    monkeypatch.setattr(merge_jsons, "merge_company", lambda c: merged.append(c.slug) or merge_company(c))
+    for shard in range(3):
+        assert run_pipeline.main(["--shard", f"{shard}/3", "--stages", "merge"]) == 0
+    assert sorted(merged) == sorted(f"company-{i}" for i in range(12))
+    out = json.loads((tmp_path / "public" / "company-3" / "all.json").read_text())
+    assert out == [{"period_end_date": "2024-06-30", "revenue": 120.0, "quarter": "Q2"}]
+
+    runs = []
+    monkeypatch.setattr(run_pipeline, "run_stages", lambda companies, stages, args: runs.append(stages) or [])
+    run_pipeline.main(["--shard", "1/3"])
+    run_pipeline.main([])
+    assert runs == [["scrape", "extract", "merge"], ["scrape", "extract", "merge", "index"]]
@@ -0,0 +1,60 @@
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+from backend.src.services import ConfigError
+
+BACKEND = Path(__file__).resolve().parents[1]
+
+def test_nothing_is_built_until_used(make_services):
+    services = make_services()
+    assert not services.built("llm") and not services.built("vectordb")
+    assert len(services.prompt_version) == 12
+    assert services.built("system_prompt") and not services.built("embeddings")
+    services.llm = stub = object()
+    assert services.llm is stub
+
+def test_missing_key_fails_readiness_not_import(make_services):
+    services = make_services()
+    with pytest.raises(ConfigError):
+        services.embeddings
+    services.warm_up()
+    assert services.readiness() == {"status": "failed", "error": "ConfigError: Missing OPENAI_EMBEDDING_KEY in .env"}
+
+def test_warm_up_prefetches_the_vector_index(make_services):
+    services = make_services(embed_key="sk-test", embedding_model="m")
+    services.vectordb._collection.add(ids=["a", "b"], embeddings=[[1.0, 0.0], [0.0, 1.0]],
+                                      metadatas=[{"company_slug": "acme"}] * 2)
+    assert services.prefetch_vectors() == 2
+    services.warm_up()
+    assert services.state == "ready" and services.warmup_seconds is not None
+    assert services.index_catalog.slugs() == ["acme"]  # no catalog file: built from the collection
+
+def test_importing_the_app_builds_no_clients():
+    code = (
+        "import sys, backend.app as app\n"
+        "assert not app.services.built('settings')\n"
+        "print(sorted(m for m in ('chromadb', 'langchain_openai', 'openai') if m in sys.modules))\n"
+    )
+    env = {k: v for k, v in os.environ.items() if not k.upper().startswith("OPENAI_")}
+    out = subprocess.run([sys.executable, "-c", code], cwd=BACKEND.parent, env=env,
+                         capture_output=True, text=True, check=True)
+    assert out.stdout.splitlines()[-1] == "[]"  # stdout also carries the log
+
+def test_health_probes_and_unconfigured_chat(make_services, monkeypatch):
+    from backend import app as chat_app
+
+    monkeypatch.setattr(chat_app, "services", make_services())
+    with TestClient(chat_app.app) as client:
+        assert client.get("/health/live").json() == {"status": "ok"}
+        deadline = time.monotonic() + 10
+        while chat_app.services.state in ("starting", "warming") and time.monotonic() < deadline:
+            time.sleep(0.01)
+        ready = client.get("/health/ready")
+        assert ready.status_code == 503 and ready.json()["status"] == "failed"
+        chat = client.post("/api/chat", json={"company_slug": "acme", "question": "Why did margins fall?"})
+        assert chat.status_code == 503
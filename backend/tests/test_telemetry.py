@@ -0,0 +1,87 @@
+import logging
+import multiprocessing
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from backend.src.telemetry import Registry, RequestIdFilter, TelemetryMiddleware
+
+def test_render_counters_and_histograms():
+    registry = Registry()
+    hits = registry.counter("cache_hits_total", "Cache hits", ("cache",))
+    latency = registry.histogram("stage_seconds", "Stage latency", ("stage",), buckets=(0.1, 1.0))
+    hits.inc(cache="answer")
+    hits.inc(2, cache="answer")
+    for value in (0.05, 0.5, 3.0):
+        latency.observe(value, stage="llm")
+
+    text = registry.render()
+    assert '# TYPE cache_hits_total counter\ncache_hits_total{cache="answer"} 3\n' in text
+    assert 'stage_seconds_bucket{stage="llm",le="0.1"} 1\n' in text
+    assert 'stage_seconds_bucket{stage="llm",le="1"} 2\n' in text
+    assert 'stage_seconds_bucket{stage="llm",le="+Inf"} 3\n' in text
+    assert 'stage_seconds_sum{stage="llm"} 3.55\n' in text
+    assert 'stage_seconds_count{stage="llm"} 3\n' in text
+
+def test_labels_are_checked_and_escaped():
+    registry = Registry()
+    counter = registry.counter("errors_total", "Errors", ("stage",))
+    with pytest.raises(ValueError):
+        counter.inc(step="llm")
+    counter.inc(stage='say "hi"\n')
+    assert 'errors_total{stage="say \\"hi\\"\\n"} 1' in registry.render()
+
+def test_collectors_mirror_external_counters():
+    registry = Registry()
+    mirrored = registry.counter("lookups_total", "Lookups", ("outcome",))
+    source = {"hit": 4}
+    registry.add_collector(lambda: mirrored.set_total(source["hit"], outcome="hit"))
+    source["hit"] = 7
+    assert 'lookups_total{outcome="hit"} 7' in registry.render()
+
+def _worker(directory, n):
+    registry = Registry(directory)
+    registry.counter("chats_total", "Chats", ("route",)).inc(n, route="llm")
+    registry.histogram("llm_seconds", "LLM", buckets=(1.0,)).observe(2.0)
+    registry.flush(force=True)
+
+def test_multiprocess_snapshots_are_summed(tmp_path):
+    ctx = multiprocessing.get_context("fork")
+    for n in (2, 5):
+        proc = ctx.Process(target=_worker, args=(tmp_path, n))
+        proc.start()
+        proc.join()
+    registry = Registry(tmp_path)
+    registry.counter("chats_total", "Chats", ("route",)).inc(route="llm")
+    registry.histogram("llm_seconds", "LLM", buckets=(1.0,))
+
+    text = registry.render()
+    assert 'chats_total{route="llm"} 8' in text
+    assert 'llm_seconds_bucket{le="+Inf"} 2' in text and "llm_seconds_count 2" in text
+    assert len(list(tmp_path.glob("metrics-*.json"))) == 3
+
+def test_middleware_sets_request_id_and_times_routes(caplog):
+    registry = Registry()
+    latency = registry.histogram("http_seconds", "HTTP", ("method", "path", "status"))
+    app = FastAPI()
+    app.add_middleware(TelemetryMiddleware, registry=registry, histogram=latency)
+    log = logging.getLogger("test_telemetry")
+
+    @app.get("/items/{item_id}")
+    def item(item_id: int):
+        log.info("fetching %d", item_id)
+        return {"id": item_id}
+
+    client = TestClient(app)
+    caplog.handler.addFilter(RequestIdFilter())
+    with caplog.at_level(logging.INFO, logger="test_telemetry"):
+        resp = client.get("/items/1", headers={"X-Request-ID": "req-42"})
+    assert resp.headers["x-request-id"] == "req-42"
+    assert caplog.records[-1].request_id == "req-42"
+
+    generated = client.get("/items/2", headers={"X-Request-ID": "bad id!"}).headers["x-request-id"]
+    assert generated != "bad id!" and len(generated) == 16
+    client.get("/nowhere")
+    text = registry.render()
+    assert 'http_seconds_count{method="GET",path="/items/{item_id}",status="200"} 2' in text
+    assert 'http_seconds_count{method="GET",path="unmatched",status="404"} 1' in text
@@ -1,5 +1,6 @@
 import React, { useState, useRef, useEffect } from 'react';
 import PropTypes            from 'prop-types';
+import { streamChat }       from '../services/chatApi';
 import './ChatPage.css';
 
 export default function ChatPage({ companySlug, onClose }) {
@@ -38,20 +39,21 @@ export default function ChatPage({ companySlug, onClose }) {
     setError(null);
 
     try {
-      const resp = await fetch('/api/chat', {
-        method: 'POST',
-        headers: { 'Content-Type': 'application/json' },
-        body: JSON.stringify({
-          question,
-          company_slug: companySlug,
-          history: newHistory
-        })
-      });
-      if (!resp.ok) throw new Error(await resp.text());
-      const { answer } = await resp.json();
-      setHistory(h => [...h, { role: 'assistant', content: answer }]);
+      // placeholder bubble that fills in as tokens stream back
+      setHistory(h => [...h, { role: 'assistant', content: '' }]);
+      await streamChat(
+        { question, company_slug: companySlug, history: newHistory },
+        {
+          onToken: token => setHistory(h => {
+            const last = h[h.length - 1];
+            return [...h.slice(0, -1), { ...last, content: last.content + token }];
+          }),
+        }
+      );
     } catch (e) {
       console.error(e);
+      // drop the placeholder bubble if nothing streamed back
+      setHistory(h => (h[h.length - 1]?.content === '' ? h.slice(0, -1) : h));
       setError(`Error: ${e.message}`);
     } finally {
       setLoading(false);
@@ -10,7 +10,7 @@ import GrossMarginChart      from './GrossMarginChart';
 import NetMarginChart        from './NetMarginChart';
 import TTMNetIncomeChart     from './TTMNetIncomeChart';
 import EntitySelector        from './EntitySelector';
-import { fetchCompanyData }  from '../services/financialApi';
+import { fetchFinancials }   from '../services/financialApi';
 
 import './Dashboard.css';
 
@@ -22,6 +22,18 @@ const METRIC_TABS = [
 
 const ALL_COMPANIES = ['dipped-products', 'richard-pieris'];
 
+// only the columns the cards and charts read; margins, growth and TTM
+// are precomputed by the backend
+const DASHBOARD_FIELDS = [
+  'unit_multiplier', 'revenue', 'gross_profit', 'operating_expenses', 'operating_income', 'net_income',
+  'gross_margin', 'operating_margin', 'net_margin', 'revenue_qoq', 'ttm_net_income',
+];
+
+// KPI amounts are shown in absolute currency (× unit_multiplier), in
+// millions, matching the TTM chart; margins are already percentages
+const toMillions = v => (v == null ? '—' : (v / 1e6).toFixed(2));
+const toPercent  = v => (v == null ? '—' : v.toFixed(2));
+
 export default function Dashboard() {
   const [metric,    setMetric]    = useState('revenue');
   const [data,      setData]      = useState({});
@@ -31,21 +43,24 @@ export default function Dashboard() {
   const [toDate,    setToDate]    = useState(null);
   const [companies, setCompanies] = useState([...ALL_COMPANIES]);
 
+  // Fetch only the selected companies; the date range is applied client
+  // side because the comparison and TTM charts need the full history.
   useEffect(() => {
+    let cancelled = false;
     (async () => {
       try {
-        const out = {};
-        for (const slug of ALL_COMPANIES) {
-          out[slug] = await fetchCompanyData(slug);
-        }
-        setData(out);
+        const out = companies.length
+          ? await fetchFinancials({ companies, fields: DASHBOARD_FIELDS })
+          : {};
+        if (!cancelled) setData(out);
       } catch {
-        setError('Failed to load data');
+        if (!cancelled) setError('Failed to load data');
       } finally {
-        setLoading(false);
+        if (!cancelled) setLoading(false);
       }
     })();
-  }, []);
+    return () => { cancelled = true; };
+  }, [companies]);
 
   const summary = useMemo(() => {
     return companies
@@ -59,18 +74,16 @@ export default function Dashboard() {
         if (!recs.length) return null;
 
         const [latest, prev] = recs;
-        const last4 = recs.slice(0,4);
-        const ttmNet = last4.reduce((sum, r) => sum + r.net_income, 0);
         const delta = prev
           ? (latest[metric] - prev[metric]) / Math.abs(prev[metric]) * 100
           : null;
 
         return {
           slug,
-          revenue: latest.revenue,
-          gm:      (latest.gross_profit / latest.revenue) * 100,
-          nm:      (latest.net_income    / latest.revenue) * 100,
-          ttmNet,
+          revenue: latest.revenue == null ? null : latest.revenue * (latest.unit_multiplier || 1),
+          gm:      latest.gross_margin,
+          nm:      latest.net_margin,
+          ttmNet:  latest.ttm_net_income,
           delta,
         };
       })
@@ -112,22 +125,22 @@ export default function Dashboard() {
           <React.Fragment key={s.slug}>
             <MetricCard
               title={`${s.slug.replace('-', ' ')} Revenue`}
-              value={(s.revenue / 1000).toFixed(2)}
-              unit="k LKR"
+              value={toMillions(s.revenue)}
+              unit="M LKR"
               delta={s.delta}
             />
             <MetricCard
               title="Gross Profit %"
-              value={s.gm.toFixed(2)}
+              value={toPercent(s.gm)}
             />
             <MetricCard
               title="Net Profit %"
-              value={s.nm.toFixed(2)}
+              value={toPercent(s.nm)}
             />
             <MetricCard
               title="TTM Net Income"
-              value={(s.ttmNet / 1000).toFixed(2)}
-              unit="k LKR"
+              value={toMillions(s.ttmNet)}
+              unit="M LKR"
             />
           </React.Fragment>
         ))}
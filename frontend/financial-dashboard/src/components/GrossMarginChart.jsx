@@ -16,7 +16,7 @@ export default function GrossMarginChart({ data, companies, fromDate, toDate })
       const row = { period_end_date: date };
       companies.forEach(slug=>{
         const rec=(data[slug]||[]).find(r=>r.period_end_date===date);
-        if(rec) row[slug]=(rec.gross_profit/rec.revenue)*100;
+        if(rec) row[slug]=rec.gross_margin;
       });
       return row;
     });
@@ -18,9 +18,9 @@ export default function MarginHeatmap({ data, companies }) {
         out.push({
           slug,
           date: rec.period_end_date,
-          gm:   rec.gross_profit     / rec.revenue,
-          om:   rec.operating_income / rec.revenue,
-          nm:   rec.net_income       / rec.revenue,
+          gm:   rec.gross_margin     / 100,
+          om:   rec.operating_margin / 100,
+          nm:   rec.net_margin       / 100,
         });
       });
     });
@@ -16,7 +16,7 @@ export default function NetMarginChart({ data, companies, fromDate, toDate }) {
       const row = { period_end_date: date };
       companies.forEach(slug=>{
         const rec=(data[slug]||[]).find(r=>r.period_end_date===date);
-        if(rec) row[slug]=(rec.net_income/rec.revenue)*100;
+        if(rec) row[slug]=rec.net_margin;
       });
       return row;
     });
@@ -6,32 +6,12 @@ import {
 } from 'recharts';
 import ChartCard from './ChartCard';
 
-/* Compute QoQ % change for each record in-place */
-function addQoQ(arr, field) {
-  return arr.map((rec, i) => {
-    const prev = arr[i + 1];          // sorted desc later
-    const pct  = prev ? ((rec[field] - prev[field]) / Math.abs(prev[field])) * 100 : null;
-    return { ...rec, [`${field}_qoq`]: pct };
-  });
-}
-
 export default function QoQGrowthChart({ data, companies }) {
-  // flatten -> sort desc per company -> compute QoQ %
-  let merged = companies.flatMap(slug =>
-    [...(data[slug] || [])]
-      .sort((a, b) => new Date(b.period_end_date) - new Date(a.period_end_date))
-      .slice(0, 8) // last 8 quarters
-  );
-
-  merged = companies.flatMap(slug =>
-    addQoQ(
-      merged.filter(r => r.slug === slug),
-      'revenue'
-    ).map(r => ({
-      ...r,
-      slug,
-      net_income_qoq: null,   // you can extend similarly if desired
-    }))
+  // last 8 quarters per company; revenue_qoq is precomputed by the backend
+  const merged = companies.flatMap(slug =>
+    (data[slug] || [])
+      .slice(-8)
+      .map(r => ({ ...r, slug }))
   );
 
   return (
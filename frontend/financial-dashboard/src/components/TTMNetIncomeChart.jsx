@@ -10,14 +10,13 @@ export default function TTMNetIncomeChart({ data, companies }) {
     new Set(companies.flatMap(s=>data[s]||[]).map(r=>r.period_end_date))
   ).sort();
 
+  // ttm_net_income is precomputed by the backend in absolute currency
+  // (× unit_multiplier); it is null until four consecutive quarters exist.
   const chartData = dates.map(date=>{
     const row={ period_end_date:date };
     companies.forEach(slug=>{
-      const recs=(data[slug]||[])
-        .filter(r=>new Date(r.period_end_date)<=new Date(date))
-        .sort((a,b)=>new Date(b.period_end_date)-new Date(a.period_end_date))
-        .slice(0,4);
-      row[slug]=recs.reduce((s,r)=>s+r.net_income,0);
+      const rec=(data[slug]||[]).find(r=>r.period_end_date===date);
+      if(rec) row[slug]=rec.ttm_net_income;
     });
     return row;
   });
@@ -32,7 +31,7 @@ export default function TTMNetIncomeChart({ data, companies }) {
         >
           <XAxis dataKey="period_end_date" tick={{fontSize:11}}/>
           <YAxis />
-          <Tooltip formatter={v=>v.toLocaleString()} />
+          <Tooltip formatter={v=>v?.toLocaleString()} />
           <Legend />
           {companies.map((s,i)=>(
             <Line key={s} dataKey={s} dot={false} stroke={i? '#ff7f0e':'#1f77b4'} />
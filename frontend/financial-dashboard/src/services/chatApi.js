@@ -11,3 +11,54 @@ export async function askLLM(companySlug, question, history = []) {
   }
   return await res.json();
 }
+
+/**
+ * Stream an answer from `/api/chat/stream` (Server-Sent Events).
+ *
+ * @param {Object} payload – `{ company_slug, question, history }`.
+ * @param {Object} handlers – `{ onSources, onToken, onDone }` callbacks.
+ * @returns {Promise<void>} – Resolves once the stream has finished.
+ * @throws {Error} – On HTTP errors or an `error` event from the server.
+ */
+export async function streamChat(payload, { onSources, onToken, onDone } = {}) {
+  const url = `${process.env.REACT_APP_API_URL || ''}/api/chat/stream`;
+  const res = await fetch(url, {
+    method: 'POST',
+    headers: { 'Content-Type': 'application/json' },
+    body: JSON.stringify(payload),
+  });
+  if (!res.ok) {
+    const text = await res.text();
+    throw new Error(`HTTP ${res.status}: ${text}`);
+  }
+
+  const reader  = res.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = '';
+
+  const dispatch = frame => {
+    let event = 'message';
+    let data  = '';
+    frame.split('\n').forEach(line => {
+      if (line.startsWith('event: ')) event = line.slice(7);
+      else if (line.startsWith('data: ')) data += line.slice(6);
+    });
+    if (!data) return;
+    const body = JSON.parse(data);
+    if (event === 'sources') onSources?.(body.sources);
+    else if (event === 'token') onToken?.(body.token);
+    else if (event === 'done') onDone?.(body);
+    else if (event === 'error') throw new Error(body.detail);
+  };
+
+  for (;;) {
+    const { value, done } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+    let sep;
+    while ((sep = buffer.indexOf('\n\n')) !== -1) {
+      dispatch(buffer.slice(0, sep));
+      buffer = buffer.slice(sep + 2);
+    }
+  }
+}
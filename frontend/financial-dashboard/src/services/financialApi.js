@@ -1,11 +1,43 @@
 /**
  * financialApi.js
  *
- * Fetches the merged quarterly P&L JSON for a given company.
- * Reads from the `public/data/<slug>/all.json` path in the CRA build.
+ * Fetches quarterly P&L records, either a slice from the backend's
+ * `/api/financials` endpoint or the whole `public/data/<slug>/all.json`
+ * file from the CRA build.
  */
 
 const DATA_BASE = process.env.REACT_APP_DATA_URL || '';
+const API_BASE  = process.env.REACT_APP_API_URL || '';
+
+const isoDate = d => (d instanceof Date ? d.toISOString().slice(0, 10) : d);
+
+/**
+ * Load a slice of P&L records from `/api/financials`.
+ *
+ * The browser revalidates with the response ETag, so repeating a query
+ * costs a 304 once the data is cached.
+ *
+ * @param {Object} query – `{ companies, from, to, fields }`; all optional.
+ *   `companies` and `fields` are arrays, `from` / `to` Dates or YYYY-MM-DD.
+ * @returns {Promise<Object<string, Array<Object>>>} – Records keyed by slug, oldest first.
+ * @throws {Error} – If the network request fails or the response is not OK.
+ */
+export async function fetchFinancials({ companies = [], from, to, fields = [] } = {}) {
+  const params = new URLSearchParams();
+  companies.forEach(slug => params.append('company', slug));
+  if (from) params.set('start', isoDate(from));
+  if (to) params.set('end', isoDate(to));
+  if (fields.length) params.set('fields', fields.join(','));
+
+  const resp = await fetch(`${API_BASE}/api/financials?${params}`);
+  if (!resp.ok) {
+    throw new Error(
+      `fetchFinancials error: HTTP ${resp.status} – ${resp.statusText}`
+    );
+  }
+
+  return (await resp.json()).data;
+}
 
 /**
  * Load all financial records for the given company slug.